@@ -1,7 +1,29 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, abort, Response, stream_with_context
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-from models import db, Usuario, Categoria, Producto, Movimiento, ProductoModelo, ProductoColor, ProductoCaracteristica
+from models import (db, Usuario, Categoria, Producto, Movimiento, ProductoModelo, ProductoColor, ProductoCaracteristica,
+                    MovimientoDiario, Cliente, LocalAnexo, crear_columnas, crear_indices)
 from config import Config
+from metricas_dashboard import obtener_metricas, reconstruir_resumen
+from consultas import (paginar_keyset, decodificar_cursor, contar_cacheado,
+                       carga_movimientos, carga_movimientos_producto, carga_productos, carga_producto_detalle,
+                       carga_modelo, presupuesto_consultas, registrar_presupuesto_consultas)
+import motor_reportes
+import secuencias_codigo
+import consulta_ruc
+from instrumentacion import registrar_instrumentacion
+from perfil_base_datos import registrar_perfil_base_datos
+from replica_lectura import configurar_replica_lectura, solo_lectura
+from tiempo_real import socketio, registrar_tiempo_real
+from difusion_stock import registrar_difusion_stock
+from trabajos import registrar_trabajos, encolar, tarea, a_dict
+from fotos_recojo import registrar_fotos_recojo
+from autoguardado_ordenes import registrar_autoguardado_ordenes
+from logs_sistema import registrar_logs
+from estaticos import registrar_estaticos
+from registro_cambios import con_etag, cambios_desde, respuesta_cambios, CursorInvalido
+from busqueda_productos import filtrar_productos, sugerencias, crear_indice_busqueda
+from servicio_stock import (registrar_movimiento, ajustar_stock, registrar_lote, leer_lote_csv,
+                            StockError, StockInsuficiente, ConflictoConcurrencia, VarianteInvalida, VarianteRequerida)
 from datetime import datetime
 from sqlalchemy import func, desc
 import os
@@ -10,7 +32,18 @@ import json
 app = Flask(__name__)
 app.config.from_object(Config)
 
+configurar_replica_lectura(app)
 db.init_app(app)
+registrar_perfil_base_datos(app)
+registrar_presupuesto_consultas(app)
+registrar_instrumentacion(app)
+registrar_tiempo_real(app)
+registrar_difusion_stock(app)
+registrar_trabajos(app)
+registrar_fotos_recojo(app)
+registrar_autoguardado_ordenes(app)
+registrar_logs(app)
+registrar_estaticos(app)
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
@@ -53,47 +86,36 @@ def logout():
 # ==================== DASHBOARD ====================
 
 @app.route('/')
+@solo_lectura
+@presupuesto_consultas(9)
 @login_required
 def dashboard():
-    # Estadísticas generales
-    total_productos = Producto.query.filter_by(activo=True).count()
-    total_categorias = Categoria.query.filter_by(activo=True).count()
-    
-    # Productos con stock bajo
-    productos_bajo_stock = Producto.query.filter(
-        Producto.activo == True,
-        Producto.stock_actual <= Producto.stock_minimo
-    ).all()
-    
-    # Valor total del inventario
-    valor_total = db.session.query(func.sum(Producto.stock_actual * Producto.precio_unitario)).filter(
-        Producto.activo == True
-    ).scalar() or 0
+    metricas = obtener_metricas()
     
     # Últimos movimientos
-    ultimos_movimientos = Movimiento.query.order_by(desc(Movimiento.fecha_movimiento)).limit(10).all()
-    
-    # Productos más movidos (últimos 30 días)
-    productos_top = db.session.query(
-        Producto.nombre,
-        func.count(Movimiento.id).label('total_movimientos')
-    ).join(Movimiento).group_by(Producto.id).order_by(desc('total_movimientos')).limit(5).all()
+    ultimos_movimientos = Movimiento.query.options(*carga_movimientos()).order_by(
+        desc(Movimiento.fecha_movimiento)
+    ).limit(10).all()
     
     return render_template('dashboard.html',
-                         total_productos=total_productos,
-                         total_categorias=total_categorias,
-                         productos_bajo_stock=productos_bajo_stock,
-                         valor_total=valor_total,
                          ultimos_movimientos=ultimos_movimientos,
-                         productos_top=productos_top)
+                         **metricas)
 
 # ==================== CATEGORÍAS ====================
 
 @app.route('/categorias')
+@solo_lectura
+@presupuesto_consultas(3)
 @login_required
 def categorias():
     categorias = Categoria.query.filter_by(activo=True).all()
-    return render_template('categorias.html', categorias=categorias)
+    
+    # Cantidad de productos por categoría en una sola consulta
+    productos_por_categoria = dict(
+        db.session.query(Producto.categoria_id, func.count(Producto.id)).group_by(Producto.categoria_id).all()
+    )
+    
+    return render_template('categorias.html', categorias=categorias, productos_por_categoria=productos_por_categoria)
 
 @app.route('/categorias/nueva', methods=['GET', 'POST'])
 @login_required
@@ -106,13 +128,8 @@ def nueva_categoria():
             flash('Ya existe una categoría con ese nombre', 'warning')
             return redirect(url_for('nueva_categoria'))
         
-        # Generar código automático (siguiente número disponible)
-        ultima_categoria = Categoria.query.order_by(Categoria.codigo.desc()).first()
-        if ultima_categoria:
-            ultimo_num = int(ultima_categoria.codigo)
-            nuevo_codigo = f"{ultimo_num + 1:03d}"
-        else:
-            nuevo_codigo = "001"
+        # Generar código automático (siguiente número de la secuencia)
+        nuevo_codigo = secuencias_codigo.siguiente(secuencias_codigo.CATEGORIAS)
         
         categoria = Categoria(codigo=nuevo_codigo, nombre=nombre, descripcion=descripcion)
         db.session.add(categoria)
@@ -153,7 +170,7 @@ def eliminar_categoria(id):
     categoria = Categoria.query.get_or_404(id)
     
     # Verificar si tiene productos asociados
-    if categoria.productos:
+    if Producto.query.filter_by(categoria_id=id).first():
         flash('No se puede eliminar la categoría porque tiene productos asociados', 'danger')
     else:
         categoria.activo = False
@@ -165,36 +182,47 @@ def eliminar_categoria(id):
 # ==================== PRODUCTOS ====================
 
 @app.route('/productos')
+@solo_lectura
+@presupuesto_consultas(4)
 @login_required
 def productos():
-    page = request.args.get('page', 1, type=int)
-    categoria_id = request.args.get('categoria', type=int)
-    busqueda = request.args.get('busqueda', '')
-    
-    query = Producto.query.filter_by(activo=True)
-    
-    if categoria_id:
-        query = query.filter_by(categoria_id=categoria_id)
-    
-    if busqueda:
-        query = query.filter(
-            (Producto.nombre.contains(busqueda)) | 
-            (Producto.codigo.contains(busqueda))
-        )
-    
-    productos = query.order_by(Producto.nombre).paginate(
-        page=page, per_page=app.config['ITEMS_PER_PAGE'], error_out=False
-    )
-    
+    productos, filtros = _pagina_productos()
     categorias = Categoria.query.filter_by(activo=True).all()
     
     return render_template('productos.html', 
                          productos=productos, 
                          categorias=categorias,
-                         categoria_seleccionada=categoria_id,
-                         busqueda=busqueda)
+                         categoria_seleccionada=filtros['categoria'],
+                         busqueda=filtros['busqueda'])
+
+def _pagina_productos():
+    """Página de productos por cursor (nombre, id); los filtros viajan dentro del cursor"""
+    cursor = request.args.get('cursor')
+    datos_cursor = decodificar_cursor(cursor)
+    if datos_cursor:
+        filtros = datos_cursor[2]
+    else:
+        filtros = {
+            'categoria': request.args.get('categoria', type=int),
+            'busqueda': request.args.get('busqueda', '')
+        }
+    
+    query = Producto.query.options(*carga_productos()).filter_by(activo=True)
+    
+    if filtros['categoria']:
+        query = query.filter_by(categoria_id=filtros['categoria'])
+    
+    orden = [Producto.nombre, Producto.id]
+    if filtros['busqueda']:
+        # Índice de texto completo: nombre, código, descripción y características, ordenado por relevancia
+        query, orden = filtrar_productos(query, filtros['busqueda'])
+    
+    total = contar_cacheado(('productos', filtros['categoria'], filtros['busqueda']), query)
+    pagina = paginar_keyset(query, orden, cursor, app.config['ITEMS_PER_PAGE'], filtros, total=total)
+    return pagina, filtros
 
 @app.route('/productos/nuevo', methods=['GET', 'POST'])
+@presupuesto_consultas(20)  # 17 medidas con secuencia nueva, stock inicial y características; 3 para códigos saltados
 @login_required
 def nuevo_producto():
     if request.method == 'POST':
@@ -210,7 +238,11 @@ def nuevo_producto():
         tiene_modelos = request.form.get('tiene_modelos') == 'on'
         tiene_colores = request.form.get('tiene_colores') == 'on'
         
-        if Producto.query.filter_by(codigo=codigo).first():
+        categoria = db.session.get(Categoria, categoria_id) if categoria_id else None
+        if categoria and ubicacion:
+            # El código se asigna al guardar: el que mostró el formulario pudo tomarlo otro usuario
+            codigo = secuencias_codigo.siguiente(secuencias_codigo.clave_producto(categoria.codigo, ubicacion))
+        elif Producto.query.filter_by(codigo=codigo).first():
             flash('Ya existe un producto con ese código', 'warning')
             return redirect(url_for('nuevo_producto'))
         
@@ -228,42 +260,39 @@ def nuevo_producto():
             tiene_colores=tiene_colores
         )
         
-        db.session.add(producto)
-        db.session.flush()  # Para obtener el ID del producto
-        
-        # Guardar características personalizadas
+        # Características y stock inicial van por las relaciones: un solo flush (y una sola
+        # actualización del índice de búsqueda) y un solo commit
         caracteristicas_json = request.form.get('caracteristicas_data', '[]')
         try:
             caracteristicas = json.loads(caracteristicas_json)
             for caract in caracteristicas:
                 if caract.get('nombre') and caract.get('valor'):
-                    caracteristica = ProductoCaracteristica(
-                        producto_id=producto.id,
+                    producto.caracteristicas.append(ProductoCaracteristica(
                         nombre=caract['nombre'],
                         valor=caract['valor']
-                    )
-                    db.session.add(caracteristica)
+                    ))
         except json.JSONDecodeError:
             pass
         
-        db.session.commit()
-        
         # Registrar movimiento inicial si hay stock
         if stock_actual > 0:
-            movimiento = Movimiento(
-                producto_id=producto.id,
+            db.session.add(Movimiento(
+                producto=producto,
                 usuario_id=current_user.id,
                 tipo_movimiento='entrada',
                 cantidad=stock_actual,
                 stock_anterior=0,
                 stock_nuevo=stock_actual,
                 motivo='Stock inicial'
-            )
-            db.session.add(movimiento)
-            db.session.commit()
+            ))
         
-        flash('Producto creado exitosamente', 'success')
-        return redirect(url_for('ver_producto', id=producto.id))
+        db.session.add(producto)
+        db.session.flush()
+        producto_id, codigo = producto.id, producto.codigo
+        db.session.commit()
+        
+        flash(f'Producto creado exitosamente con código {codigo}', 'success')
+        return redirect(url_for('ver_producto', id=producto_id))
     
     categorias = Categoria.query.filter_by(activo=True).all()
     return render_template('producto_form.html', producto=None, categorias=categorias)
@@ -330,10 +359,13 @@ def editar_producto(id):
     return render_template('producto_form.html', producto=producto, categorias=categorias)
 
 @app.route('/productos/ver/<int:id>')
+@presupuesto_consultas(6)
 @login_required
 def ver_producto(id):
-    producto = Producto.query.get_or_404(id)
-    movimientos = Movimiento.query.filter_by(producto_id=id).order_by(desc(Movimiento.fecha_movimiento)).limit(20).all()
+    producto = Producto.query.options(*carga_producto_detalle()).get_or_404(id)
+    movimientos = Movimiento.query.options(*carga_movimientos_producto()).filter_by(producto_id=id).order_by(
+        desc(Movimiento.fecha_movimiento)
+    ).limit(20).all()
     return render_template('producto_detalle.html', producto=producto, movimientos=movimientos)
 
 @app.route('/productos/eliminar/<int:id>', methods=['POST'])
@@ -349,6 +381,7 @@ def eliminar_producto(id):
 # ==================== MODELOS DE PRODUCTOS ====================
 
 @app.route('/productos/<int:producto_id>/modelos/nuevo', methods=['GET', 'POST'])
+@presupuesto_consultas(30)  # un movimiento de stock inicial por color
 @login_required
 def nuevo_modelo(producto_id):
     producto = Producto.query.get_or_404(producto_id)
@@ -363,13 +396,15 @@ def nuevo_modelo(producto_id):
         descripcion = request.form.get('descripcion')
         stock_actual = float(request.form.get('stock_actual', 0))
         precio_diferencial = float(request.form.get('precio_diferencial', 0))
+        # Stock cargado a nivel de producto antes de tener modelos
+        stock_sin_asignar = producto.stock_actual if not any(m.activo for m in producto.modelos) else 0
         
         modelo = ProductoModelo(
             producto_id=producto_id,
             nombre_modelo=nombre_modelo,
             codigo_modelo=codigo_modelo,
             descripcion=descripcion,
-            stock_actual=stock_actual,
+            stock_actual=0,
             precio_diferencial=precio_diferencial
         )
         
@@ -377,6 +412,7 @@ def nuevo_modelo(producto_id):
         db.session.flush()
         
         # Si el producto también maneja colores, agregar colores al modelo
+        colores_iniciales = []
         if producto.tiene_colores:
             colores_json = request.form.get('colores_data', '[]')
             try:
@@ -387,13 +423,32 @@ def nuevo_modelo(producto_id):
                             modelo_id=modelo.id,
                             nombre_color=color_data['nombre'],
                             codigo_color=color_data.get('codigo', ''),
-                            stock_actual=float(color_data.get('stock', 0))
+                            stock_actual=0
                         )
                         db.session.add(color)
+                        colores_iniciales.append((color, float(color_data.get('stock') or 0)))
             except json.JSONDecodeError:
                 pass
+        db.session.flush()
         
-        db.session.commit()
+        # El stock inicial entra como movimiento de la variante (y suma al producto);
+        # si el modelo tiene colores, su stock es la suma de los colores
+        if colores_iniciales:
+            iniciales = [(color.id, stock) for color, stock in colores_iniciales if stock > 0]
+        else:
+            iniciales = [(None, stock_actual)] if stock_actual > 0 else []
+        try:
+            for color_id, stock in iniciales:
+                registrar_movimiento(producto_id, 'entrada', stock, current_user.id, motivo='Stock inicial',
+                                     modelo_id=modelo.id, color_id=color_id, commit=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        if stock_sin_asignar:
+            flash(f'El stock previo del producto ({stock_sin_asignar}) no está asignado a ningún modelo; '
+                  f'regístralo en los modelos y ejecuta reconciliar_stock.py', 'warning')
         
         flash(f'Modelo "{nombre_modelo}" agregado exitosamente', 'success')
         return redirect(url_for('ver_producto', id=producto_id))
@@ -401,10 +456,11 @@ def nuevo_modelo(producto_id):
     return render_template('modelo_form.html', producto=producto, modelo=None)
 
 @app.route('/productos/<int:producto_id>/modelos/<int:modelo_id>/editar', methods=['GET', 'POST'])
+@presupuesto_consultas(30)  # un movimiento de stock inicial por color
 @login_required
 def editar_modelo(producto_id, modelo_id):
     producto = Producto.query.get_or_404(producto_id)
-    modelo = ProductoModelo.query.get_or_404(modelo_id)
+    modelo = ProductoModelo.query.options(*carga_modelo()).get_or_404(modelo_id)
     
     if request.method == 'POST':
         modelo.nombre_modelo = request.form.get('nombre_modelo')
@@ -412,26 +468,50 @@ def editar_modelo(producto_id, modelo_id):
         modelo.descripcion = request.form.get('descripcion')
         modelo.precio_diferencial = float(request.form.get('precio_diferencial', 0))
         
-        # Actualizar colores si aplica
+        # Actualizar colores si aplica: los existentes se editan en su lugar (el stock
+        # solo cambia con movimientos) y los quitados se desactivan si no tienen stock
         if producto.tiene_colores:
-            # Eliminar colores existentes
-            ProductoColor.query.filter_by(modelo_id=modelo.id).delete()
-            
-            # Agregar nuevos colores
+            existentes = {color.id: color for color in modelo.colores if color.activo}
+            nuevos = []
             colores_json = request.form.get('colores_data', '[]')
             try:
                 colores = json.loads(colores_json)
-                for color_data in colores:
-                    if color_data.get('nombre'):
-                        color = ProductoColor(
-                            modelo_id=modelo.id,
-                            nombre_color=color_data['nombre'],
-                            codigo_color=color_data.get('codigo', ''),
-                            stock_actual=float(color_data.get('stock', 0))
-                        )
-                        db.session.add(color)
             except json.JSONDecodeError:
-                pass
+                colores = []
+            for color_data in colores:
+                if not color_data.get('nombre'):
+                    continue
+                color = existentes.pop(int(color_data['id']), None) if color_data.get('id') else None
+                if color:
+                    color.nombre_color = color_data['nombre']
+                    color.codigo_color = color_data.get('codigo', '')
+                else:
+                    color = ProductoColor(
+                        modelo_id=modelo.id,
+                        nombre_color=color_data['nombre'],
+                        codigo_color=color_data.get('codigo', ''),
+                        stock_actual=0
+                    )
+                    db.session.add(color)
+                    nuevos.append((color, float(color_data.get('stock') or 0)))
+            
+            for color in existentes.values():
+                if color.stock_actual:
+                    flash(f'El color "{color.nombre_color}" tiene stock ({color.stock_actual}); '
+                          f'registra su salida antes de quitarlo', 'warning')
+                else:
+                    color.activo = False
+            db.session.flush()
+            
+            try:
+                for color, stock in nuevos:
+                    if stock > 0:
+                        registrar_movimiento(producto_id, 'entrada', stock, current_user.id, motivo='Stock inicial',
+                                             color_id=color.id, commit=False)
+            except StockError as e:
+                db.session.rollback()
+                flash(str(e), 'danger')
+                return redirect(url_for('editar_modelo', producto_id=producto_id, modelo_id=modelo_id))
         
         db.session.commit()
         
@@ -444,6 +524,9 @@ def editar_modelo(producto_id, modelo_id):
 @login_required
 def eliminar_modelo(producto_id, modelo_id):
     modelo = ProductoModelo.query.get_or_404(modelo_id)
+    if modelo.stock_actual:
+        flash(f'El modelo tiene stock ({modelo.stock_actual}); registra su salida antes de eliminarlo', 'warning')
+        return redirect(url_for('ver_producto', id=producto_id))
     modelo.activo = False
     db.session.commit()
     
@@ -453,21 +536,34 @@ def eliminar_modelo(producto_id, modelo_id):
 # ==================== MOVIMIENTOS ====================
 
 @app.route('/movimientos')
+@solo_lectura
+@presupuesto_consultas(3)
 @login_required
 def movimientos():
-    page = request.args.get('page', 1, type=int)
-    tipo = request.args.get('tipo', '')
+    movimientos, filtros = _pagina_movimientos()
+    return render_template('movimientos.html', movimientos=movimientos, tipo_seleccionado=filtros['tipo'])
+
+def _pagina_movimientos():
+    """Página de movimientos por cursor (fecha_movimiento, id): la página 5000 cuesta lo mismo que la 1"""
+    cursor = request.args.get('cursor')
+    datos_cursor = decodificar_cursor(cursor)
+    filtros = datos_cursor[2] if datos_cursor else {'tipo': request.args.get('tipo', '')}
     
-    query = Movimiento.query
+    query = Movimiento.query.options(*carga_movimientos())
     
-    if tipo:
-        query = query.filter_by(tipo_movimiento=tipo)
+    if filtros['tipo']:
+        query = query.filter_by(tipo_movimiento=filtros['tipo'])
     
-    movimientos = query.order_by(desc(Movimiento.fecha_movimiento)).paginate(
-        page=page, per_page=app.config['ITEMS_PER_PAGE'], error_out=False
-    )
-    
-    return render_template('movimientos.html', movimientos=movimientos, tipo_seleccionado=tipo)
+    total = contar_cacheado(('movimientos', filtros['tipo']), query)
+    pagina = paginar_keyset(query, [Movimiento.fecha_movimiento, Movimiento.id], cursor,
+                            app.config['ITEMS_PER_PAGE'], filtros, descendente=True, total=total)
+    return pagina, filtros
+
+def _variante_formulario():
+    """(modelo_id, color_id) elegidos en el formulario de movimiento"""
+    modelo_id = request.form.get('modelo_id', type=int)
+    color_id = request.form.get('color_id', type=int)
+    return modelo_id, color_id
 
 @app.route('/movimientos/entrada', methods=['GET', 'POST'])
 @login_required
@@ -478,25 +574,22 @@ def entrada_stock():
         motivo = request.form.get('motivo')
         observaciones = request.form.get('observaciones')
         documento = request.form.get('documento')
+        modelo_id, color_id = _variante_formulario()
         
         producto = Producto.query.get_or_404(producto_id)
-        stock_anterior = producto.stock_actual
-        producto.stock_actual += cantidad
         
-        movimiento = Movimiento(
-            producto_id=producto_id,
-            usuario_id=current_user.id,
-            tipo_movimiento='entrada',
-            cantidad=cantidad,
-            stock_anterior=stock_anterior,
-            stock_nuevo=producto.stock_actual,
-            motivo=motivo,
-            observaciones=observaciones,
-            documento_referencia=documento
-        )
-        
-        db.session.add(movimiento)
-        db.session.commit()
+        try:
+            registrar_movimiento(
+                producto.id, 'entrada', cantidad, current_user.id,
+                motivo=motivo,
+                observaciones=observaciones,
+                documento_referencia=documento,
+                modelo_id=modelo_id,
+                color_id=color_id
+            )
+        except (VarianteRequerida, VarianteInvalida, ValueError) as e:
+            flash(str(e), 'warning')
+            return redirect(url_for('entrada_stock'))
         
         flash(f'Entrada registrada: +{cantidad} {producto.unidad_medida} de {producto.nombre}', 'success')
         return redirect(url_for('movimientos'))
@@ -513,30 +606,25 @@ def salida_stock():
         motivo = request.form.get('motivo')
         observaciones = request.form.get('observaciones')
         documento = request.form.get('documento')
+        modelo_id, color_id = _variante_formulario()
         
         producto = Producto.query.get_or_404(producto_id)
         
-        if cantidad > producto.stock_actual:
+        try:
+            registrar_movimiento(
+                producto.id, 'salida', cantidad, current_user.id,
+                motivo=motivo,
+                observaciones=observaciones,
+                documento_referencia=documento,
+                modelo_id=modelo_id,
+                color_id=color_id
+            )
+        except StockInsuficiente:
             flash(f'Stock insuficiente. Stock actual: {producto.stock_actual} {producto.unidad_medida}', 'danger')
             return redirect(url_for('salida_stock'))
-        
-        stock_anterior = producto.stock_actual
-        producto.stock_actual -= cantidad
-        
-        movimiento = Movimiento(
-            producto_id=producto_id,
-            usuario_id=current_user.id,
-            tipo_movimiento='salida',
-            cantidad=cantidad,
-            stock_anterior=stock_anterior,
-            stock_nuevo=producto.stock_actual,
-            motivo=motivo,
-            observaciones=observaciones,
-            documento_referencia=documento
-        )
-        
-        db.session.add(movimiento)
-        db.session.commit()
+        except (VarianteRequerida, VarianteInvalida, ValueError) as e:
+            flash(str(e), 'warning')
+            return redirect(url_for('salida_stock'))
         
         flash(f'Salida registrada: -{cantidad} {producto.unidad_medida} de {producto.nombre}', 'success')
         return redirect(url_for('movimientos'))
@@ -552,25 +640,19 @@ def ajuste_stock():
         nuevo_stock = float(request.form.get('nuevo_stock'))
         motivo = request.form.get('motivo')
         observaciones = request.form.get('observaciones')
+        modelo_id, color_id = _variante_formulario()
         
         producto = Producto.query.get_or_404(producto_id)
-        stock_anterior = producto.stock_actual
-        diferencia = nuevo_stock - stock_anterior
-        producto.stock_actual = nuevo_stock
         
-        movimiento = Movimiento(
-            producto_id=producto_id,
-            usuario_id=current_user.id,
-            tipo_movimiento='ajuste',
-            cantidad=abs(diferencia),
-            stock_anterior=stock_anterior,
-            stock_nuevo=nuevo_stock,
-            motivo=motivo,
-            observaciones=observaciones
-        )
-        
-        db.session.add(movimiento)
-        db.session.commit()
+        try:
+            ajustar_stock(producto.id, nuevo_stock, current_user.id, motivo=motivo, observaciones=observaciones,
+                          modelo_id=modelo_id, color_id=color_id)
+        except ConflictoConcurrencia:
+            flash(f'El stock de {producto.nombre} cambió mientras se ajustaba. Intenta nuevamente', 'warning')
+            return redirect(url_for('ajuste_stock'))
+        except (VarianteRequerida, VarianteInvalida, ValueError) as e:
+            flash(str(e), 'warning')
+            return redirect(url_for('ajuste_stock'))
         
         flash(f'Ajuste registrado: {producto.nombre} - Stock ajustado a {nuevo_stock} {producto.unidad_medida}', 'success')
         return redirect(url_for('movimientos'))
@@ -578,6 +660,105 @@ def ajuste_stock():
     productos = Producto.query.filter_by(activo=True).order_by(Producto.nombre).all()
     return render_template('movimiento_form.html', productos=productos, tipo='ajuste')
 
+# ==================== CLIENTES ====================
+
+def _cliente_a_dict(cliente, total_locales_anexos=None):
+    return {
+        'id': cliente.id,
+        'nombre': cliente.nombre,
+        'rfc': cliente.rfc,
+        'direccion': cliente.direccion,
+        'ubigeo': cliente.ubigeo,
+        'distrito': cliente.distrito,
+        'provincia': cliente.provincia,
+        'departamento': cliente.departamento,
+        'estado': cliente.estado,
+        'condicion': cliente.condicion,
+        'es_agente_retencion': cliente.es_agente_retencion,
+        'es_buen_contribuyente': cliente.es_buen_contribuyente,
+        'total_locales_anexos': total_locales_anexos,
+    }
+
+@app.route('/clientes')
+@login_required
+def clientes():
+    return render_template('clientes.html')
+
+@app.route('/api/clientes')
+@solo_lectura
+@login_required
+@con_etag('cliente')
+def api_clientes():
+    """Clientes activos; con ?since=<versión> solo los cambiados desde entonces (registro_cambios.py)"""
+    total_anexos = (
+        db.select(func.count(LocalAnexo.id)).where(LocalAnexo.cliente_id == Cliente.id).scalar_subquery()
+    )
+    consulta = db.select(Cliente, total_anexos)
+    if 'since' in request.args:
+        try:
+            version, ids = cambios_desde('cliente', request.args['since'])
+        except CursorInvalido as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        if ids is None:
+            return jsonify(respuesta_cambios(version, 'clientes'))
+        filas = db.session.execute(consulta.where(Cliente.id.in_(ids))).all() if ids else []
+        activos = [(cliente, total) for cliente, total in filas if cliente.activo]
+        # Los dados de baja salen del listado igual que los borrados
+        return jsonify(respuesta_cambios(version, 'clientes', [_cliente_a_dict(c, t) for c, t in activos],
+                                         set(ids) - {cliente.id for cliente, _ in activos}))
+    filas = db.session.execute(consulta.where(Cliente.activo == True).order_by(Cliente.nombre)).all()
+    return jsonify([_cliente_a_dict(cliente, total) for cliente, total in filas])
+
+@app.route('/api/clientes/<int:id>')
+@login_required
+def api_cliente(id):
+    cliente = Cliente.query.get_or_404(id)
+    datos = _cliente_a_dict(cliente, len(cliente.locales_anexos))
+    datos['locales_anexos'] = [{
+        'direccion': local.direccion,
+        'ubigeo': local.ubigeo,
+        'distrito': local.distrito,
+        'provincia': local.provincia,
+        'departamento': local.departamento,
+    } for local in cliente.locales_anexos]
+    return jsonify(datos)
+
+@app.route('/api/consultar-ruc/<ruc>')
+@login_required
+def api_consultar_ruc(ruc):
+    if not consulta_ruc.ruc_valido(ruc):
+        return jsonify({'success': False, 'message': 'RUC inválido'}), 400
+    try:
+        datos = consulta_ruc.consultar(ruc)
+    except consulta_ruc.ErrorConsultaRuc as e:
+        return jsonify({'success': False, 'message': f'No se pudo consultar el RUC: {e}'}), 502
+    if datos is None:
+        return jsonify({'success': False, 'message': 'No se encontraron datos para este RUC en SUNAT'}), 404
+    return jsonify({'success': True, 'data': {'rfc': ruc, **datos}})
+
+@app.route('/api/consultar-rucs-masivo', methods=['POST'])
+@presupuesto_consultas(60)  # caché, clientes existentes y upsert en partes de 500 RUCs (hasta RUC_MAXIMO_LOTE)
+@login_required
+def api_consultar_rucs_masivo():
+    """
+    Consulta y registra una lista de RUCs ({"rucs": [...]}). Con Accept: application/x-ndjson
+    responde una línea JSON por RUC a medida que se resuelve y una línea final con los totales.
+    """
+    datos = request.get_json(silent=True) or {}
+    rucs = datos.get('rucs')
+    if not isinstance(rucs, list) or not rucs:
+        return jsonify({'error': 'No se recibieron RUCs'}), 400
+    if len(rucs) > app.config['RUC_MAXIMO_LOTE']:
+        return jsonify({'error': f'Máximo {app.config["RUC_MAXIMO_LOTE"]} RUCs por consulta'}), 413
+    
+    if 'application/x-ndjson' in request.headers.get('Accept', ''):
+        lineas = (json.dumps(linea, ensure_ascii=False) + '\n' for linea in consulta_ruc.importar(rucs))
+        return Response(stream_with_context(lineas), mimetype='application/x-ndjson',
+                        headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'})
+    
+    *resultados, totales = consulta_ruc.importar(rucs)
+    return jsonify({'resultados': resultados, **totales})
+
 # ==================== REPORTES ====================
 
 @app.route('/reportes')
@@ -586,44 +767,228 @@ def reportes():
     return render_template('reportes.html')
 
 @app.route('/reportes/stock-bajo')
+@solo_lectura
+@presupuesto_consultas(6)
 @login_required
 def reporte_stock_bajo():
-    productos = Producto.query.filter(
-        Producto.activo == True,
-        Producto.stock_actual <= Producto.stock_minimo
-    ).order_by(Producto.nombre).all()
-    
-    return render_template('reporte_stock_bajo.html', productos=productos, now=datetime.now())
+    formato = request.args.get('formato', 'html')
+    if formato not in motor_reportes.FORMATOS:
+        abort(400)
+    return motor_reportes.responder('stock-bajo', formato)
 
 @app.route('/reportes/valorizado')
+@solo_lectura
+@presupuesto_consultas(8)
 @login_required
 def reporte_valorizado():
-    productos = Producto.query.filter_by(activo=True).order_by(Producto.nombre).all()
-    
-    total_general = sum(p.valor_total for p in productos)
+    formato = request.args.get('formato', 'html')
+    if formato not in motor_reportes.FORMATOS:
+        abort(400)
+
+    # ?fecha=AAAA-MM-DD: stock valorizado al cierre de ese día
+    fecha = _fecha_reporte(request.args.get('fecha'))
+    return motor_reportes.responder('valorizado', formato, fecha=fecha)
+
+def _fecha_reporte(valor):
+    """Fecha de cierre del reporte; None si no se indicó o si es hoy (stock actual)"""
+    if not valor:
+        return None
+    try:
+        fecha = datetime.strptime(valor, '%Y-%m-%d').date()
+    except ValueError:
+        abort(400)
+    return fecha if fecha < datetime.utcnow().date() else None
+
+@tarea('exportar_reporte')
+def _exportar_reporte(trabajo):
+    parametros = trabajo.parametros
+    fecha = datetime.strptime(parametros['fecha'], '%Y-%m-%d').date() if parametros.get('fecha') else None
+    ruta = trabajo.ruta_resultado(parametros['formato'])
+    return motor_reportes.exportar(parametros['reporte'], parametros['formato'], ruta, fecha=fecha,
+                                   avance=trabajo.progreso)
+
+@app.route('/reportes/<reporte>/exportar', methods=['POST'])
+@login_required
+def exportar_reporte(reporte):
+    """Genera el archivo del reporte en segundo plano; el avance se consulta en /api/jobs/<id>"""
+    formato = request.values.get('formato', '')
+    if reporte not in motor_reportes.REPORTES or formato not in motor_reportes.MIMETYPES:
+        abort(400)
+    fecha = _fecha_reporte(request.values.get('fecha')) if reporte == 'valorizado' else None
     
-    return render_template('reporte_valorizado.html', productos=productos, total_general=total_general, now=datetime.now())
+    trabajo = encolar(app, 'exportar_reporte', {
+        'reporte': reporte,
+        'formato': formato,
+        'fecha': fecha.isoformat() if fecha else None,
+    }, current_user.id)
+    return jsonify(a_dict(trabajo)), 202, {'Location': url_for('estado_trabajo', id=trabajo.id)}
 
 # ==================== API ENDPOINTS ====================
 
-@app.route('/api/producto/<int:id>')
-@login_required
-def api_producto(id):
-    producto = Producto.query.get_or_404(id)
-    return jsonify({
+def _producto_a_dict(producto):
+    return {
         'id': producto.id,
         'codigo': producto.codigo,
         'nombre': producto.nombre,
         'stock_actual': producto.stock_actual,
         'unidad_medida': producto.unidad_medida,
         'precio_unitario': producto.precio_unitario
+    }
+
+@app.route('/api/producto/<int:id>')
+@login_required
+@con_etag('productos')
+def api_producto(id):
+    return jsonify(_producto_a_dict(Producto.query.get_or_404(id)))
+
+@app.route('/api/productos/cambios')
+@solo_lectura
+@login_required
+@con_etag('productos')
+def api_productos_cambios():
+    """Productos cambiados desde ?since=<versión> (stock, precio, altas y bajas)"""
+    try:
+        version, ids = cambios_desde('productos', request.args.get('since', 0))
+    except CursorInvalido as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if ids is None:
+        return jsonify(respuesta_cambios(version, 'productos'))
+    productos = Producto.query.filter(Producto.id.in_(ids)).all() if ids else []
+    activos = [producto for producto in productos if producto.activo]
+    return jsonify(respuesta_cambios(version, 'productos',
+                                     [{**_producto_a_dict(p), 'stock_minimo': p.stock_minimo} for p in activos],
+                                     set(ids) - {producto.id for producto in activos}))
+
+@app.route('/api/producto/<int:id>/variantes')
+@presupuesto_consultas(3)
+@login_required
+def api_producto_variantes(id):
+    """Modelos y colores activos con su stock (totales ya consolidados)"""
+    modelos = ProductoModelo.query.options(*carga_modelo()).filter_by(producto_id=id, activo=True).order_by(
+        ProductoModelo.nombre_modelo
+    ).all()
+    return jsonify([
+        {
+            'id': modelo.id,
+            'nombre': modelo.nombre_modelo,
+            'codigo': modelo.codigo_modelo,
+            'stock_actual': modelo.stock_actual,
+            'colores': [
+                {'id': color.id, 'nombre': color.nombre_color, 'stock_actual': color.stock_actual}
+                for color in modelo.colores if color.activo
+            ]
+        }
+        for modelo in modelos
+    ])
+
+@app.route('/api/productos/buscar')
+@solo_lectura
+@login_required
+def api_buscar_productos():
+    """Autocompletado de productos"""
+    busqueda = request.args.get('q', '').strip()
+    limite = min(request.args.get('limite', 10, type=int), 50)
+    
+    if not busqueda:
+        return jsonify([])
+    
+    return jsonify(sugerencias(busqueda, limite))
+
+def _movimiento_a_dict(mov):
+    return {
+        'id': mov.id,
+        'fecha': mov.fecha_movimiento.strftime('%d/%m/%Y'),
+        'hora': mov.fecha_movimiento.strftime('%H:%M'),
+        'producto': mov.producto.nombre,
+        'codigo': mov.producto.codigo,
+        'unidad_medida': mov.producto.unidad_medida,
+        'tipo_movimiento': mov.tipo_movimiento,
+        'cantidad': mov.cantidad,
+        'stock_anterior': mov.stock_anterior,
+        'stock_nuevo': mov.stock_nuevo,
+        'usuario': mov.usuario.nombre_completo,
+        'motivo': mov.motivo,
+        'documento_referencia': mov.documento_referencia
+    }
+
+@app.route('/api/movimientos')
+@solo_lectura
+@presupuesto_consultas(5)  # usuario, versiones, conteo cacheado y página; con ?since=, cursor, ids y filas
+@login_required
+@con_etag('movimientos', 'productos')
+def api_movimientos():
+    """Historial de movimientos en JSON para el scroll infinito; ?since=<versión> trae solo los nuevos"""
+    if 'since' in request.args:
+        return _movimientos_desde(request.args['since'], request.args.get('tipo', ''))
+    pagina, filtros = _pagina_movimientos()
+    return jsonify({
+        'movimientos': [_movimiento_a_dict(mov) for mov in pagina.items],
+        'siguiente': pagina.cursor_siguiente,
+        'total': pagina.total
     })
 
+def _movimientos_desde(cursor, tipo):
+    try:
+        version, ids = cambios_desde('movimientos', cursor)
+    except CursorInvalido as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if ids is None:
+        return jsonify(respuesta_cambios(version, 'movimientos'))
+    movimientos = (
+        Movimiento.query.options(*carga_movimientos()).filter(Movimiento.id.in_(ids))
+        .order_by(Movimiento.fecha_movimiento.desc(), Movimiento.id.desc()).all()
+    ) if ids else []
+    return jsonify(respuesta_cambios(
+        version, 'movimientos',
+        [_movimiento_a_dict(mov) for mov in movimientos if not tipo or mov.tipo_movimiento == tipo],
+        set(ids) - {mov.id for mov in movimientos}
+    ))
+
+@app.route('/api/movimientos/lote', methods=['POST'])
+@login_required
+@presupuesto_consultas(12)  # productos y variantes, un UPDATE por tabla de stock, movimientos y registro de cambios
+def api_movimientos_lote():
+    """Carga masiva de movimientos en JSON ({"movimientos": [...]}) o CSV (cuerpo o archivo)"""
+    parcial = request.args.get('parcial', '').lower() in ('1', 'true', 'si')
+    
+    if request.is_json:
+        datos = request.get_json(silent=True)
+        if isinstance(datos, dict):
+            lineas = datos.get('movimientos', [])
+            parcial = parcial or bool(datos.get('parcial'))
+        else:
+            lineas = datos
+    elif 'archivo' in request.files:
+        lineas = leer_lote_csv(request.files['archivo'].read().decode('utf-8-sig'))
+    else:
+        lineas = leer_lote_csv(request.get_data(as_text=True))
+    
+    if not isinstance(lineas, list) or not lineas:
+        return jsonify({'error': 'No se recibieron movimientos'}), 400
+    
+    # ?asincrono=1: se registra en segundo plano y se responde con el trabajo (ver /api/jobs/<id>)
+    if request.args.get('asincrono', '').lower() in ('1', 'true', 'si'):
+        trabajo = encolar(app, 'lote_movimientos', {'movimientos': lineas, 'parcial': parcial}, current_user.id)
+        return jsonify(a_dict(trabajo)), 202, {'Location': url_for('estado_trabajo', id=trabajo.id)}
+    
+    try:
+        resultado = registrar_lote(lineas, current_user.id, parcial=parcial)
+    except ConflictoConcurrencia as e:
+        return jsonify({'error': str(e)}), 409
+    
+    return jsonify(resultado), (200 if resultado['registrados'] or resultado['ok'] else 422)
+
+@tarea('lote_movimientos')
+def _lote_movimientos(trabajo):
+    # Si registrar_lote agota sus reintentos por conflictos, el lote se revierte y el trabajo
+    # se reintenta más tarde; los errores de validación quedan en el resultado.
+    # El trabajo queda completado en la misma transacción que el lote: un reintento no lo repite
+    return registrar_lote(trabajo.parametros['movimientos'], trabajo.usuario_id,
+                          parcial=trabajo.parametros.get('parcial', False), al_confirmar=trabajo.completar)
+
 @app.route('/api/siguiente-codigo')
 @login_required
 def siguiente_codigo():
-    import re
-    
     categoria_id = request.args.get('categoria_id', '')
     ubicacion = request.args.get('ubicacion', '')
     
@@ -635,44 +1000,27 @@ def siguiente_codigo():
     if not categoria:
         return jsonify({'error': 'Categoría no encontrada'}), 404
     
-    # Mapeo de ubicaciones a códigos de 3 caracteres
-    ubicaciones_map = {
-        'Oficina': 'OFI',
-        'Almacén': 'ALM',
-        'Taller': 'TAL'
-    }
-    
-    ubi_codigo = ubicaciones_map.get(ubicacion, ubicacion[:3].upper())
-    
-    # Formato: CAT(3)-UBI(3)-NNNN(4)
-    # Ejemplo: 001-TAL-0001
-    patron_base = f"{categoria.codigo}-{ubi_codigo}-"
-    
-    # Buscar productos con códigos similares
-    productos = Producto.query.filter(Producto.codigo.like(f"{patron_base}%")).all()
-    
-    # Encontrar el número más alto
-    max_num = 0
-    for producto in productos:
-        # Extraer el número del código (últimos 4 dígitos)
-        match = re.search(r'-(\d{4})$', producto.codigo)
-        if match:
-            num = int(match.group(1))
-            if num > max_num:
-                max_num = num
-    
-    # Generar el siguiente número (4 dígitos, soporta hasta 9999)
-    siguiente_num = max_num + 1
-    codigo_generado = f"{patron_base}{siguiente_num:04d}"
+    # Formato: CAT(3)-UBI(3)-NNNN(4), ej: 001-TAL-0001
+    # Vista previa: el código definitivo se asigna al guardar el producto
+    codigo_generado = secuencias_codigo.proximo(secuencias_codigo.clave_producto(categoria.codigo, ubicacion))
     
     return jsonify({'codigo': codigo_generado})
 
+@app.route('/api/codigos/huecos')
+@login_required
+def huecos_codigos():
+    """Números asignados por cada secuencia de códigos que no corresponden a ningún producto o categoría"""
+    return jsonify(secuencias_codigo.huecos())
+
 
 # ==================== INICIALIZACIÓN ====================
 
 def init_db():
     with app.app_context():
         db.create_all()
+        crear_columnas()
+        crear_indices()
+        crear_indice_busqueda()
         
         # Crear usuario admin por defecto si no existe
         if not Usuario.query.filter_by(username='admin').first():
@@ -703,7 +1051,11 @@ def init_db():
             db.session.commit()
             print('Base de datos inicializada con datos por defecto')
             print('Usuario: admin | Contraseña: admin123')
+        
+        # Poblar el resumen diario si la base ya tenía movimientos antes de existir la tabla
+        if Movimiento.query.first() and not MovimientoDiario.query.first():
+            reconstruir_resumen()
 
 if __name__ == '__main__':
     init_db()
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    socketio.run(app, debug=True, host='0.0.0.0', port=5000, allow_unsafe_werkzeug=True)
@@ -8,6 +8,7 @@ import time
 import socket
 import logging
 from app import app, socketio
+from logs_sistema import agregar_manejador
 
 def obtener_ip_local():
     """Obtiene la IP local de la maquina"""
@@ -42,8 +43,10 @@ if __name__ == '__main__':
     
     ip_local = obtener_ip_local()
     
-    # Configurar logging
-    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    # Configurar logging: la consola la escribe el mismo hilo que logs/app.log (ver logs_sistema.py)
+    consola = logging.StreamHandler()
+    consola.setFormatter(logging.Formatter('%(message)s'))
+    agregar_manejador(consola)
     
     print("=" * 60)
     print("  SISTEMA DE GESTION DE EXTINTORES v2.0 - HTTPS")
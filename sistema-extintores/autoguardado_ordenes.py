@@ -0,0 +1,212 @@
+"""
+Autoguardado por lotes del detalle de una orden (tabla de extintores)
+- El cliente junta las ediciones de la orden y manda un solo pedido:
+  {"clave": "<id único del lote>", "cambios": [{"id": 12, "version": 3, "campos": {"serie": "A1"}}, ...]}
+- Todo el lote se aplica en una transacción: los extintores se actualizan con un solo UPDATE
+  (executemany), no uno por celda. Cada campo va como COALESCE(valor, campo): los que el
+  cambio no trae se mandan en NULL y conservan su valor (los editados nunca son NULL, ver
+  _normalizar).
+- Idempotencia: la clave se busca por clave primaria; un reintento con la misma clave recibe
+  la respuesta guardada sin volver a aplicar nada. La clave se inserta antes de leer los
+  extintores, así dos reintentos simultáneos no aplican el lote dos veces (el segundo choca
+  con la clave primaria y devuelve la respuesta del primero).
+- Versiones: cada cambio indica la versión sobre la que se editó; si el extintor ya cambió,
+  ese cambio se rechaza y vuelve en 'conflictos' con los valores actuales. El resto del
+  lote se aplica igual.
+"""
+import json
+import time
+import hashlib
+from datetime import datetime, timedelta
+from flask import current_app, jsonify, request
+from flask_login import login_required, current_user
+from sqlalchemy import select, update, delete, bindparam, func
+from sqlalchemy.exc import IntegrityError
+from models import db, ExtintorOrden, ClaveIdempotencia
+from consultas import presupuesto_consultas
+from registro_cambios import con_etag, cambios_desde, respuesta_cambios, marcar_cambios, CursorInvalido
+
+CAMPOS_EDITABLES = ('serie', 'marca', 'observaciones', 'fecha_recarga', 'vencimiento_recarga')
+LARGO_CAMPOS = {'serie': 100, 'marca': 100, 'fecha_recarga': 30, 'vencimiento_recarga': 30}
+LARGO_CLAVE = (8, 64)
+INTERVALO_LIMPIEZA = 3600  # segundos
+
+_limpieza = {'proxima': 0}
+
+
+class AutoguardadoInvalido(Exception):
+    codigo = 400
+
+
+class ClaveReutilizada(AutoguardadoInvalido):
+    """La misma clave con otro contenido: es un error del cliente, no un reintento"""
+    codigo = 422
+
+
+def extintor_a_dict(extintor):
+    return {
+        'id': extintor.id,
+        'orden_id': extintor.orden_id,
+        'serie': extintor.serie,
+        'tipo': extintor.tipo,
+        'capacidad': extintor.capacidad,
+        'marca': extintor.marca,
+        'fecha_recarga': extintor.fecha_recarga,
+        'vencimiento_recarga': extintor.vencimiento_recarga,
+        'observaciones': extintor.observaciones,
+        'version': extintor.version,
+    }
+
+
+def _normalizar(cambios):
+    """{id: (version, {campo: valor})}; valida tipos, campos y largos"""
+    if not isinstance(cambios, list) or not cambios:
+        raise AutoguardadoInvalido('"cambios" debe ser una lista no vacía')
+    if len(cambios) > current_app.config.get('AUTOGUARDADO_MAXIMO_CAMBIOS', 500):
+        raise AutoguardadoInvalido('Demasiados cambios en un solo lote')
+    normalizados = {}
+    for cambio in cambios:
+        if not isinstance(cambio, dict):
+            raise AutoguardadoInvalido('Cada cambio debe ser un objeto')
+        extintor_id, version, campos = cambio.get('id'), cambio.get('version'), cambio.get('campos')
+        if type(extintor_id) is not int or type(version) is not int:
+            raise AutoguardadoInvalido('Cada cambio necesita "id" y "version" enteros')
+        if extintor_id in normalizados:
+            raise AutoguardadoInvalido(f'El extintor {extintor_id} aparece dos veces en el lote')
+        if not isinstance(campos, dict) or not campos:
+            raise AutoguardadoInvalido(f'Cambio sin campos para el extintor {extintor_id}')
+        for campo, valor in campos.items():
+            if campo not in CAMPOS_EDITABLES:
+                raise AutoguardadoInvalido(f'Campo no editable: {campo}')
+            if valor is not None and not isinstance(valor, str):
+                raise AutoguardadoInvalido(f'Valor inválido para {campo}')
+            if valor and campo in LARGO_CAMPOS and len(valor) > LARGO_CAMPOS[campo]:
+                raise AutoguardadoInvalido(f'{campo} supera {LARGO_CAMPOS[campo]} caracteres')
+        normalizados[extintor_id] = (version, {campo: (valor or '').strip() for campo, valor in campos.items()})
+    return normalizados
+
+
+def _huella(orden_id, cambios):
+    contenido = json.dumps([orden_id, cambios], sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(contenido.encode()).hexdigest()
+
+
+def _respuesta_guardada(clave, huella, usuario_id):
+    previa = db.session.get(ClaveIdempotencia, clave)
+    if previa is None:
+        return None
+    if previa.huella != huella or previa.usuario_id != usuario_id:
+        raise ClaveReutilizada('La clave ya se usó para otro lote')
+    return previa.respuesta
+
+
+def _limpiar_claves():
+    """Borra las claves vencidas como mucho una vez por INTERVALO_LIMPIEZA en cada proceso"""
+    if time.monotonic() < _limpieza['proxima']:
+        return
+    _limpieza['proxima'] = time.monotonic() + INTERVALO_LIMPIEZA
+    limite = datetime.utcnow() - timedelta(hours=current_app.config.get('AUTOGUARDADO_CLAVES_HORAS', 24))
+    db.session.execute(delete(ClaveIdempotencia).where(ClaveIdempotencia.fecha_creacion < limite))
+
+
+def aplicar_autoguardado(orden_id, clave, cambios, usuario_id):
+    """Aplica el lote una sola vez por clave. Devuelve (respuesta, repetido)"""
+    if not isinstance(clave, str) or not LARGO_CLAVE[0] <= len(clave) <= LARGO_CLAVE[1] or not clave.isprintable():
+        raise AutoguardadoInvalido('Clave de idempotencia inválida')
+    huella = _huella(orden_id, cambios)
+    guardada = _respuesta_guardada(clave, huella, usuario_id)
+    if guardada is not None:
+        return guardada, True
+    normalizados = _normalizar(cambios)
+
+    _limpiar_claves()
+    registro_clave = ClaveIdempotencia(clave=clave, usuario_id=usuario_id, huella=huella)
+    db.session.add(registro_clave)
+    try:
+        # Reclamar la clave primero: toma el bloqueo de escritura antes de leer las versiones
+        db.session.flush()
+    except IntegrityError:
+        db.session.rollback()
+        guardada = _respuesta_guardada(clave, huella, usuario_id)
+        if guardada is None:
+            raise
+        return guardada, True
+
+    filas = {fila.id: fila for fila in db.session.execute(
+        select(ExtintorOrden)
+        .where(ExtintorOrden.orden_id == orden_id, ExtintorOrden.id.in_(list(normalizados)))
+        .with_for_update()
+    ).scalars()}
+
+    aplicados, conflictos, parametros = [], [], []
+    ahora = datetime.utcnow()
+    for extintor_id, (version, campos) in normalizados.items():
+        fila = filas.get(extintor_id)
+        if fila is None:
+            conflictos.append({'id': extintor_id, 'motivo': 'no_encontrado'})
+            continue
+        if fila.version != version:
+            conflictos.append({'id': extintor_id, 'motivo': 'version', 'version': fila.version,
+                               'extintor': extintor_a_dict(fila)})
+            continue
+        parametros.append({**{f'_{campo}': campos.get(campo) for campo in CAMPOS_EDITABLES},
+                           'b_id': extintor_id, 'b_version': version + 1})
+        aplicados.append({'id': extintor_id, 'version': version + 1})
+
+    if parametros:
+        tabla = ExtintorOrden.__table__
+        db.session.execute(
+            update(tabla)
+            .where(tabla.c.id == bindparam('b_id'))
+            .values({**{campo: func.coalesce(bindparam(f'_{campo}', type_=tabla.c[campo].type), tabla.c[campo])
+                        for campo in CAMPOS_EDITABLES},
+                     'version': bindparam('b_version'), 'usuario_id': usuario_id, 'fecha_actualizacion': ahora}),
+            parametros
+        )
+
+    # UPDATE directo: el flush del ORM no lo ve
+    marcar_cambios(db.session, 'orden_extintores', [aplicado['id'] for aplicado in aplicados], orden_id)
+    respuesta = {'success': True, 'aplicados': aplicados, 'conflictos': conflictos}
+    registro_clave.respuesta = respuesta
+    db.session.commit()
+    return respuesta, False
+
+
+def registrar_autoguardado_ordenes(app):
+
+    @app.route('/api/ordenes/<int:orden_id>/extintores')
+    @login_required
+    @con_etag('orden_extintores')
+    def extintores_orden(orden_id):
+        """Extintores de la orden; con ?since=<versión> solo los cambiados desde entonces"""
+        consulta = select(ExtintorOrden).where(ExtintorOrden.orden_id == orden_id).order_by(ExtintorOrden.id)
+        if 'since' not in request.args:
+            extintores = db.session.execute(consulta).scalars().all()
+            return jsonify({'success': True, 'extintores': [extintor_a_dict(e) for e in extintores]})
+        try:
+            version, ids = cambios_desde('orden_extintores', request.args['since'], grupo_id=orden_id)
+        except CursorInvalido as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        if ids is None:
+            return jsonify(respuesta_cambios(version, 'extintores'))
+        # Los ids son los de esta orden: los que ya no existen se informan como eliminados
+        filas = db.session.execute(
+            consulta.where(ExtintorOrden.id.in_(ids))
+        ).scalars().all() if ids else []
+        return jsonify(respuesta_cambios(version, 'extintores', [extintor_a_dict(e) for e in filas],
+                                         set(ids) - {e.id for e in filas}))
+
+    @app.route('/api/ordenes/<int:orden_id>/autoguardado', methods=['POST'])
+    @login_required
+    @presupuesto_consultas(12)  # clave, extintores, un UPDATE, registro de cambios y limpieza horaria
+    def autoguardado_orden(orden_id):
+        datos = request.get_json(silent=True)
+        if not isinstance(datos, dict):
+            return jsonify({'success': False, 'error': 'Se esperaba un JSON'}), 400
+        try:
+            respuesta, repetido = aplicar_autoguardado(orden_id, datos.get('clave'), datos.get('cambios'),
+                                                       current_user.id)
+        except AutoguardadoInvalido as e:
+            db.session.rollback()
+            return jsonify({'success': False, 'error': str(e)}), e.codigo
+        return jsonify({**respuesta, 'repetido': repetido})
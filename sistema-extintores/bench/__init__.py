@@ -0,0 +1,16 @@
+"""
+Suite de benchmarks reproducible
+- generador: datos sintéticos deterministas (productos, variantes, características y
+  movimientos) cargados con inserts masivos.
+- escenarios: mide las rutas principales con el cliente de pruebas de Flask y corre
+  una carga con varios hilos.
+- logs: latencia de los requests bajo gunicorn (Procfile) con el log escrito directo o por cola.
+- python -m bench: corre todo y guarda los resultados en JSON para comparar entre commits.
+
+Uso (desde sistema-extintores/):
+    python -m bench correr --productos 10000 --movimientos 100000
+    python -m bench correr postgresql://u:p@host/db_de_prueba --productos 100000
+    python -m bench comparar bench_a1b2c3d_sqlite.json bench_e4f5a6b_sqlite.json
+    python -m bench perfiles --hilos 8 --segundos 10
+    python -m bench logs --hilos 16 --disco-lento-ms 5
+"""
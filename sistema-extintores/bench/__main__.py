@@ -0,0 +1,306 @@
+"""
+python -m bench correr [url] ...   genera el dataset, mide los escenarios y guarda el JSON
+python -m bench comparar a.json b.json
+python -m bench perfiles [url]     carga mixta con cada perfil de base de datos (config.PERFILES_BASE_DATOS)
+python -m bench logs [url]         latencia con el log escrito desde el request o desde la cola (gunicorn del Procfile)
+"""
+import os
+import sys
+import json
+import platform
+import tempfile
+import argparse
+import subprocess
+from datetime import datetime
+
+UMBRAL_REGRESION = 0.10  # 10% más lento en p50 o p95
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconocido'
+
+
+def _versiones():
+    from importlib.metadata import version, PackageNotFoundError
+    versiones = {'python': platform.python_version()}
+    for paquete in ('flask', 'sqlalchemy', 'flask-sqlalchemy'):
+        try:
+            versiones[paquete] = version(paquete)
+        except PackageNotFoundError:
+            pass
+    return versiones
+
+
+def correr(args):
+    # La URL debe definirse antes de importar la app (Config la lee al cargar)
+    os.environ['DATABASE_URL'] = args.url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+    from app import app, init_db
+    from models import db
+    from bench import generador, escenarios
+
+    app.config['TESTING'] = True
+    if not args.reutilizar:
+        with app.app_context():
+            db.drop_all()
+        init_db()
+        with app.app_context():
+            print(f'Generando {args.productos} productos y {args.movimientos} movimientos (semilla {args.semilla})...')
+            inicio = datetime.utcnow()
+            totales = generador.generar(args.productos, args.movimientos, args.semilla)
+            generador.completar_derivados()
+            print(f'  {totales} en {(datetime.utcnow() - inicio).total_seconds():.1f}s')
+
+    with app.app_context():
+        motor = db.engine.dialect.name
+
+    rutas = escenarios.rutas(app)
+    if args.solo:
+        rutas = {nombre: ruta for nombre, ruta in rutas.items() if nombre in args.solo}
+
+    print('=' * 60)
+    print(f'Escenarios ({args.repeticiones} repeticiones)')
+    resultados = escenarios.medir(app, rutas, args.repeticiones)
+
+    resultado_carga = None
+    if args.hilos and args.segundos:
+        print('=' * 60)
+        print(f'Carga: {args.hilos} hilos durante {args.segundos}s')
+        resultado_carga = escenarios.carga(app, rutas, args.hilos, args.segundos)
+        print(f'  {resultado_carga["requests_por_segundo"]} req/s | p50 {resultado_carga.get("p50_ms")} ms | '
+              f'p95 {resultado_carga.get("p95_ms")} ms | errores {resultado_carga["errores"]}')
+
+    commit = _commit()
+    salida = args.salida or f'bench_{commit}_{motor}.json'
+    documento = {
+        'meta': {
+            'commit': commit,
+            'fecha': datetime.utcnow().isoformat(timespec='seconds'),
+            'motor': motor,
+            'productos': args.productos,
+            'movimientos': args.movimientos,
+            'semilla': args.semilla,
+            'repeticiones': args.repeticiones,
+            'plataforma': platform.platform(),
+            'versiones': _versiones(),
+        },
+        'escenarios': resultados,
+        'carga': resultado_carga,
+    }
+    with open(salida, 'w', encoding='utf-8') as archivo:
+        json.dump(documento, archivo, indent=2, ensure_ascii=False)
+    print('=' * 60)
+    print(f'Resultados: {salida}')
+
+
+def carga_mixta(args):
+    """Un perfil por proceso: Config lee PERFIL_BASE_DATOS al importar la app"""
+    os.environ['DATABASE_URL'] = args.url
+    os.environ['PERFIL_BASE_DATOS'] = args.perfil
+
+    from app import app, init_db
+    from models import db
+    from bench import generador, escenarios
+
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+    init_db()
+    with app.app_context():
+        generador.generar(args.productos, args.productos * 10, args.semilla)
+        generador.completar_derivados()
+
+    resultado = escenarios.carga_mixta(app, args.hilos, args.segundos, args.escritura, args.semilla)
+    resultado['perfil'] = args.perfil
+    print(json.dumps(resultado))
+
+
+def perfiles(args):
+    from config import PERFILES_BASE_DATOS
+
+    postgres = bool(args.url and args.url.startswith('postgres'))
+    nombres = args.perfiles or (['basico', 'prod-postgres'] if postgres else ['basico', 'dev-sqlite', 'prod-sqlite'])
+    resultados = []
+    for nombre in nombres:
+        if nombre not in PERFILES_BASE_DATOS:
+            raise SystemExit(f'Perfil desconocido: {nombre} (disponibles: {", ".join(PERFILES_BASE_DATOS)})')
+        url = args.url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), f'perfil_{nombre}.db')
+        print(f'Perfil {nombre}: {args.hilos} hilos, {args.segundos}s, {args.escritura:.0%} escrituras...')
+        proceso = subprocess.run(
+            [sys.executable, '-m', 'bench', 'carga-mixta', url, '--perfil', nombre,
+             '--productos', str(args.productos), '--hilos', str(args.hilos), '--segundos', str(args.segundos),
+             '--escritura', str(args.escritura), '--semilla', str(args.semilla)],
+            capture_output=True, text=True
+        )
+        if proceso.returncode != 0:
+            print(proceso.stderr[-2000:])
+            raise SystemExit(f'Falló el perfil {nombre}')
+        resultados.append(json.loads(proceso.stdout.strip().splitlines()[-1]))
+
+    base = resultados[0]['operaciones_por_segundo']
+    print('=' * 60)
+    print(f'{"Perfil":<14} {"ops/s":>9} {"escr/s":>8} {"bloqueos":>9} {"p95 lect":>9} {"p95 escr":>9} {"vs base":>8}')
+    for r in resultados:
+        print(f'{r["perfil"]:<14} {r["operaciones_por_segundo"]:>9.1f} {r["escrituras_por_segundo"]:>8.1f} '
+              f'{r["bloqueos"]:>9} {r["lectura"].get("p95_ms", 0):>9.1f} {r["escritura"].get("p95_ms", 0):>9.1f} '
+              f'{(r["operaciones_por_segundo"] / base - 1 if base else 0):>+8.1%}')
+    print('=' * 60)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump({'meta': {'commit': _commit(), 'fecha': datetime.utcnow().isoformat(timespec='seconds')},
+                       'perfiles': resultados}, archivo, indent=2, ensure_ascii=False)
+        print(f'Resultados: {args.salida}')
+
+
+def logs(args):
+    directorio = tempfile.mkdtemp()
+    url = args.url or 'sqlite:///' + os.path.join(directorio, 'bench_logs.db')
+    # El log de este proceso (el que genera los datos) tampoco va al logs/ del repositorio
+    os.environ.update(DATABASE_URL=url, LOGS_DIRECTORIO=os.path.join(directorio, 'preparacion'))
+
+    from app import app, init_db
+    from models import db
+    from bench import generador, logs as bench_logs
+
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+    init_db()
+    with app.app_context():
+        generador.generar(args.productos, args.productos * 10, args.semilla)
+        generador.completar_derivados()
+
+    print(f'gunicorn: {" ".join(bench_logs.comando_procfile("$PORT"))}')
+    print(f'{args.hilos} clientes durante {args.segundos}s por modo, disco lento {args.disco_lento_ms} ms')
+    resultados = bench_logs.medir(app, url, directorio, args.hilos, args.segundos, args.disco_lento_ms)
+
+    print('=' * 60)
+    print(f'{"Modo":<9} {"req/s":>8} {"p50":>8} {"p95":>8} {"p99":>8} {"max":>8} {"en disco":>9} {"descart.":>8}')
+    for modo, r in resultados.items():
+        descartados = sum((r.get('escritura') or {}).get('descartados', {}).values())
+        print(f'{modo:<9} {r["requests_por_segundo"]:>8.1f} {r["p50_ms"]:>8.2f} {r["p95_ms"]:>8.2f} '
+              f'{r["p99_ms"]:>8.2f} {r["max_ms"]:>8.2f} {r["registros_en_disco"]:>9} {descartados:>8}')
+    print('=' * 60)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump({'meta': {'commit': _commit(), 'fecha': datetime.utcnow().isoformat(timespec='seconds'),
+                                'hilos': args.hilos, 'segundos': args.segundos,
+                                'disco_lento_ms': args.disco_lento_ms},
+                       'modos': resultados}, archivo, indent=2, ensure_ascii=False)
+        print(f'Resultados: {args.salida}')
+
+
+def _variacion(antes, despues):
+    if not antes:
+        return None
+    return (despues - antes) / antes
+
+
+def comparar(args):
+    with open(args.base, encoding='utf-8') as archivo:
+        base = json.load(archivo)
+    with open(args.nuevo, encoding='utf-8') as archivo:
+        nuevo = json.load(archivo)
+
+    print('=' * 60)
+    print(f'Base:  {base["meta"]["commit"]} ({base["meta"]["motor"]}, {base["meta"]["productos"]} productos)')
+    print(f'Nuevo: {nuevo["meta"]["commit"]} ({nuevo["meta"]["motor"]}, {nuevo["meta"]["productos"]} productos)')
+    if (base['meta']['motor'], base['meta']['productos'], base['meta']['movimientos']) != \
+            (nuevo['meta']['motor'], nuevo['meta']['productos'], nuevo['meta']['movimientos']):
+        print('ADVERTENCIA: los resultados no usan el mismo motor o dataset')
+    print('=' * 60)
+    print(f'{"Escenario":<26} {"p50 base":>10} {"p50 nuevo":>10} {"Δ p50":>8} {"Δ p95":>8} {"SQL":>9}')
+
+    regresiones = []
+    for nombre, antes in base['escenarios'].items():
+        despues = nuevo['escenarios'].get(nombre)
+        if not despues:
+            print(f'{nombre:<26} (no existe en el nuevo)')
+            continue
+        cambio_p50 = _variacion(antes['p50_ms'], despues['p50_ms'])
+        cambio_p95 = _variacion(antes['p95_ms'], despues['p95_ms'])
+        sql = f'{antes["consultas_sql"]:.0f}->{despues["consultas_sql"]:.0f}'
+        marca = ''
+        if max(cambio_p50 or 0, cambio_p95 or 0) > args.umbral:
+            regresiones.append(nombre)
+            marca = '  <-- más lento'
+        print(f'{nombre:<26} {antes["p50_ms"]:>10.2f} {despues["p50_ms"]:>10.2f} '
+              f'{(cambio_p50 or 0):>+8.1%} {(cambio_p95 or 0):>+8.1%} {sql:>9}{marca}')
+
+    if base.get('carga') and nuevo.get('carga'):
+        print('-' * 60)
+        cambio = _variacion(base['carga']['requests_por_segundo'], nuevo['carga']['requests_por_segundo'])
+        print(f'Carga: {base["carga"]["requests_por_segundo"]} -> {nuevo["carga"]["requests_por_segundo"]} req/s '
+              f'({(cambio or 0):+.1%})')
+    print('=' * 60)
+    print(f'Regresiones sobre {args.umbral:.0%}: {len(regresiones)}')
+    sys.exit(1 if regresiones else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m bench', description='Benchmarks reproducibles del inventario')
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    p_correr = subcomandos.add_parser('correr', help='Genera el dataset, mide y guarda los resultados')
+    p_correr.add_argument('url', nargs='?', help='URL de una base de datos de prueba (se borra su contenido)')
+    p_correr.add_argument('--productos', type=int, default=10000)
+    p_correr.add_argument('--movimientos', type=int, default=None, help='Por defecto 10 por producto')
+    p_correr.add_argument('--semilla', type=int, default=42)
+    p_correr.add_argument('--repeticiones', type=int, default=20)
+    p_correr.add_argument('--hilos', type=int, default=8, help='0 para omitir la carga concurrente')
+    p_correr.add_argument('--segundos', type=float, default=10)
+    p_correr.add_argument('--solo', nargs='*', help='Nombres de escenarios a medir')
+    p_correr.add_argument('--reutilizar', action='store_true', help='Usa los datos ya cargados en la URL')
+    p_correr.add_argument('--salida', help='Archivo JSON (por defecto bench_<commit>_<motor>.json)')
+    p_correr.set_defaults(funcion=correr)
+
+    p_comparar = subcomandos.add_parser('comparar', help='Compara dos archivos de resultados')
+    p_comparar.add_argument('base')
+    p_comparar.add_argument('nuevo')
+    p_comparar.add_argument('--umbral', type=float, default=UMBRAL_REGRESION)
+    p_comparar.set_defaults(funcion=comparar)
+
+    p_perfiles = subcomandos.add_parser('perfiles', help='Compara el rendimiento de los perfiles de base de datos')
+    p_perfiles.add_argument('url', nargs='?', help='URL de una base de datos de prueba (se borra su contenido)')
+    p_perfiles.add_argument('--perfiles', nargs='*', help='Por defecto: basico y los perfiles del motor')
+    p_perfiles.add_argument('--productos', type=int, default=2000)
+    p_perfiles.add_argument('--hilos', type=int, default=8)
+    p_perfiles.add_argument('--segundos', type=float, default=10)
+    p_perfiles.add_argument('--escritura', type=float, default=0.25, help='Proporción de operaciones de escritura')
+    p_perfiles.add_argument('--semilla', type=int, default=42)
+    p_perfiles.add_argument('--salida', help='Archivo JSON con los resultados')
+    p_perfiles.set_defaults(funcion=perfiles)
+
+    p_logs = subcomandos.add_parser('logs', help='Latencia con escritura de logs directa y con cola')
+    p_logs.add_argument('url', nargs='?', help='URL de una base de datos de prueba (se borra su contenido)')
+    p_logs.add_argument('--productos', type=int, default=2000)
+    p_logs.add_argument('--hilos', type=int, default=16, help='Clientes HTTP concurrentes')
+    p_logs.add_argument('--segundos', type=float, default=10, help='Duración de la carga por modo')
+    p_logs.add_argument('--disco-lento-ms', type=float, default=0, help='Demora agregada a cada escritura del log')
+    p_logs.add_argument('--semilla', type=int, default=42)
+    p_logs.add_argument('--salida', help='Archivo JSON con los resultados')
+    p_logs.set_defaults(funcion=logs)
+
+    # Lo invoca `perfiles` en un proceso aparte por cada perfil
+    p_mixta = subcomandos.add_parser('carga-mixta')
+    p_mixta.add_argument('url')
+    p_mixta.add_argument('--perfil', required=True)
+    p_mixta.add_argument('--productos', type=int, default=2000)
+    p_mixta.add_argument('--hilos', type=int, default=8)
+    p_mixta.add_argument('--segundos', type=float, default=10)
+    p_mixta.add_argument('--escritura', type=float, default=0.25)
+    p_mixta.add_argument('--semilla', type=int, default=42)
+    p_mixta.set_defaults(funcion=carga_mixta)
+
+    args = parser.parse_args()
+    if args.comando == 'correr' and args.movimientos is None:
+        args.movimientos = args.productos * 10
+    args.funcion(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+"""
+App que carga gunicorn en `python -m bench logs`
+Con BENCH_DISCO_LENTO_MS cada escritura al log tarda ese tiempo de más, como un disco trabado.
+"""
+import os
+import time
+from logs_sistema import ManejadorRotativo
+from app import app
+
+__all__ = ['app']  # gunicorn carga bench.app_logs:app
+
+_demora = float(os.environ.get('BENCH_DISCO_LENTO_MS', 0)) / 1000
+
+if _demora:
+    _escribir = ManejadorRotativo.emit
+
+    def _escribir_lento(self, record):
+        time.sleep(_demora)
+        _escribir(self, record)
+
+    ManejadorRotativo.emit = _escribir_lento
@@ -0,0 +1,245 @@
+"""
+Escenarios de benchmark sobre las rutas principales
+- medir(): cada escenario se repite con el cliente de pruebas de Flask, midiendo tiempo,
+  sentencias SQL y bytes de la respuesta (incluidas las respuestas que se generan en partes).
+- carga(): varios hilos, cada uno con su sesión, recorren los escenarios durante un tiempo fijo.
+- carga_mixta(): lecturas y movimientos de stock concurrentes (compara perfiles de base de datos).
+"""
+import time
+import random
+import threading
+from sqlalchemy import event, select
+from sqlalchemy.exc import OperationalError
+from models import db, Producto, Categoria
+from servicio_stock import registrar_movimiento, StockError
+
+USUARIO = {'username': 'admin', 'password': 'admin123'}
+CUANTILES = (0.5, 0.95, 0.99)
+
+
+def rutas(app):
+    """
+    Escenarios (nombre -> ruta) con ids elegidos de forma determinista del dataset generado.
+    El cursor de movimientos se toma de /api/movimientos para medir páginas profundas.
+    """
+    with app.app_context():
+        producto_simple = db.session.execute(
+            select(Producto.id).where(Producto.tiene_modelos == False).order_by(Producto.id)
+        ).scalar()
+        producto_variantes = db.session.execute(
+            select(Producto.id).where(Producto.tiene_modelos == True).order_by(Producto.id)
+        ).scalar() or producto_simple
+        categoria_id = db.session.execute(select(Categoria.id).order_by(Categoria.codigo)).scalar()
+
+    cliente = _cliente(app)
+    cursor = None
+    for _ in range(5):
+        datos = cliente.get('/api/movimientos' + (f'?cursor={cursor}' if cursor else '')).get_json() or {}
+        cursor = datos.get('siguiente') or cursor
+
+    return {
+        'dashboard': '/',
+        'productos': '/productos',
+        'productos_categoria': f'/productos?categoria={categoria_id}',
+        'productos_busqueda': '/productos?busqueda=extintor',
+        'buscar_api': '/api/productos/buscar?q=man',
+        'movimientos': '/movimientos',
+        'movimientos_entrada': '/movimientos?tipo=entrada',
+        'movimientos_pagina_6': f'/movimientos?cursor={cursor}' if cursor else '/movimientos',
+        'ver_producto': f'/productos/ver/{producto_simple}',
+        'ver_producto_variantes': f'/productos/ver/{producto_variantes}',
+        'reporte_stock_bajo': '/reportes/stock-bajo',
+        'reporte_valorizado': '/reportes/valorizado',
+        'reporte_valorizado_csv': '/reportes/valorizado?formato=csv',
+        'siguiente_codigo': f'/api/siguiente-codigo?categoria_id={categoria_id}&ubicacion=Almacén',
+    }
+
+
+def _cliente(app):
+    cliente = app.test_client()
+    cliente.post('/login', data=USUARIO)
+    return cliente
+
+
+def _pedir(cliente, ruta):
+    """Devuelve (segundos, status, bytes) leyendo el cuerpo completo"""
+    inicio = time.perf_counter()
+    respuesta = cliente.get(ruta)
+    tamanio = len(respuesta.get_data())
+    respuesta.close()
+    return time.perf_counter() - inicio, respuesta.status_code, tamanio
+
+
+def cuantil(valores, q):
+    """Cuantil por rango más cercano"""
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, int(round(q * len(ordenados) + 0.5)) - 1))
+    return ordenados[indice]
+
+
+def _resumen(tiempos):
+    if not tiempos:
+        return {}
+    resumen = {f'p{int(q * 100)}_ms': round(cuantil(tiempos, q) * 1000, 3) for q in CUANTILES}
+    resumen['media_ms'] = round(sum(tiempos) / len(tiempos) * 1000, 3)
+    resumen['max_ms'] = round(max(tiempos) * 1000, 3)
+    return resumen
+
+
+# ==================== ESCENARIOS ====================
+
+def medir(app, escenarios, repeticiones=20, calentamiento=2):
+    """Mide cada escenario en serie. Devuelve {nombre: {ruta, status, bytes, consultas_sql, p50_ms, ...}}"""
+    consultas = {'total': 0}
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        consultas['total'] += 1
+
+    cliente = _cliente(app)
+    resultados = {}
+    with app.app_context():
+        motor = db.engine
+    event.listen(motor, 'before_cursor_execute', contar)
+    try:
+        for nombre, ruta in escenarios.items():
+            for _ in range(calentamiento):
+                _pedir(cliente, ruta)
+            tiempos = []
+            consultas['total'] = 0
+            for _ in range(repeticiones):
+                segundos, status, tamanio = _pedir(cliente, ruta)
+                tiempos.append(segundos)
+            resultados[nombre] = {
+                'ruta': ruta,
+                'status': status,
+                'bytes': tamanio,
+                'consultas_sql': consultas['total'] / repeticiones,
+                **_resumen(tiempos),
+            }
+            print(f'  {nombre:<26} p50 {resultados[nombre]["p50_ms"]:>9.2f} ms | '
+                  f'p95 {resultados[nombre]["p95_ms"]:>9.2f} ms | {resultados[nombre]["consultas_sql"]:.0f} SQL')
+    finally:
+        event.remove(motor, 'before_cursor_execute', contar)
+    return resultados
+
+
+# ==================== CARGA CONCURRENTE ====================
+
+def carga(app, escenarios, hilos=8, segundos=10):
+    """
+    Cada hilo recorre los escenarios en orden (desfasado según el hilo) hasta cumplir el tiempo.
+    Devuelve requests por segundo, errores y cuantiles de latencia global y por escenario.
+    """
+    nombres = list(escenarios)
+    tiempos = {nombre: [] for nombre in nombres}
+    errores = []
+    bloqueo = threading.Lock()
+    limite = time.perf_counter() + segundos
+
+    def trabajador(indice):
+        cliente = _cliente(app)
+        propios = []
+        n = indice
+        while time.perf_counter() < limite:
+            nombre = nombres[n % len(nombres)]
+            n += 1
+            try:
+                duracion, status, _ = _pedir(cliente, escenarios[nombre])
+            except Exception as e:
+                with bloqueo:
+                    errores.append(f'{nombre}: {e!r}')
+                continue
+            if status >= 400:
+                with bloqueo:
+                    errores.append(f'{nombre}: HTTP {status}')
+            propios.append((nombre, duracion))
+        with bloqueo:
+            for nombre, duracion in propios:
+                tiempos[nombre].append(duracion)
+
+    inicio = time.perf_counter()
+    trabajadores = [threading.Thread(target=trabajador, args=(i,)) for i in range(hilos)]
+    for t in trabajadores:
+        t.start()
+    for t in trabajadores:
+        t.join()
+    duracion = time.perf_counter() - inicio
+
+    todos = [t for valores in tiempos.values() for t in valores]
+    return {
+        'hilos': hilos,
+        'segundos': round(duracion, 3),
+        'requests': len(todos),
+        'requests_por_segundo': round(len(todos) / duracion, 2),
+        'errores': len(errores),
+        'primeros_errores': errores[:5],
+        **_resumen(todos),
+        'escenarios': {nombre: {'requests': len(valores), **_resumen(valores)} for nombre, valores in tiempos.items()},
+    }
+
+
+# ==================== CARGA MIXTA (LECTURA Y ESCRITURA) ====================
+
+def carga_mixta(app, hilos=8, segundos=10, proporcion_escritura=0.25, semilla=42):
+    """
+    Hilos que mezclan movimientos de stock (servicio_stock) con lecturas de páginas.
+    Mide operaciones por segundo y cuenta los errores de bloqueo de la base.
+    """
+    with app.app_context():
+        productos = db.session.execute(
+            select(Producto.id).where(Producto.tiene_modelos == False).order_by(Producto.id).limit(500)
+        ).scalars().all()
+    lecturas = ['/productos', '/movimientos', '/'] + [f'/productos/ver/{p}' for p in productos[:20]]
+
+    conteo = {'lecturas': 0, 'escrituras': 0, 'rechazos_stock': 0, 'bloqueos': 0, 'otros_errores': 0}
+    tiempos = {'lectura': [], 'escritura': []}
+    bloqueo = threading.Lock()
+    limite = time.perf_counter() + segundos
+
+    def trabajador(indice):
+        rnd = random.Random(semilla + indice)
+        cliente = _cliente(app)
+        propios = {clave: 0 for clave in conteo}
+        propios_tiempos = {'lectura': [], 'escritura': []}
+        while time.perf_counter() < limite:
+            inicio = time.perf_counter()
+            try:
+                if rnd.random() < proporcion_escritura:
+                    with app.app_context():
+                        try:
+                            registrar_movimiento(rnd.choice(productos), rnd.choice(('entrada', 'salida')), 1, 1,
+                                                 motivo='Benchmark')
+                            propios['escrituras'] += 1
+                        except StockError:
+                            propios['rechazos_stock'] += 1
+                    propios_tiempos['escritura'].append(time.perf_counter() - inicio)
+                else:
+                    _, status, _ = _pedir(cliente, rnd.choice(lecturas))
+                    propios['lecturas' if status < 400 else 'otros_errores'] += 1
+                    propios_tiempos['lectura'].append(time.perf_counter() - inicio)
+            except OperationalError as e:
+                propios['bloqueos' if 'locked' in str(e) else 'otros_errores'] += 1
+        with bloqueo:
+            for clave, valor in propios.items():
+                conteo[clave] += valor
+            for clave, valores in propios_tiempos.items():
+                tiempos[clave].extend(valores)
+
+    inicio = time.perf_counter()
+    trabajadores = [threading.Thread(target=trabajador, args=(i,)) for i in range(hilos)]
+    for t in trabajadores:
+        t.start()
+    for t in trabajadores:
+        t.join()
+    duracion = time.perf_counter() - inicio
+
+    operaciones = conteo['lecturas'] + conteo['escrituras'] + conteo['rechazos_stock']
+    return {
+        'hilos': hilos,
+        'segundos': round(duracion, 3),
+        'operaciones_por_segundo': round(operaciones / duracion, 2),
+        'escrituras_por_segundo': round(conteo['escrituras'] / duracion, 2),
+        **conteo,
+        'lectura': _resumen(tiempos['lectura']),
+        'escritura': _resumen(tiempos['escritura']),
+    }
@@ -0,0 +1,205 @@
+"""
+Generador de datos sintéticos deterministas
+Con la misma semilla y los mismos tamaños produce exactamente las mismas filas.
+El historial es consistente: cada movimiento encadena stock_anterior -> stock_nuevo del
+producto, el stock final coincide con stock_actual y el de cada producto con variantes es
+la suma de sus modelos (y la de cada modelo con colores, la de sus colores).
+Se asume una base recién creada (init_db): los ids se asignan en orden desde 1.
+"""
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import insert, select
+from models import (db, Usuario, Categoria, Producto, ProductoModelo, ProductoColor, ProductoCaracteristica,
+                    Movimiento)
+
+LOTE = 5000
+DIAS_HISTORIAL = 3 * 365
+
+UBICACIONES = {'Oficina': 'OFI', 'Almacén': 'ALM', 'Taller': 'TAL'}
+TIPOS = ('Extintor', 'Casco', 'Guante', 'Manguera', 'Válvula', 'Botas', 'Chaleco', 'Señal', 'Recarga',
+         'Gabinete', 'Soporte', 'Manómetro', 'Boquilla', 'Precinto', 'Detector', 'Lámpara')
+DETALLES = ('PQS', 'CO2', 'industrial', 'de seguridad', 'reforzado', 'acero', 'nitrilo', 'reflectivo',
+            'ABC', 'portátil', 'rodante', 'fotoluminiscente', 'dieléctrico', 'térmico')
+MODELOS = ('Estándar', 'Pro', 'Compacto', 'XL', 'Industrial', 'Económico')
+COLORES = ('Rojo', 'Negro', 'Amarillo', 'Azul', 'Blanco', 'Verde')
+CARACTERISTICAS = {
+    'Material': ('Acero', 'Aluminio', 'PVC', 'Nitrilo', 'Cuero'),
+    'Capacidad': ('1 Kg', '2 Kg', '4 Kg', '6 Kg', '9 Kg', '12 Kg'),
+    'Talla': ('S', 'M', 'L', 'XL'),
+    'Norma': ('NTP 350.043', 'NFPA 10', 'ANSI Z89.1'),
+}
+
+# Proporciones del catálogo
+PROPORCION_CON_MODELOS = 0.10
+PROPORCION_CON_COLORES = 0.5  # de los productos con modelos
+
+
+class _Escritor:
+    """Acumula filas por tabla y las inserta por lotes respetando el orden de las llaves foráneas"""
+    ORDEN = (Producto, ProductoModelo, ProductoColor, ProductoCaracteristica, Movimiento)
+
+    def __init__(self):
+        self.filas = {modelo: [] for modelo in self.ORDEN}
+        self.totales = {modelo.__tablename__: 0 for modelo in self.ORDEN}
+
+    def agregar(self, modelo, fila):
+        self.filas[modelo].append(fila)
+        if len(self.filas[modelo]) >= LOTE:
+            self.vaciar(hasta=modelo)
+
+    def vaciar(self, hasta=None):
+        for modelo in self.ORDEN:
+            if self.filas[modelo]:
+                db.session.execute(insert(modelo.__table__), self.filas[modelo])
+                self.totales[modelo.__tablename__] += len(self.filas[modelo])
+                self.filas[modelo] = []
+            if modelo is hasta:
+                break
+
+
+def _repartir(rnd, total, partes):
+    """Reparte `total` elementos al azar entre `partes` (cantidad por parte)"""
+    cantidades = [0] * partes
+    for _ in range(total):
+        cantidades[rnd.randrange(partes)] += 1
+    return cantidades
+
+
+def _fechas(rnd, desde, hasta, cantidad):
+    segundos = max(int((hasta - desde).total_seconds()), 1)
+    return [desde + timedelta(seconds=s) for s in sorted(rnd.randrange(segundos) for _ in range(cantidad))]
+
+
+def _cantidad_movimiento(rnd, stock):
+    """(tipo, cantidad, stock nuevo) de la hoja: nunca deja stock negativo"""
+    sorteo = rnd.random()
+    if sorteo < 0.1:
+        nuevo = float(rnd.randint(0, 60))
+        return 'ajuste', abs(nuevo - stock), nuevo
+    if sorteo < 0.55 and stock >= 1:
+        cantidad = float(rnd.randint(1, min(int(stock), 20)))
+        return 'salida', cantidad, stock - cantidad
+    cantidad = float(rnd.randint(1, 20))
+    return 'entrada', cantidad, stock + cantidad
+
+
+def generar(productos=10000, movimientos=None, semilla=42, ahora=None):
+    """
+    Inserta el catálogo y el historial sintético. movimientos por defecto: 10 por producto.
+    Devuelve la cantidad de filas insertadas por tabla.
+    """
+    movimientos = productos * 10 if movimientos is None else movimientos
+    rnd = random.Random(semilla)
+    ahora = ahora or datetime.utcnow().replace(microsecond=0)
+    inicio = ahora - timedelta(days=DIAS_HISTORIAL)
+
+    usuario_id = db.session.execute(select(Usuario.id).order_by(Usuario.id)).scalar()
+    categorias = db.session.execute(select(Categoria.id, Categoria.codigo).order_by(Categoria.codigo)).all()
+    if usuario_id is None or not categorias:
+        raise RuntimeError('La base debe estar inicializada (init_db) antes de generar datos')
+
+    escritor = _Escritor()
+    correlativos = {}
+    modelo_id = color_id = 0
+    por_producto = _repartir(rnd, movimientos, productos)
+
+    for producto_id in range(1, productos + 1):
+        categoria_id, categoria_codigo = rnd.choice(categorias)
+        ubicacion = rnd.choice(list(UBICACIONES))
+        clave = (categoria_codigo, UBICACIONES[ubicacion])
+        correlativos[clave] = correlativos.get(clave, 0) + 1
+        creado = inicio + timedelta(seconds=rnd.randrange(DIAS_HISTORIAL * 24 * 3600 // 3))
+
+        # Hojas donde se registra el stock: el producto, sus modelos o sus colores
+        hojas, modelos, colores = [], [], []
+        if rnd.random() < PROPORCION_CON_MODELOS:
+            con_colores = rnd.random() < PROPORCION_CON_COLORES
+            for nombre_modelo in rnd.sample(MODELOS, rnd.randint(1, 3)):
+                modelo_id += 1
+                modelo = {'id': modelo_id, 'producto_id': producto_id, 'nombre_modelo': nombre_modelo,
+                          'precio_diferencial': float(rnd.choice((0, 0, 5, 10, 25))), 'activo': True,
+                          'fecha_creacion': creado, 'stock_actual': 0.0}
+                modelos.append(modelo)
+                if not con_colores:
+                    hojas.append((modelo, None))
+                    continue
+                for nombre_color in rnd.sample(COLORES, rnd.randint(1, 3)):
+                    color_id += 1
+                    color = {'id': color_id, 'modelo_id': modelo_id, 'nombre_color': nombre_color,
+                             'activo': True, 'fecha_creacion': creado, 'stock_actual': 0.0}
+                    colores.append(color)
+                    hojas.append((modelo, color))
+
+        # Historial: cada movimiento cambia una hoja y el total del producto en el mismo delta
+        stock_hojas = [0.0] * max(len(hojas), 1)
+        total = 0.0
+        historial = []
+        for fecha in _fechas(rnd, creado, ahora, por_producto[producto_id - 1]):
+            indice = rnd.randrange(len(stock_hojas))
+            tipo, cantidad, nuevo = _cantidad_movimiento(rnd, stock_hojas[indice])
+            delta = nuevo - stock_hojas[indice]
+            stock_hojas[indice] = nuevo
+            modelo, color = hojas[indice] if hojas else (None, None)
+            historial.append({
+                'producto_id': producto_id,
+                'modelo_id': modelo['id'] if modelo else None,
+                'color_id': color['id'] if color else None,
+                'usuario_id': usuario_id,
+                'tipo_movimiento': tipo,
+                'cantidad': cantidad,
+                'stock_anterior': total,
+                'stock_nuevo': total + delta,
+                'motivo': 'Benchmark',
+                'fecha_movimiento': fecha,
+            })
+            total += delta
+
+        for (modelo, color), stock in zip(hojas, stock_hojas):
+            (color or modelo)['stock_actual'] = stock
+            if color:
+                modelo['stock_actual'] += stock
+
+        escritor.agregar(Producto, {
+            'id': producto_id,
+            'codigo': f'{clave[0]}-{clave[1]}-{correlativos[clave]:04d}',
+            'nombre': f'{rnd.choice(TIPOS)} {rnd.choice(DETALLES)} {producto_id}',
+            'descripcion': f'{rnd.choice(TIPOS)} {rnd.choice(DETALLES)} para uso {rnd.choice(DETALLES)}',
+            'categoria_id': categoria_id,
+            'unidad_medida': 'unidad',
+            'stock_actual': total,
+            'stock_minimo': float(rnd.randint(0, 15)),
+            'precio_unitario': round(rnd.uniform(1, 800), 2),
+            'ubicacion': ubicacion,
+            'tiene_modelos': bool(modelos),
+            'tiene_colores': bool(colores),
+            'activo': True,
+            'fecha_creacion': creado,
+            'fecha_actualizacion': creado,
+        })
+        for modelo in modelos:
+            escritor.agregar(ProductoModelo, modelo)
+        for color in colores:
+            escritor.agregar(ProductoColor, color)
+        for nombre in rnd.sample(list(CARACTERISTICAS), rnd.randint(0, 3)):
+            escritor.agregar(ProductoCaracteristica, {
+                'producto_id': producto_id, 'nombre': nombre,
+                'valor': rnd.choice(CARACTERISTICAS[nombre]), 'fecha_creacion': creado,
+            })
+        for movimiento in historial:
+            escritor.agregar(Movimiento, movimiento)
+
+    escritor.vaciar()
+    db.session.commit()
+    return escritor.totales
+
+
+def completar_derivados():
+    """Resumen diario, índice de búsqueda y estadísticas del planificador (los inserts masivos no los disparan)"""
+    from metricas_dashboard import reconstruir_resumen
+    from busqueda_productos import disponible, reindexar_todo
+
+    reconstruir_resumen()
+    if disponible():
+        reindexar_todo()
+    with db.engine.begin() as conexion:
+        conexion.exec_driver_sql('ANALYZE')
@@ -0,0 +1,133 @@
+"""
+Benchmark del log de la aplicación: latencia de los requests con escritura directa y con cola
+- Levanta gunicorn con el mismo comando web del Procfile (workers y threads), una vez por modo
+  de LOGS_ESCRITURA, y le pega por HTTP con varios clientes durante un tiempo fijo.
+- Con --disco-lento-ms cada escritura al archivo tarda ese tiempo de más (bench/app_logs.py):
+  con 'directa' lo paga el request, con 'cola' lo paga el hilo escritor y lo que no entra
+  en la cola se descarta y se cuenta.
+"""
+import os
+import sys
+import json
+import time
+import shlex
+import socket
+import threading
+import subprocess
+import http.client
+from urllib.parse import urlencode, quote
+from bench import escenarios
+
+MODOS = ('directa', 'cola')
+RUTAS = ('dashboard', 'productos', 'buscar_api', 'ver_producto', 'siguiente_codigo')
+
+
+def comando_procfile(puerto, modulo='bench.app_logs:app'):
+    """El comando 'web:' del Procfile escuchando en localhost y cargando `modulo`"""
+    with open('Procfile', encoding='utf-8') as archivo:
+        linea = next(l for l in archivo if l.startswith('web:'))
+    partes = shlex.split(linea[len('web:'):])
+    partes = [f'127.0.0.1:{puerto}' if '$PORT' in parte else parte for parte in partes]
+    partes[-1] = modulo
+    return [sys.executable, '-m', *partes] if partes[0] == 'gunicorn' else partes
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _esperar(puerto, segundos=30):
+    limite = time.monotonic() + segundos
+    while time.monotonic() < limite:
+        try:
+            socket.create_connection(('127.0.0.1', puerto), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit(f'gunicorn no respondió en el puerto {puerto}')
+
+
+class ClienteHttp:
+    """Conexión keep-alive con la cookie de sesión del login"""
+
+    def __init__(self, puerto):
+        self.conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=60)
+        self.cookies = {}
+        self.pedir('POST', '/login', urlencode(escenarios.USUARIO),
+                   {'Content-Type': 'application/x-www-form-urlencoded'})
+
+    def pedir(self, metodo, ruta, cuerpo=None, cabeceras=None):
+        cabeceras = dict(cabeceras or {})
+        if self.cookies:
+            cabeceras['Cookie'] = '; '.join(f'{k}={v}' for k, v in self.cookies.items())
+        self.conexion.request(metodo, quote(ruta, safe='/?=&'), cuerpo, cabeceras)
+        respuesta = self.conexion.getresponse()
+        datos = respuesta.read()
+        for clave, valor in respuesta.getheaders():
+            if clave.lower() == 'set-cookie':
+                nombre, _, resto = valor.partition('=')
+                self.cookies[nombre] = resto.split(';', 1)[0]
+        return respuesta.status, datos
+
+
+def _carga(puerto, rutas, hilos, segundos):
+    tiempos, errores = [], []
+    bloqueo = threading.Lock()
+    limite = time.perf_counter() + segundos
+
+    def trabajador(indice):
+        cliente = ClienteHttp(puerto)
+        propios, fallidos = [], 0
+        n = indice
+        while time.perf_counter() < limite:
+            inicio = time.perf_counter()
+            status, _ = cliente.pedir('GET', rutas[n % len(rutas)])
+            propios.append(time.perf_counter() - inicio)
+            fallidos += status >= 400
+            n += 1
+        with bloqueo:
+            tiempos.extend(propios)
+            errores.append(fallidos)
+
+    inicio = time.perf_counter()
+    trabajadores = [threading.Thread(target=trabajador, args=(i,)) for i in range(hilos)]
+    for t in trabajadores:
+        t.start()
+    for t in trabajadores:
+        t.join()
+    duracion = time.perf_counter() - inicio
+    return {'requests': len(tiempos), 'requests_por_segundo': round(len(tiempos) / duracion, 2),
+            'errores': sum(errores), **escenarios._resumen(tiempos)}
+
+
+def medir_modo(modo, url, rutas, directorio, hilos, segundos, disco_lento_ms):
+    puerto = _puerto_libre()
+    logs = os.path.join(directorio, modo)
+    entorno = dict(os.environ, DATABASE_URL=url, LOGS_ESCRITURA=modo, LOGS_DIRECTORIO=logs,
+                   BENCH_DISCO_LENTO_MS=str(disco_lento_ms), TRABAJOS_HILOS='0')
+    proceso = subprocess.Popen(comando_procfile(puerto), env=entorno,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _esperar(puerto)
+        # Calentamiento: la primera vuelta arma cachés y plantillas
+        _carga(puerto, rutas, 1, 1)
+        resultado = _carga(puerto, rutas, hilos, segundos)
+        if modo == 'cola':
+            _, datos = ClienteHttp(puerto).pedir('GET', '/api/logs?cantidad=1')
+            resultado['escritura'] = json.loads(datos).get('escritura')
+    finally:
+        proceso.terminate()
+        proceso.wait(timeout=60)
+    with open(os.path.join(logs, 'app.log'), 'rb') as archivo:
+        resultado['registros_en_disco'] = sum(1 for _ in archivo)
+    resultado['modo'] = modo
+    return resultado
+
+
+def medir(app, url, directorio, hilos=16, segundos=10, disco_lento_ms=0):
+    """Un gunicorn por modo sobre la misma base; devuelve {modo: resultado}"""
+    todas = escenarios.rutas(app)
+    rutas = [todas[nombre] for nombre in RUTAS]
+    return {modo: medir_modo(modo, url, rutas, directorio, hilos, segundos, disco_lento_ms) for modo in MODOS}
@@ -0,0 +1,118 @@
+"""
+Benchmark de contención para el servicio de stock
+Lanza cientos de movimientos concurrentes contra un mismo producto y verifica
+que el stock final y el historial de movimientos cuadren.
+
+Uso:
+    python benchmark_stock.py                       # SQLite temporal con el perfil prod-sqlite (WAL)
+    python benchmark_stock.py postgresql://u:p@host/db --destruir
+
+Con una URL, el benchmark borra y recrea todas las tablas de esa base: se exige --destruir.
+"""
+import os
+import sys
+import time
+import tempfile
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+HILOS = 8
+MOVIMIENTOS_POR_HILO = 50
+STOCK_INICIAL = 100
+
+
+def preparar_entorno(url):
+    # La URL y el perfil deben definirse antes de importar la app (Config los lee al cargar)
+    os.environ['DATABASE_URL'] = url
+    if url.startswith('sqlite'):
+        # WAL y busy_timeout (ver config.PERFILES_BASE_DATOS)
+        os.environ.setdefault('PERFIL_BASE_DATOS', 'prod-sqlite')
+
+
+def ejecutar(url):
+    preparar_entorno(url)
+
+    from app import app
+    from models import db, Usuario, Categoria, Producto, Movimiento
+    from servicio_stock import registrar_movimiento, StockInsuficiente
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        usuario = Usuario(username='bench', nombre_completo='Benchmark', email='bench@local')
+        usuario.set_password('bench')
+        categoria = Categoria(codigo='999', nombre='Benchmark')
+        db.session.add_all([usuario, categoria])
+        db.session.flush()
+
+        producto = Producto(
+            codigo='BENCH-0001',
+            nombre='Producto benchmark',
+            categoria_id=categoria.id,
+            unidad_medida='unidad',
+            stock_actual=STOCK_INICIAL
+        )
+        db.session.add(producto)
+        db.session.commit()
+        producto_id, usuario_id = producto.id, usuario.id
+
+    rechazados = []
+    bloqueo = threading.Lock()
+
+    def trabajador(indice):
+        with app.app_context():
+            for n in range(MOVIMIENTOS_POR_HILO):
+                # Mezcla de salidas y entradas para forzar la condición de stock >= 0
+                tipo = 'salida' if (indice + n) % 3 else 'entrada'
+                try:
+                    registrar_movimiento(producto_id, tipo, 1, usuario_id, motivo='benchmark')
+                except StockInsuficiente:
+                    with bloqueo:
+                        rechazados.append(indice)
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=HILOS) as pool:
+        list(pool.map(trabajador, range(HILOS)))
+    duracion = time.perf_counter() - inicio
+
+    with app.app_context():
+        stock_final = db.session.get(Producto, producto_id).stock_actual
+        movimientos = Movimiento.query.filter_by(producto_id=producto_id).order_by(Movimiento.id).all()
+        entradas = sum(m.cantidad for m in movimientos if m.tipo_movimiento == 'entrada')
+        salidas = sum(m.cantidad for m in movimientos if m.tipo_movimiento == 'salida')
+        esperado = STOCK_INICIAL + entradas - salidas
+
+        # Cada movimiento debe encadenar con el anterior: stock_nuevo de uno = stock_anterior del siguiente
+        cortes = [
+            m for previo, m in zip(movimientos, movimientos[1:])
+            if previo.stock_nuevo != m.stock_anterior
+        ]
+        negativos = [m for m in movimientos if m.stock_nuevo < 0]
+
+    total = HILOS * MOVIMIENTOS_POR_HILO
+    print('=' * 60)
+    print(f'Motor: {url.split(":")[0]}')
+    print(f'Movimientos intentados: {total} en {HILOS} hilos')
+    print(f'Registrados: {len(movimientos)} | Rechazados por stock: {len(rechazados)}')
+    print(f'Duración: {duracion:.2f}s ({total / duracion:.0f} mov/s)')
+    print(f'Stock final: {stock_final} | Esperado según historial: {esperado}')
+    print(f'Stocks negativos: {len(negativos)} | Cortes en la cadena: {len(cortes)}')
+    print('=' * 60)
+
+    if stock_final != esperado or negativos or cortes or len(movimientos) + len(rechazados) != total:
+        print('ERROR: el historial no cuadra con el stock')
+        sys.exit(1)
+    print('OK: sin actualizaciones perdidas')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark de contención del servicio de stock')
+    parser.add_argument('url', nargs='?', help='URL de una base de datos de prueba (se borran sus tablas)')
+    parser.add_argument('--destruir', action='store_true', help='Confirma que se puede borrar la base de la URL')
+    args = parser.parse_args()
+
+    if args.url and not args.destruir:
+        parser.error(f'{args.url} se borra por completo; repite con --destruir si es una base de prueba')
+    ejecutar(args.url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'benchmark_stock.db'))
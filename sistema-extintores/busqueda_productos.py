@@ -0,0 +1,219 @@
+"""
+Búsqueda de productos por texto completo
+- SQLite: tabla virtual FTS5 (productos_fts) ordenada por bm25
+- PostgreSQL: tabla productos_busqueda con tsvector + índice GIN, ordenada por ts_rank
+Indexa nombre, código, descripción y características. El texto se normaliza sin
+acentos y en minúsculas, así "extintor" encuentra "Extintór".
+El índice se mantiene en la misma transacción que crea o edita el producto.
+"""
+import re
+import unicodedata
+from sqlalchemy import event, inspect, text, select, bindparam, Integer, Float
+from models import db, Producto, ProductoCaracteristica
+
+MAX_CANDIDATOS_SUGERENCIAS = 500
+
+_estado = {'disponible': None}
+
+
+def normalizar(texto):
+    """Minúsculas y sin acentos"""
+    if not texto:
+        return ''
+    descompuesto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c)).lower()
+
+
+def _terminos(busqueda):
+    return re.findall(r'\w+', normalizar(busqueda))
+
+
+def _es_postgres(conexion):
+    return conexion.dialect.name == 'postgresql'
+
+
+# ==================== ESQUEMA ====================
+
+def crear_indice_busqueda():
+    """Crea la estructura de búsqueda si no existe y la llena si está vacía"""
+    conexion = db.session.connection()
+    try:
+        if _es_postgres(conexion):
+            conexion.execute(text(
+                'CREATE TABLE IF NOT EXISTS productos_busqueda ('
+                ' producto_id INTEGER PRIMARY KEY REFERENCES productos(id) ON DELETE CASCADE,'
+                ' documento tsvector NOT NULL)'
+            ))
+            conexion.execute(text(
+                'CREATE INDEX IF NOT EXISTS ix_productos_busqueda_documento '
+                'ON productos_busqueda USING GIN (documento)'
+            ))
+            vacio = conexion.execute(text('SELECT 1 FROM productos_busqueda LIMIT 1')).first() is None
+        else:
+            conexion.execute(text(
+                # rowid = id del producto
+                'CREATE VIRTUAL TABLE IF NOT EXISTS productos_fts USING fts5('
+                ' nombre, codigo, descripcion, caracteristicas,'
+                " tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            ))
+            vacio = conexion.execute(text('SELECT 1 FROM productos_fts LIMIT 1')).first() is None
+        db.session.commit()
+    except Exception as e:
+        # Ej. SQLite compilado sin FTS5: se sigue usando la búsqueda con LIKE
+        db.session.rollback()
+        _estado['disponible'] = False
+        print(f'[BUSQUEDA] Índice de texto completo no disponible: {e}')
+        return
+
+    _estado['disponible'] = True
+    if vacio:
+        reindexar_todo()
+
+
+def disponible():
+    if _estado['disponible'] is None:
+        tabla = 'productos_busqueda' if db.engine.dialect.name == 'postgresql' else 'productos_fts'
+        _estado['disponible'] = inspect(db.engine).has_table(tabla)
+    return _estado['disponible']
+
+
+# ==================== INDEXACIÓN ====================
+
+def _documentos(conexion, producto_ids=None):
+    """Arma (producto_id, nombre, codigo, descripcion, caracteristicas) normalizados de productos activos"""
+    consulta = select(Producto.id, Producto.nombre, Producto.codigo, Producto.descripcion).where(Producto.activo == True)
+    consulta_caract = select(ProductoCaracteristica.producto_id, ProductoCaracteristica.nombre, ProductoCaracteristica.valor)
+    if producto_ids is not None:
+        consulta = consulta.where(Producto.id.in_(producto_ids))
+        consulta_caract = consulta_caract.where(ProductoCaracteristica.producto_id.in_(producto_ids))
+
+    caracteristicas = {}
+    for producto_id, nombre, valor in conexion.execute(consulta_caract):
+        caracteristicas.setdefault(producto_id, []).append(f'{nombre} {valor}')
+
+    return [
+        {
+            'producto_id': fila.id,
+            'nombre': normalizar(fila.nombre),
+            'codigo': normalizar(fila.codigo),
+            'descripcion': normalizar(fila.descripcion),
+            'caracteristicas': normalizar(' '.join(caracteristicas.get(fila.id, [])))
+        }
+        for fila in conexion.execute(consulta)
+    ]
+
+
+def _escribir(conexion, producto_ids, documentos):
+    if _es_postgres(conexion):
+        borrar = text('DELETE FROM productos_busqueda WHERE producto_id IN :ids').bindparams(bindparam('ids', expanding=True))
+        insertar = text(
+            'INSERT INTO productos_busqueda (producto_id, documento) VALUES (:producto_id, '
+            "setweight(to_tsvector('simple', :nombre), 'A') || setweight(to_tsvector('simple', :codigo), 'A') || "
+            "setweight(to_tsvector('simple', :caracteristicas), 'B') || setweight(to_tsvector('simple', :descripcion), 'C'))"
+        )
+    else:
+        borrar = text('DELETE FROM productos_fts WHERE rowid IN :ids').bindparams(bindparam('ids', expanding=True))
+        insertar = text(
+            'INSERT INTO productos_fts (rowid, nombre, codigo, descripcion, caracteristicas) '
+            'VALUES (:producto_id, :nombre, :codigo, :descripcion, :caracteristicas)'
+        )
+
+    if producto_ids is None:
+        conexion.execute(text('DELETE FROM productos_busqueda' if _es_postgres(conexion) else 'DELETE FROM productos_fts'))
+    elif producto_ids:
+        conexion.execute(borrar, {'ids': list(producto_ids)})
+    if documentos:
+        conexion.execute(insertar, documentos)
+
+
+def reindexar(conexion, producto_ids):
+    producto_ids = list(producto_ids)
+    if producto_ids:
+        _escribir(conexion, producto_ids, _documentos(conexion, producto_ids))
+
+
+def reindexar_todo():
+    conexion = db.session.connection()
+    _escribir(conexion, None, _documentos(conexion))
+    db.session.commit()
+
+
+@event.listens_for(db.session, 'after_flush')
+def _sincronizar(session, flush_context):
+    if not disponible():
+        return
+    ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Producto):
+            ids.add(obj.id)
+        elif isinstance(obj, ProductoCaracteristica):
+            ids.add(obj.producto_id)
+    ids.discard(None)
+    if ids:
+        reindexar(session.connection(), ids)
+
+
+# ==================== CONSULTA ====================
+
+def subconsulta_resultados(busqueda, max_candidatos=None):
+    """
+    Subconsulta (producto_id, rango) con los productos que coinciden; menor rango = más relevante.
+    max_candidatos limita cuántas coincidencias se rankean (autocompletado con prefijos muy cortos).
+    Devuelve None si la búsqueda no tiene términos.
+    """
+    terminos = _terminos(busqueda)
+    if not terminos:
+        return None
+
+    if db.engine.dialect.name == 'postgresql':
+        consulta = ' & '.join(f'{t}:*' for t in terminos)
+        sql = text(
+            "SELECT producto_id, -ts_rank(documento, to_tsquery('simple', :consulta_fts)) AS rango "
+            "FROM productos_busqueda WHERE documento @@ to_tsquery('simple', :consulta_fts)"
+        )
+    else:
+        consulta = ' '.join(f'"{t}"*' for t in terminos)
+        sql = text(
+            'SELECT rowid AS producto_id, bm25(productos_fts, 10.0, 8.0, 1.0, 3.0) AS rango '
+            'FROM productos_fts WHERE productos_fts MATCH :consulta_fts'
+        )
+
+    if max_candidatos:
+        sql = text(sql.text + f' LIMIT {int(max_candidatos)}')
+
+    return sql.bindparams(consulta_fts=consulta).columns(producto_id=Integer, rango=Float).subquery('resultados_busqueda')
+
+
+def filtrar_productos(query, busqueda, max_candidatos=None):
+    """
+    Aplica la búsqueda a una consulta de Producto.
+    Devuelve (query, orden): orden son las columnas por relevancia, terminando en Producto.id
+    """
+    if not disponible():
+        query = query.filter(
+            (Producto.nombre.contains(busqueda)) |
+            (Producto.codigo.contains(busqueda))
+        )
+        return query, [Producto.nombre, Producto.id]
+
+    resultados = subconsulta_resultados(busqueda, max_candidatos)
+    if resultados is None:
+        return query, [Producto.nombre, Producto.id]
+    query = query.join(resultados, resultados.c.producto_id == Producto.id)
+    return query, [resultados.c.rango, Producto.id]
+
+
+def sugerencias(busqueda, limite=10):
+    """Resultados para autocompletado: solo se rankean los primeros candidatos para responder rápido"""
+    query, orden = filtrar_productos(Producto.query.filter(Producto.activo == True), busqueda,
+                                     max_candidatos=MAX_CANDIDATOS_SUGERENCIAS)
+    return [
+        {
+            'id': p.id,
+            'codigo': p.codigo,
+            'nombre': p.nombre,
+            'stock_actual': p.stock_actual,
+            'unidad_medida': p.unidad_medida
+        }
+        for p in query.order_by(*orden).limit(limite)
+    ]
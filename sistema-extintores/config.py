@@ -3,8 +3,121 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Perfiles del motor de base de datos (PERFIL_BASE_DATOS; ver perfil_base_datos.py)
+# - pragmas: se aplican a cada conexión SQLite nueva
+# - motor: opciones de create_engine (pool, connect_args)
+PERFILES_BASE_DATOS = {
+    # Sin ajustes: comportamiento por defecto de SQLAlchemy y del driver (referencia para benchmarks)
+    'basico': {'pragmas': {}, 'motor': {}},
+    'dev-sqlite': {
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': 5000,
+            'cache_size': -16000,  # KiB (16 MB)
+            'temp_store': 'MEMORY',
+        },
+        'motor': {},
+    },
+    'prod-sqlite': {
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': 15000,
+            'cache_size': -64000,  # KiB (64 MB)
+            'mmap_size': 256 * 1024 * 1024,
+            'temp_store': 'MEMORY',
+        },
+        'motor': {'pool_size': 10, 'max_overflow': 10, 'pool_timeout': 15},
+    },
+    'prod-postgres': {
+        'pragmas': {},
+        'motor': {
+            'pool_size': 10,
+            'max_overflow': 20,
+            'pool_timeout': 10,
+            'pool_pre_ping': True,
+            'pool_recycle': 1800,
+            'connect_args': {
+                'connect_timeout': 5,
+                'options': '-c statement_timeout=30000 -c lock_timeout=5000 '
+                           '-c idle_in_transaction_session_timeout=60000',
+            },
+        },
+    },
+}
+
+
+def _perfil_por_defecto(url):
+    return 'prod-postgres' if url.startswith('postgres') else 'dev-sqlite'
+
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'clave-secreta-desarrollo-2024'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///inventario.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    PERFIL_BASE_DATOS = os.environ.get('PERFIL_BASE_DATOS') or _perfil_por_defecto(SQLALCHEMY_DATABASE_URI)
+    SQLALCHEMY_ENGINE_OPTIONS = PERFILES_BASE_DATOS[PERFIL_BASE_DATOS]['motor']
     ITEMS_PER_PAGE = 20
+    # Máximo de sentencias SQL por request (ver consultas.presupuesto_consultas)
+    PRESUPUESTO_CONSULTAS = 10
+    PRESUPUESTO_CONSULTAS_ESTRICTO = os.environ.get('PRESUPUESTO_CONSULTAS_ESTRICTO') == '1'
+    # Frecuencia de los snapshots de stock (ver historico_stock.py): diaria o mensual
+    SNAPSHOT_STOCK_FRECUENCIA = os.environ.get('SNAPSHOT_STOCK_FRECUENCIA', 'diaria')
+    # Instrumentación por request y /admin/metrics (ver instrumentacion.py)
+    INSTRUMENTACION = os.environ.get('INSTRUMENTACION') == '1'
+    INSTRUMENTACION_MEMORIA = os.environ.get('INSTRUMENTACION_MEMORIA', '1') == '1'
+    INSTRUMENTACION_CONSULTA_LENTA_MS = float(os.environ.get('INSTRUMENTACION_CONSULTA_LENTA_MS', 200))
+    # Token para que Prometheus lea /admin/metrics sin sesión (Authorization: Bearer <token>)
+    INSTRUMENTACION_TOKEN = os.environ.get('INSTRUMENTACION_TOKEN')
+    # Réplica de lectura para las vistas @solo_lectura (ver replica_lectura.py): URL de una
+    # réplica PostgreSQL o "sqlite-ro" (misma base SQLite en una conexión de solo lectura)
+    DATABASE_URL_LECTURA = os.environ.get('DATABASE_URL_LECTURA')
+    # Tras una escritura, el usuario lee de la principal durante estos segundos
+    LECTURA_PRIMARIA_SEGUNDOS = float(os.environ.get('LECTURA_PRIMARIA_SEGUNDOS', 5))
+    # Trabajos en segundo plano (ver trabajos.py); TRABAJOS_HILOS=0 los deja en cola sin ejecutar
+    TRABAJOS_HILOS = int(os.environ.get('TRABAJOS_HILOS', 2))
+    TRABAJOS_REINTENTOS = int(os.environ.get('TRABAJOS_REINTENTOS', 3))
+    TRABAJOS_REINTENTO_SEGUNDOS = float(os.environ.get('TRABAJOS_REINTENTO_SEGUNDOS', 5))
+    TRABAJOS_RETENCION_HORAS = float(os.environ.get('TRABAJOS_RETENCION_HORAS', 24))
+    # Consulta de RUCs (ver consulta_ruc.py): API con el formato de Factiliza, {ruc} se reemplaza
+    RUC_API_URL = os.environ.get('RUC_API_URL', 'https://api.factiliza.com/v1/ruc/info/{ruc}')
+    RUC_API_URL_ANEXOS = os.environ.get('RUC_API_URL_ANEXOS', 'https://api.factiliza.com/v1/ruc/anexo/{ruc}')
+    RUC_API_TOKEN = os.environ.get('RUC_API_TOKEN')
+    RUC_API_TIMEOUT = float(os.environ.get('RUC_API_TIMEOUT', 10))
+    RUC_CONCURRENCIA = int(os.environ.get('RUC_CONCURRENCIA', 16))
+    RUC_POR_SEGUNDO = float(os.environ.get('RUC_POR_SEGUNDO', 50))  # pedidos a la API, 0 sin límite
+    RUC_REINTENTOS = int(os.environ.get('RUC_REINTENTOS', 3))
+    RUC_REINTENTO_SEGUNDOS = float(os.environ.get('RUC_REINTENTO_SEGUNDOS', 0.5))
+    RUC_CACHE_HORAS = float(os.environ.get('RUC_CACHE_HORAS', 24 * 7))
+    RUC_CACHE_NO_ENCONTRADO_HORAS = float(os.environ.get('RUC_CACHE_NO_ENCONTRADO_HORAS', 24))
+    RUC_MAXIMO_LOTE = 5000
+    # Fotos de recojo y de guía (ver fotos_recojo.py); FOTOS_DIRECTORIO por defecto instance/fotos
+    FOTOS_FORMATO = os.environ.get('FOTOS_FORMATO', 'WEBP')  # WEBP o JPEG
+    FOTOS_LADO_MAXIMO = int(os.environ.get('FOTOS_LADO_MAXIMO', 1600))  # px
+    FOTOS_LADO_MINIATURA = int(os.environ.get('FOTOS_LADO_MINIATURA', 320))  # px
+    FOTOS_CALIDAD = int(os.environ.get('FOTOS_CALIDAD', 80))
+    FOTOS_MAXIMO_MB = float(os.environ.get('FOTOS_MAXIMO_MB', 25))
+    # Subida por partes: tamaño sugerido de cada parte y horas antes de descartar una subida sin terminar
+    FOTOS_PARTE_KB = int(os.environ.get('FOTOS_PARTE_KB', 512))
+    FOTOS_SUBIDA_HORAS = float(os.environ.get('FOTOS_SUBIDA_HORAS', 24))
+    # Log de la aplicación (ver logs_sistema.py); LOGS_DIRECTORIO por defecto logs/
+    LOGS_DIRECTORIO = os.environ.get('LOGS_DIRECTORIO')
+    LOGS_MAXIMO_MB = float(os.environ.get('LOGS_MAXIMO_MB', 10))
+    LOGS_ROTACION_HORAS = float(os.environ.get('LOGS_ROTACION_HORAS', 24))
+    LOGS_SEGMENTOS = int(os.environ.get('LOGS_SEGMENTOS', 14))  # segmentos comprimidos que se conservan
+    LOGS_FORMATO = os.environ.get('LOGS_FORMATO', 'json')  # json (una línea por registro) o texto
+    # cola: un hilo escribe y los requests solo encolan; directa: cada request escribe en el archivo
+    LOGS_ESCRITURA = os.environ.get('LOGS_ESCRITURA', 'cola')
+    LOGS_COLA = int(os.environ.get('LOGS_COLA', 10000))  # registros en espera; con la cola llena se descartan
+    LOGS_LOTE = int(os.environ.get('LOGS_LOTE', 256))  # registros escritos entre volcados al disco
+    LOGS_SOLICITUDES = os.environ.get('LOGS_SOLICITUDES', '1') == '1'  # un registro por request con su duración
+    # Autoguardado del detalle de órdenes (ver autoguardado_ordenes.py)
+    AUTOGUARDADO_MAXIMO_CAMBIOS = int(os.environ.get('AUTOGUARDADO_MAXIMO_CAMBIOS', 500))  # extintores por pedido
+    AUTOGUARDADO_CLAVES_HORAS = float(os.environ.get('AUTOGUARDADO_CLAVES_HORAS', 24))  # vida de las claves
+    # Registro de cambios por tabla: ETag y ?since= (ver registro_cambios.py)
+    CAMBIOS_RETENCION_HORAS = float(os.environ.get('CAMBIOS_RETENCION_HORAS', 72))  # historial para ?since=
+    CAMBIOS_MARGEN_SEGUNDOS = float(os.environ.get('CAMBIOS_MARGEN_SEGUNDOS', 60))  # cambios que se vuelven a enviar
+    CAMBIOS_MAXIMO_FILAS = int(os.environ.get('CAMBIOS_MAXIMO_FILAS', 2000))  # más cambios: recargar todo
+    # Archivos estáticos con hash (ver estaticos.py): construir static/dist al iniciar si cambió alguna fuente
+    ESTATICOS_CONSTRUIR = os.environ.get('ESTATICOS_CONSTRUIR', '1') == '1'
@@ -0,0 +1,478 @@
+"""
+Consulta de RUCs (SUNAT vía API Factiliza) con caché local, en lote
+- Los RUCs se deduplican; los consultados hace menos de RUC_CACHE_HORAS se sirven de la
+  tabla ruc_cache sin salir a la API (las respuestas "no existe", RUC_CACHE_NO_ENCONTRADO_HORAS).
+- El resto se consulta en un pool de RUC_CONCURRENCIA hilos, con un máximo de RUC_POR_SEGUNDO
+  pedidos por segundo entre todos y reintentos con espera ante errores transitorios
+  (timeout, 429, 5xx).
+- importar() entrega cada resultado apenas llega (para enviarlo al navegador en partes) y al
+  final guarda la caché y hace el upsert de los clientes y sus locales en una sola transacción.
+- El backend es intercambiable: cualquier objeto con consultar(ruc) -> dict | None.
+  BackendHttp habla con Factiliza o con el servidor falso de este módulo:
+
+    python consulta_ruc.py servidor-falso --puerto 8765 --latencia 0.2
+    RUC_API_URL=http://127.0.0.1:8765/ruc/info/{ruc} RUC_API_URL_ANEXOS=http://127.0.0.1:8765/ruc/anexo/{ruc} ...
+    python consulta_ruc.py benchmark --rucs 2000
+"""
+import re
+import json
+import time
+import random
+import socket
+import logging
+import argparse
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import current_app
+from sqlalchemy import select, delete, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, Cliente, LocalAnexo, ConsultaRuc
+from registro_cambios import marcar_cambios
+
+PATRON_RUC = re.compile(r'^(10|15|17|20)\d{9}$')
+LOTE_SQL = 500
+
+registro = logging.getLogger(__name__)
+
+
+class ErrorConsultaRuc(Exception):
+    """Error definitivo de la API (token rechazado, respuesta inválida): no se reintenta"""
+
+
+class ErrorTransitorio(ErrorConsultaRuc):
+    """Timeout, 429 o 5xx: se reintenta con espera"""
+
+
+def ruc_valido(ruc):
+    return bool(PATRON_RUC.match(ruc or ''))
+
+
+# ==================== BACKENDS ====================
+
+def _texto(valor, largo):
+    return (str(valor).strip()[:largo] or None) if valor not in (None, '', '-') else None
+
+
+def _si(valor):
+    return valor is True or str(valor).strip().upper() in ('SI', 'SÍ', 'S', 'TRUE', '1')
+
+
+def normalizar(info, anexos=None):
+    """Respuesta de Factiliza -> campos de Cliente (más locales_anexos)"""
+    return {
+        'nombre': _texto(info.get('nombre_o_razon_social') or info.get('nombre'), 200),
+        'direccion': _texto(info.get('direccion_completa') or info.get('direccion'), 300),
+        'ubigeo': _texto(info.get('ubigeo_sunat') or info.get('ubigeo'), 10),
+        'distrito': _texto(info.get('distrito'), 100),
+        'provincia': _texto(info.get('provincia'), 100),
+        'departamento': _texto(info.get('departamento'), 100),
+        'estado': _texto(info.get('estado'), 50),
+        'condicion': _texto(info.get('condicion'), 50),
+        'es_agente_retencion': _si(info.get('es_agente_retencion') or info.get('agente_retencion')),
+        'es_buen_contribuyente': _si(info.get('es_buen_contribuyente') or info.get('buen_contribuyente')),
+        'locales_anexos': [
+            {
+                'direccion': _texto(anexo.get('direccion_completa') or anexo.get('direccion'), 300),
+                'ubigeo': _texto(anexo.get('ubigeo_sunat') or anexo.get('ubigeo'), 10),
+                'distrito': _texto(anexo.get('distrito'), 100),
+                'provincia': _texto(anexo.get('provincia'), 100),
+                'departamento': _texto(anexo.get('departamento'), 100),
+            }
+            for anexo in (anexos or []) if isinstance(anexo, dict)
+        ],
+    }
+
+
+class BackendHttp:
+    """API REST con el formato de Factiliza: {"success": bool, "data": {...}}"""
+
+    def __init__(self, url, url_anexos=None, token=None, timeout=10):
+        self.url = url
+        self.url_anexos = url_anexos
+        self.token = token
+        self.timeout = timeout
+
+    def _get(self, url):
+        pedido = urllib.request.Request(url, headers={'Accept': 'application/json'})
+        if self.token:
+            pedido.add_header('Authorization', f'Bearer {self.token}')
+        try:
+            with urllib.request.urlopen(pedido, timeout=self.timeout) as respuesta:
+                cuerpo = respuesta.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            if e.code == 429 or e.code >= 500:
+                raise ErrorTransitorio(f'HTTP {e.code}') from e
+            raise ErrorConsultaRuc(f'HTTP {e.code}') from e
+        except (urllib.error.URLError, socket.timeout, ConnectionError) as e:
+            raise ErrorTransitorio(str(getattr(e, 'reason', e))) from e
+        try:
+            datos = json.loads(cuerpo)
+        except ValueError as e:
+            raise ErrorConsultaRuc('Respuesta no es JSON') from e
+        return datos.get('data') if datos.get('success', True) else None
+
+    def consultar(self, ruc):
+        info = self._get(self.url.format(ruc=ruc))
+        if not info:
+            return None
+        anexos = self._get(self.url_anexos.format(ruc=ruc)) if self.url_anexos else None
+        return normalizar(info, anexos)
+
+
+def backend_configurado(app=None):
+    config = (app or current_app).config
+    return BackendHttp(config['RUC_API_URL'], config.get('RUC_API_URL_ANEXOS'), config.get('RUC_API_TOKEN'),
+                       config.get('RUC_API_TIMEOUT', 10))
+
+
+# ==================== CONSULTA CONCURRENTE ====================
+
+class LimiteTasa:
+    """Espaciado mínimo entre pedidos, compartido por todos los hilos"""
+
+    def __init__(self, por_segundo):
+        self.intervalo = 1.0 / por_segundo if por_segundo else 0.0
+        self._lock = threading.Lock()
+        self._proximo = 0.0
+
+    def esperar(self):
+        if not self.intervalo:
+            return
+        with self._lock:
+            ahora = time.monotonic()
+            turno = max(ahora, self._proximo)
+            self._proximo = turno + self.intervalo
+        if turno > ahora:
+            time.sleep(turno - ahora)
+
+
+class _ConLimite:
+    """Aplica el límite de tasa a cada pedido del backend (la consulta de anexos es otro pedido)"""
+
+    def __init__(self, backend, limite):
+        self._backend = backend
+        self._limite = limite
+
+    def consultar(self, ruc):
+        self._limite.esperar()
+        return self._backend.consultar(ruc)
+
+
+def _consultar_con_reintentos(backend, ruc, reintentos, espera):
+    for intento in range(1, reintentos + 1):
+        try:
+            return backend.consultar(ruc)
+        except ErrorTransitorio as e:
+            if intento == reintentos:
+                raise
+            registro.info('RUC %s: %s, reintento %s', ruc, e, intento)
+            time.sleep(espera * 2 ** (intento - 1) * random.uniform(0.8, 1.2))
+
+
+def consultar_api(rucs, backend, concurrencia=8, por_segundo=10, reintentos=3, espera=0.5):
+    """Generador de (ruc, datos | None, error | None) en el orden en que responde la API"""
+    if not rucs:
+        return
+    limitado = _ConLimite(backend, LimiteTasa(por_segundo))
+    with ThreadPoolExecutor(max_workers=min(concurrencia, len(rucs)), thread_name_prefix='ruc') as pool:
+        futuros = {pool.submit(_consultar_con_reintentos, limitado, ruc, reintentos, espera): ruc for ruc in rucs}
+        try:
+            for futuro in as_completed(futuros):
+                ruc = futuros[futuro]
+                try:
+                    yield ruc, futuro.result(), None
+                except Exception as e:
+                    yield ruc, None, str(e) or type(e).__name__
+        finally:
+            # Si el cliente corta la respuesta, no se siguen consultando los que faltan
+            for futuro in futuros:
+                futuro.cancel()
+
+
+# ==================== CACHÉ Y CLIENTES ====================
+
+def _partes(valores):
+    valores = list(valores)
+    for inicio in range(0, len(valores), LOTE_SQL):
+        yield valores[inicio:inicio + LOTE_SQL]
+
+
+def _insert_dialecto():
+    return (postgresql if db.engine.dialect.name == 'postgresql' else sqlite).insert
+
+
+def leer_cache(rucs, horas, horas_no_encontrado):
+    """{ruc: datos | None} de las consultas vigentes"""
+    ahora = datetime.utcnow()
+    vigentes = {}
+    for parte in _partes(rucs):
+        for fila in db.session.execute(select(ConsultaRuc).where(ConsultaRuc.ruc.in_(parte))).scalars():
+            edad = ahora - fila.fecha_consulta
+            if edad < timedelta(hours=horas if fila.encontrado else horas_no_encontrado):
+                vigentes[fila.ruc] = fila.datos if fila.encontrado else None
+    return vigentes
+
+
+def _guardar_cache(consultados):
+    if not consultados:
+        return
+    insertar = _insert_dialecto()(ConsultaRuc.__table__)
+    db.session.execute(
+        insertar.on_conflict_do_update(
+            index_elements=['ruc'],
+            set_={'encontrado': insertar.excluded.encontrado, 'datos': insertar.excluded.datos,
+                  'fecha_consulta': insertar.excluded.fecha_consulta}
+        ),
+        [{'ruc': ruc, 'encontrado': datos is not None, 'datos': datos, 'fecha_consulta': datetime.utcnow()}
+         for ruc, datos in consultados.items()]
+    )
+
+
+def _guardar_clientes(datos_por_ruc):
+    """Upsert por RUC (rfc) y reemplazo de sus locales anexos. No confirma"""
+    if not datos_por_ruc:
+        return
+    campos = ('nombre', 'direccion', 'ubigeo', 'distrito', 'provincia', 'departamento', 'estado', 'condicion',
+              'es_agente_retencion', 'es_buen_contribuyente')
+    ahora = datetime.utcnow()
+    insertar = _insert_dialecto()(Cliente.__table__)
+    db.session.execute(
+        insertar.on_conflict_do_update(
+            index_elements=['rfc'], set_={campo: getattr(insertar.excluded, campo) for campo in campos}
+        ),
+        [{'rfc': ruc, 'activo': True, 'fecha_registro': ahora,
+          **{campo: datos.get(campo) for campo in campos}, 'nombre': datos.get('nombre') or ruc}
+         for ruc, datos in datos_por_ruc.items()]
+    )
+
+    ids = {}
+    for parte in _partes(datos_por_ruc):
+        ids.update(db.session.execute(select(Cliente.rfc, Cliente.id).where(Cliente.rfc.in_(parte))).all())
+    marcar_cambios(db.session, 'cliente', ids.values())
+    for parte in _partes(ids.values()):
+        db.session.execute(delete(LocalAnexo).where(LocalAnexo.cliente_id.in_(parte)))
+    locales = [
+        {**local, 'cliente_id': ids[ruc], 'fecha_registro': ahora}
+        for ruc, datos in datos_por_ruc.items() for local in datos.get('locales_anexos') or []
+    ]
+    if locales:
+        db.session.execute(insert(LocalAnexo), locales)
+
+
+def consultar(ruc, backend=None):
+    """Un RUC, con caché: datos normalizados o None si SUNAT no lo tiene"""
+    config = current_app.config
+    cache = leer_cache([ruc], config['RUC_CACHE_HORAS'], config['RUC_CACHE_NO_ENCONTRADO_HORAS'])
+    if ruc in cache:
+        return cache[ruc]
+    datos = _consultar_con_reintentos(backend or backend_configurado(), ruc, config['RUC_REINTENTOS'],
+                                      config['RUC_REINTENTO_SEGUNDOS'])
+    _guardar_cache({ruc: datos})
+    db.session.commit()
+    return datos
+
+
+def _resultado(ruc, datos, origen, existentes):
+    if datos is None:
+        return {'ruc': ruc, 'status': 'error', 'message': 'RUC no encontrado en SUNAT', 'origen': origen}
+    resultado = {'ruc': ruc, 'nombre': datos.get('nombre'), 'locales': len(datos.get('locales_anexos') or []),
+                 'origen': origen}
+    if ruc in existentes:
+        resultado.update(status='duplicado', message=f'Cliente ya registrado: {datos.get("nombre")}')
+    else:
+        resultado['status'] = 'exitoso'
+    return resultado
+
+
+def importar(rucs, backend=None):
+    """
+    Consulta y registra una lista de RUCs. Generador: un dict por RUC a medida que se
+    resuelve (status exitoso, duplicado o error) y al final {'fin': True, ...totales}.
+    Los clientes existentes se actualizan con los datos nuevos.
+    """
+    config = current_app.config
+    inicio = time.perf_counter()
+    totales = {'exitosos': 0, 'duplicados': 0, 'errores': 0, 'desde_cache': 0, 'consultados': 0}
+
+    def contar(resultado):
+        totales[{'exitoso': 'exitosos', 'duplicado': 'duplicados'}.get(resultado['status'], 'errores')] += 1
+        return resultado
+
+    unicos = []
+    vistos = set()
+    for ruc in (str(r).strip() for r in rucs):
+        if ruc in vistos:
+            yield contar({'ruc': ruc, 'status': 'duplicado', 'message': 'Repetido en la lista'})
+        elif not ruc_valido(ruc):
+            yield contar({'ruc': ruc, 'status': 'error', 'message': 'RUC inválido'})
+        else:
+            unicos.append(ruc)
+        vistos.add(ruc)
+
+    existentes = set()
+    for parte in _partes(unicos):
+        existentes.update(db.session.execute(select(Cliente.rfc).where(Cliente.rfc.in_(parte))).scalars())
+    cache = leer_cache(unicos, config['RUC_CACHE_HORAS'], config['RUC_CACHE_NO_ENCONTRADO_HORAS'])
+    # La consulta a la API puede tardar: no se retiene la conexión mientras tanto
+    db.session.commit()
+
+    a_guardar = {}
+    for ruc in unicos:
+        if ruc in cache:
+            totales['desde_cache'] += 1
+            if cache[ruc] is not None and ruc not in existentes:
+                a_guardar[ruc] = cache[ruc]
+            yield contar(_resultado(ruc, cache[ruc], 'cache', existentes))
+
+    consultados = {}
+    pendientes = [ruc for ruc in unicos if ruc not in cache]
+    for ruc, datos, error in consultar_api(pendientes, backend or backend_configurado(),
+                                           config['RUC_CONCURRENCIA'], config['RUC_POR_SEGUNDO'],
+                                           config['RUC_REINTENTOS'], config['RUC_REINTENTO_SEGUNDOS']):
+        totales['consultados'] += 1
+        if error:
+            yield contar({'ruc': ruc, 'status': 'error', 'message': f'No se pudo consultar: {error}', 'origen': 'api'})
+            continue
+        consultados[ruc] = datos
+        if datos is not None:
+            a_guardar[ruc] = datos
+        yield contar(_resultado(ruc, datos, 'api', existentes))
+
+    try:
+        _guardar_cache(consultados)
+        _guardar_clientes(a_guardar)
+        db.session.commit()
+        totales['guardados'] = len(a_guardar)
+    except Exception as e:
+        db.session.rollback()
+        registro.exception('No se pudieron guardar los clientes consultados')
+        totales['error'] = f'No se pudieron guardar los clientes: {e}'
+        totales['guardados'] = 0
+    registro.info('Consulta masiva: %s RUCs, %s de caché, %s a la API, %s guardados', len(unicos),
+                  totales['desde_cache'], totales['consultados'], totales['guardados'])
+    yield {'fin': True, **totales, 'segundos': round(time.perf_counter() - inicio, 2)}
+
+
+# ==================== SERVIDOR FALSO Y BENCHMARK ====================
+
+def ruc_de_prueba(numero):
+    """RUC sintético con formato válido (los terminados en 9 no existen en el servidor falso)"""
+    return f'20{numero:09d}'
+
+
+def crear_servidor_falso(puerto=0, latencia=0.0, fallos=0.0):
+    """Servidor HTTP con el formato de Factiliza y datos deterministas. Devuelve el servidor (sin iniciar)"""
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    class Manejador(BaseHTTPRequestHandler):
+        def log_message(self, formato, *args):
+            pass
+
+        def _responder(self, codigo, cuerpo):
+            datos = json.dumps(cuerpo).encode()
+            self.send_response(codigo)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(datos)))
+            self.end_headers()
+            self.wfile.write(datos)
+
+        def do_GET(self):
+            time.sleep(latencia)
+            partes = self.path.strip('/').split('/')
+            if len(partes) != 3 or partes[0] != 'ruc' or not ruc_valido(partes[2]):
+                return self._responder(400, {'success': False, 'message': 'Pedido inválido'})
+            if fallos and random.random() < fallos:
+                return self._responder(503, {'success': False, 'message': 'Servicio no disponible'})
+            ruc = partes[2]
+            if ruc.endswith('9'):
+                return self._responder(404, {'success': False, 'message': 'No encontrado'})
+            semilla = int(ruc)
+            if partes[1] == 'anexo':
+                return self._responder(200, {'success': True, 'data': [
+                    {'direccion': f'AV. ANEXO {semilla % 1000} NRO. {i + 1}', 'departamento': 'LIMA',
+                     'provincia': 'LIMA', 'distrito': 'ATE', 'ubigeo': '150103'}
+                    for i in range(semilla % 3)
+                ]})
+            self._responder(200, {'success': True, 'data': {
+                'numero': ruc,
+                'nombre_o_razon_social': f'EMPRESA DE PRUEBA {semilla % 100000} S.A.C.',
+                'estado': 'ACTIVO',
+                'condicion': 'HABIDO',
+                'direccion': f'JR. PRUEBA NRO. {semilla % 1000}',
+                'direccion_completa': f'JR. PRUEBA NRO. {semilla % 1000}, LIMA - LIMA - LIMA',
+                'departamento': 'LIMA',
+                'provincia': 'LIMA',
+                'distrito': 'LIMA',
+                'ubigeo_sunat': '150101',
+            }})
+
+    servidor = ThreadingHTTPServer(('127.0.0.1', puerto), Manejador)
+    servidor.daemon_threads = True
+    return servidor
+
+
+def _benchmark(args):
+    import os
+    import tempfile
+
+    servidor = crear_servidor_falso(latencia=args.latencia, fallos=args.fallos)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{servidor.server_address[1]}/ruc'
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'rucs.db')
+
+    from app import app, init_db
+    init_db()
+    app.config.update(RUC_API_URL=f'{base}/info/{{ruc}}', RUC_API_URL_ANEXOS=f'{base}/anexo/{{ruc}}',
+                      RUC_CONCURRENCIA=args.concurrencia, RUC_POR_SEGUNDO=args.por_segundo,
+                      RUC_REINTENTO_SEGUNDOS=0.1)
+    rucs = [ruc_de_prueba(n) for n in range(1, args.rucs + 1)]
+
+    print('=' * 60)
+    print(f'{args.rucs} RUCs | latencia {args.latencia}s | {args.concurrencia} hilos | '
+          f'{args.por_segundo or "sin límite"} pedidos/s | fallos {args.fallos:.0%}')
+    for pasada in ('Primera pasada (API)', 'Segunda pasada (caché)'):
+        with app.app_context():
+            fin = list(importar(rucs))[-1]
+        print(f'{pasada}: {fin["segundos"]}s | exitosos {fin["exitosos"]} | duplicados {fin["duplicados"]} | '
+              f'errores {fin["errores"]} | caché {fin["desde_cache"]} | guardados {fin["guardados"]}')
+    secuencial = args.rucs * 2 * args.latencia
+    print(f'Una consulta a la vez (estimado): {secuencial:.0f}s')
+    print('=' * 60)
+    servidor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Consulta de RUCs: servidor falso y benchmark')
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    p_servidor = subcomandos.add_parser('servidor-falso', help='API falsa con el formato de Factiliza')
+    p_servidor.add_argument('--puerto', type=int, default=8765)
+    p_servidor.add_argument('--latencia', type=float, default=0.2, help='Segundos por pedido')
+    p_servidor.add_argument('--fallos', type=float, default=0.0, help='Proporción de respuestas 503')
+
+    p_bench = subcomandos.add_parser('benchmark', help='Importa una lista de RUCs contra el servidor falso')
+    p_bench.add_argument('--rucs', type=int, default=2000)
+    p_bench.add_argument('--latencia', type=float, default=0.2)
+    p_bench.add_argument('--fallos', type=float, default=0.02)
+    p_bench.add_argument('--concurrencia', type=int, default=16)
+    p_bench.add_argument('--por-segundo', type=float, default=200)
+
+    args = parser.parse_args()
+    if args.comando == 'servidor-falso':
+        servidor = crear_servidor_falso(args.puerto, args.latencia, args.fallos)
+        print(f'API falsa en http://127.0.0.1:{args.puerto}/ruc/info/{{ruc}} y /ruc/anexo/{{ruc}} (Ctrl+C para salir)')
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    else:
+        _benchmark(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+"""
+Filtros y opciones de consulta reutilizables por las vistas
+"""
+import time
+import logging
+import threading
+from datetime import datetime
+from functools import wraps
+from flask import current_app, g, request, has_request_context
+from itsdangerous import URLSafeSerializer, BadSignature
+from sqlalchemy import and_, tuple_, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import joinedload, selectinload
+from models import Producto, ProductoModelo, Movimiento
+
+
+def filtro_prefijo(columna, prefijo):
+    """
+    Equivalente a columna LIKE 'prefijo%' expresado como rango, para que use el índice
+    B-tree en SQLite (donde LIKE no distingue mayúsculas y no usa índices) y en PostgreSQL.
+    """
+    siguiente = prefijo[:-1] + chr(ord(prefijo[-1]) + 1)
+    return and_(columna >= prefijo, columna < siguiente)
+
+
+# ==================== PAGINACIÓN POR CURSOR (KEYSET) ====================
+
+def _serializador():
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt='cursor-paginacion')
+
+
+def _a_json(valor):
+    if isinstance(valor, datetime):
+        return {'dt': valor.isoformat()}
+    return valor
+
+
+def _de_json(valor):
+    if isinstance(valor, dict) and 'dt' in valor:
+        return datetime.fromisoformat(valor['dt'])
+    return valor
+
+
+def codificar_cursor(clave, direccion, filtros):
+    """Token opaco (firmado) con la posición y los filtros de la consulta"""
+    return _serializador().dumps({
+        'k': [_a_json(v) for v in clave],
+        'd': direccion,
+        'f': filtros
+    })
+
+
+def decodificar_cursor(token):
+    """Devuelve (clave, direccion, filtros) o None si el token es inválido"""
+    if not token:
+        return None
+    try:
+        datos = _serializador().loads(token)
+        return [_de_json(v) for v in datos['k']], datos['d'], datos['f']
+    except (BadSignature, KeyError, TypeError, ValueError):
+        return None
+
+
+class PaginaKeyset:
+    """Página de resultados con cursores a la página siguiente y anterior"""
+
+    def __init__(self, items, total, cursor_siguiente, cursor_anterior, por_pagina):
+        self.items = items
+        self.total = total
+        self.cursor_siguiente = cursor_siguiente
+        self.cursor_anterior = cursor_anterior
+        self.por_pagina = por_pagina
+
+    @property
+    def has_next(self):
+        return self.cursor_siguiente is not None
+
+    @property
+    def has_prev(self):
+        return self.cursor_anterior is not None
+
+
+def paginar_keyset(query, orden, cursor, por_pagina, filtros, descendente=False, total=None):
+    """
+    Pagina por cursor sobre las columnas de `orden` (la última debe ser única, ej. id).
+    El costo de cada página no depende de su posición: WHERE (orden) < :clave LIMIT n.
+    """
+    datos = decodificar_cursor(cursor)
+    clave, direccion = (datos[0], datos[1]) if datos else (None, 'sig')
+    hacia_atras = direccion == 'ant'
+
+    # Al retroceder se recorre en sentido inverso y luego se invierte la página
+    invertir = descendente != hacia_atras
+    if clave is not None:
+        posicion = tuple_(*orden)
+        limite = tuple_(*clave)
+        query = query.filter(posicion < limite if invertir else posicion > limite)
+    query = query.order_by(*[c.desc() if invertir else c.asc() for c in orden])
+
+    etiquetas = [c.label(f'_clave_{n}') for n, c in enumerate(orden)]
+    filas = query.add_columns(*etiquetas).limit(por_pagina + 1).all()
+
+    hay_mas = len(filas) > por_pagina
+    filas = filas[:por_pagina]
+    if hacia_atras:
+        filas.reverse()
+
+    items = [fila[0] for fila in filas]
+    claves = [tuple(fila[1:]) for fila in filas]
+
+    cursor_siguiente = cursor_anterior = None
+    if claves:
+        if hay_mas or hacia_atras:
+            cursor_siguiente = codificar_cursor(claves[-1], 'sig', filtros)
+        if (hay_mas and hacia_atras) or (not hacia_atras and clave is not None):
+            cursor_anterior = codificar_cursor(claves[0], 'ant', filtros)
+
+    return PaginaKeyset(items, total, cursor_siguiente, cursor_anterior, por_pagina)
+
+
+# ==================== CONTEOS EN CACHÉ ====================
+
+_conteos = {}
+_bloqueo_conteos = threading.Lock()
+
+
+def contar_cacheado(clave, query, ttl=60):
+    """
+    Total aproximado: el COUNT(*) se ejecuta como máximo una vez cada `ttl` segundos
+    por combinación de filtros, en vez de en cada página.
+    """
+    ahora = time.monotonic()
+    with _bloqueo_conteos:
+        guardado = _conteos.get(clave)
+        if guardado and ahora - guardado[1] < ttl:
+            return guardado[0]
+
+    total = query.order_by(None).count()
+    with _bloqueo_conteos:
+        _conteos[clave] = (total, ahora)
+    return total
+
+
+# ==================== CARGA ANTICIPADA DE RELACIONES ====================
+# Las relaciones de models.py son lazy: sin estas opciones cada fila de un listado
+# dispara una consulta extra por producto, usuario, categoría, modelo o color.
+
+def carga_movimientos():
+    """Listados de movimientos: producto y usuario en el mismo SELECT"""
+    return (joinedload(Movimiento.producto), joinedload(Movimiento.usuario))
+
+
+def carga_movimientos_producto():
+    """Historial dentro del detalle de un producto (el producto ya está cargado)"""
+    return (joinedload(Movimiento.usuario),)
+
+
+def carga_productos():
+    """Listados y reportes de productos: categoría en el mismo SELECT"""
+    return (joinedload(Producto.categoria),)
+
+
+def carga_producto_detalle():
+    """Detalle de producto: categoría, características, modelos y sus colores"""
+    return (
+        joinedload(Producto.categoria),
+        selectinload(Producto.caracteristicas),
+        selectinload(Producto.modelos).selectinload(ProductoModelo.colores),
+    )
+
+
+def carga_modelo():
+    return (selectinload(ProductoModelo.colores),)
+
+
+# ==================== PRESUPUESTO DE CONSULTAS POR REQUEST ====================
+
+class PresupuestoConsultasExcedido(Exception):
+    pass
+
+
+def presupuesto_consultas(maximo):
+    """Decorador: máximo de sentencias SQL permitidas para esta vista"""
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(*args, **kwargs):
+            return vista(*args, **kwargs)
+        envoltura.presupuesto_consultas = maximo
+        return envoltura
+    return decorador
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _contar_consulta(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.consultas_sql = g.get('consultas_sql', 0) + 1
+
+
+def registrar_presupuesto_consultas(app):
+    """
+    Compara las sentencias SQL de cada request con su presupuesto
+    (decorador presupuesto_consultas o PRESUPUESTO_CONSULTAS por defecto).
+    Registra un warning al excederse; con PRESUPUESTO_CONSULTAS_ESTRICTO lanza una excepción
+    (pensado para las verificaciones automáticas).
+    """
+    @app.before_request
+    def _iniciar_conteo():
+        g.consultas_sql = 0
+
+    @app.after_request
+    def _verificar_presupuesto(response):
+        vista = app.view_functions.get(request.endpoint)
+        maximo = getattr(vista, 'presupuesto_consultas', app.config.get('PRESUPUESTO_CONSULTAS'))
+        consultas = g.get('consultas_sql', 0)
+        if maximo is not None and consultas > maximo:
+            mensaje = f'[SQL] {request.method} {request.path} ejecutó {consultas} consultas (presupuesto: {maximo})'
+            if app.config.get('PRESUPUESTO_CONSULTAS_ESTRICTO'):
+                raise PresupuestoConsultasExcedido(mensaje)
+            logging.warning(mensaje)
+        return response
@@ -5,8 +5,10 @@ Interfaz web simple para visualizar y editar la base de datos
 from flask import Flask, render_template_string, request, jsonify
 import sqlite3
 import json
+from estaticos import registrar_estaticos
 
 app = Flask(__name__)
+registrar_estaticos(app)
 DB_PATH = 'instance/extintores.db'
 
 HTML_TEMPLATE = """
@@ -14,7 +16,7 @@ HTML_TEMPLATE = """
 <html>
 <head>
     <title>Visor de Base de Datos - Sistema Extintores</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">
+    <link href="{{ estatico('vendor/bootstrap/bootstrap.min.css') }}" rel="stylesheet">
     <style>
         body { padding: 20px; }
         .table-container { margin-top: 20px; overflow-x: auto; }
@@ -67,8 +69,8 @@ HTML_TEMPLATE = """
         </div>
     </div>
 
-    <script src="https://code.jquery.com/jquery-3.6.0.min.js"></script>
-    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/js/bootstrap.bundle.min.js"></script>
+    <script src="{{ estatico('vendor/jquery/jquery.min.js') }}"></script>
+    <script src="{{ estatico('vendor/bootstrap/bootstrap.bundle.min.js') }}"></script>
     <script>
         let currentTable = null;
         
@@ -0,0 +1,156 @@
+"""
+Difusión de cambios de stock en tiempo real (Socket.IO, ver tiempo_real.py)
+- Al confirmar una transacción con movimientos o cambios de productos, los ids afectados
+  se juntan en memoria; nada se envía si la transacción se revierte.
+- Un hilo publica cada VENTANA segundos: lee el estado actual de esos productos en una
+  consulta y manda un solo mensaje 'stock' por cliente con todo lo que le interesa
+  (un lote de 500 movimientos llega como un mensaje, no 500).
+- Salas: producto_<id> y categoria_<id> reciben {id, stock, minimo, bajo, activo};
+  inventario (dashboard) recibe el resumen de metricas_dashboard.
+- Los clientes se suscriben con el evento 'suscribir_stock'.
+Con varios workers cada proceso solo avisa a sus propias conexiones.
+"""
+import time
+import logging
+import threading
+from sqlalchemy import event, select
+from flask_login import current_user
+from flask_socketio import join_room
+from models import db, Producto, Movimiento
+from metricas_dashboard import obtener_metricas
+from tiempo_real import socketio, participantes
+
+VENTANA = 0.25  # segundos
+MAXIMO_SALAS = 500  # por suscripción
+LOTE_SQL = 500
+SALA_INVENTARIO = 'inventario'
+
+registro = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pendientes = set()
+_aviso = threading.Event()
+_publicador = {'hilo': None, 'app': None}
+
+
+def marcar_productos(session, producto_ids):
+    """Para escrituras que no pasan por el flush del ORM (bulk_insert_mappings, UPDATE directos)"""
+    session.info.setdefault('stock_cambiado', set()).update(producto_ids)
+
+
+# ==================== EVENTOS DE SESIÓN ====================
+
+@event.listens_for(db.session, 'after_flush')
+def _despues_de_flush(session, flush_context):
+    ids = set()
+    for obj in session.new:
+        if isinstance(obj, Movimiento):
+            ids.add(obj.producto_id)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Producto) and obj.id is not None:
+            ids.add(obj.id)
+    if ids:
+        marcar_productos(session, ids)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _despues_de_commit(session):
+    ids = session.info.pop('stock_cambiado', None)
+    if ids and _publicador['app'] is not None:
+        with _lock:
+            _pendientes.update(ids)
+        _aviso.set()
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _despues_de_rollback(session):
+    session.info.pop('stock_cambiado', None)
+
+
+# ==================== PUBLICACIÓN ====================
+
+def _hay_conexiones():
+    return bool(socketio.server and socketio.server.manager.rooms.get('/'))
+
+
+def _estado_productos(ids):
+    filas = []
+    ids = list(ids)
+    for inicio in range(0, len(ids), LOTE_SQL):
+        filas += db.session.execute(
+            select(Producto.id, Producto.categoria_id, Producto.stock_actual, Producto.stock_minimo, Producto.activo)
+            .where(Producto.id.in_(ids[inicio:inicio + LOTE_SQL]))
+        ).all()
+    return filas
+
+
+def publicar(ids):
+    """Envía a cada cliente un único mensaje con los productos de sus salas"""
+    mensajes = {}
+    for fila in _estado_productos(ids):
+        stock = fila.stock_actual or 0
+        delta = {'id': fila.id, 'stock': stock, 'minimo': fila.stock_minimo or 0,
+                 'bajo': stock <= (fila.stock_minimo or 0), 'activo': fila.activo}
+        for sala in (f'producto_{fila.id}', f'categoria_{fila.categoria_id}'):
+            for sid in participantes(sala):
+                mensajes.setdefault(sid, {}).setdefault('productos', {})[fila.id] = delta
+
+    inventario = participantes(SALA_INVENTARIO)
+    if inventario:
+        metricas = obtener_metricas()
+        resumen = {clave: metricas[clave] for clave in ('total_productos', 'total_categorias', 'total_bajo_stock',
+                                                        'valor_total', 'productos_bajo_stock')}
+        for sid in inventario:
+            mensajes.setdefault(sid, {})['resumen'] = resumen
+
+    for sid, mensaje in mensajes.items():
+        if 'productos' in mensaje:
+            mensaje['productos'] = list(mensaje['productos'].values())
+        socketio.emit('stock', mensaje, to=sid)
+    return len(mensajes)
+
+
+def _bucle(app):
+    while True:
+        _aviso.wait()
+        # Junta todo lo que se confirme durante la ventana en una sola publicación
+        _aviso.clear()
+        time.sleep(VENTANA)
+        with _lock:
+            ids = set(_pendientes)
+            _pendientes.clear()
+        if not ids or not _hay_conexiones():
+            continue
+        try:
+            with app.app_context():
+                publicar(ids)
+        except Exception:
+            registro.exception('No se pudieron publicar los cambios de stock')
+
+
+# ==================== REGISTRO EN LA APP ====================
+
+def _ids(valores):
+    if not isinstance(valores, list):
+        return []
+    return [int(v) for v in valores[:MAXIMO_SALAS] if str(v).isdigit()]
+
+
+def registrar_difusion_stock(app):
+    _publicador['app'] = app
+    if _publicador['hilo'] is None:
+        _publicador['hilo'] = threading.Thread(target=_bucle, args=(app,), name='difusion-stock', daemon=True)
+        _publicador['hilo'].start()
+
+    @socketio.on('suscribir_stock')
+    def _suscribir(datos):
+        """{'productos': [ids], 'categorias': [ids], 'inventario': bool}"""
+        if not current_user.is_authenticated or not isinstance(datos, dict):
+            return False
+        for producto_id in _ids(datos.get('productos')):
+            join_room(f'producto_{producto_id}')
+        for categoria_id in _ids(datos.get('categorias')):
+            join_room(f'categoria_{categoria_id}')
+        if datos.get('inventario'):
+            join_room(SALA_INVENTARIO)
+        return True
@@ -0,0 +1,462 @@
+"""
+Archivos estáticos precompilados: minificados, con hash en el nombre y precomprimidos
+- Fuentes: static/src (JS y CSS de las plantillas) y static/vendor (Bootstrap, Bootstrap Icons,
+  jQuery y Socket.IO, sin CDN para que funcione en la red de planta sin internet).
+- construir() minifica lo propio, copia cada archivo a static/dist con el hash de su contenido
+  en el nombre, genera .gz y .br (si está instalado el módulo brotli) y escribe
+  static/dist/manifest.json {nombre lógico: archivo con hash}. Los url() de los CSS (fuentes
+  de los íconos) se reescriben a los nombres con hash.
+- Al iniciar la app se construye solo si cambió alguna fuente (ESTATICOS_CONSTRUIR).
+- Las plantillas usan {{ estatico('js/ordenes.js') }}. /static/dist/ responde la variante
+  comprimida que acepte el navegador con Cache-Control immutable: un archivo con hash no
+  cambia nunca, así que una visita repetida solo descarga el HTML.
+- Las librerías de static/vendor son parte de la construcción: si falta alguna, construir()
+  falla (VendorFaltante) y la app no inicia; nunca se recurre a un CDN.
+  `python estaticos.py --vendor` descarga las que falten (una vez, con internet).
+
+Uso:
+    python estaticos.py            # construir static/dist
+    python estaticos.py --vendor   # descargar las librerías que falten y construir
+"""
+import os
+import re
+import sys
+import gzip
+import json
+import hashlib
+import logging
+import argparse
+import mimetypes
+import posixpath
+import urllib.request
+from flask import request, url_for, abort, send_file
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CACHE_SEGUNDOS = 365 * 24 * 3600
+COMPRIMIBLES = ('.js', '.css', '.svg', '.json', '.txt')
+LARGO_HASH = 12
+
+# Nombre lógico -> URL de donde lo descarga `--vendor` (solo al construir, nunca desde las páginas)
+VENDOR = {
+    'vendor/bootstrap/bootstrap.min.css': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+    'vendor/bootstrap/bootstrap.bundle.min.js':
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js',
+    'vendor/bootstrap-icons/bootstrap-icons.css':
+        'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.0/font/bootstrap-icons.css',
+    'vendor/bootstrap-icons/fonts/bootstrap-icons.woff2':
+        'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.0/font/fonts/bootstrap-icons.woff2',
+    'vendor/bootstrap-icons/fonts/bootstrap-icons.woff':
+        'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.0/font/fonts/bootstrap-icons.woff',
+    'vendor/jquery/jquery.min.js': 'https://code.jquery.com/jquery-3.7.0.min.js',
+    'vendor/socket.io/socket.io.min.js': 'https://cdn.socket.io/4.5.4/socket.io.min.js',
+}
+
+registro = logging.getLogger(__name__)
+
+
+class VendorFaltante(Exception):
+    """Falta en static/vendor una librería de VENDOR"""
+
+
+# ==================== MINIFICACIÓN ====================
+
+ESPACIOS = ' \t\r\n\f\v'
+# Después de estos caracteres o palabras una '/' abre una expresión regular, no es una división
+ANTES_DE_REGEX = set('(,=:[!&|?{};+-*%<>~^')
+PALABRAS_REGEX = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw',
+                  'case', 'do', 'else', 'yield', 'await'}
+# Un salto de línea después de estos caracteres (o antes de los de CIERRA) no cambia el
+# significado: no puede terminar una sentencia por inserción automática de ';'
+ABRE = set('{;,(')
+CIERRA = set('});,')
+
+
+def _es_palabra(c):
+    return c.isalnum() or c in '_$' or ord(c) > 127
+
+
+class _MinificadorJS:
+    """
+    Quita comentarios y espacios sin tocar cadenas, plantillas `...` ni expresiones regulares.
+    Conserva un salto de línea donde había uno (salvo tras '{;,(' o antes de '});,'), así la
+    inserción automática de ';' sigue funcionando igual.
+    """
+
+    def __init__(self, codigo):
+        self.codigo = codigo
+        self.i = 0
+        self.salida = []
+        self.ultimo = ''
+        self.palabra = ''
+
+    def minificar(self):
+        self._codigo(dentro_de_plantilla=False)
+        return ''.join(self.salida).strip() + '\n'
+
+    def _emitir(self, texto):
+        self.salida.append(texto)
+        self.ultimo = texto[-1]
+
+    def _separar(self, espacio, siguiente):
+        """Espacio pendiente antes de `siguiente`: salto, espacio o nada"""
+        if not espacio or not self.ultimo:
+            return
+        if espacio == '\n' and self.ultimo not in ABRE and siguiente not in CIERRA:
+            self._emitir('\n')
+        elif (_es_palabra(self.ultimo) and _es_palabra(siguiente)) or \
+                (self.ultimo in '+-' and siguiente == self.ultimo) or (self.ultimo == '/' and siguiente == '/'):
+            self._emitir(' ')
+
+    def _codigo(self, dentro_de_plantilla):
+        codigo, n = self.codigo, len(self.codigo)
+        espacio = ''
+        llaves = 0
+        while self.i < n:
+            c = codigo[self.i]
+            siguiente = codigo[self.i + 1] if self.i + 1 < n else ''
+            if c in ESPACIOS:
+                if c == '\n':
+                    espacio = '\n'
+                elif not espacio:
+                    espacio = ' '
+                self.i += 1
+                continue
+            if c == '/' and siguiente == '/':
+                fin = codigo.find('\n', self.i)
+                self.i = n if fin < 0 else fin
+                continue
+            if c == '/' and siguiente == '*':
+                fin = codigo.find('*/', self.i + 2)
+                fin = n if fin < 0 else fin + 2
+                comentario = codigo[self.i:fin]
+                espacio = '\n' if '\n' in comentario or espacio == '\n' else (espacio or ' ')
+                self.i = fin
+                continue
+
+            self._separar(espacio, c)
+            espacio = ''
+            if dentro_de_plantilla and c == '}' and llaves == 0:
+                # Fin de ${...}: vuelve al texto de la plantilla
+                self._emitir(c)
+                self.i += 1
+                return
+            if c in '{':
+                llaves += 1
+            elif c == '}':
+                llaves -= 1
+
+            if c in '\'"':
+                self._cadena(c)
+            elif c == '`':
+                self._plantilla()
+            elif c == '/' and (not self.ultimo or self.ultimo in ANTES_DE_REGEX or self.palabra in PALABRAS_REGEX):
+                self._regex()
+            elif _es_palabra(c):
+                inicio = self.i
+                while self.i < n and _es_palabra(codigo[self.i]):
+                    self.i += 1
+                self._emitir(codigo[inicio:self.i])
+                self.palabra = codigo[inicio:self.i]
+                continue
+            else:
+                self._emitir(c)
+                self.i += 1
+            self.palabra = ''
+
+    def _cadena(self, comilla):
+        codigo, inicio = self.codigo, self.i
+        self.i += 1
+        while self.i < len(codigo) and codigo[self.i] != comilla:
+            self.i += 2 if codigo[self.i] == '\\' else 1
+        self.i += 1
+        self._emitir(codigo[inicio:self.i])
+
+    def _plantilla(self):
+        codigo, inicio = self.codigo, self.i
+        self.i += 1
+        while self.i < len(codigo):
+            c = codigo[self.i]
+            if c == '\\':
+                self.i += 2
+            elif c == '`':
+                self.i += 1
+                break
+            elif c == '$' and codigo[self.i + 1:self.i + 2] == '{':
+                self.i += 2
+                self._emitir(codigo[inicio:self.i])
+                self._codigo(dentro_de_plantilla=True)
+                inicio = self.i
+            else:
+                self.i += 1
+        self._emitir(codigo[inicio:self.i])
+
+    def _regex(self):
+        codigo, inicio = self.codigo, self.i
+        self.i += 1
+        clase = False
+        while self.i < len(codigo):
+            c = codigo[self.i]
+            if c == '\\':
+                self.i += 2
+                continue
+            if c == '\n':
+                break
+            if c == '[':
+                clase = True
+            elif c == ']':
+                clase = False
+            elif c == '/' and not clase:
+                self.i += 1
+                break
+            self.i += 1
+        while self.i < len(codigo) and _es_palabra(codigo[self.i]):
+            self.i += 1  # banderas
+        self._emitir(codigo[inicio:self.i])
+
+
+def minificar_js(codigo):
+    return _MinificadorJS(codigo).minificar()
+
+
+_PARTES_CSS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|(/\*.*?\*/)|(\s+)', re.S)
+
+
+def minificar_css(codigo):
+    """Quita comentarios y espacios; alrededor de '{};,' no hacen falta. Respeta las cadenas"""
+    def parte(m):
+        cadena, comentario, espacio = m.groups()
+        if cadena:
+            return cadena
+        return '' if comentario else ' '
+    codigo = _PARTES_CSS.sub(parte, codigo)
+    codigo = re.sub(r'\s*([{};,])\s*', r'\1', codigo)
+    return codigo.replace(';}', '}').strip() + '\n'
+
+
+# ==================== CONSTRUCCIÓN ====================
+
+_URL_CSS = re.compile(r'url\((["\']?)([^"\')]+)\1\)')
+_MAPA_FUENTE = re.compile(r'\n?/[/*]# sourceMappingURL=\S+(?: \*/)?\s*$')
+
+
+def _fuentes(carpeta):
+    """{nombre lógico: ruta} de static/src (sin el prefijo src/) y static/vendor"""
+    fuentes = {}
+    for subcarpeta, prefijo in (('src', ''), ('vendor', 'vendor/')):
+        raiz = os.path.join(carpeta, subcarpeta)
+        for directorio, _, archivos in os.walk(raiz):
+            for archivo in archivos:
+                ruta = os.path.join(directorio, archivo)
+                fuentes[prefijo + os.path.relpath(ruta, raiz).replace(os.sep, '/')] = ruta
+    return fuentes
+
+
+def _firma(fuentes):
+    """Cambia si se agrega, borra o modifica alguna fuente (o cambia este módulo)"""
+    datos = [(nombre, os.stat(ruta).st_mtime_ns, os.stat(ruta).st_size) for nombre, ruta in sorted(fuentes.items())]
+    datos.append(os.stat(__file__).st_mtime_ns)
+    return hashlib.sha256(json.dumps(datos).encode()).hexdigest()
+
+
+def _ruta_manifiesto(carpeta):
+    return os.path.join(carpeta, 'dist', 'manifest.json')
+
+
+def leer_manifiesto(carpeta):
+    try:
+        with open(_ruta_manifiesto(carpeta), encoding='utf-8') as archivo:
+            return json.load(archivo)
+    except (OSError, ValueError):
+        return None
+
+
+def _escribir(ruta, contenido):
+    """Escritura atómica: otro worker construyendo a la vez nunca ve un archivo a medias"""
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f'{ruta}.{os.getpid()}.tmp'
+    with open(temporal, 'wb') as archivo:
+        archivo.write(contenido)
+    os.replace(temporal, ruta)
+
+
+def _reescribir_urls(nombre, texto, archivos):
+    """url() relativos de un CSS -> archivos con hash ya construidos (las fuentes van primero)"""
+    directorio = posixpath.dirname(nombre)
+
+    def reemplazar(m):
+        referencia = m.group(2).strip()
+        if re.match(r'^(data:|[a-z]+://|//|#)', referencia):
+            return m.group(0)
+        limpia = re.split(r'[?#]', referencia, maxsplit=1)[0]
+        destino = archivos.get(posixpath.normpath(posixpath.join(directorio, limpia)))
+        if destino is None:
+            return m.group(0)
+        return f'url("{posixpath.relpath(destino, posixpath.join("dist", directorio))}")'
+    return _URL_CSS.sub(reemplazar, texto)
+
+
+def _procesar(nombre, contenido, archivos):
+    base, extension = posixpath.splitext(nombre)
+    if extension in ('.js', '.css'):
+        texto = contenido.decode('utf-8')
+        if base.endswith('.min'):
+            # Ya minificado: solo se quita la referencia al .map, que no se copia
+            texto = _MAPA_FUENTE.sub('', texto) + '\n'
+        elif extension == '.js':
+            texto = minificar_js(texto)
+        else:
+            texto = minificar_css(texto)
+        if extension == '.css':
+            texto = _reescribir_urls(nombre, texto, archivos)
+        contenido = texto.encode('utf-8')
+    huella = hashlib.sha256(contenido).hexdigest()[:LARGO_HASH]
+    return f'dist/{base}.{huella}{extension}', contenido
+
+
+def _variantes(destino):
+    return (destino, destino + '.gz', destino + '.br')
+
+
+def faltantes(carpeta):
+    return [nombre for nombre in VENDOR if not os.path.exists(os.path.join(carpeta, *nombre.split('/')))]
+
+
+def construir(carpeta, forzar=False):
+    """Construye static/dist si cambió alguna fuente. Devuelve el manifiesto"""
+    faltan = faltantes(carpeta)
+    if faltan:
+        raise VendorFaltante(f'Faltan librerías en static/vendor: {", ".join(faltan)}. '
+                             'Descargarlas con: python estaticos.py --vendor')
+    fuentes = _fuentes(carpeta)
+    firma = _firma(fuentes)
+    previo = leer_manifiesto(carpeta)
+    if previo and previo.get('firma') == firma and previo.get('brotli') == bool(brotli) and not forzar:
+        return previo
+
+    archivos = {}
+    # Primero lo que no es CSS: los CSS apuntan a fuentes e imágenes por su nombre con hash
+    for nombre in sorted(fuentes, key=lambda n: (n.endswith('.css'), n)):
+        with open(fuentes[nombre], 'rb') as archivo:
+            destino, contenido = _procesar(nombre, archivo.read(), archivos)
+        archivos[nombre] = destino
+        ruta = os.path.join(carpeta, destino)
+        if os.path.exists(ruta):
+            continue
+        _escribir(ruta, contenido)
+        if destino.endswith(COMPRIMIBLES):
+            # mtime=0: el mismo contenido produce siempre el mismo .gz
+            _escribir(ruta + '.gz', gzip.compress(contenido, compresslevel=9, mtime=0))
+            if brotli is not None:
+                _escribir(ruta + '.br', brotli.compress(contenido, quality=11))
+
+    manifiesto = {'firma': firma, 'brotli': bool(brotli), 'archivos': archivos}
+    _limpiar(carpeta, manifiesto, previo)
+    _escribir(_ruta_manifiesto(carpeta), json.dumps(manifiesto, indent=1, sort_keys=True).encode('utf-8'))
+    return manifiesto
+
+
+def _limpiar(carpeta, manifiesto, previo):
+    """Borra lo que no es de esta construcción ni de la anterior (páginas ya abiertas aún la piden)"""
+    vigentes = {'dist/manifest.json'}
+    for actual in (manifiesto, previo or {}):
+        for destino in actual.get('archivos', {}).values():
+            vigentes.update(_variantes(destino))
+    raiz = os.path.join(carpeta, 'dist')
+    for directorio, _, archivos in os.walk(raiz):
+        for archivo in archivos:
+            ruta = os.path.join(directorio, archivo)
+            if os.path.relpath(ruta, carpeta).replace(os.sep, '/') not in vigentes and not archivo.endswith('.tmp'):
+                os.remove(ruta)
+
+
+def descargar_vendor(carpeta):
+    """Descarga a static/vendor las librerías de VENDOR que falten. Devuelve los nombres descargados"""
+    descargados = []
+    for nombre, url in VENDOR.items():
+        ruta = os.path.join(carpeta, *nombre.split('/'))
+        if os.path.exists(ruta):
+            continue
+        with urllib.request.urlopen(url, timeout=60) as respuesta:
+            _escribir(ruta, respuesta.read())
+        descargados.append(nombre)
+    return descargados
+
+
+# ==================== SERVIDOR ====================
+
+def registrar_estaticos(app):
+    """Helper estatico() para las plantillas y /static/dist/ con caché immutable"""
+    carpeta = app.static_folder
+    manifiesto = None
+    if app.config.get('ESTATICOS_CONSTRUIR', True):
+        try:
+            manifiesto = construir(carpeta)
+        except OSError:
+            registro.exception('No se pudieron construir los archivos estáticos')
+    archivos = (manifiesto or leer_manifiesto(carpeta) or {}).get('archivos', {})
+    dist = os.path.join(carpeta, 'dist')
+
+    def estatico(nombre):
+        destino = archivos.get(nombre)
+        if destino:
+            return url_for('estatico_dist', archivo=destino[len('dist/'):])
+        if nombre.startswith('vendor/'):
+            return url_for('static', filename=nombre)
+        # Sin construir: la fuente tal cual, sin caché larga
+        return url_for('static', filename=f'src/{nombre}')
+
+    app.jinja_env.globals['estatico'] = estatico
+
+    @app.route('/static/dist/<path:archivo>', endpoint='estatico_dist')
+    def estatico_dist(archivo):
+        ruta = safe_join(dist, archivo)
+        if ruta is None or not os.path.isfile(ruta):
+            abort(404)
+        mimetype = mimetypes.guess_type(archivo)[0] or 'application/octet-stream'
+        codificacion = None
+        for nombre, extension in (('br', '.br'), ('gzip', '.gz')):
+            if request.accept_encodings[nombre] and os.path.isfile(ruta + extension):
+                codificacion, ruta = nombre, ruta + extension
+                break
+        respuesta = send_file(ruta, mimetype=mimetype, conditional=True, max_age=CACHE_SEGUNDOS)
+        if codificacion:
+            respuesta.headers['Content-Encoding'] = codificacion
+        respuesta.vary.add('Accept-Encoding')
+        respuesta.cache_control.public = True
+        respuesta.cache_control.immutable = True
+        return respuesta
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Construir los archivos estáticos (static/dist)')
+    parser.add_argument('--vendor', action='store_true', help='Descargar las librerías que falten en static/vendor')
+    parser.add_argument('--forzar', action='store_true', help='Reconstruir aunque no haya cambios')
+    args = parser.parse_args()
+    carpeta = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+    if args.vendor:
+        for nombre in descargar_vendor(carpeta):
+            print(f'Descargado: {nombre}')
+    try:
+        manifiesto = construir(carpeta, forzar=args.forzar)
+    except VendorFaltante as e:
+        print(f'ERROR: {e}')
+        return 1
+    print('=' * 60)
+    for nombre, destino in sorted(manifiesto['archivos'].items()):
+        ruta = os.path.join(carpeta, destino)
+        tamanios = [os.path.getsize(r) for r in (ruta, ruta + '.gz', ruta + '.br') if os.path.exists(r)]
+        print(f'  {nombre:50} {destino.rsplit("/", 1)[-1]:45} {" / ".join(str(t) for t in tamanios)}')
+    if not manifiesto['brotli']:
+        print('Sin .br: falta el módulo brotli (pip install Brotli)')
+    print('=' * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
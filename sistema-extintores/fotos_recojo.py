@@ -0,0 +1,536 @@
+"""
+Fotos de recojo y de guía de las órdenes de trabajo
+- La subida solo guarda el archivo calculando su SHA-256 y encola 'procesar_foto'; la
+  conversión corre en el pool de trabajos.py, no en el request.
+- El proceso aplica la orientación EXIF, descarta los metadatos (EXIF, GPS, perfil de la
+  cámara), reduce la foto a FOTOS_LADO_MAXIMO en FOTOS_FORMATO y genera una miniatura
+  de FOTOS_LADO_MINIATURA.
+- Los archivos se guardan por contenido en FOTOS_DIRECTORIO/<hh>/<hash>.<ext>: la misma
+  foto subida otra vez a la orden devuelve la fila existente, y entre órdenes (o entre
+  recojo y guía) se reutilizan los archivos ya procesados.
+- /fotos/<hash>/<variante> responde con ETag fuerte y Cache-Control immutable: la URL
+  cambia si cambia el contenido. Los listados usan la miniatura; la completa solo al abrirla.
+- Subida por partes para conexiones inestables: cada parte se escribe directo al disco y,
+  si se corta, el cliente reanuda desde el offset recibido (ver SUBIDA POR PARTES).
+"""
+import os
+import re
+import uuid
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from PIL import Image, ImageOps, UnidentifiedImageError
+from flask import current_app, jsonify, request, abort, send_file, url_for
+from flask_login import login_required, current_user
+from sqlalchemy import update, case
+from werkzeug.utils import secure_filename
+from models import db, FotoRecojo, FotoGuiaRecojo, SubidaFoto
+from trabajos import tarea, encolar, TrabajoFallido
+
+# Segmento de la URL -> modelo
+CLASES = {'fotos': FotoRecojo, 'fotos-guia': FotoGuiaRecojo}
+# Formatos aceptados en la subida -> extensión del original pendiente (MPO: JPEG de algunas cámaras)
+FORMATOS_ENTRADA = {'JPEG': 'jpg', 'MPO': 'jpg', 'PNG': 'png', 'WEBP': 'webp'}
+EXTENSIONES = {'WEBP': 'webp', 'JPEG': 'jpg'}
+MIMETYPES = {'webp': 'image/webp', 'jpg': 'image/jpeg', 'png': 'image/png'}
+VARIANTES = ('miniatura', 'completa')
+CACHE_SEGUNDOS = 365 * 24 * 3600
+BLOQUE = 1024 * 1024
+PATRON_HASH = re.compile(r'^[0-9a-f]{64}$')
+
+
+class FotoInvalida(Exception):
+    codigo = 400
+
+
+class FotoDemasiadoGrande(FotoInvalida):
+    codigo = 413
+
+
+class ConflictoSubida(FotoInvalida):
+    """Offset distinto del recibido o subida ya cerrada: el cliente consulta el estado y sigue"""
+    codigo = 409
+
+
+def _ruta(relativa):
+    return os.path.join(current_app.config['FOTOS_DIRECTORIO'], relativa)
+
+
+def _foto_por_hash(hash_contenido):
+    """Una fila con ese contenido, de cualquiera de las dos tablas (primero las ya procesadas)"""
+    fotos = [modelo.query.filter_by(hash_contenido=hash_contenido)
+             .order_by(case((modelo.estado == 'lista', 0), else_=1)).first()
+             for modelo in CLASES.values()]
+    fotos = [foto for foto in fotos if foto is not None]
+    return next((foto for foto in fotos if foto.estado == 'lista'), fotos[0] if fotos else None)
+
+
+def _borrar(*relativas):
+    for relativa in relativas:
+        if relativa and os.path.exists(_ruta(relativa)):
+            os.remove(_ruta(relativa))
+
+
+def foto_a_dict(foto):
+    return {
+        'id': foto.id,
+        'orden_id': foto.orden_id,
+        'nombre_archivo': foto.nombre_archivo,
+        'fecha_captura': foto.fecha_captura.isoformat(),
+        'tamanio_bytes': foto.tamanio_bytes,
+        'tamanio_original': foto.tamanio_original,
+        'ancho': foto.ancho,
+        'alto': foto.alto,
+        'estado': foto.estado,
+        'url': url_for('archivo_foto', hash_contenido=foto.hash_contenido, variante='miniatura'),
+        'url_completa': url_for('archivo_foto', hash_contenido=foto.hash_contenido, variante='completa'),
+    }
+
+
+# ==================== SUBIDA ====================
+
+def _maximo_bytes():
+    return int(current_app.config['FOTOS_MAXIMO_MB'] * 1024 * 1024)
+
+
+def _copiar(origen, destino, maximo_bytes, sha=None):
+    """Copia un stream a un archivo abierto por bloques (memoria constante). Devuelve los bytes copiados"""
+    total = 0
+    while True:
+        bloque = origen.read(BLOQUE)
+        if not bloque:
+            return total
+        total += len(bloque)
+        if total > maximo_bytes:
+            raise FotoDemasiadoGrande('La foto supera el tamaño máximo permitido')
+        if sha is not None:
+            sha.update(bloque)
+        destino.write(bloque)
+
+
+def _a_pendientes(temporal, hash_contenido):
+    """Valida la imagen y la mueve (os.replace, atómico) a pendientes/<hash>.<ext>"""
+    try:
+        with Image.open(_ruta(temporal)) as imagen:
+            formato = imagen.format
+    except UnidentifiedImageError:
+        _borrar(temporal)
+        raise FotoInvalida('El archivo no es una imagen válida')
+    if formato not in FORMATOS_ENTRADA:
+        _borrar(temporal)
+        raise FotoInvalida(f'Formato de imagen no soportado: {formato}')
+    relativa = os.path.join('pendientes', f'{hash_contenido}.{FORMATOS_ENTRADA[formato]}')
+    os.makedirs(_ruta('pendientes'), exist_ok=True)
+    os.replace(_ruta(temporal), _ruta(relativa))
+    return relativa
+
+
+def _guardar_subida(archivo):
+    """Copia la subida a pendientes/ calculando el hash. Devuelve (hash, bytes, ruta relativa)"""
+    os.makedirs(_ruta('pendientes'), exist_ok=True)
+    temporal = os.path.join('pendientes', f'.{uuid.uuid4().hex}')
+    sha = hashlib.sha256()
+    try:
+        with open(_ruta(temporal), 'wb') as destino:
+            total = _copiar(archivo.stream, destino, _maximo_bytes(), sha)
+    except Exception:
+        _borrar(temporal)
+        raise
+    hash_contenido = sha.hexdigest()
+    return hash_contenido, total, _a_pendientes(temporal, hash_contenido)
+
+
+def registrar_foto(modelo, orden_id, nombre_archivo, hash_contenido, tamanio, pendiente, usuario_id):
+    """Crea la fila de la foto ya guardada en pendientes/. Devuelve (foto, creada)"""
+    existente = modelo.query.filter_by(orden_id=orden_id, hash_contenido=hash_contenido).first()
+    procesada = _foto_por_hash(hash_contenido)
+    if existente is not None:
+        if procesada.estado != 'procesando':
+            # Ningún trabajo espera este original
+            _borrar(pendiente)
+        return existente, False
+
+    foto = modelo(orden_id=orden_id, nombre_archivo=secure_filename(nombre_archivo or '') or 'foto',
+                  hash_contenido=hash_contenido, tamanio_original=tamanio)
+    if procesada is not None and procesada.estado == 'lista':
+        # Mismo contenido ya procesado (otra orden o la otra galería): se reutilizan los archivos
+        _borrar(pendiente)
+        foto.estado = 'lista'
+        for campo in ('ruta_archivo', 'ruta_miniatura', 'ancho', 'alto', 'tamanio_bytes'):
+            setattr(foto, campo, getattr(procesada, campo))
+        db.session.add(foto)
+        db.session.commit()
+        return foto, True
+
+    # Hasta que termine el proceso se sirve el original subido
+    foto.ruta_archivo = pendiente
+    foto.tamanio_bytes = tamanio
+    db.session.add(foto)
+    encolar(current_app, 'procesar_foto', {'hash': hash_contenido, 'origen': pendiente}, usuario_id)
+    return foto, True
+
+
+def subir_foto(modelo, orden_id, archivo, usuario_id):
+    """Subida en un solo request (multipart). Devuelve (foto, creada)"""
+    hash_contenido, tamanio, pendiente = _guardar_subida(archivo)
+    return registrar_foto(modelo, orden_id, archivo.filename, hash_contenido, tamanio, pendiente, usuario_id)
+
+
+def eliminar_foto(foto):
+    """Borra la fila y, si ninguna otra usa el mismo contenido, sus archivos"""
+    hash_contenido = foto.hash_contenido
+    rutas = (foto.ruta_archivo, foto.ruta_miniatura)
+    db.session.delete(foto)
+    db.session.commit()
+    if _foto_por_hash(hash_contenido) is None:
+        _borrar(*rutas)
+
+
+# ==================== SUBIDA POR PARTES ====================
+# 1. POST /api/ordenes/<id>/<fotos|fotos-guia>/subidas {nombre_archivo, tamanio, sha256?}
+# 2. PUT /api/subidas-fotos/<id> con las cabeceras Upload-Offset y Upload-Checksum (SHA-256 de la
+#    parte); si falla, GET /api/subidas-fotos/<id> da el offset y se reenvía solo lo que falta.
+# 3. POST /api/subidas-fotos/<id>/finalizar: verifica el archivo y lo registra como con subir_foto.
+
+# Una parte (o la finalización) a la vez por subida; repartidas en candados fijos
+_candados = [threading.Lock() for _ in range(64)]
+
+
+def _candado(subida_id):
+    return _candados[hash(subida_id) % len(_candados)]
+
+
+def _ruta_parte(subida):
+    return os.path.join('subidas', f'{subida.id}.parte')
+
+
+def _offset(subida):
+    """Lo escrito en disco manda: sobrevive a un corte entre la escritura y el commit"""
+    ruta = _ruta(_ruta_parte(subida))
+    return os.path.getsize(ruta) if subida.estado == 'abierta' and os.path.exists(ruta) else subida.recibidos
+
+
+def subida_a_dict(subida):
+    return {
+        'id': subida.id,
+        'orden_id': subida.orden_id,
+        'clase': subida.clase,
+        'tamanio': subida.tamanio,
+        'offset': _offset(subida),
+        'estado': subida.estado,
+        'tamanio_parte': current_app.config['FOTOS_PARTE_KB'] * 1024,
+        'url': url_for('estado_subida_foto', id=subida.id),
+    }
+
+
+def _limpiar_subidas():
+    """Descarta las subidas sin actividad en FOTOS_SUBIDA_HORAS"""
+    limite = datetime.utcnow() - timedelta(hours=current_app.config['FOTOS_SUBIDA_HORAS'])
+    for subida in SubidaFoto.query.filter(SubidaFoto.fecha_actualizacion < limite).all():
+        _borrar(_ruta_parte(subida))
+        db.session.delete(subida)
+
+
+def crear_subida(orden_id, clase, nombre_archivo, tamanio, sha256, usuario_id):
+    if tamanio <= 0:
+        raise FotoInvalida('Tamaño inválido')
+    if tamanio > _maximo_bytes():
+        raise FotoDemasiadoGrande('La foto supera el tamaño máximo permitido')
+    if sha256 and not PATRON_HASH.match(sha256):
+        raise FotoInvalida('sha256 inválido')
+    _limpiar_subidas()
+    subida = SubidaFoto(id=uuid.uuid4().hex, orden_id=orden_id, clase=clase, nombre_archivo=nombre_archivo,
+                        tamanio=tamanio, sha256=sha256 or None, usuario_id=usuario_id)
+    os.makedirs(_ruta('subidas'), exist_ok=True)
+    open(_ruta(_ruta_parte(subida)), 'wb').close()
+    db.session.add(subida)
+    db.session.commit()
+    return subida
+
+
+def recibir_parte(subida, offset, stream, largo, checksum=None):
+    """Escribe la parte en offset sin cargarla en memoria. Devuelve el nuevo offset"""
+    with _candado(subida.id):
+        db.session.refresh(subida)
+        actual = _offset(subida)
+        if subida.estado != 'abierta':
+            raise ConflictoSubida('La subida ya fue finalizada')
+        if offset != actual:
+            raise ConflictoSubida(f'Se esperaba el offset {actual}')
+        if not largo or offset + largo > subida.tamanio:
+            raise FotoInvalida('La parte excede el tamaño declarado')
+
+        sha = hashlib.sha256()
+        with open(_ruta(_ruta_parte(subida)), 'r+b') as destino:
+            destino.seek(offset)
+            try:
+                recibidos = _copiar(stream, destino, largo, sha)
+                if recibidos != largo:
+                    raise FotoInvalida('La parte llegó incompleta')
+                if checksum and sha.hexdigest() != checksum.lower():
+                    raise FotoInvalida('El checksum de la parte no coincide')
+            except BaseException:
+                # Nada de una parte fallida queda en el archivo
+                destino.truncate(offset)
+                raise
+
+        subida.recibidos = offset + largo
+        subida.fecha_actualizacion = datetime.utcnow()
+        db.session.commit()
+        return subida.recibidos
+
+
+def finalizar_subida(subida):
+    """Verifica el archivo completo y registra la foto (repetirla devuelve la misma). Devuelve (foto, creada)"""
+    modelo = CLASES[subida.clase]
+    with _candado(subida.id):
+        db.session.refresh(subida)
+        if subida.estado == 'finalizada':
+            foto = modelo.query.filter_by(orden_id=subida.orden_id, hash_contenido=subida.sha256).first()
+            if foto is None:
+                raise ConflictoSubida('La foto de esta subida fue eliminada')
+            return foto, False
+        if _offset(subida) != subida.tamanio:
+            raise ConflictoSubida(f'Faltan partes: recibidos {_offset(subida)} de {subida.tamanio} bytes')
+
+        parte = _ruta_parte(subida)
+        sha = hashlib.sha256()
+        with open(_ruta(parte), 'rb') as archivo:
+            for bloque in iter(lambda: archivo.read(BLOQUE), b''):
+                sha.update(bloque)
+        hash_contenido = sha.hexdigest()
+        try:
+            if subida.sha256 and subida.sha256 != hash_contenido:
+                raise FotoInvalida('El archivo recibido no coincide con el sha256 declarado')
+            pendiente = _a_pendientes(parte, hash_contenido)
+        except FotoInvalida:
+            # Hay que empezar de nuevo
+            _borrar(parte)
+            db.session.delete(subida)
+            db.session.commit()
+            raise
+
+        subida.estado = 'finalizada'
+        subida.sha256 = hash_contenido
+        subida.recibidos = subida.tamanio
+        subida.fecha_actualizacion = datetime.utcnow()
+        foto, creada = registrar_foto(modelo, subida.orden_id, subida.nombre_archivo, hash_contenido,
+                                      subida.tamanio, pendiente, subida.usuario_id)
+        db.session.commit()
+        return foto, creada
+
+
+def cancelar_subida(subida):
+    with _candado(subida.id):
+        _borrar(_ruta_parte(subida))
+        db.session.delete(subida)
+        db.session.commit()
+
+
+# ==================== PROCESO ====================
+
+def _a_rgb(imagen):
+    if imagen.mode in ('RGBA', 'LA') or (imagen.mode == 'P' and 'transparency' in imagen.info):
+        imagen = imagen.convert('RGBA')
+        fondo = Image.new('RGB', imagen.size, 'white')
+        fondo.paste(imagen, mask=imagen.getchannel('A'))
+        return fondo
+    return imagen if imagen.mode == 'RGB' else imagen.convert('RGB')
+
+
+def _guardar(imagen, relativa, formato, calidad):
+    """Sin exif= ni icc_profile=: el archivo final no lleva metadatos"""
+    destino = _ruta(relativa)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    temporal = f'{destino}.{uuid.uuid4().hex}.tmp'
+    if formato == 'JPEG':
+        imagen.save(temporal, 'JPEG', quality=calidad, optimize=True, progressive=True)
+    else:
+        imagen.save(temporal, 'WEBP', quality=calidad, method=4)
+    os.replace(temporal, destino)
+    return os.path.getsize(destino)
+
+
+def convertir(origen, hash_contenido, formato, lado, lado_miniatura, calidad):
+    """Genera la foto reducida y la miniatura; devuelve los campos para la fila"""
+    extension = EXTENSIONES[formato]
+    ruta = os.path.join(hash_contenido[:2], f'{hash_contenido}.{extension}')
+    ruta_miniatura = os.path.join(hash_contenido[:2], f'{hash_contenido}_min.{extension}')
+    with Image.open(_ruta(origen)) as imagen:
+        # JPEG: decodifica directamente a una escala reducida (mucho menos CPU y memoria)
+        imagen.draft('RGB', (lado, lado))
+        imagen = _a_rgb(ImageOps.exif_transpose(imagen))
+        imagen.thumbnail((lado, lado), Image.Resampling.LANCZOS)
+        ancho, alto = imagen.size
+        tamanio = _guardar(imagen, ruta, formato, calidad)
+        imagen.thumbnail((lado_miniatura, lado_miniatura), Image.Resampling.LANCZOS)
+        _guardar(imagen, ruta_miniatura, formato, calidad)
+    return {'ruta_archivo': ruta, 'ruta_miniatura': ruta_miniatura, 'ancho': ancho, 'alto': alto,
+            'tamanio_bytes': tamanio}
+
+
+@tarea('procesar_foto')
+def _procesar_foto(trabajo):
+    hash_contenido = trabajo.parametros['hash']
+    origen = trabajo.parametros['origen']
+    config = current_app.config
+
+    procesada = _foto_por_hash(hash_contenido)
+    if procesada is not None and procesada.estado == 'lista':
+        # Otro trabajo ya procesó el mismo contenido
+        valores = {campo: getattr(procesada, campo)
+                   for campo in ('ruta_archivo', 'ruta_miniatura', 'ancho', 'alto', 'tamanio_bytes')}
+    elif os.path.exists(_ruta(origen)):
+        formato = config['FOTOS_FORMATO'].upper()
+        try:
+            valores = convertir(origen, hash_contenido, formato if formato in EXTENSIONES else 'JPEG',
+                                config['FOTOS_LADO_MAXIMO'], config['FOTOS_LADO_MINIATURA'], config['FOTOS_CALIDAD'])
+        except (UnidentifiedImageError, Image.DecompressionBombError, SyntaxError) as e:
+            _marcar_error(hash_contenido)
+            raise TrabajoFallido(f'No se pudo procesar la imagen: {e}')
+    else:
+        _marcar_error(hash_contenido)
+        raise TrabajoFallido('El archivo subido ya no está disponible')
+
+    for modelo in CLASES.values():
+        db.session.execute(
+            update(modelo).where(modelo.hash_contenido == hash_contenido, modelo.estado != 'lista')
+            .values(estado='lista', **valores)
+        )
+    db.session.commit()
+    _borrar(origen)
+    return {'hash': hash_contenido, 'tamanio_bytes': valores['tamanio_bytes']}
+
+
+def _marcar_error(hash_contenido):
+    with db.engine.begin() as conexion:
+        for modelo in CLASES.values():
+            conexion.execute(update(modelo).where(modelo.hash_contenido == hash_contenido,
+                                                  modelo.estado == 'procesando').values(estado='error'))
+
+
+# ==================== REGISTRO EN LA APP ====================
+
+def registrar_fotos_recojo(app):
+    app.config.setdefault('FOTOS_DIRECTORIO', os.path.join(app.instance_path, 'fotos'))
+
+    @app.route('/api/ordenes/<int:orden_id>/<any(fotos, "fotos-guia"):clase>')
+    @login_required
+    def fotos_orden(orden_id, clase):
+        modelo = CLASES[clase]
+        fotos = (modelo.query.filter_by(orden_id=orden_id)
+                 .order_by(modelo.fecha_captura.desc(), modelo.id.desc()).all())
+        return jsonify({'success': True, 'fotos': [foto_a_dict(f) for f in fotos], 'total': len(fotos)})
+
+    @app.route('/api/ordenes/<int:orden_id>/<any(fotos, "fotos-guia"):clase>', methods=['POST'])
+    @login_required
+    def subir_foto_orden(orden_id, clase):
+        archivo = request.files.get('foto')
+        if archivo is None:
+            return jsonify({'success': False, 'error': 'Falta el archivo "foto"'}), 400
+        try:
+            foto, creada = subir_foto(CLASES[clase], orden_id, archivo, current_user.id)
+        except FotoInvalida as e:
+            return jsonify({'success': False, 'error': str(e)}), e.codigo
+        return jsonify({'success': True, 'foto': foto_a_dict(foto), 'duplicada': not creada}), 201 if creada else 200
+
+    @app.route('/api/ordenes/<int:orden_id>/<any(fotos, "fotos-guia"):clase>/<int:foto_id>', methods=['DELETE'])
+    @login_required
+    def eliminar_foto_orden(orden_id, clase, foto_id):
+        modelo = CLASES[clase]
+        foto = modelo.query.filter_by(id=foto_id, orden_id=orden_id).first_or_404()
+        eliminar_foto(foto)
+        return jsonify({'success': True})
+
+    # Subida por partes
+    def _subida_del_usuario(id):
+        subida = db.session.get(SubidaFoto, id)
+        if subida is None or (subida.usuario_id != current_user.id and current_user.rol != 'admin'):
+            abort(404)
+        return subida
+
+    def _error_subida(e, subida=None):
+        datos = {'success': False, 'error': str(e)}
+        if isinstance(e, ConflictoSubida) and subida is not None:
+            datos.update(subida_a_dict(subida))
+        return jsonify(datos), e.codigo
+
+    @app.route('/api/ordenes/<int:orden_id>/<any(fotos, "fotos-guia"):clase>/subidas', methods=['POST'])
+    @login_required
+    def crear_subida_foto(orden_id, clase):
+        datos = request.get_json(silent=True) or {}
+        try:
+            tamanio = int(datos.get('tamanio'))
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'Falta el tamaño del archivo'}), 400
+        try:
+            subida = crear_subida(orden_id, clase, datos.get('nombre_archivo'), tamanio,
+                                  (datos.get('sha256') or '').lower(), current_user.id)
+        except FotoInvalida as e:
+            return _error_subida(e)
+        return jsonify({'success': True, **subida_a_dict(subida)}), 201, {'Location': url_for('estado_subida_foto', id=subida.id)}
+
+    @app.route('/api/subidas-fotos/<id>')
+    @login_required
+    def estado_subida_foto(id):
+        return jsonify({'success': True, **subida_a_dict(_subida_del_usuario(id))})
+
+    @app.route('/api/subidas-fotos/<id>', methods=['PUT'])
+    @login_required
+    def parte_subida_foto(id):
+        subida = _subida_del_usuario(id)
+        if request.content_length is None:
+            return jsonify({'success': False, 'error': 'Falta Content-Length'}), 411
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Falta la cabecera Upload-Offset'}), 400
+        try:
+            recibir_parte(subida, offset, request.stream, request.content_length,
+                          request.headers.get('Upload-Checksum'))
+        except FotoInvalida as e:
+            return _error_subida(e, subida)
+        return jsonify({'success': True, **subida_a_dict(subida)})
+
+    @app.route('/api/subidas-fotos/<id>/finalizar', methods=['POST'])
+    @login_required
+    def finalizar_subida_foto(id):
+        subida = _subida_del_usuario(id)
+        try:
+            foto, creada = finalizar_subida(subida)
+        except FotoInvalida as e:
+            return _error_subida(e, subida if isinstance(e, ConflictoSubida) else None)
+        return jsonify({'success': True, 'foto': foto_a_dict(foto), 'duplicada': not creada}), 201 if creada else 200
+
+    @app.route('/api/subidas-fotos/<id>', methods=['DELETE'])
+    @login_required
+    def cancelar_subida_foto(id):
+        cancelar_subida(_subida_del_usuario(id))
+        return jsonify({'success': True})
+
+    @app.route('/fotos/<hash_contenido>/<variante>')
+    @login_required
+    def archivo_foto(hash_contenido, variante):
+        if variante not in VARIANTES or not PATRON_HASH.match(hash_contenido):
+            abort(404)
+        foto = _foto_por_hash(hash_contenido)
+        if foto is None:
+            abort(404)
+        relativa = foto.ruta_miniatura if foto.estado == 'lista' and variante == 'miniatura' else foto.ruta_archivo
+        if not os.path.exists(_ruta(relativa)):
+            abort(404)
+        mimetype = MIMETYPES[relativa.rsplit('.', 1)[-1]]
+
+        if foto.estado != 'lista':
+            # Original aún sin procesar: no se cachea, la misma URL servirá la versión reducida
+            respuesta = send_file(_ruta(relativa), mimetype=mimetype, max_age=0)
+            respuesta.cache_control.no_cache = True
+            return respuesta
+
+        # El contenido de una URL no cambia nunca: ETag fuerte y caché de un año
+        respuesta = send_file(_ruta(relativa), mimetype=mimetype, conditional=True,
+                              etag=f'{hash_contenido}-{variante}', max_age=CACHE_SEGUNDOS)
+        respuesta.cache_control.public = False
+        respuesta.cache_control.private = True
+        respuesta.cache_control.immutable = True
+        return respuesta
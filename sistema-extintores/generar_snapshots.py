@@ -0,0 +1,47 @@
+"""
+Genera los snapshots de stock pendientes (stock_snapshot)
+Pensado para correr una vez al día (cron / tarea programada), después de medianoche UTC.
+
+Uso:
+    python generar_snapshots.py                       # cierres pendientes hasta ayer
+    python generar_snapshots.py --frecuencia mensual
+    python generar_snapshots.py --fecha 2024-05-31    # regenera un cierre puntual
+"""
+import sys
+import time
+import argparse
+from datetime import datetime
+from app import app
+from historico_stock import generar_snapshot, generar_snapshots_pendientes, FRECUENCIAS
+
+
+def leer_fecha(texto):
+    return datetime.strptime(texto, '%Y-%m-%d').date()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generar snapshots de stock')
+    parser.add_argument('--fecha', type=leer_fecha, help='Regenerar solo el cierre de esta fecha (AAAA-MM-DD)')
+    parser.add_argument('--hasta', type=leer_fecha, help='Último cierre a generar (por defecto ayer)')
+    parser.add_argument('--frecuencia', choices=FRECUENCIAS, help='Por defecto SNAPSHOT_STOCK_FRECUENCIA')
+    args = parser.parse_args()
+
+    with app.app_context():
+        inicio = time.perf_counter()
+        if args.fecha:
+            generados = [(args.fecha, generar_snapshot(args.fecha))]
+        else:
+            frecuencia = args.frecuencia or app.config['SNAPSHOT_STOCK_FRECUENCIA']
+            generados = generar_snapshots_pendientes(args.hasta, frecuencia)
+        duracion = time.perf_counter() - inicio
+
+    print('=' * 60)
+    for fecha, filas in generados:
+        print(f'  {fecha.isoformat()}: {filas} filas')
+    print(f'Snapshots generados: {len(generados)} en {duracion:.2f}s')
+    print('=' * 60)
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""
+Stock histórico a una fecha
+- stock_snapshot guarda el stock de productos, modelos y colores al cierre de cada día
+  (o de cada mes, según SNAPSHOT_STOCK_FRECUENCIA).
+- as_of(fecha) parte del snapshot más cercano y aplica solo los movimientos entre ese
+  snapshot y la fecha pedida (hacia adelante o hacia atrás) como suma de
+  stock_nuevo - stock_anterior. Costo: O(productos + movimientos de la ventana).
+Las fechas son cierres de día en UTC, igual que Movimiento.fecha_movimiento.
+"""
+from datetime import datetime, time, timedelta
+from sqlalchemy import select, func, delete, insert, null, literal, or_, cast, Integer
+from models import db, Producto, ProductoModelo, ProductoColor, Movimiento, StockSnapshot
+
+NIVELES = ('producto', 'modelo', 'color')
+FRECUENCIAS = ('diaria', 'mensual')
+
+COLUMNAS = ['producto_id', 'modelo_id', 'color_id', 'stock', 'precio_unitario']
+
+
+def _cierre(fecha):
+    """Instante en que termina el día (UTC)"""
+    return datetime.combine(fecha + timedelta(days=1), time.min)
+
+
+def _hoy():
+    return datetime.utcnow().date()
+
+
+# ==================== RECONSTRUCCIÓN ====================
+
+def _nivel(nivel):
+    """Columnas de cada nivel: (clave en movimientos, filtro del snapshot, select del estado actual)"""
+    if nivel == 'producto':
+        return (
+            Movimiento.producto_id,
+            (StockSnapshot.modelo_id.is_(None), StockSnapshot.color_id.is_(None)),
+            select(Producto.id.label('producto_id'), null().label('modelo_id'), null().label('color_id'),
+                   Producto.stock_actual, Producto.precio_unitario, Producto.fecha_creacion)
+        )
+    if nivel == 'modelo':
+        return (
+            Movimiento.modelo_id,
+            (StockSnapshot.modelo_id.isnot(None), StockSnapshot.color_id.is_(None)),
+            select(ProductoModelo.producto_id, ProductoModelo.id.label('modelo_id'), null().label('color_id'),
+                   ProductoModelo.stock_actual,
+                   (func.coalesce(Producto.precio_unitario, 0) + func.coalesce(ProductoModelo.precio_diferencial, 0))
+                   .label('precio_unitario'),
+                   ProductoModelo.fecha_creacion)
+            .join(Producto, Producto.id == ProductoModelo.producto_id)
+        )
+    if nivel == 'color':
+        return (
+            Movimiento.color_id,
+            (StockSnapshot.color_id.isnot(None),),
+            select(ProductoModelo.producto_id, ProductoModelo.id.label('modelo_id'), ProductoColor.id.label('color_id'),
+                   ProductoColor.stock_actual,
+                   (func.coalesce(Producto.precio_unitario, 0) + func.coalesce(ProductoModelo.precio_diferencial, 0))
+                   .label('precio_unitario'),
+                   ProductoColor.fecha_creacion)
+            .join(ProductoModelo, ProductoModelo.id == ProductoColor.modelo_id)
+            .join(Producto, Producto.id == ProductoModelo.producto_id)
+        )
+    raise ValueError(f'Nivel inválido: {nivel}')
+
+
+def punto_de_partida(fecha):
+    """
+    Elige desde dónde reconstruir: el snapshot anterior, el posterior o el stock actual,
+    el que esté más cerca de la fecha. Devuelve (fecha del snapshot o None, sentido)
+    """
+    anterior = db.session.execute(
+        select(func.max(StockSnapshot.fecha)).where(StockSnapshot.fecha <= fecha)
+    ).scalar()
+    posterior = db.session.execute(
+        select(func.min(StockSnapshot.fecha)).where(StockSnapshot.fecha > fecha)
+    ).scalar()
+
+    candidatos = [((_hoy() - fecha).days, None, 'atras')]
+    if posterior is not None:
+        candidatos.append(((posterior - fecha).days, posterior, 'atras'))
+    if anterior is not None:
+        candidatos.append(((fecha - anterior).days, anterior, 'adelante'))
+    _, base, sentido = min(candidatos, key=lambda c: (c[0], c[2] != 'adelante'))
+    return base, sentido
+
+
+def as_of(fecha, nivel='producto', partida=None):
+    """
+    Subconsulta (producto_id, modelo_id, color_id, stock, precio_unitario) con el stock
+    al cierre de la fecha indicada. Solo incluye lo creado hasta esa fecha.
+    partida: resultado de punto_de_partida(fecha), para reutilizarlo entre niveles.
+    """
+    clave_movimiento, filtro_snapshot, actual = _nivel(nivel)
+    base, sentido = partida or punto_de_partida(fecha)
+    actual = actual.subquery('actual')
+    clave_actual = actual.c[COLUMNAS[NIVELES.index(nivel)]]
+
+    if sentido == 'adelante':
+        desde, hasta = _cierre(base), _cierre(fecha)
+    else:
+        desde, hasta = _cierre(fecha), (_cierre(base) if base is not None else None)
+
+    ventana = [Movimiento.fecha_movimiento >= desde]
+    if hasta is not None:
+        ventana.append(Movimiento.fecha_movimiento < hasta)
+    # CAST(clave + 0): evita que SQLite recorra todo ix_movimientos_producto_fecha para agrupar
+    # en vez de leer solo la ventana de fechas con ix_movimientos_fecha (el CAST conserva la
+    # afinidad entera para que el join con la clave pueda usar índice)
+    clave_grupo = cast(clave_movimiento + 0, Integer)
+    deltas = (
+        select(clave_grupo.label('clave'),
+               func.sum(Movimiento.stock_nuevo - Movimiento.stock_anterior).label('delta'))
+        .where(*ventana)
+        .group_by(clave_grupo)
+        .subquery('deltas')
+    )
+    delta = func.coalesce(deltas.c.delta, 0)
+
+    consulta = select(actual.c.producto_id, actual.c.modelo_id, actual.c.color_id)
+    if base is None:
+        consulta = consulta.add_columns(
+            (func.coalesce(actual.c.stock_actual, 0) - delta).label('stock'),
+            actual.c.precio_unitario
+        ).select_from(actual)
+    else:
+        snapshot = (
+            select(StockSnapshot.producto_id, StockSnapshot.modelo_id, StockSnapshot.color_id,
+                   StockSnapshot.stock, StockSnapshot.precio_unitario)
+            .where(StockSnapshot.fecha == base, *filtro_snapshot)
+            .subquery('snapshot')
+        )
+        clave_snapshot = snapshot.c[COLUMNAS[NIVELES.index(nivel)]]
+        stock_base = func.coalesce(snapshot.c.stock, 0)
+        consulta = consulta.add_columns(
+            (stock_base + delta if sentido == 'adelante' else stock_base - delta).label('stock'),
+            func.coalesce(snapshot.c.precio_unitario, actual.c.precio_unitario).label('precio_unitario')
+        ).select_from(actual).outerjoin(snapshot, clave_snapshot == clave_actual)
+
+    return (
+        consulta
+        .outerjoin(deltas, deltas.c.clave == clave_actual)
+        .where(or_(actual.c.fecha_creacion.is_(None), actual.c.fecha_creacion < _cierre(fecha)))
+        .subquery('stock_historico')
+    )
+
+
+# ==================== SNAPSHOTS ====================
+
+def generar_snapshot(fecha):
+    """Guarda (o reemplaza) el snapshot al cierre de la fecha para los tres niveles"""
+    try:
+        db.session.execute(delete(StockSnapshot).where(StockSnapshot.fecha == fecha))
+        partida = punto_de_partida(fecha)
+        total = 0
+        for nivel in NIVELES:
+            historico = as_of(fecha, nivel, partida)
+            resultado = db.session.execute(
+                insert(StockSnapshot).from_select(
+                    ['fecha'] + COLUMNAS,
+                    select(literal(fecha, StockSnapshot.fecha.type), *[historico.c[c] for c in COLUMNAS])
+                )
+            )
+            total += resultado.rowcount
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return total
+
+
+def _es_cierre(fecha, frecuencia):
+    return frecuencia == 'diaria' or (fecha + timedelta(days=1)).day == 1
+
+
+def fechas_pendientes(hasta=None, frecuencia='diaria'):
+    """Cierres sin snapshot desde el último guardado hasta `hasta` (por defecto ayer)"""
+    if frecuencia not in FRECUENCIAS:
+        raise ValueError(f'Frecuencia inválida: {frecuencia}')
+    hasta = hasta or _hoy() - timedelta(days=1)
+    ultimo = db.session.execute(select(func.max(StockSnapshot.fecha))).scalar()
+    if ultimo is None:
+        # Sin historial: basta el cierre más reciente (se reconstruye desde el stock actual)
+        fecha = hasta
+        while not _es_cierre(fecha, frecuencia):
+            fecha -= timedelta(days=1)
+        return [fecha]
+
+    fechas = []
+    fecha = ultimo + timedelta(days=1)
+    while fecha <= hasta:
+        if _es_cierre(fecha, frecuencia):
+            fechas.append(fecha)
+        fecha += timedelta(days=1)
+    return fechas
+
+
+def generar_snapshots_pendientes(hasta=None, frecuencia='diaria'):
+    """Genera en orden los snapshots que falten; cada uno parte del anterior"""
+    generados = []
+    for fecha in fechas_pendientes(hasta, frecuencia):
+        generados.append((fecha, generar_snapshot(fecha)))
+    return generados
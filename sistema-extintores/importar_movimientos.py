@@ -0,0 +1,68 @@
+"""
+Importa un lote de movimientos de stock desde un archivo CSV o JSON
+
+Uso:
+    python importar_movimientos.py movimientos.csv --usuario admin
+    python importar_movimientos.py movimientos.json --usuario admin --parcial
+
+Columnas CSV: producto_id, codigo, modelo_id, color_id, tipo, cantidad, nuevo_stock, motivo,
+observaciones, documento (basta con producto_id o codigo; modelo_id y color_id indican la variante
+de los productos que la manejan; nuevo_stock solo aplica a los ajustes)
+"""
+import sys
+import json
+import time
+import argparse
+from app import app
+from models import Usuario
+from servicio_stock import registrar_lote, leer_lote_csv, ConflictoConcurrencia
+
+
+def leer_archivo(ruta):
+    with open(ruta, encoding='utf-8-sig') as f:
+        contenido = f.read()
+    if ruta.lower().endswith('.json'):
+        datos = json.loads(contenido)
+        return datos.get('movimientos', []) if isinstance(datos, dict) else datos
+    return leer_lote_csv(contenido)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Importar movimientos de stock por lotes')
+    parser.add_argument('archivo', help='Archivo .csv o .json con los movimientos')
+    parser.add_argument('--usuario', default='admin', help='Usuario que registra los movimientos')
+    parser.add_argument('--parcial', action='store_true', help='Registrar las líneas válidas aunque otras tengan errores')
+    args = parser.parse_args()
+
+    lineas = leer_archivo(args.archivo)
+
+    with app.app_context():
+        usuario = Usuario.query.filter_by(username=args.usuario).first()
+        if not usuario:
+            print(f'ERROR: usuario "{args.usuario}" no existe')
+            sys.exit(1)
+
+        inicio = time.perf_counter()
+        try:
+            resultado = registrar_lote(lineas, usuario.id, parcial=args.parcial)
+        except ConflictoConcurrencia as e:
+            print(f'ERROR: {e}')
+            sys.exit(1)
+        duracion = time.perf_counter() - inicio
+
+    print('=' * 60)
+    print(f'Líneas leídas: {len(lineas)}')
+    print(f'Movimientos registrados: {resultado["registrados"]} en {duracion:.2f}s')
+    if resultado['errores']:
+        print(f'Errores: {len(resultado["errores"])}')
+        for error in resultado['errores']:
+            print(f'  Línea {error["linea"]}: {error["error"]}')
+        if not args.parcial:
+            print('Lote rechazado: no se registró ningún movimiento (usa --parcial para registrar las líneas válidas)')
+    print('=' * 60)
+
+    sys.exit(0 if resultado['ok'] else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -22,6 +22,14 @@ if not exist "venv\Lib\site-packages\flask\" (
     echo.
 )
 
+REM Librerias de static/vendor (Bootstrap, jQuery, Socket.IO): se descargan una vez
+python estaticos.py --vendor
+if errorlevel 1 (
+    echo ERROR: No se pudieron descargar las librerias de static/vendor
+    pause
+    exit /b 1
+)
+
 REM Iniciar la aplicación
 echo Iniciando servidor...
 echo.
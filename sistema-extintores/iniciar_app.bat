@@ -29,6 +29,14 @@ if errorlevel 1 (
     )
 )
 
+REM Librerias de static/vendor (Bootstrap, jQuery, Socket.IO): se descargan una vez
+python estaticos.py --vendor
+if errorlevel 1 (
+    echo ERROR: No se pudieron descargar las librerias de static/vendor
+    pause
+    exit /b 1
+)
+
 REM Ejecutar la aplicacion
 python app.py
 
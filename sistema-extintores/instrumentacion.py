@@ -0,0 +1,234 @@
+"""
+Instrumentación por request (opcional, INSTRUMENTACION=1)
+- Por cada request mide: tiempo total, cantidad y tiempo de sentencias SQL, tiempo de
+  render de plantillas y memoria pico (tracemalloc, INSTRUMENTACION_MEMORIA).
+- Guarda las últimas muestras de cada endpoint y publica p50/p95/p99 en /admin/metrics
+  en formato de texto de Prometheus (administradores o Bearer INSTRUMENTACION_TOKEN).
+- Las sentencias que superan INSTRUMENTACION_CONSULTA_LENTA_MS se registran con su ruta
+  en consultas_lentas.log, junto a app.log y rotado igual.
+Todo queda en memoria del proceso: con varios workers cada uno publica sus propias métricas.
+La memoria pico es la del proceso durante el request: con requests concurrentes es aproximada.
+"""
+import os
+import math
+import time
+import logging
+import threading
+import tracemalloc
+from collections import deque, defaultdict
+from flask import g, request, has_request_context, before_render_template, template_rendered, Response, abort
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from logs_sistema import ManejadorRotativo, agregar_manejador
+
+MUESTRAS_POR_ENDPOINT = 1000
+CUANTILES = (0.5, 0.95, 0.99)
+
+# nombre de la métrica -> (clave de la medición, descripción)
+METRICAS = {
+    'inventario_request_segundos': ('duracion', 'Tiempo total del request'),
+    'inventario_sql_consultas': ('consultas', 'Sentencias SQL por request'),
+    'inventario_sql_segundos': ('tiempo_sql', 'Tiempo en sentencias SQL por request'),
+    'inventario_plantilla_segundos': ('tiempo_plantillas', 'Tiempo de render de plantillas por request'),
+    'inventario_memoria_pico_bytes': ('memoria_pico', 'Memoria pico asignada durante el request'),
+}
+
+ENDPOINTS_EXCLUIDOS = {'metricas', 'static'}
+
+_lock = threading.Lock()
+_muestras = defaultdict(lambda: {clave: deque(maxlen=MUESTRAS_POR_ENDPOINT) for clave, _ in METRICAS.values()})
+_totales = defaultdict(lambda: defaultdict(float))
+_respuestas = defaultdict(int)
+_consultas_lentas = defaultdict(int)
+
+registro_consultas_lentas = logging.getLogger('consultas_lentas')
+
+
+def _medicion():
+    medicion = g.get('instrumentacion') if has_request_context() else None
+    return None if medicion is None or medicion['cerrada'] else medicion
+
+
+# ==================== CAPTURA ====================
+
+def _antes_de_consulta(conn, cursor, statement, parameters, context, executemany):
+    if _medicion() is not None:
+        conn.info['instrumentacion_inicio'] = time.perf_counter()
+
+
+def _despues_de_consulta(conn, cursor, statement, parameters, context, executemany):
+    medicion = _medicion()
+    inicio = conn.info.pop('instrumentacion_inicio', None)
+    if medicion is None or inicio is None:
+        return
+    duracion = time.perf_counter() - inicio
+    medicion['consultas'] += 1
+    medicion['tiempo_sql'] += duracion
+    if duracion * 1000 >= medicion['umbral_lenta_ms']:
+        medicion['lentas'] += 1
+        registro_consultas_lentas.warning(
+            '%.1f ms | %s %s (%s) | %s', duracion * 1000, request.method, request.path,
+            request.endpoint, ' '.join(statement.split())
+        )
+
+
+def _antes_de_plantilla(sender, template, context, **extra):
+    medicion = _medicion()
+    if medicion is not None:
+        medicion['plantillas'].append(time.perf_counter())
+
+
+def _plantilla_renderizada(sender, template, context, **extra):
+    medicion = _medicion()
+    if medicion is not None and medicion['plantillas']:
+        medicion['tiempo_plantillas'] += time.perf_counter() - medicion['plantillas'].pop()
+
+
+def _registrar(endpoint, status, medicion):
+    with _lock:
+        muestras = _muestras[endpoint]
+        totales = _totales[endpoint]
+        for clave, _ in METRICAS.values():
+            if medicion.get(clave) is not None:
+                muestras[clave].append(medicion[clave])
+                totales[clave] += medicion[clave]
+        totales['requests'] += 1
+        _respuestas[(endpoint, status)] += 1
+        _consultas_lentas[endpoint] += medicion['lentas']
+
+
+# ==================== PROMETHEUS ====================
+
+def _cuantil(valores, q):
+    """Cuantil por rango más cercano sobre las muestras ordenadas"""
+    indice = min(len(valores) - 1, max(0, math.ceil(q * len(valores)) - 1))
+    return valores[indice]
+
+
+def _etiqueta(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def exportar_prometheus():
+    """Métricas acumuladas en formato de texto de Prometheus (version 0.0.4)"""
+    with _lock:
+        muestras = {endpoint: {clave: sorted(valores) for clave, valores in m.items()} for endpoint, m in _muestras.items()}
+        totales = {endpoint: dict(t) for endpoint, t in _totales.items()}
+        respuestas = dict(_respuestas)
+        lentas = dict(_consultas_lentas)
+
+    lineas = []
+    for nombre, (clave, descripcion) in METRICAS.items():
+        lineas.append(f'# HELP {nombre} {descripcion} (cuantiles de las últimas {MUESTRAS_POR_ENDPOINT} muestras)')
+        lineas.append(f'# TYPE {nombre} summary')
+        for endpoint in sorted(muestras):
+            valores = muestras[endpoint][clave]
+            if not valores:
+                continue
+            etiqueta = f'endpoint="{_etiqueta(endpoint)}"'
+            for q in CUANTILES:
+                lineas.append(f'{nombre}{{{etiqueta},quantile="{q}"}} {_cuantil(valores, q):.6g}')
+            lineas.append(f'{nombre}_sum{{{etiqueta}}} {totales[endpoint].get(clave, 0):.6g}')
+            lineas.append(f'{nombre}_count{{{etiqueta}}} {int(totales[endpoint]["requests"])}')
+
+    lineas.append('# HELP inventario_requests_total Requests atendidos por endpoint y código de respuesta')
+    lineas.append('# TYPE inventario_requests_total counter')
+    for (endpoint, status), cantidad in sorted(respuestas.items()):
+        lineas.append(f'inventario_requests_total{{endpoint="{_etiqueta(endpoint)}",status="{status}"}} {cantidad}')
+
+    lineas.append('# HELP inventario_sql_consultas_lentas_total Sentencias SQL sobre el umbral de consulta lenta')
+    lineas.append('# TYPE inventario_sql_consultas_lentas_total counter')
+    for endpoint, cantidad in sorted(lentas.items()):
+        lineas.append(f'inventario_sql_consultas_lentas_total{{endpoint="{_etiqueta(endpoint)}"}} {cantidad}')
+    return '\n'.join(lineas) + '\n'
+
+
+def reiniciar():
+    with _lock:
+        _muestras.clear()
+        _totales.clear()
+        _respuestas.clear()
+        _consultas_lentas.clear()
+
+
+# ==================== REGISTRO EN LA APP ====================
+
+def _configurar_registro_lentas(app):
+    """consultas_lentas.log rotativo, escrito por el hilo de logs; no se repite en app.log"""
+    if registro_consultas_lentas.handlers:
+        return
+    directorio = app.config.get('LOGS_DIRECTORIO') or os.path.join(app.root_path, 'logs')
+    os.makedirs(directorio, exist_ok=True)
+    manejador = ManejadorRotativo(os.path.join(directorio, 'consultas_lentas.log'),
+                                  int(app.config.get('LOGS_MAXIMO_MB', 10) * 1024 * 1024),
+                                  app.config.get('LOGS_ROTACION_HORAS', 24) * 3600,
+                                  app.config.get('LOGS_SEGMENTOS', 14))
+    manejador.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+    registro_consultas_lentas.setLevel(logging.WARNING)
+    agregar_manejador(manejador, registro_consultas_lentas)
+
+
+def registrar_instrumentacion(app):
+    """Activa la instrumentación si INSTRUMENTACION está habilitada en la configuración"""
+    if not app.config.get('INSTRUMENTACION'):
+        return
+
+    memoria = app.config.get('INSTRUMENTACION_MEMORIA', True)
+    umbral_lenta_ms = app.config.get('INSTRUMENTACION_CONSULTA_LENTA_MS', 200)
+    token = app.config.get('INSTRUMENTACION_TOKEN')
+    if memoria and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    _configurar_registro_lentas(app)
+    event.listen(Engine, 'before_cursor_execute', _antes_de_consulta)
+    event.listen(Engine, 'after_cursor_execute', _despues_de_consulta)
+    before_render_template.connect(_antes_de_plantilla, app)
+    template_rendered.connect(_plantilla_renderizada, app)
+
+    @app.before_request
+    def _iniciar_medicion():
+        if request.endpoint in ENDPOINTS_EXCLUIDOS:
+            return
+        if memoria:
+            tracemalloc.reset_peak()
+        g.instrumentacion = {
+            'inicio': time.perf_counter(),
+            'memoria_inicial': tracemalloc.get_traced_memory()[0] if memoria else None,
+            'consultas': 0,
+            'tiempo_sql': 0.0,
+            'tiempo_plantillas': 0.0,
+            'plantillas': [],
+            'lentas': 0,
+            'umbral_lenta_ms': umbral_lenta_ms,
+            'cerrada': False,
+        }
+
+    @app.after_request
+    def _cerrar_medicion(response):
+        medicion = g.get('instrumentacion')
+        if medicion is None:
+            return response
+        endpoint = request.endpoint or 'sin_endpoint'
+
+        # Se cierra al terminar de enviar el cuerpo: incluye las respuestas que se generan en partes
+        def finalizar():
+            medicion['cerrada'] = True
+            medicion['duracion'] = time.perf_counter() - medicion['inicio']
+            if medicion['memoria_inicial'] is not None:
+                medicion['memoria_pico'] = max(0, tracemalloc.get_traced_memory()[1] - medicion['memoria_inicial'])
+            _registrar(endpoint, response.status_code, medicion)
+
+        response.call_on_close(finalizar)
+        return response
+
+    def metricas():
+        # Como el resto de /admin: solo administradores, o el scraper con el token
+        if not (token and request.headers.get('Authorization') == f'Bearer {token}'):
+            if not current_user.is_authenticated:
+                abort(401)
+            if current_user.rol != 'admin':
+                abort(403)
+        return Response(exportar_prometheus(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+    app.add_url_rule('/admin/metrics', 'metricas', metricas)
@@ -0,0 +1,684 @@
+"""
+Log de la aplicación (logs/app.log) y consola de logs (/logs)
+- ManejadorRotativo rota por tamaño (LOGS_MAXIMO_MB) y por tiempo (LOGS_ROTACION_HORAS) y
+  comprime los segmentos viejos: app.log.1.gz (el más reciente) ... app.log.<LOGS_SEGMENTOS>.gz.
+- Una entrada empieza con "fecha [NIVEL]"; las líneas siguientes sin fecha (tracebacks,
+  banners) son parte de la misma entrada.
+- ultimas() lee hacia atrás desde el final por bloques: cuesta lo mismo con un log de 1 MB
+  que con uno de 1 GB.
+- buscar() filtra por nivel, texto y rango de fechas en el servidor. IndiceLog guarda por cada
+  bloque de ~256 KB su offset, la fecha de su primera entrada y los niveles que contiene, y así
+  se saltan los bloques que no pueden coincidir; se extiende solo con lo agregado al archivo.
+- Lo nuevo se publica por Socket.IO a la sala 'logs': un solo hilo mira el tamaño del archivo
+  cada segundo y lee solo lo agregado, sin importar cuántas pestañas estén abiertas.
+- Los requests no escriben en disco: ColaLogs (QueueHandler) deja el registro en una cola
+  acotada (LOGS_COLA) y EscritorLogs (QueueListener) lo escribe desde un único hilo, volcando
+  al disco por lotes. Si el disco se traba y la cola se llena, los registros se descartan y
+  se cuentan en lugar de frenar al request.
+- Con LOGS_FORMATO='json' cada registro es una línea JSON con fecha, nivel, mensaje y, dentro
+  de un request, request_id, usuario, ruta y (al terminar) status y duracion_ms.
+"""
+import os
+import re
+import gzip
+import json
+import time
+import uuid
+import queue
+import atexit
+import shutil
+import logging
+import threading
+from collections import deque, Counter
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from flask import jsonify, request, abort, render_template, g, has_request_context
+from flask_login import login_required, current_user
+from flask_socketio import join_room
+from tiempo_real import socketio, participantes, emitir
+
+ARCHIVO = 'app.log'
+FORMATO = '%(asctime)s [%(levelname)s] %(message)s'
+NIVELES = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+# Inicio de una entrada: "2025-10-23 15:27:15,469 [INFO]" o '{"fecha": "2025-10-23 15:27:15,469", "nivel": "INFO"'
+PATRON_ENTRADA = re.compile(
+    rb'^(?:\{"fecha": ")?(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),\d{3}(?: \[|", "nivel": ")([A-Z]+)[\]"]', re.M)
+CAMPOS_SOLICITUD = ('request_id', 'usuario', 'metodo', 'ruta', 'status', 'duracion_ms')
+PATRON_FECHA = re.compile(r'^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2})?)?$')
+BLOQUE_LECTURA = 64 * 1024
+BLOQUE_INDICE = 256 * 1024
+MAXIMO_ENTRADAS = 5000
+SALA_LOGS = 'logs'
+INTERVALO_SEGUIMIENTO = 1.0  # segundos
+
+registro = logging.getLogger(__name__)
+registro_solicitudes = logging.getLogger('solicitudes')
+
+
+# ==================== ROTACIÓN ====================
+
+def _comprimir(origen, destino):
+    with open(origen, 'rb') as entrada, gzip.open(destino, 'wb') as salida:
+        shutil.copyfileobj(entrada, salida, BLOQUE_INDICE)
+    os.remove(origen)
+
+
+def _fecha_inicial(ruta):
+    """Momento de la primera entrada del archivo (o ahora si está vacío)"""
+    try:
+        with open(ruta, 'rb') as archivo:
+            coincidencia = PATRON_ENTRADA.match(archivo.read(64))
+        if coincidencia:
+            return time.mktime(time.strptime(coincidencia.group(1).decode(), '%Y-%m-%d %H:%M:%S'))
+    except OSError:
+        pass
+    return time.time()
+
+
+class ManejadorRotativo(RotatingFileHandler):
+    """Rota al superar maxBytes o al cumplirse el intervalo; los segmentos viejos quedan en gzip"""
+
+    def __init__(self, ruta, maximo_bytes, intervalo_segundos, segmentos):
+        super().__init__(ruta, maxBytes=maximo_bytes, backupCount=segmentos, encoding='utf-8')
+        self.namer = lambda nombre: f'{nombre}.gz'
+        self.rotator = _comprimir
+        self.intervalo = intervalo_segundos
+        self._proximo_corte = _fecha_inicial(ruta) + intervalo_segundos
+        self.por_lotes = False  # Lo activa EscritorLogs, que llama a volcar() por lote
+        self.rotar_pendiente = False
+
+    def _open(self):
+        stream = super()._open()
+        # Tamaño llevado en memoria: seek()/tell() vaciarían el buffer en cada registro
+        self._tamanio = os.fstat(stream.fileno()).st_size
+        return stream
+
+    def flush(self):
+        if not self.por_lotes:
+            super().flush()
+
+    def volcar(self):
+        super().flush()
+
+    def solicitar_rotacion(self):
+        """Rota al escribir el próximo registro: con cola, la compresión la hace el hilo escritor"""
+        self.rotar_pendiente = True
+
+    def _debe_rotar(self, largo):
+        if self.rotar_pendiente and self._tamanio > 0:
+            return True
+        if self.intervalo and time.time() >= self._proximo_corte:
+            if self._tamanio > 0:
+                return True
+            self._proximo_corte = time.time() + self.intervalo
+        return 0 < self.maxBytes <= self._tamanio + largo and self._tamanio > 0
+
+    def shouldRollover(self, record):
+        return self._debe_rotar(len(self.format(record)) + 1)
+
+    def emit(self, record):
+        try:
+            mensaje = self.format(record) + self.terminator
+            if self._debe_rotar(len(mensaje)):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(mensaje)
+            self._tamanio += len(mensaje)  # Caracteres, no bytes: alcanza para decidir la rotación
+            self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def doRollover(self):
+        self.rotar_pendiente = False
+        super().doRollover()
+        self._proximo_corte = time.time() + self.intervalo
+
+
+# ==================== ESCRITURA EN SEGUNDO PLANO ====================
+
+class ContextoSolicitud(logging.Filter):
+    """Copia al registro los datos del request en el hilo que loguea (el escritor no los tiene)"""
+
+    def filter(self, record):
+        if has_request_context() and not hasattr(record, 'request_id'):
+            record.request_id = g.get('request_id')
+            record.metodo = request.method
+            record.ruta = request.url_rule.rule if request.url_rule else request.path
+            # El usuario ya cargado por Flask-Login; nunca se consulta la base desde un log
+            usuario = g.get('_login_user')
+            record.usuario = getattr(usuario, 'id', None)
+        return True
+
+
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por registro; fecha y nivel primero (PATRON_ENTRADA los lee al principio)"""
+
+    def format(self, record):
+        datos = {'fecha': self.formatTime(record), 'nivel': record.levelname,
+                 'mensaje': record.getMessage(), 'logger': record.name}
+        for campo in CAMPOS_SOLICITUD:
+            valor = getattr(record, campo, None)
+            if valor is not None:
+                datos[campo] = valor
+        if record.exc_info:
+            datos['excepcion'] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class ColaLogs(QueueHandler):
+    """
+    Encola sin esperar nunca; con la cola llena el registro se descarta y se cuenta.
+    El último 10% de la cola queda para WARNING y superiores: lo primero que se pierde es INFO.
+    """
+
+    def __init__(self, capacidad):
+        super().__init__(queue.Queue(capacidad))
+        self.capacidad = capacidad
+        self.limite_informativos = capacidad - max(1, capacidad // 10)
+        self.descartados = Counter()
+        self._lock_descartes = threading.Lock()
+        self.setFormatter(logging.Formatter('%(message)s'))
+        self.addFilter(ContextoSolicitud())
+
+    def enqueue(self, record):
+        try:
+            if record.levelno < logging.WARNING and self.queue.qsize() >= self.limite_informativos:
+                raise queue.Full
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock_descartes:
+                self.descartados[record.levelname] += 1
+
+
+class EscritorLogs(QueueListener):
+    """Único hilo que escribe; vuelca al disco cada `lote` registros o cuando la cola se vacía"""
+
+    def __init__(self, cola, lote, *manejadores):
+        super().__init__(cola.queue, *manejadores, respect_handler_level=True)
+        self.cola = cola
+        self.lote = lote
+        self.escritos = 0
+        self.lotes = 0
+        self.descartes_avisados = 0
+        self._sin_volcar = 0
+
+    def handle(self, record):
+        self._despachar(self.prepare(record))
+        self.escritos += 1
+        self._sin_volcar += 1
+        if self._sin_volcar >= self.lote or self.queue.empty():
+            self.volcar()
+
+    def volcar(self):
+        for manejador in self.handlers:
+            manejador.acquire()
+            try:
+                # flush() de ManejadorRotativo no hace nada con por_lotes: el volcado es este
+                if isinstance(manejador, ManejadorRotativo):
+                    manejador.volcar()
+                else:
+                    manejador.flush()
+            finally:
+                manejador.release()
+        self._sin_volcar = 0
+        self.lotes += 1
+        self._avisar_descartes()
+
+    def _avisar_descartes(self):
+        descartados = sum(self.cola.descartados.values())
+        if descartados > self.descartes_avisados:
+            aviso = registro.makeRecord(registro.name, logging.WARNING, __file__, 0,
+                                        '[LOGS] %d registros descartados: la cola de escritura estaba llena',
+                                        (descartados - self.descartes_avisados,), None)
+            self.descartes_avisados = descartados
+            self._despachar(aviso)
+
+    def _despachar(self, record):
+        """Los loggers con destino propio (agregar_manejador con registro) solo van a ese destino"""
+        dedicados = {getattr(manejador, 'registro_dedicado', None) for manejador in self.handlers}
+        destino = record.name if record.name in dedicados else None
+        for manejador in self.handlers:
+            if getattr(manejador, 'registro_dedicado', None) == destino and record.levelno >= manejador.level:
+                manejador.handle(record)
+
+    def agregar(self, manejador):
+        """Suma un destino (p. ej. la consola en app_https.py); lo usa el mismo hilo escritor"""
+        if isinstance(manejador, ManejadorRotativo):
+            manejador.por_lotes = True
+        self.handlers = (*self.handlers, manejador)
+
+    def estadisticas(self):
+        return {'en_cola': self.queue.qsize(), 'capacidad': self.cola.capacidad, 'escritos': self.escritos,
+                'lotes': self.lotes, 'descartados': dict(self.cola.descartados)}
+
+
+_escritura = {'cola': None, 'escritor': None, 'manejador': None, 'dedicados': []}
+
+
+def escritor():
+    return _escritura['escritor']
+
+
+def agregar_manejador(manejador, registro=None):
+    """
+    Agrega un destino de logs sin escribir desde los requests (o directo si no hay cola).
+    Con `registro` (un logger), el destino recibe solo ese logger y sus registros no van a app.log.
+    """
+    if registro is not None:
+        registro.propagate = False
+        manejador.registro_dedicado = registro.name
+    if _escritura['escritor'] is not None:
+        _escritura['escritor'].agregar(manejador)
+        if registro is not None and _escritura['cola'] not in registro.handlers:
+            registro.addHandler(_escritura['cola'])
+    elif registro is not None:
+        # Directo hasta que arranque el escritor (_iniciar_escritura lo pasa a la cola)
+        registro.addHandler(manejador)
+        _escritura['dedicados'].append((registro, manejador))
+    else:
+        logging.getLogger().addHandler(manejador)
+
+
+def _iniciar_escritura(app, manejador):
+    raiz = logging.getLogger()
+    if app.config.get('LOGS_ESCRITURA', 'cola') != 'cola':
+        manejador.addFilter(ContextoSolicitud())
+        raiz.addHandler(manejador)
+        return
+    manejador.por_lotes = True
+    cola = ColaLogs(app.config.get('LOGS_COLA', 10000))
+    _escritura['cola'] = cola
+    _escritura['escritor'] = EscritorLogs(cola, app.config.get('LOGS_LOTE', 256), manejador)
+    _escritura['escritor'].start()
+    # Lo que quede en la cola se escribe al salir (antes de logging.shutdown, que se registró antes)
+    atexit.register(_escritura['escritor'].stop)
+    raiz.addHandler(cola)
+    for registro_dedicado, dedicado in _escritura['dedicados']:
+        registro_dedicado.removeHandler(dedicado)
+        agregar_manejador(dedicado, registro_dedicado)
+    _escritura['dedicados'].clear()
+
+
+def _registrar_solicitudes(app):
+    """request_id por request (o el X-Request-ID recibido) y un registro con status y duración"""
+
+    @app.before_request
+    def _iniciar_solicitud():
+        recibido = request.headers.get('X-Request-ID', '')
+        g.request_id = recibido[:64] if recibido.isprintable() and recibido else uuid.uuid4().hex[:16]
+        g.inicio_solicitud = time.perf_counter()
+
+    @app.after_request
+    def _terminar_solicitud(response):
+        request_id = g.get('request_id')
+        if request_id:
+            response.headers['X-Request-ID'] = request_id
+            if request.endpoint != 'static' and app.config.get('LOGS_SOLICITUDES', True):
+                duracion = round((time.perf_counter() - g.inicio_solicitud) * 1000, 2)
+                registro_solicitudes.info('%s %s %s %.2f ms', request.method, request.path, response.status_code,
+                                          duracion, extra={'status': response.status_code, 'duracion_ms': duracion})
+        return response
+
+
+def segmentos(directorio):
+    """Archivos del log del más nuevo al más viejo"""
+    rutas = [os.path.join(directorio, ARCHIVO)]
+    numero = 1
+    while os.path.exists(os.path.join(directorio, f'{ARCHIVO}.{numero}.gz')):
+        rutas.append(os.path.join(directorio, f'{ARCHIVO}.{numero}.gz'))
+        numero += 1
+    return rutas
+
+
+# ==================== LECTURA ====================
+
+def _entradas(datos):
+    """Divide bytes en entradas: una línea con fecha y nivel más sus líneas de continuación"""
+    inicios = [m.start() for m in PATRON_ENTRADA.finditer(datos)]
+    if not inicios or inicios[0] != 0:
+        inicios.insert(0, 0)
+    return [datos[a:b].rstrip(b'\r\n') for a, b in zip(inicios, inicios[1:] + [len(datos)]) if datos[a:b].strip()]
+
+
+def _legible(entrada):
+    """Las líneas JSON se muestran como el formato de texto, con los datos del request al final"""
+    texto = entrada.decode('utf-8', 'replace')
+    if not texto.startswith('{'):
+        return texto
+    try:
+        datos = json.loads(texto)
+    except ValueError:
+        return texto
+    extra = ' '.join(f'{campo}={datos[campo]}' for campo in CAMPOS_SOLICITUD if campo in datos)
+    texto = f"{datos.get('fecha')} [{datos.get('nivel')}] {datos.get('mensaje')}"
+    if extra:
+        texto += f'  ({extra})'
+    if datos.get('excepcion'):
+        texto += '\n' + datos['excepcion']
+    return texto
+
+
+def _texto(entradas):
+    return [_legible(entrada) for entrada in entradas]
+
+
+def ultimas(ruta, cantidad):
+    """Últimas `cantidad` entradas leyendo desde el final. Devuelve (entradas, offset del final)"""
+    try:
+        archivo = open(ruta, 'rb')
+    except FileNotFoundError:
+        return [], 0
+    with archivo:
+        fin = archivo.seek(0, os.SEEK_END)
+        posicion = fin
+        datos = b''
+        while posicion > 0:
+            leer = min(BLOQUE_LECTURA, posicion)
+            posicion -= leer
+            archivo.seek(posicion)
+            datos = archivo.read(leer) + datos
+            # Con una entrada de más, la más vieja de las pedidas está completa
+            if len(PATRON_ENTRADA.findall(datos)) > cantidad:
+                break
+    entradas = _entradas(datos)
+    if posicion > 0 and entradas and not PATRON_ENTRADA.match(entradas[0]):
+        entradas = entradas[1:]
+    return entradas[-cantidad:], fin
+
+
+def identidad_archivo(ruta):
+    """Identifica el archivo activo: cambia cuando rota, aunque el nombre sea el mismo"""
+    try:
+        estado = os.stat(ruta)
+    except FileNotFoundError:
+        return None
+    return f'{estado.st_dev}-{estado.st_ino}'
+
+
+def leer_desde(ruta, offset):
+    """Entradas completas agregadas desde offset. Devuelve (entradas, nuevo offset)"""
+    with open(ruta, 'rb') as archivo:
+        archivo.seek(offset)
+        datos = archivo.read()
+    # Solo líneas completas: lo que sigue se lee en la próxima vuelta
+    corte = datos.rfind(b'\n') + 1
+    return _entradas(datos[:corte]), offset + corte
+
+
+# ==================== BÚSQUEDA ====================
+
+class Filtro:
+    def __init__(self, nivel=None, texto=None, desde=None, hasta=None):
+        self.nivel = nivel.encode() if nivel else None
+        self.texto = texto.lower().encode() if texto else None
+        self.desde = desde.encode() if desde else None
+        self.hasta = hasta.encode() if hasta else None
+
+    def descarta_rango(self, fecha_inicial, fecha_final, niveles):
+        """True si ninguna entrada con esas fechas y niveles puede coincidir"""
+        return bool((self.hasta and fecha_inicial and fecha_inicial > self.hasta)
+                    or (self.desde and fecha_final and fecha_final < self.desde)
+                    or (self.nivel and niveles is not None and self.nivel not in niveles))
+
+    def coincide(self, entrada):
+        if self.nivel or self.desde or self.hasta:
+            coincidencia = PATRON_ENTRADA.match(entrada)
+            if coincidencia is None:
+                return False
+            fecha, nivel = coincidencia.groups()
+            if ((self.nivel and nivel != self.nivel) or (self.desde and fecha < self.desde)
+                    or (self.hasta and fecha > self.hasta)):
+                return False
+        return not self.texto or self.texto in entrada.lower()
+
+    def filtrar(self, datos):
+        if self.texto and self.texto not in datos.lower():
+            return []
+        return [entrada for entrada in _entradas(datos) if self.coincide(entrada)]
+
+
+def _resumen(datos):
+    """(fecha de la primera entrada, fecha de la última, niveles presentes)"""
+    coincidencias = PATRON_ENTRADA.findall(datos)
+    if not coincidencias:
+        return None, None, set()
+    return coincidencias[0][0], coincidencias[-1][0], {nivel for _, nivel in coincidencias}
+
+
+class IndiceLog:
+    """Índice del archivo activo: [offset, fecha inicial, fecha final, niveles] por bloque"""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.bloques = []
+        self.fin = 0  # Hasta dónde está indexado (siempre al inicio de una entrada)
+        self.identidad = None
+        self._lock = threading.Lock()
+
+    def actualizar(self):
+        """Indexa lo agregado desde la última vez; vuelve a empezar si el archivo rotó"""
+        with self._lock:
+            try:
+                estado = os.stat(self.ruta)
+            except FileNotFoundError:
+                self.bloques, self.fin, self.identidad = [], 0, None
+                return 0
+            identidad = (estado.st_dev, estado.st_ino)
+            if identidad != self.identidad or estado.st_size < self.fin:
+                self.bloques, self.fin, self.identidad = [], 0, identidad
+
+            with open(self.ruta, 'rb') as archivo:
+                archivo.seek(self.fin)
+                pendiente = b''
+                while True:
+                    datos = archivo.read(BLOQUE_INDICE)
+                    if not datos:
+                        break
+                    pendiente += datos
+                    inicios = [m.start() for m in PATRON_ENTRADA.finditer(pendiente)]
+                    # El bloque termina donde empieza la última entrada: esa puede seguir creciendo
+                    corte = inicios[-1] if inicios and inicios[-1] > 0 else 0
+                    if corte == 0:
+                        continue
+                    self.bloques.append([self.fin, *_resumen(pendiente[:corte])])
+                    self.fin += corte
+                    pendiente = pendiente[corte:]
+            return estado.st_size
+
+    def buscar(self, filtro, limite):
+        """Coincidencias del archivo activo de la más nueva a la más vieja (como mucho `limite`)"""
+        tamanio = self.actualizar()
+        with self._lock:
+            bloques = list(self.bloques)
+            fin = self.fin
+        resultado = []
+        with open(self.ruta, 'rb') as archivo:
+            # Lo que aún no está indexado (la última entrada)
+            archivo.seek(fin)
+            resultado += reversed(filtro.filtrar(archivo.read(max(0, tamanio - fin))))
+            finales = [bloque[0] for bloque in bloques[1:]] + [fin]
+            for (offset, fecha_inicial, fecha_final, niveles), final in zip(reversed(bloques), reversed(finales)):
+                if len(resultado) >= limite:
+                    break
+                if filtro.desde and fecha_final and fecha_final < filtro.desde:
+                    break  # Los bloques anteriores son todavía más viejos
+                if filtro.descarta_rango(fecha_inicial, fecha_final, niveles):
+                    continue
+                archivo.seek(offset)
+                resultado += reversed(filtro.filtrar(archivo.read(final - offset)))
+        return resultado[:limite]
+
+
+_resumenes_gz = {}
+
+
+def _resumen_gz(ruta):
+    """Fechas y niveles de un segmento comprimido (no cambia: se calcula una vez)"""
+    estado = os.stat(ruta)
+    clave = (ruta, estado.st_mtime, estado.st_size)
+    if clave not in _resumenes_gz:
+        fecha_inicial, fecha_final, niveles = None, None, set()
+        with gzip.open(ruta, 'rb') as archivo:
+            for bloque in iter(lambda: archivo.read(BLOQUE_INDICE), b''):
+                inicial, final, presentes = _resumen(bloque)
+                fecha_inicial = fecha_inicial or inicial
+                fecha_final = final or fecha_final
+                niveles |= presentes
+        if len(_resumenes_gz) > 100:
+            _resumenes_gz.clear()
+        _resumenes_gz[clave] = (fecha_inicial, fecha_final, niveles)
+    return _resumenes_gz[clave]
+
+
+def _buscar_gz(ruta, filtro, limite):
+    if filtro.descarta_rango(*_resumen_gz(ruta)):
+        return []
+    ultimas_coincidencias = deque(maxlen=limite)
+    pendiente = b''
+    with gzip.open(ruta, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(BLOQUE_INDICE), b''):
+            pendiente += bloque
+            inicios = [m.start() for m in PATRON_ENTRADA.finditer(pendiente)]
+            corte = inicios[-1] if inicios and inicios[-1] > 0 else 0
+            if corte:
+                ultimas_coincidencias.extend(filtro.filtrar(pendiente[:corte]))
+                pendiente = pendiente[corte:]
+    ultimas_coincidencias.extend(filtro.filtrar(pendiente))
+    return list(reversed(ultimas_coincidencias))
+
+
+def buscar(indice, directorio, filtro, limite):
+    """Entradas que cumplen el filtro, las `limite` más recientes, en orden cronológico"""
+    resultado = indice.buscar(filtro, limite) if os.path.exists(indice.ruta) else []
+    for ruta in segmentos(directorio)[1:]:
+        if len(resultado) >= limite:
+            break
+        fecha_final = _resumen_gz(ruta)[1]
+        if filtro.desde and fecha_final and fecha_final < filtro.desde:
+            break  # Los segmentos siguientes son todavía más viejos
+        resultado += _buscar_gz(ruta, filtro, limite - len(resultado))
+    return list(reversed(resultado[:limite]))
+
+
+# ==================== SEGUIMIENTO EN VIVO ====================
+
+def _seguir(ruta):
+    """Publica en la sala 'logs' las entradas nuevas; sin suscriptores solo consulta el tamaño"""
+    offset, identidad, arrancando = 0, None, True
+    while True:
+        try:
+            estado = os.stat(ruta)
+            if (estado.st_dev, estado.st_ino) != identidad or estado.st_size < offset:
+                # Rotó: el archivo nuevo se lee desde el principio (salvo al arrancar)
+                offset = estado.st_size if arrancando else 0
+                identidad = (estado.st_dev, estado.st_ino)
+            arrancando = False
+            if estado.st_size > offset:
+                if participantes(SALA_LOGS):
+                    desde = offset
+                    entradas, offset = leer_desde(ruta, offset)
+                    if entradas:
+                        emitir('logs', {'entradas': _texto(entradas), 'desde': desde, 'offset': offset,
+                                        'archivo': f'{identidad[0]}-{identidad[1]}'}, sala=SALA_LOGS)
+                else:
+                    offset = estado.st_size
+        except FileNotFoundError:
+            offset, identidad = 0, None
+        except Exception:
+            registro.exception('Error siguiendo el log')
+        time.sleep(INTERVALO_SEGUIMIENTO)
+
+
+# ==================== REGISTRO EN LA APP ====================
+
+def _solo_admin():
+    if current_user.rol != 'admin':
+        abort(403)
+
+
+def _fecha(valor, fin_del_dia=False):
+    """'2025-10-23', '2025-10-23T15:27' o '2025-10-23 15:27:15' -> 'YYYY-MM-DD HH:MM:SS'"""
+    valor = (valor or '').strip()
+    if not valor:
+        return None
+    if not PATRON_FECHA.match(valor):
+        raise ValueError(f'Fecha inválida: {valor}')
+    valor = valor.replace('T', ' ')
+    relleno = ' 23:59:59' if fin_del_dia else ' 00:00:00'
+    return valor + relleno[len(valor) - 10:]
+
+
+def registrar_logs(app):
+    directorio = app.config.get('LOGS_DIRECTORIO') or os.path.join(app.root_path, 'logs')
+    os.makedirs(directorio, exist_ok=True)
+    ruta = os.path.join(directorio, ARCHIVO)
+
+    raiz = logging.getLogger()
+    manejador = _escritura.get('manejador')
+    if manejador is None:
+        manejador = ManejadorRotativo(ruta, int(app.config.get('LOGS_MAXIMO_MB', 10) * 1024 * 1024),
+                                      app.config.get('LOGS_ROTACION_HORAS', 24) * 3600,
+                                      app.config.get('LOGS_SEGMENTOS', 14))
+        formato = app.config.get('LOGS_FORMATO', 'json')
+        manejador.setFormatter(FormatoJSON() if formato == 'json' else logging.Formatter(FORMATO))
+        _escritura['manejador'] = manejador
+        _iniciar_escritura(app, manejador)
+        if raiz.getEffectiveLevel() > logging.INFO:
+            raiz.setLevel(logging.INFO)
+    _registrar_solicitudes(app)
+
+    estado = {'indice': IndiceLog(ruta), 'seguidor': None}
+    app.extensions['logs'] = estado
+
+    @app.route('/logs')
+    @login_required
+    def logs():
+        _solo_admin()
+        return render_template('logs.html')
+
+    @app.route('/api/logs')
+    @login_required
+    def api_logs():
+        """Sin filtros: las últimas `cantidad` entradas. Con nivel, q, desde o hasta: búsqueda en el servidor"""
+        _solo_admin()
+        cantidad = min(max(request.args.get('cantidad', 100, type=int), 1), MAXIMO_ENTRADAS)
+        nivel = request.args.get('nivel', '').upper() or None
+        if nivel and nivel not in NIVELES:
+            return jsonify({'error': f'Nivel inválido: {nivel}'}), 400
+        try:
+            desde = _fecha(request.args.get('desde'))
+            hasta = _fecha(request.args.get('hasta'), fin_del_dia=True)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        texto = request.args.get('q', '').strip() or None
+
+        filtrado = any((nivel, texto, desde, hasta))
+        if filtrado:
+            entradas = buscar(estado['indice'], directorio, Filtro(nivel, texto, desde, hasta), cantidad)
+            offset = os.path.getsize(ruta) if os.path.exists(ruta) else 0
+        else:
+            entradas, offset = ultimas(ruta, cantidad)
+        return jsonify({'logs': _texto(entradas), 'total': len(entradas), 'offset': offset,
+                        'archivo': identidad_archivo(ruta), 'filtrado': filtrado,
+                        'escritura': escritor().estadisticas() if escritor() else None})
+
+    @app.route('/api/logs/limpiar', methods=['POST'])
+    @login_required
+    def limpiar_logs():
+        """Empieza un archivo nuevo; el anterior queda comprimido como app.log.1.gz"""
+        _solo_admin()
+        manejador.solicitar_rotacion()
+        registro.info('[LOGS] Logs rotados por usuario: %s', current_user.nombre_completo)
+        return jsonify({'success': True})
+
+    @socketio.on('suscribir_logs')
+    def _suscribir_logs(datos=None):
+        if not current_user.is_authenticated or current_user.rol != 'admin':
+            return False
+        join_room(SALA_LOGS)
+        if estado['seguidor'] is None:
+            estado['seguidor'] = threading.Thread(target=_seguir, args=(ruta,), name='seguidor-logs', daemon=True)
+            estado['seguidor'].start()
+        return True
@@ -0,0 +1,186 @@
+"""
+Métricas del dashboard
+- Los conteos diarios por producto (movimientos_diarios) se actualizan de forma
+  incremental al escribir cada Movimiento, en la misma transacción.
+- Los demás agregados (totales, bajo stock, valor del inventario) no son incrementales:
+  se recalculan completos en _calcular, que corre solo cuando se invalidó la caché.
+  La caché vive en memoria y se invalida al confirmar cualquier cambio en productos,
+  categorías o movimientos (con un TTL corto como respaldo cuando hay varios workers).
+  El stock cambia también por UPDATE directos (servicio_stock), así que mantener estos
+  totales por deltas obligaría a tocar cada camino de escritura.
+"""
+import time
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import event, func, desc, delete, insert, select
+from models import db, Producto, Categoria, Movimiento, MovimientoDiario
+
+VENTANA_TOP_DIAS = 30
+TTL_SEGUNDOS = 30
+
+_MODELOS_OBSERVADOS = (Producto, Categoria, Movimiento)
+
+_bloqueo = threading.Lock()
+_cache = {'version': -1, 'calculado': 0.0, 'datos': None}
+_version = 0
+
+
+def invalidar():
+    global _version
+    with _bloqueo:
+        _version += 1
+
+
+# ==================== RESUMEN DIARIO ====================
+
+def _sentencia_upsert(dialecto):
+    if dialecto == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as insert_dialecto
+    else:
+        from sqlalchemy.dialects.sqlite import insert as insert_dialecto
+
+    stmt = insert_dialecto(MovimientoDiario.__table__)
+    return stmt.on_conflict_do_update(
+        index_elements=['producto_id', 'fecha'],
+        set_={'total_movimientos': MovimientoDiario.__table__.c.total_movimientos + stmt.excluded.total_movimientos}
+    )
+
+
+def acumular_movimientos(conexion, movimientos):
+    """
+    Suma los movimientos recién escritos al resumen diario.
+    movimientos: iterable de (producto_id, fecha_movimiento)
+    """
+    conteos = {}
+    for producto_id, fecha in movimientos:
+        clave = (producto_id, (fecha or datetime.utcnow()).date())
+        conteos[clave] = conteos.get(clave, 0) + 1
+
+    if not conteos:
+        return
+
+    filas = [
+        {'producto_id': producto_id, 'fecha': fecha, 'total_movimientos': total}
+        for (producto_id, fecha), total in conteos.items()
+    ]
+    conexion.execute(_sentencia_upsert(conexion.dialect.name), filas)
+
+
+def reconstruir_resumen():
+    """Recalcula movimientos_diarios desde cero a partir de la tabla movimientos"""
+    fecha = func.date(Movimiento.fecha_movimiento)
+    db.session.execute(delete(MovimientoDiario))
+    db.session.execute(
+        insert(MovimientoDiario).from_select(
+            ['producto_id', 'fecha', 'total_movimientos'],
+            select(Movimiento.producto_id, fecha, func.count(Movimiento.id))
+            .group_by(Movimiento.producto_id, fecha)
+        )
+    )
+    db.session.commit()
+    invalidar()
+
+
+# ==================== EVENTOS DE SESIÓN ====================
+
+@event.listens_for(db.session, 'after_flush')
+def _despues_de_flush(session, flush_context):
+    nuevos = [obj for obj in session.new if isinstance(obj, Movimiento)]
+    if nuevos:
+        acumular_movimientos(session.connection(), ((m.producto_id, m.fecha_movimiento) for m in nuevos))
+
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _MODELOS_OBSERVADOS):
+            session.info['metricas_pendientes'] = True
+            break
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def _al_ejecutar(orm_execute_state):
+    # UPDATE/INSERT/DELETE ejecutados directamente (ej. servicio_stock)
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in _MODELOS_OBSERVADOS:
+        orm_execute_state.session.info['metricas_pendientes'] = True
+
+
+@event.listens_for(db.session, 'after_commit')
+def _despues_de_commit(session):
+    if session.info.pop('metricas_pendientes', False):
+        invalidar()
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _despues_de_rollback(session):
+    session.info.pop('metricas_pendientes', None)
+
+
+# ==================== CÁLCULO ====================
+
+def _calcular():
+    total_productos = Producto.query.filter_by(activo=True).count()
+    total_categorias = Categoria.query.filter_by(activo=True).count()
+
+    filtro_bajo_stock = (Producto.activo == True, Producto.stock_actual <= Producto.stock_minimo)
+    total_bajo_stock = Producto.query.filter(*filtro_bajo_stock).count()
+    productos_bajo_stock = [
+        {
+            'id': p.id,
+            'codigo': p.codigo,
+            'nombre': p.nombre,
+            'stock_actual': p.stock_actual,
+            'stock_minimo': p.stock_minimo,
+            'unidad_medida': p.unidad_medida
+        }
+        for p in Producto.query.filter(*filtro_bajo_stock).order_by(Producto.stock_actual).limit(5)
+    ]
+
+    valor_total = db.session.query(func.sum(Producto.stock_actual * Producto.precio_unitario)).filter(
+        Producto.activo == True
+    ).scalar() or 0
+
+    # Productos más movidos en la ventana móvil: se agrega primero el resumen diario
+    # (índice por fecha) y luego se buscan los nombres de los 5 primeros
+    desde = datetime.utcnow().date() - timedelta(days=VENTANA_TOP_DIAS - 1)
+    top = (
+        select(MovimientoDiario.producto_id, func.sum(MovimientoDiario.total_movimientos).label('total_movimientos'))
+        .where(MovimientoDiario.fecha >= desde)
+        .group_by(MovimientoDiario.producto_id)
+        .order_by(desc('total_movimientos'))
+        .limit(5)
+        .subquery()
+    )
+    productos_top = [
+        (nombre, cantidad)
+        for nombre, cantidad in db.session.query(Producto.nombre, top.c.total_movimientos)
+        .join(top, top.c.producto_id == Producto.id)
+        .order_by(desc(top.c.total_movimientos))
+    ]
+
+    return {
+        'total_productos': total_productos,
+        'total_categorias': total_categorias,
+        'total_bajo_stock': total_bajo_stock,
+        'productos_bajo_stock': productos_bajo_stock,
+        'valor_total': valor_total,
+        'productos_top': productos_top
+    }
+
+
+def obtener_metricas():
+    """Devuelve los agregados del dashboard, recalculándolos solo si cambió algo"""
+    ahora = time.monotonic()
+    with _bloqueo:
+        version = _version
+        if (_cache['datos'] is not None and _cache['version'] == version
+                and ahora - _cache['calculado'] < TTL_SEGUNDOS):
+            return _cache['datos']
+
+    datos = _calcular()
+
+    with _bloqueo:
+        # Si hubo una invalidación mientras se calculaba, no guardar datos viejos
+        if _version == version:
+            _cache.update(version=version, calculado=ahora, datos=datos)
+    return datos
@@ -1,9 +1,30 @@
+from flask import g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import inspect
+from flask_sqlalchemy.session import Session
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 
-db = SQLAlchemy()
+# Bind de la réplica de lectura (ver replica_lectura.py)
+BIND_LECTURA = 'lectura'
+
+
+class SesionEnrutada(Session):
+    """
+    Sesión que envía las lecturas de las vistas @solo_lectura a la réplica (bind 'lectura').
+    Los flush y las sentencias INSERT/UPDATE/DELETE siempre van a la base principal.
+    """
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and has_request_context() and g.get('usar_replica')
+                and not self._flushing and not getattr(clause, 'is_dml', False)):
+            replica = self._db.engines.get(BIND_LECTURA)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={'class_': SesionEnrutada})
 
 class Usuario(UserMixin, db.Model):
     __tablename__ = 'usuarios'
@@ -47,6 +68,22 @@ class Categoria(db.Model):
 
 class Producto(db.Model):
     __tablename__ = 'productos'
+    __table_args__ = (
+        # Listados de productos activos ordenados por nombre (con y sin filtro de categoría)
+        db.Index('ix_productos_activo_nombre', 'activo', 'nombre', 'id'),
+        db.Index('ix_productos_categoria_nombre', 'categoria_id', 'nombre', 'id'),
+        # Stock bajo: índice parcial, solo contiene los productos que necesitan reposición
+        db.Index('ix_productos_stock_bajo', 'activo', 'nombre',
+                 sqlite_where=db.text('stock_actual <= stock_minimo'),
+                 postgresql_where=db.text('stock_actual <= stock_minimo')),
+        # Valor total del inventario (SUM(stock * precio)) resuelto solo con el índice
+        db.Index('ix_productos_valorizado', 'activo', 'stock_actual', 'precio_unitario'),
+        # Totales del inventario valorizado agrupados por ubicación (cubre la consulta)
+        db.Index('ix_productos_ubicacion_valorizado', 'activo', 'ubicacion', 'stock_actual', 'precio_unitario'),
+        # Búsqueda por prefijo de código (LIKE 'CAT-UBI-%') en PostgreSQL
+        db.Index('ix_productos_codigo_patron', 'codigo',
+                 postgresql_ops={'codigo': 'text_pattern_ops'}).ddl_if(dialect='postgresql'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     codigo = db.Column(db.String(50), unique=True, nullable=False)
@@ -84,7 +121,7 @@ class ProductoModelo(db.Model):
     __tablename__ = 'producto_modelos'
     
     id = db.Column(db.Integer, primary_key=True)
-    producto_id = db.Column(db.Integer, db.ForeignKey('productos.id'), nullable=False)
+    producto_id = db.Column(db.Integer, db.ForeignKey('productos.id'), nullable=False, index=True)
     nombre_modelo = db.Column(db.String(100), nullable=False)
     codigo_modelo = db.Column(db.String(50))  # Código específico del modelo
     descripcion = db.Column(db.Text)
@@ -107,7 +144,7 @@ class ProductoColor(db.Model):
     __tablename__ = 'producto_colores'
     
     id = db.Column(db.Integer, primary_key=True)
-    modelo_id = db.Column(db.Integer, db.ForeignKey('producto_modelos.id'), nullable=False)
+    modelo_id = db.Column(db.Integer, db.ForeignKey('producto_modelos.id'), nullable=False, index=True)
     nombre_color = db.Column(db.String(50), nullable=False)
     codigo_color = db.Column(db.String(20))  # Código hexadecimal o referencia
     stock_actual = db.Column(db.Float, default=0)
@@ -122,7 +159,7 @@ class ProductoCaracteristica(db.Model):
     __tablename__ = 'producto_caracteristicas'
     
     id = db.Column(db.Integer, primary_key=True)
-    producto_id = db.Column(db.Integer, db.ForeignKey('productos.id'), nullable=False)
+    producto_id = db.Column(db.Integer, db.ForeignKey('productos.id'), nullable=False, index=True)
     nombre = db.Column(db.String(100), nullable=False)  # Ej: "Talla", "Material", "Voltaje"
     valor = db.Column(db.String(200), nullable=False)  # Ej: "XL", "Acero", "220V"
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
@@ -133,6 +170,12 @@ class ProductoCaracteristica(db.Model):
 
 class Movimiento(db.Model):
     __tablename__ = 'movimientos'
+    __table_args__ = (
+        # (fecha, id) también sirven a la paginación por cursor
+        db.Index('ix_movimientos_fecha', 'fecha_movimiento', 'id'),
+        db.Index('ix_movimientos_producto_fecha', 'producto_id', 'fecha_movimiento'),
+        db.Index('ix_movimientos_tipo_fecha', 'tipo_movimiento', 'fecha_movimiento', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     producto_id = db.Column(db.Integer, db.ForeignKey('productos.id'), nullable=False)
@@ -150,3 +193,316 @@ class Movimiento(db.Model):
     
     def __repr__(self):
         return f'<Movimiento {self.tipo_movimiento} - {self.cantidad}>'
+
+
+# Resumen incremental de movimientos por producto y día (lo mantiene metricas_dashboard.py)
+class MovimientoDiario(db.Model):
+    __tablename__ = 'movimientos_diarios'
+    __table_args__ = (
+        db.Index('ix_movimientos_diarios_fecha', 'fecha'),
+    )
+    
+    producto_id = db.Column(db.Integer, db.ForeignKey('productos.id'), primary_key=True)
+    fecha = db.Column(db.Date, primary_key=True)
+    total_movimientos = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<MovimientoDiario {self.producto_id} {self.fecha}: {self.total_movimientos}>'
+
+
+# Stock de cada producto, modelo y color al cierre de un día (lo mantiene historico_stock.py).
+# Filas de producto: modelo_id y color_id nulos; de modelo: color_id nulo.
+# modelo_id/color_id sin FK para conservar el histórico de variantes eliminadas.
+class StockSnapshot(db.Model):
+    __tablename__ = 'stock_snapshot'
+    __table_args__ = (
+        db.Index('ix_stock_snapshot_fecha_producto', 'fecha', 'producto_id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    fecha = db.Column(db.Date, nullable=False)
+    producto_id = db.Column(db.Integer, db.ForeignKey('productos.id'), nullable=False)
+    modelo_id = db.Column(db.Integer)
+    color_id = db.Column(db.Integer)
+    stock = db.Column(db.Float, nullable=False, default=0)
+    precio_unitario = db.Column(db.Float, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<StockSnapshot {self.fecha} producto={self.producto_id}: {self.stock}>'
+
+
+# Último número de código asignado por (categoría, ubicación) (lo mantiene secuencias_codigo.py).
+# categoria = Categoria.codigo, ubicacion = código de 3 letras; la secuencia de los códigos
+# de categoría usa ambas claves vacías.
+class SecuenciaCodigo(db.Model):
+    __tablename__ = 'code_sequences'
+
+    categoria = db.Column(db.String(3), primary_key=True)
+    ubicacion = db.Column(db.String(3), primary_key=True)
+    ultimo = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<SecuenciaCodigo {self.categoria}-{self.ubicacion}: {self.ultimo}>'
+
+
+class Cliente(db.Model):
+    __tablename__ = 'cliente'
+    __table_args__ = (
+        # Listado de clientes activos por nombre (/api/clientes)
+        db.Index('ix_cliente_activo_nombre', 'activo', 'nombre'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    nombre = db.Column(db.String(200), nullable=False)
+    rfc = db.Column(db.String(13), unique=True)  # RUC
+    direccion = db.Column(db.String(300))
+    ubigeo = db.Column(db.String(10))
+    distrito = db.Column(db.String(100))
+    provincia = db.Column(db.String(100))
+    departamento = db.Column(db.String(100))
+    estado = db.Column(db.String(50))  # ACTIVO, BAJA... (SUNAT)
+    condicion = db.Column(db.String(50))  # HABIDO, NO HABIDO... (SUNAT)
+    es_agente_retencion = db.Column(db.Boolean, default=False)
+    es_buen_contribuyente = db.Column(db.Boolean, default=False)
+    fecha_registro = db.Column(db.DateTime, default=datetime.utcnow)
+    activo = db.Column(db.Boolean, default=True)
+
+    locales_anexos = db.relationship('LocalAnexo', backref='cliente', lazy=True, cascade='all, delete-orphan')
+
+    def __repr__(self):
+        return f'<Cliente {self.rfc} - {self.nombre}>'
+
+
+class LocalAnexo(db.Model):
+    __tablename__ = 'local_anexo'
+
+    id = db.Column(db.Integer, primary_key=True)
+    cliente_id = db.Column(db.Integer, db.ForeignKey('cliente.id'), nullable=False, index=True)
+    direccion = db.Column(db.String(300))
+    ubigeo = db.Column(db.String(10))
+    distrito = db.Column(db.String(100))
+    provincia = db.Column(db.String(100))
+    departamento = db.Column(db.String(100))
+    fecha_registro = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<LocalAnexo {self.cliente_id}: {self.direccion}>'
+
+
+# Última respuesta de la API de RUC por número (la mantiene consulta_ruc.py).
+# encontrado=False guarda las respuestas "no existe" para no repetirlas.
+class ConsultaRuc(db.Model):
+    __tablename__ = 'ruc_cache'
+    __table_args__ = (
+        db.Index('ix_ruc_cache_fecha', 'fecha_consulta'),
+    )
+
+    ruc = db.Column(db.String(11), primary_key=True)
+    encontrado = db.Column(db.Boolean, nullable=False)
+    datos = db.Column(db.JSON)
+    fecha_consulta = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ConsultaRuc {self.ruc}: {self.encontrado}>'
+
+
+# Trabajo en segundo plano (lo ejecuta trabajos.py).
+# estado: pendiente, ejecutando, reintentando, completado, fallido.
+# fecha_actualizacion sirve de latido: un trabajo "ejecutando" sin latido se da por abandonado.
+class Trabajo(db.Model):
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        # El despachador busca los trabajos listos para ejecutar
+        db.Index('ix_jobs_estado_proximo', 'estado', 'proximo_intento'),
+        # Limpieza de los trabajos terminados hace más de TRABAJOS_RETENCION_HORAS
+        db.Index('ix_jobs_estado_fin', 'estado', 'fecha_fin'),
+        db.Index('ix_jobs_usuario_fecha', 'usuario_id', 'fecha_creacion'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    tipo = db.Column(db.String(50), nullable=False)
+    estado = db.Column(db.String(20), nullable=False, default='pendiente')
+    parametros = db.Column(db.JSON)
+    progreso = db.Column(db.Float, nullable=False, default=0)  # 0 a 100
+    mensaje = db.Column(db.String(200))
+    resultado = db.Column(db.JSON)
+    resultado_ruta = db.Column(db.String(500))  # Archivo generado (ver TRABAJOS_DIRECTORIO)
+    error = db.Column(db.Text)
+    intentos = db.Column(db.Integer, nullable=False, default=0)
+    max_intentos = db.Column(db.Integer, nullable=False, default=3)
+    proximo_intento = db.Column(db.DateTime, default=datetime.utcnow)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'))
+    fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
+    fecha_inicio = db.Column(db.DateTime)
+    fecha_fin = db.Column(db.DateTime)
+    fecha_actualizacion = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<Trabajo {self.id} {self.tipo}: {self.estado}>'
+
+
+# Fotos de una orden de trabajo (ver fotos_recojo.py). Los archivos se guardan una sola vez
+# por contenido (hash_contenido) y los comparten las filas con la misma foto.
+# estado: procesando (aún se sirve el original subido), lista, error.
+class FotoRecojo(db.Model):
+    __tablename__ = 'foto_recojo'
+    __table_args__ = (
+        db.Index('ix_foto_recojo_orden_hash', 'orden_id', 'hash_contenido'),
+        db.Index('ix_foto_recojo_hash', 'hash_contenido'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    orden_id = db.Column(db.Integer, nullable=False)
+    nombre_archivo = db.Column(db.String(255), nullable=False)
+    ruta_archivo = db.Column(db.String(500), nullable=False)  # Relativa a FOTOS_DIRECTORIO
+    ruta_miniatura = db.Column(db.String(500))
+    hash_contenido = db.Column(db.String(64), nullable=False)  # SHA-256 del archivo subido
+    estado = db.Column(db.String(20), nullable=False, default='procesando')
+    ancho = db.Column(db.Integer)
+    alto = db.Column(db.Integer)
+    tamanio_bytes = db.Column(db.Integer)
+    tamanio_original = db.Column(db.Integer)
+    fecha_captura = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<FotoRecojo {self.orden_id}: {self.nombre_archivo}>'
+
+
+class FotoGuiaRecojo(db.Model):
+    __tablename__ = 'foto_guia_recojo'
+    __table_args__ = (
+        db.Index('ix_foto_guia_recojo_orden_hash', 'orden_id', 'hash_contenido'),
+        db.Index('ix_foto_guia_recojo_hash', 'hash_contenido'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    orden_id = db.Column(db.Integer, nullable=False)
+    nombre_archivo = db.Column(db.String(255), nullable=False)
+    ruta_archivo = db.Column(db.String(500), nullable=False)
+    ruta_miniatura = db.Column(db.String(500))
+    hash_contenido = db.Column(db.String(64), nullable=False)
+    estado = db.Column(db.String(20), nullable=False, default='procesando')
+    ancho = db.Column(db.Integer)
+    alto = db.Column(db.Integer)
+    tamanio_bytes = db.Column(db.Integer)
+    tamanio_original = db.Column(db.Integer)
+    fecha_captura = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<FotoGuiaRecojo {self.orden_id}: {self.nombre_archivo}>'
+
+
+# Subida de una foto por partes (ver fotos_recojo.py). Las partes se agregan al archivo
+# FOTOS_DIRECTORIO/subidas/<id>.parte; su tamaño es el offset desde el que se reanuda.
+# estado: abierta, finalizada.
+class SubidaFoto(db.Model):
+    __tablename__ = 'subidas_foto'
+    __table_args__ = (
+        # Limpieza de las subidas abandonadas
+        db.Index('ix_subidas_foto_actualizacion', 'fecha_actualizacion'),
+    )
+
+    id = db.Column(db.String(32), primary_key=True)
+    orden_id = db.Column(db.Integer, nullable=False)
+    clase = db.Column(db.String(20), nullable=False)  # fotos o fotos-guia
+    nombre_archivo = db.Column(db.String(255))
+    tamanio = db.Column(db.Integer, nullable=False)
+    recibidos = db.Column(db.Integer, nullable=False, default=0)
+    sha256 = db.Column(db.String(64))  # Del archivo completo: declarado (se verifica) o calculado al finalizar
+    estado = db.Column(db.String(20), nullable=False, default='abierta')
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'))
+    fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
+    fecha_actualizacion = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<SubidaFoto {self.id}: {self.recibidos}/{self.tamanio}>'
+
+
+# Extintor de una orden de trabajo. El detalle de la orden lo edita con autoguardado por lotes
+# (ver autoguardado_ordenes.py); version sube con cada cambio aplicado y un cambio hecho sobre
+# una versión vieja se rechaza.
+class ExtintorOrden(db.Model):
+    __tablename__ = 'orden_extintores'
+    __table_args__ = (
+        db.Index('ix_orden_extintores_orden', 'orden_id', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    orden_id = db.Column(db.Integer, nullable=False)
+    serie = db.Column(db.String(100))
+    tipo = db.Column(db.String(50))
+    capacidad = db.Column(db.String(50))
+    marca = db.Column(db.String(100))
+    fecha_recarga = db.Column(db.String(30))  # Como se muestra: "Enero-2025"
+    vencimiento_recarga = db.Column(db.String(30))
+    observaciones = db.Column(db.Text)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'))  # Último que lo modificó
+    fecha_actualizacion = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ExtintorOrden {self.orden_id}/{self.id} v{self.version}>'
+
+
+# Clave de idempotencia de un autoguardado: un reintento con la misma clave devuelve la
+# respuesta guardada sin volver a aplicar los cambios. huella es el SHA-256 del pedido.
+class ClaveIdempotencia(db.Model):
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        # Limpieza de las claves vencidas
+        db.Index('ix_idempotency_keys_fecha', 'fecha_creacion'),
+    )
+
+    clave = db.Column(db.String(64), primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'))
+    huella = db.Column(db.String(64), nullable=False)
+    respuesta = db.Column(db.JSON)
+    fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ClaveIdempotencia {self.clave}>'
+
+
+# Filas tocadas por cada transacción en las tablas seguidas por registro_cambios.py. El id es
+# el cursor de ?since= y la base del ETag. Se poda a CAMBIOS_RETENCION_HORAS (conservando la
+# última fila de cada tabla); un cursor anterior a lo podado tiene que recargar todo.
+class RegistroCambio(db.Model):
+    __tablename__ = 'registro_cambios'
+    __table_args__ = (
+        # Cambios de una tabla posteriores a un cursor y último id de cada tabla
+        db.Index('ix_registro_cambios_tabla_id', 'tabla', 'id'),
+        # Cambios de una orden (grupo) posteriores a un cursor
+        db.Index('ix_registro_cambios_tabla_grupo_id', 'tabla', 'grupo_id', 'id'),
+        # Poda del historial vencido
+        db.Index('ix_registro_cambios_fecha', 'fecha'),
+    )
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    tabla = db.Column(db.String(50), nullable=False)
+    fila_id = db.Column(db.Integer, nullable=False)
+    grupo_id = db.Column(db.Integer)  # Fila padre, para filtrar por ella (orden_id en orden_extintores)
+    fecha = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<RegistroCambio {self.id} {self.tabla}: {self.fila_id}>'
+
+
+def crear_columnas():
+    """Agrega las columnas que admiten NULL y falten en tablas existentes (create_all no las agrega)"""
+    inspector = inspect(db.engine)
+    for tabla in db.metadata.sorted_tables:
+        if not inspector.has_table(tabla.name):
+            continue
+        existentes = {columna['name'] for columna in inspector.get_columns(tabla.name)}
+        for columna in tabla.columns:
+            if columna.name not in existentes and columna.nullable and columna.server_default is None:
+                tipo = columna.type.compile(dialect=db.engine.dialect)
+                with db.engine.begin() as conexion:
+                    conexion.exec_driver_sql(f'ALTER TABLE {tabla.name} ADD COLUMN {columna.name} {tipo}')
+
+
+def crear_indices():
+    """Crea los índices declarados que falten (create_all no los agrega a tablas existentes)"""
+    for tabla in db.metadata.sorted_tables:
+        for indice in tabla.indexes:
+            indice.create(db.engine, checkfirst=True)
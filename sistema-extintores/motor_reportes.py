@@ -0,0 +1,365 @@
+"""
+Motor de reportes de inventario (valorizado y stock bajo)
+- Los totales se calculan en SQL, agrupados por categoría y por ubicación.
+- Las filas se leen con yield_per y se envían en partes (HTML, CSV, XLSX o PDF),
+  así la memoria no crece con el tamaño del catálogo.
+- Con fecha, el stock y el precio salen de historico_stock.as_of (cierre de ese día).
+- exportar() escribe el reporte a un archivo informando el avance (lo usan los trabajos
+  en segundo plano, ver trabajos.py).
+"""
+import io
+import os
+import csv
+import tempfile
+from itertools import islice
+from datetime import datetime
+from flask import Response, stream_template, stream_with_context
+from sqlalchemy import select, func, case
+from models import db, Producto, Categoria
+from historico_stock import as_of
+
+FORMATOS = ('html', 'csv', 'xlsx', 'pdf')
+MIMETYPES = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'pdf': 'application/pdf',
+}
+FILAS_POR_LOTE = 1000
+BYTES_POR_PARTE = 64 * 1024
+FILAS_POR_TABLA_PDF = 40
+
+
+def _estado_stock(fila):
+    return 'Agotado' if fila.stock_actual == 0 else 'Bajo'
+
+
+REPORTES = {
+    'valorizado': {
+        'titulo': 'Inventario Valorizado',
+        'plantilla': 'reporte_valorizado.html',
+        'filtro': lambda stock: (Producto.activo == True,),
+        'columnas': [
+            ('Código', lambda f: f.codigo),
+            ('Producto', lambda f: f.nombre),
+            ('Categoría', lambda f: f.categoria),
+            ('Ubicación', lambda f: f.ubicacion or ''),
+            ('Stock Actual', lambda f: f.stock_actual),
+            ('Unidad', lambda f: f.unidad_medida),
+            ('Precio Unit.', lambda f: round(f.precio_unitario or 0, 2)),
+            ('Valor Total', lambda f: round(f.valor_total or 0, 2)),
+        ],
+    },
+    'stock-bajo': {
+        'titulo': 'Reporte de Stock Bajo',
+        'plantilla': 'reporte_stock_bajo.html',
+        'filtro': lambda stock: (Producto.activo == True, stock <= Producto.stock_minimo),
+        'columnas': [
+            ('Código', lambda f: f.codigo),
+            ('Producto', lambda f: f.nombre),
+            ('Categoría', lambda f: f.categoria),
+            ('Stock Actual', lambda f: f.stock_actual),
+            ('Stock Mínimo', lambda f: f.stock_minimo),
+            ('Diferencia', lambda f: f.stock_minimo - f.stock_actual),
+            ('Unidad', lambda f: f.unidad_medida),
+            ('Estado', _estado_stock),
+            ('Ubicación', lambda f: f.ubicacion or ''),
+        ],
+    },
+}
+
+
+# ==================== CONSULTAS ====================
+
+class _Origen:
+    """Columnas de stock y precio: actuales, o reconstruidas al cierre de una fecha"""
+
+    def __init__(self, fecha=None):
+        self.fecha = fecha
+        self.historico = as_of(fecha) if fecha else None
+        if self.historico is None:
+            self.stock, self.precio = Producto.stock_actual, Producto.precio_unitario
+        else:
+            self.stock, self.precio = self.historico.c.stock, self.historico.c.precio_unitario
+        self.valor = func.coalesce(self.stock, 0) * func.coalesce(self.precio, 0)
+
+    def unir(self, consulta):
+        if self.historico is None:
+            return consulta
+        return consulta.join(self.historico, self.historico.c.producto_id == Producto.id)
+
+
+def filas(reporte, origen=None):
+    """Generador de filas del reporte, leídas de la base de datos por lotes"""
+    origen = origen or _Origen()
+    definicion = REPORTES[reporte]
+    consulta = origen.unir(
+        select(
+            Producto.id, Producto.codigo, Producto.nombre, Categoria.nombre.label('categoria'),
+            Producto.ubicacion, Producto.unidad_medida, origen.stock.label('stock_actual'), Producto.stock_minimo,
+            origen.precio.label('precio_unitario'), origen.valor.label('valor_total')
+        )
+        .join(Categoria, Categoria.id == Producto.categoria_id)
+    ).where(
+        *definicion['filtro'](origen.stock)
+    ).order_by(Producto.nombre, Producto.id).execution_options(yield_per=FILAS_POR_LOTE)
+    yield from db.session.execute(consulta)
+
+
+def resumen(reporte, origen=None):
+    """Totales calculados en SQL: general, por categoría y por ubicación"""
+    origen = origen or _Origen()
+    filtro = REPORTES[reporte]['filtro'](origen.stock)
+    valor = origen.valor
+
+    total_productos, agotados, total_general = db.session.execute(
+        origen.unir(select(
+            func.count(Producto.id),
+            func.coalesce(func.sum(case((origen.stock == 0, 1), else_=0)), 0),
+            func.coalesce(func.sum(valor), 0)
+        ).select_from(Producto)).where(*filtro)
+    ).one()
+
+    por_categoria = db.session.execute(
+        origen.unir(
+            select(Categoria.nombre, func.count(Producto.id), func.coalesce(func.sum(valor), 0))
+            .select_from(Producto)
+            .join(Categoria, Categoria.id == Producto.categoria_id)
+        )
+        .where(*filtro)
+        .group_by(Categoria.id, Categoria.nombre)
+        .order_by(Categoria.nombre)
+    ).all()
+
+    por_ubicacion = db.session.execute(
+        origen.unir(
+            select(Producto.ubicacion, func.count(Producto.id), func.coalesce(func.sum(valor), 0))
+            .select_from(Producto)
+        )
+        .where(*filtro)
+        .group_by(Producto.ubicacion)
+        .order_by(Producto.ubicacion)
+    ).all()
+
+    return {
+        'total_productos': total_productos,
+        'agotados': agotados,
+        'total_general': total_general,
+        'por_categoria': [{'nombre': n, 'productos': c, 'valor': v} for n, c, v in por_categoria],
+        'por_ubicacion': [{'nombre': n or 'Sin ubicación', 'productos': c, 'valor': v} for n, c, v in por_ubicacion],
+    }
+
+
+# ==================== FORMATOS ====================
+
+def _titulo(reporte, origen):
+    titulo = REPORTES[reporte]['titulo']
+    return f'{titulo} al {origen.fecha.strftime("%d/%m/%Y")}' if origen.fecha else titulo
+
+
+def _nombre_archivo(reporte, extension):
+    return f'reporte_{reporte.replace("-", "_")}_{datetime.now().strftime("%Y%m%d_%H%M")}.{extension}'
+
+
+def _adjunto(reporte, extension):
+    return {'Content-Disposition': f'attachment; filename="{_nombre_archivo(reporte, extension)}"'}
+
+
+def _avisar(avance, numero, total):
+    if avance is not None and numero % FILAS_POR_LOTE == 0:
+        avance(numero, total)
+
+
+def _generar_csv(reporte, origen, avance=None, total=None):
+    columnas = REPORTES[reporte]['columnas']
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+
+    buffer.write('﻿')  # BOM para que Excel reconozca UTF-8
+    escritor.writerow(['#'] + [nombre for nombre, _ in columnas])
+    for numero, fila in enumerate(filas(reporte, origen), start=1):
+        escritor.writerow([numero] + [valor(fila) for _, valor in columnas])
+        _avisar(avance, numero, total)
+        if buffer.tell() >= BYTES_POR_PARTE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _enviar_archivo(ruta):
+    """Envía un archivo temporal por partes y lo borra al terminar"""
+    try:
+        with open(ruta, 'rb') as archivo:
+            while True:
+                parte = archivo.read(BYTES_POR_PARTE)
+                if not parte:
+                    break
+                yield parte
+    finally:
+        os.remove(ruta)
+
+
+def _archivo_temporal(extension):
+    descriptor, ruta = tempfile.mkstemp(suffix=f'.{extension}')
+    os.close(descriptor)
+    return ruta
+
+
+def _escribir_xlsx(reporte, origen, ruta, avance=None):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    definicion = REPORTES[reporte]
+    columnas = definicion['columnas']
+    datos = resumen(reporte, origen)
+
+    # Modo write-only: las filas se vuelcan a disco a medida que se agregan
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet(_titulo(reporte, origen)[:31].replace('/', '-'))
+
+    negrita = Font(bold=True)
+    encabezado = []
+    for titulo in ['#'] + [nombre for nombre, _ in columnas]:
+        celda = WriteOnlyCell(hoja, value=titulo)
+        celda.font = negrita
+        encabezado.append(celda)
+    hoja.append(encabezado)
+
+    for numero, fila in enumerate(filas(reporte, origen), start=1):
+        hoja.append([numero] + [valor(fila) for _, valor in columnas])
+        _avisar(avance, numero, datos['total_productos'])
+
+    hoja.append([])
+    hoja.append(['', 'TOTAL PRODUCTOS', datos['total_productos']])
+    hoja.append(['', 'TOTAL GENERAL', round(datos['total_general'], 2)])
+
+    hoja_resumen = libro.create_sheet('Resumen')
+    hoja_resumen.append(['Categoría', 'Productos', 'Valor'])
+    for grupo in datos['por_categoria']:
+        hoja_resumen.append([grupo['nombre'], grupo['productos'], round(grupo['valor'], 2)])
+    hoja_resumen.append([])
+    hoja_resumen.append(['Ubicación', 'Productos', 'Valor'])
+    for grupo in datos['por_ubicacion']:
+        hoja_resumen.append([grupo['nombre'], grupo['productos'], round(grupo['valor'], 2)])
+
+    libro.save(ruta)
+
+
+def _construir_por_partes(documento, flowables, tamanio=20):
+    """
+    Arma el PDF tomando las flowables del generador de a `tamanio` y pasándolas por
+    handle_flowable, como build() con una lista: nunca están todas las tablas en memoria.
+    """
+    documento._startBuild()
+    while True:
+        pendientes = list(islice(flowables, tamanio))
+        if not pendientes:
+            break
+        while pendientes:
+            documento.clean_hanging()
+            documento.handle_flowable(pendientes)
+    documento._endBuild()
+
+
+def _escribir_pdf(reporte, origen, ruta, avance=None):
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import cm
+    from reportlab.platypus import BaseDocTemplate, PageTemplate, Frame, Table, TableStyle, Paragraph, Spacer
+
+    definicion = REPORTES[reporte]
+    columnas = definicion['columnas']
+    datos = resumen(reporte, origen)
+    estilos = getSampleStyleSheet()
+    encabezado = ['#'] + [nombre for nombre, _ in columnas]
+
+    estilo_tabla = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f8f9fa')),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 7),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ])
+
+    def flowables():
+        yield Paragraph('AB Ingeniería S.A.C', estilos['Title'])
+        yield Paragraph(f'{_titulo(reporte, origen)} - {datetime.now().strftime("%d/%m/%Y %H:%M")}', estilos['Normal'])
+        yield Spacer(1, 0.4 * cm)
+
+        bloque = []
+        for numero, fila in enumerate(filas(reporte, origen), start=1):
+            bloque.append([numero] + [valor(fila) for _, valor in columnas])
+            _avisar(avance, numero, datos['total_productos'])
+            if len(bloque) == FILAS_POR_TABLA_PDF:
+                yield Table([encabezado] + bloque, repeatRows=1, style=estilo_tabla)
+                bloque = []
+        if bloque:
+            yield Table([encabezado] + bloque, repeatRows=1, style=estilo_tabla)
+
+        yield Spacer(1, 0.6 * cm)
+        yield Paragraph(f'Total de productos: {datos["total_productos"]}', estilos['Normal'])
+        yield Paragraph(f'Valor total: S/ {datos["total_general"]:.2f}', estilos['Heading3'])
+        tabla_categorias = [['Categoría', 'Productos', 'Valor']] + [
+            [g['nombre'], g['productos'], f'S/ {g["valor"]:.2f}'] for g in datos['por_categoria']
+        ]
+        yield Table(tabla_categorias, style=estilo_tabla)
+
+    documento = BaseDocTemplate(ruta, pagesize=landscape(A4), title=_titulo(reporte, origen),
+                                leftMargin=1 * cm, rightMargin=1 * cm, topMargin=1 * cm, bottomMargin=1 * cm)
+    marco = Frame(documento.leftMargin, documento.bottomMargin, documento.width, documento.height, id='normal')
+    documento.addPageTemplates([PageTemplate(id='normal', frames=[marco], pagesize=documento.pagesize)])
+    _construir_por_partes(documento, flowables())
+
+
+# ==================== ARCHIVOS ====================
+
+def exportar(reporte, formato, ruta, fecha=None, avance=None):
+    """
+    Escribe el reporte en ruta (csv, xlsx o pdf). avance(filas_escritas, total) se llama
+    cada FILAS_POR_LOTE filas. Devuelve el nombre de descarga y el mimetype.
+    """
+    origen = _Origen(fecha)
+    if formato == 'csv':
+        total = resumen(reporte, origen)['total_productos'] if avance else None
+        with open(ruta, 'w', encoding='utf-8', newline='') as archivo:
+            for parte in _generar_csv(reporte, origen, avance, total):
+                archivo.write(parte)
+    elif formato == 'xlsx':
+        _escribir_xlsx(reporte, origen, ruta, avance)
+    elif formato == 'pdf':
+        _escribir_pdf(reporte, origen, ruta, avance)
+    else:
+        raise ValueError(f'Formato no exportable: {formato}')
+    return {'archivo': _nombre_archivo(reporte, formato), 'mimetype': MIMETYPES[formato]}
+
+
+# ==================== RESPUESTAS HTTP ====================
+
+def responder(reporte, formato='html', fecha=None, **contexto):
+    """Respuesta HTTP en partes para el reporte y formato pedidos (fecha: stock al cierre de ese día)"""
+    origen = _Origen(fecha)
+
+    if formato == 'csv':
+        return Response(stream_with_context(_generar_csv(reporte, origen)), mimetype=MIMETYPES['csv'],
+                        headers=_adjunto(reporte, 'csv'))
+
+    if formato in ('xlsx', 'pdf'):
+        ruta = _archivo_temporal(formato)
+        try:
+            if formato == 'xlsx':
+                _escribir_xlsx(reporte, origen, ruta)
+            else:
+                _escribir_pdf(reporte, origen, ruta)
+        except Exception:
+            os.remove(ruta)
+            raise
+        headers = _adjunto(reporte, formato)
+        headers['Content-Length'] = str(os.path.getsize(ruta))
+        return Response(_enviar_archivo(ruta), mimetype=MIMETYPES[formato], headers=headers)
+
+    definicion = REPORTES[reporte]
+    return Response(stream_template(definicion['plantilla'], productos=filas(reporte, origen),
+                                    resumen=resumen(reporte, origen), fecha=fecha, now=datetime.now(),
+                                    **contexto))
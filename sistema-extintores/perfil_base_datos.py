@@ -0,0 +1,81 @@
+"""
+Perfil del motor de base de datos (Config.PERFIL_BASE_DATOS, ver config.PERFILES_BASE_DATOS)
+- SQLite: aplica los pragmas del perfil a cada conexión nueva (WAL, synchronous, busy_timeout,
+  cache_size, mmap_size, temp_store). La réplica de solo lectura recibe solo los de lectura.
+- PostgreSQL: el pool y los timeouts van en SQLALCHEMY_ENGINE_OPTIONS (se leen al crear el motor).
+- /api/salud: prueba la conexión e informa el perfil y el uso del pool.
+"""
+import time
+from flask import jsonify
+from sqlalchemy import event, text
+from config import PERFILES_BASE_DATOS
+from models import db, BIND_LECTURA
+
+# Pragmas que modifican la base: no se aplican a la conexión de solo lectura
+PRAGMAS_ESCRITURA = ('journal_mode', 'synchronous')
+
+
+def _aplicar_pragmas(motor, pragmas):
+    @event.listens_for(motor, 'connect')
+    def _pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for nombre, valor in pragmas.items():
+            cursor.execute(f'PRAGMA {nombre}={valor}')
+        cursor.close()
+
+
+def estado_pool(motor):
+    """Uso del pool de conexiones (los pools sin tamaño fijo solo informan su tipo)"""
+    pool = motor.pool
+    estado = {'tipo': type(pool).__name__}
+    for clave, metodo in (('tamanio', 'size'), ('libres', 'checkedin'), ('en_uso', 'checkedout'),
+                          ('desborde', 'overflow')):
+        if hasattr(pool, metodo):
+            estado[clave] = getattr(pool, metodo)()
+    if hasattr(pool, '_max_overflow'):
+        estado['desborde_maximo'] = pool._max_overflow
+    return estado
+
+
+def registrar_perfil_base_datos(app):
+    """Aplica el perfil configurado al motor de la app y registra /api/salud"""
+    nombre = app.config.get('PERFIL_BASE_DATOS', 'basico')
+    perfil = PERFILES_BASE_DATOS[nombre]
+
+    with app.app_context():
+        motor = db.engine
+        if perfil['pragmas']:
+            if motor.dialect.name != 'sqlite':
+                raise ValueError(f'El perfil {nombre} es para SQLite y la base es {motor.dialect.name}')
+            _aplicar_pragmas(motor, perfil['pragmas'])
+            replica = db.engines.get(BIND_LECTURA)
+            if replica is not None and replica.dialect.name == 'sqlite':
+                _aplicar_pragmas(replica, {k: v for k, v in perfil['pragmas'].items() if k not in PRAGMAS_ESCRITURA})
+
+    @app.route('/api/salud')
+    def salud():
+        """Prueba la base de datos; sin sesión para que la usen los chequeos del servidor"""
+        motor = db.engine
+        respuesta = {'perfil': nombre, 'motor': motor.dialect.name}
+        inicio = time.perf_counter()
+        try:
+            with motor.connect() as conexion:
+                conexion.execute(text('SELECT 1'))
+                if motor.dialect.name == 'sqlite':
+                    respuesta['pragmas'] = {
+                        pragma: conexion.exec_driver_sql(f'PRAGMA {pragma}').scalar()
+                        for pragma in ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size',
+                                       'temp_store')
+                    }
+            respuesta['estado'] = 'ok'
+            codigo = 200
+        except Exception as e:
+            respuesta['estado'] = 'error'
+            respuesta['error'] = str(e)
+            codigo = 503
+        respuesta['latencia_ms'] = round((time.perf_counter() - inicio) * 1000, 2)
+        respuesta['pool'] = estado_pool(motor)
+        replica = db.engines.get(BIND_LECTURA)
+        if replica is not None:
+            respuesta['pool_lectura'] = estado_pool(replica)
+        return jsonify(respuesta), codigo
@@ -0,0 +1,46 @@
+"""
+Reconciliación de stock por variantes
+Compara el stock de cada modelo con la suma de sus colores activos y el de cada
+producto con la suma de sus modelos activos, e informa el descuadre.
+
+Uso:
+    python reconciliar_stock.py                     # solo informa
+    python reconciliar_stock.py --aplicar --usuario admin
+"""
+import sys
+import argparse
+from app import app
+from models import Usuario
+from servicio_stock import reconciliar_variantes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reconciliar stock de productos y modelos con sus variantes')
+    parser.add_argument('--aplicar', action='store_true', help='Corregir los totales y registrar los ajustes')
+    parser.add_argument('--usuario', default='admin', help='Usuario que registra los ajustes')
+    args = parser.parse_args()
+
+    with app.app_context():
+        usuario = Usuario.query.filter_by(username=args.usuario).first()
+        if args.aplicar and not usuario:
+            print(f'ERROR: usuario "{args.usuario}" no existe')
+            sys.exit(1)
+
+        descuadres = reconciliar_variantes(usuario.id if usuario else None, aplicar=args.aplicar)
+
+    print('=' * 60)
+    print(f'Modelos descuadrados: {len(descuadres["modelos"])}')
+    for d in descuadres['modelos']:
+        print(f'  Modelo {d["id"]} (producto {d["producto_id"]}): registrado {d["registrado"]}, suma de colores {d["calculado"]}')
+    print(f'Productos descuadrados: {len(descuadres["productos"])}')
+    for d in descuadres['productos']:
+        print(f'  {d["codigo"]}: registrado {d["registrado"]}, suma de modelos {d["calculado"]}')
+    if args.aplicar:
+        print('Totales corregidos')
+    print('=' * 60)
+
+    sys.exit(0 if args.aplicar or not (descuadres['modelos'] or descuadres['productos']) else 1)
+
+
+if __name__ == '__main__':
+    main()
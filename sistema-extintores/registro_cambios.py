@@ -0,0 +1,187 @@
+"""
+Registro de cambios por tabla: ETag/304 y sincronización incremental (?since=)
+- Cada transacción confirmada que toca una tabla seguida deja los ids tocados en
+  registro_cambios. El id de esas filas (autoincremental, sin bloqueos entre transacciones)
+  es el cursor de ?since=.
+- Un id se asigna antes del commit, así que una transacción lenta puede hacerse visible
+  después de otra con un id mayor. Por eso el cursor que se entrega es el último id con más
+  de CAMBIOS_MARGEN_SEGUNDOS ("estable"): todo lo anterior ya está confirmado. Los cambios
+  más nuevos se envían igual y vuelven a llegar en la consulta siguiente; el cliente los
+  aplica por id, repetirlos no cambia nada.
+- con_etag: el ETag sale del último id estable de cada tabla y de cuántas filas hay después
+  (una consulta); si coincide con If-None-Match se responde 304 sin ejecutar la vista.
+- cambios_desde: ids cambiados después de un cursor, opcionalmente solo los de un grupo
+  (grupo_id: la orden de cada extintor, así una orden no recibe los ids de las otras). Si el historial ya se podó
+  (CAMBIOS_RETENCION_HORAS) o cambiaron más de CAMBIOS_MAXIMO_FILAS filas, el cliente
+  recibe 'completo' y recarga todo. La poda corre en el despachador de trabajos.
+Las escrituras por el ORM se detectan solas; las masivas (bulk_insert_mappings, INSERT o
+UPDATE directos) llaman a marcar_cambios. Los productos llegan por difusion_stock (stock_cambiado).
+"""
+import hashlib
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, request, make_response
+from sqlalchemy import event, select, delete, insert, exists, func
+from models import db, Cliente, LocalAnexo, Movimiento, ExtintorOrden, RegistroCambio
+from trabajos import periodica
+
+TABLAS = ('cliente', 'movimientos', 'orden_extintores', 'productos')
+MODELOS = {Cliente: 'cliente', Movimiento: 'movimientos', ExtintorOrden: 'orden_extintores'}
+INTERVALO_PODA = 3600  # segundos
+
+
+class CursorInvalido(Exception):
+    pass
+
+
+def marcar_cambios(session, tabla, ids, grupo_id=None):
+    """Para escrituras que no pasan por el flush del ORM"""
+    ids = set(ids)
+    if not ids:
+        return
+    session.info.setdefault('cambios', {}).setdefault(tabla, {}).update(dict.fromkeys(ids, grupo_id))
+
+
+# ==================== EVENTOS DE SESIÓN ====================
+
+@event.listens_for(db.session, 'after_flush')
+def _despues_de_flush(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        tabla = MODELOS.get(type(obj))
+        if tabla and obj.id is not None:
+            marcar_cambios(session, tabla, (obj.id,), obj.orden_id if isinstance(obj, ExtintorOrden) else None)
+        elif isinstance(obj, LocalAnexo) and obj.cliente_id is not None:
+            # El listado de clientes muestra la cantidad de locales anexos
+            marcar_cambios(session, 'cliente', (obj.cliente_id,))
+
+
+@event.listens_for(db.session, 'before_commit')
+def _antes_de_commit(session):
+    # Los cambios pendientes del ORM pasan por after_flush antes de leer session.info
+    session.flush()
+    cambios = session.info.pop('cambios', {})
+    productos = session.info.get('stock_cambiado')
+    if productos:
+        cambios.setdefault('productos', {}).update(dict.fromkeys(productos))
+    # Un lote sin filas aplicadas no deja nada en el registro ni cambia el ETag
+    cambios = {tabla: ids for tabla, ids in cambios.items() if ids}
+    if not cambios:
+        return
+    ahora = datetime.utcnow()
+    session.execute(insert(RegistroCambio.__table__), [
+        {'tabla': tabla, 'fila_id': fila_id, 'grupo_id': grupo_id, 'fecha': ahora}
+        for tabla in sorted(cambios) for fila_id, grupo_id in cambios[tabla].items()
+    ])
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _despues_de_rollback(session):
+    session.info.pop('cambios', None)
+
+
+@periodica('podar_registro_cambios', INTERVALO_PODA)
+def podar():
+    """Borra el historial vencido; la última fila de cada tabla queda como referencia de los cursores"""
+    limite = datetime.utcnow() - timedelta(hours=current_app.config.get('CAMBIOS_RETENCION_HORAS', 72))
+    for tabla in TABLAS:
+        ultimo = select(func.max(RegistroCambio.id)).where(RegistroCambio.tabla == tabla).scalar_subquery()
+        db.session.execute(delete(RegistroCambio.__table__).where(
+            RegistroCambio.tabla == tabla, RegistroCambio.fecha < limite, RegistroCambio.id < ultimo
+        ))
+
+
+# ==================== LECTURA ====================
+
+def _estable(tabla, limite):
+    """Último id de la tabla anterior al margen (0 si no hay): los anteriores ya son visibles"""
+    return (
+        select(func.coalesce(func.max(RegistroCambio.id), 0))
+        .where(RegistroCambio.tabla == tabla, RegistroCambio.fecha < limite)
+        .scalar_subquery()
+    )
+
+
+def _limite_margen():
+    return datetime.utcnow() - timedelta(seconds=current_app.config.get('CAMBIOS_MARGEN_SEGUNDOS', 60))
+
+
+def versiones(*tablas):
+    """{tabla: (id estable, filas posteriores)} en una consulta"""
+    limite = _limite_margen()
+    columnas = []
+    for tabla in tablas:
+        columnas.append(_estable(tabla, limite))
+        columnas.append(
+            select(func.count()).select_from(RegistroCambio)
+            .where(RegistroCambio.tabla == tabla, RegistroCambio.id > _estable(tabla, limite))
+            .scalar_subquery()
+        )
+    fila = db.session.execute(select(*columnas)).one()
+    return {tabla: (fila[2 * i], fila[2 * i + 1]) for i, tabla in enumerate(tablas)}
+
+
+def _etag(versiones_tablas):
+    """Depende de la ruta con sus parámetros y de las versiones de las tablas"""
+    base = '|'.join([request.full_path, *(f'{tabla}={estable}+{recientes}' for tabla, (estable, recientes) in versiones_tablas.items())])
+    return hashlib.sha1(base.encode()).hexdigest()[:24]
+
+
+def con_etag(*tablas):
+    """
+    Decorador de vistas GET que solo leen `tablas`: ETag fuerte y 304 con If-None-Match.
+    X-Cambios-Version lleva el id estable de la primera tabla, el cursor para ?since=.
+    """
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(*args, **kwargs):
+            actuales = versiones(*tablas)
+            valor = _etag(actuales)
+            if request.if_none_match.contains(valor):
+                respuesta = make_response('', 304)
+            else:
+                respuesta = make_response(vista(*args, **kwargs))
+                if respuesta.status_code != 200:
+                    return respuesta
+            respuesta.set_etag(valor)
+            respuesta.headers['Cache-Control'] = 'private, no-cache'
+            respuesta.headers['X-Cambios-Version'] = str(actuales[tablas[0]][0])
+            return respuesta
+        return envoltura
+    return decorador
+
+
+def cambios_desde(tabla, cursor, grupo_id=None):
+    """(próximo cursor, ids cambiados después de cursor); ids es None si hay que recargar todo"""
+    try:
+        desde = int(cursor)
+    except (TypeError, ValueError):
+        raise CursorInvalido('Cursor de cambios inválido')
+    if desde < 0:
+        raise CursorInvalido('Cursor de cambios inválido')
+
+    estable = _estable(tabla, _limite_margen())
+    ultimo = select(func.max(RegistroCambio.id)).where(RegistroCambio.tabla == tabla).scalar_subquery()
+    # La poda conserva la última fila de cada tabla: si queda alguna hasta el cursor, no se perdió nada después
+    conservado = exists().where(RegistroCambio.tabla == tabla, RegistroCambio.id <= desde)
+    actual, ultimo, conservado = db.session.execute(select(estable, ultimo, conservado)).one()
+    if ultimo is None:
+        # La tabla todavía no cambió; un cursor mayor es de otra base
+        return 0, ([] if desde == 0 else None)
+    if desde > ultimo or not conservado:
+        return actual, None
+
+    maximo = current_app.config.get('CAMBIOS_MAXIMO_FILAS', 2000)
+    consulta = select(RegistroCambio.fila_id).where(RegistroCambio.tabla == tabla, RegistroCambio.id > desde)
+    if grupo_id is not None:
+        consulta = consulta.where(RegistroCambio.grupo_id == grupo_id)
+    ids = db.session.execute(consulta.distinct().limit(maximo + 1)).scalars().all()
+    if len(ids) > maximo:
+        return actual, None
+    return max(actual, desde), ids
+
+
+def respuesta_cambios(version, clave, filas=None, eliminados=()):
+    """Cuerpo de una respuesta ?since=; sin filas, el cliente tiene que recargar todo"""
+    if filas is None:
+        return {'success': True, 'version': version, 'completo': True}
+    return {'success': True, 'version': version, 'completo': False, clave: filas, 'eliminados': sorted(eliminados)}
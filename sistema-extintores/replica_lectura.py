@@ -0,0 +1,59 @@
+"""
+Réplica de lectura para reportes, dashboard y listados
+- DATABASE_URL_LECTURA: URL de una réplica PostgreSQL, o "sqlite-ro" para abrir la misma
+  base SQLite con una conexión de solo lectura (mode=ro; en WAL no bloquea a los escritores).
+- Las vistas marcadas con @solo_lectura leen de la réplica (models.SesionEnrutada);
+  todo lo demás, y cualquier escritura, va a la base principal.
+- Lee tus escrituras: después de un POST/PUT/PATCH/DELETE, las vistas del mismo usuario
+  leen de la principal durante LECTURA_PRIMARIA_SEGUNDOS (el retraso de la réplica).
+"""
+import os
+import time
+from flask import g, request, session
+from sqlalchemy.engine import make_url
+from models import BIND_LECTURA
+
+METODOS_SEGUROS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def solo_lectura(vista):
+    """Marca la vista como de solo lectura: puede leer de la réplica"""
+    vista.solo_lectura = True
+    return vista
+
+
+def _url_sqlite_solo_lectura(app, url_principal):
+    """Misma base SQLite abierta con mode=ro (rutas relativas: carpeta instance, como Flask-SQLAlchemy)"""
+    url = make_url(url_principal)
+    ruta = url.database
+    if not ruta or ruta == ':memory:' or ruta.startswith('file:'):
+        raise ValueError('sqlite-ro requiere una base SQLite en archivo')
+    if not os.path.isabs(ruta):
+        ruta = os.path.join(app.instance_path, ruta)
+    return f'sqlite:///file:{ruta}?mode=ro&uri=true'
+
+
+def configurar_replica_lectura(app):
+    """Agrega el bind de lectura y el enrutamiento por request. Llamar antes de db.init_app"""
+    url = app.config.get('DATABASE_URL_LECTURA')
+    if not url:
+        return
+    if url == 'sqlite-ro':
+        url = _url_sqlite_solo_lectura(app, app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config['SQLALCHEMY_BINDS'] = {**app.config.get('SQLALCHEMY_BINDS', {}), BIND_LECTURA: url}
+    ventana = app.config.get('LECTURA_PRIMARIA_SEGUNDOS', 5)
+
+    @app.before_request
+    def _elegir_base():
+        vista = app.view_functions.get(request.endpoint)
+        g.usar_replica = (
+            getattr(vista, 'solo_lectura', False)
+            and request.method in METODOS_SEGUROS
+            and time.time() >= session.get('_lectura_primaria_hasta', 0)
+        )
+
+    @app.after_request
+    def _fijar_primaria(response):
+        if request.method not in METODOS_SEGUROS:
+            session['_lectura_primaria_hasta'] = time.time() + ventana
+        return response
@@ -0,0 +1,172 @@
+"""
+Secuencias de códigos de productos (CAT-UBI-NNNN) y de categorías (NNN)
+- code_sequences guarda el último número asignado por (categoría, ubicación).
+  Asignar es un único UPDATE ... RETURNING: O(1) y sin duplicados aunque dos usuarios
+  creen productos a la vez (la fila queda bloqueada hasta el commit de quien asigna).
+- La asignación corre en la transacción del llamador: si se revierte, el número se libera.
+- La primera vez que se usa una secuencia se inicializa con el mayor código existente.
+- huecos() informa los números asignados que no corresponden a ningún código.
+"""
+import re
+from sqlalchemy import update, select
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, Producto, Categoria, SecuenciaCodigo
+from consultas import filtro_prefijo
+
+# Mapeo de ubicaciones a códigos de 3 caracteres
+UBICACIONES = {
+    'Oficina': 'OFI',
+    'Almacén': 'ALM',
+    'Taller': 'TAL'
+}
+
+DIGITOS_PRODUCTO = 4
+DIGITOS_CATEGORIA = 3
+
+# Clave de la secuencia de códigos de categoría
+CATEGORIAS = ('', '')
+
+
+def codigo_ubicacion(ubicacion):
+    return UBICACIONES.get(ubicacion, ubicacion[:3].upper())
+
+
+def clave_producto(categoria_codigo, ubicacion):
+    """Clave de la secuencia de productos de una categoría (su código) y ubicación (su nombre)"""
+    return categoria_codigo, codigo_ubicacion(ubicacion)
+
+
+def formatear(clave, numero):
+    """Ej: ('001', 'TAL'), 1 -> 001-TAL-0001; CATEGORIAS, 9 -> 009"""
+    if clave == CATEGORIAS:
+        return f'{numero:0{DIGITOS_CATEGORIA}d}'
+    return f'{clave[0]}-{clave[1]}-{numero:0{DIGITOS_PRODUCTO}d}'
+
+
+# ==================== CÓDIGOS EXISTENTES ====================
+
+def _numeros_existentes(clave):
+    """Números ya usados en códigos de la secuencia (recorre solo el prefijo, vía índice)"""
+    if clave == CATEGORIAS:
+        codigos = db.session.execute(select(Categoria.codigo)).scalars()
+        patron = re.compile(r'^(\d+)$')
+    else:
+        prefijo = formatear(clave, 0)[:-DIGITOS_PRODUCTO]
+        codigos = db.session.execute(
+            select(Producto.codigo).where(filtro_prefijo(Producto.codigo, prefijo))
+        ).scalars()
+        patron = re.compile(r'^' + re.escape(prefijo) + r'(\d+)$')
+    return {int(m.group(1)) for codigo in codigos for m in [patron.match(codigo or '')] if m}
+
+
+def _en_uso(clave, codigo):
+    if clave == CATEGORIAS:
+        return db.session.execute(select(Categoria.id).where(Categoria.codigo == codigo)).first() is not None
+    return db.session.execute(select(Producto.id).where(Producto.codigo == codigo)).first() is not None
+
+
+# ==================== ASIGNACIÓN ====================
+
+def _inicializar(clave):
+    """Crea la secuencia desde el mayor código existente; si otro la creó antes, no hace nada"""
+    ultimo = max(_numeros_existentes(clave), default=0)
+    dialecto = postgresql if db.engine.dialect.name == 'postgresql' else sqlite
+    db.session.execute(
+        dialecto.insert(SecuenciaCodigo)
+        .values(categoria=clave[0], ubicacion=clave[1], ultimo=ultimo)
+        .on_conflict_do_nothing()
+    )
+
+
+def _incrementar(clave, cantidad):
+    stmt = (
+        update(SecuenciaCodigo)
+        .where(SecuenciaCodigo.categoria == clave[0], SecuenciaCodigo.ubicacion == clave[1])
+        .values(ultimo=SecuenciaCodigo.ultimo + cantidad)
+        .returning(SecuenciaCodigo.ultimo)
+    )
+    return db.session.execute(stmt).scalar_one_or_none()
+
+
+def reservar(clave, n=1):
+    """
+    Reserva n números consecutivos de la secuencia en un solo UPDATE (para importaciones).
+    Devuelve la lista de códigos. No hace commit: la reserva vale con la transacción del llamador.
+    """
+    if n < 1:
+        raise ValueError('La cantidad a reservar debe ser positiva')
+    ultimo = _incrementar(clave, n)
+    if ultimo is None:
+        _inicializar(clave)
+        ultimo = _incrementar(clave, n)
+    return [formatear(clave, numero) for numero in range(ultimo - n + 1, ultimo + 1)]
+
+
+def siguiente(clave):
+    """
+    Asigna el siguiente código libre. Si un código se cargó a mano por delante de la
+    secuencia, se salta (queda registrado como hueco si luego se libera).
+    """
+    while True:
+        codigo = reservar(clave)[0]
+        if not _en_uso(clave, codigo):
+            return codigo
+
+
+def _ultimo(clave):
+    return db.session.execute(
+        select(SecuenciaCodigo.ultimo)
+        .where(SecuenciaCodigo.categoria == clave[0], SecuenciaCodigo.ubicacion == clave[1])
+    ).scalar()
+
+
+def proximo(clave):
+    """
+    Código que se asignaría ahora, sin reservarlo (vista previa del formulario).
+    Solo lee: una secuencia que aún no existe se calcula desde los códigos existentes,
+    igual que la inicializaría siguiente() al guardar.
+    """
+    ultimo = _ultimo(clave)
+    if ultimo is None:
+        ultimo = max(_numeros_existentes(clave), default=0)
+    numero = ultimo + 1
+    while _en_uso(clave, formatear(clave, numero)):
+        numero += 1
+    return formatear(clave, numero)
+
+
+# ==================== HUECOS ====================
+
+def _rangos(numeros):
+    """[1, 2, 3, 7, 9, 10] -> [[1, 3], [7, 7], [9, 10]]"""
+    rangos = []
+    for numero in sorted(numeros):
+        if rangos and rangos[-1][1] == numero - 1:
+            rangos[-1][1] = numero
+        else:
+            rangos.append([numero, numero])
+    return rangos
+
+
+def huecos(clave=None):
+    """
+    Números de cada secuencia (1..ultimo) que no corresponden a ningún código: reservas de
+    importaciones no usadas, códigos saltados o anteriores a la secuencia. Recorre cada prefijo.
+    """
+    consulta = select(SecuenciaCodigo).order_by(SecuenciaCodigo.categoria, SecuenciaCodigo.ubicacion)
+    if clave is not None:
+        consulta = consulta.where(SecuenciaCodigo.categoria == clave[0], SecuenciaCodigo.ubicacion == clave[1])
+
+    reporte = []
+    for secuencia in db.session.execute(consulta).scalars():
+        clave_secuencia = (secuencia.categoria, secuencia.ubicacion)
+        usados = _numeros_existentes(clave_secuencia)
+        libres = set(range(1, secuencia.ultimo + 1)) - usados
+        reporte.append({
+            'categoria': secuencia.categoria,
+            'ubicacion': secuencia.ubicacion,
+            'ultimo': formatear(clave_secuencia, secuencia.ultimo) if secuencia.ultimo else None,
+            'total_huecos': len(libres),
+            'huecos': _rangos(libres)
+        })
+    return reporte
@@ -0,0 +1,653 @@
+"""
+Servicio de stock: mutaciones atómicas de Producto.stock_actual
+Cada movimiento se aplica con un único UPDATE condicional en la base de datos
+y registra su Movimiento en la misma transacción.
+Variantes: un movimiento de un color actualiza el color, su modelo y el producto;
+uno de un modelo, el modelo y el producto. El stock del producto (y el del modelo
+con colores) es siempre la suma de sus variantes activas (ver reconciliar_variantes).
+"""
+import csv
+import io
+from datetime import datetime
+from sqlalchemy import update, insert, select, or_, func, exists, bindparam
+from models import db, Producto, ProductoModelo, ProductoColor, Movimiento
+from metricas_dashboard import acumular_movimientos
+from difusion_stock import marcar_productos
+from registro_cambios import marcar_cambios
+
+TIPOS_MOVIMIENTO = ('entrada', 'salida', 'ajuste')
+TOLERANCIA_DESCUADRE = 1e-6
+
+
+class StockError(Exception):
+    """Error base del servicio de stock"""
+
+
+class ProductoNoEncontrado(StockError):
+    pass
+
+
+class StockInsuficiente(StockError):
+    def __init__(self, producto_id, cantidad):
+        self.producto_id = producto_id
+        self.cantidad = cantidad
+        super().__init__(f'Stock insuficiente para el producto {producto_id} (cantidad solicitada: {cantidad})')
+
+
+class ConflictoConcurrencia(StockError):
+    pass
+
+
+class VarianteInvalida(StockError):
+    """El modelo o color no existe, está inactivo o no pertenece al producto"""
+
+
+class VarianteRequerida(StockError):
+    """El producto (o modelo) tiene variantes activas: el movimiento debe indicar cuál"""
+
+
+def _sin_modelos_activos():
+    """Condición para mover el stock del producto directamente: no debe tener modelos activos"""
+    return ~exists().where(ProductoModelo.producto_id == Producto.id, ProductoModelo.activo == True)
+
+
+def _aplicar_delta(fila_id, delta, entidad=Producto, *condiciones):
+    """Suma delta al stock sin permitir que quede negativo. Devuelve el stock nuevo o None"""
+    stock = func.coalesce(entidad.stock_actual, 0)
+    stmt = (
+        update(entidad)
+        .where(entidad.id == fila_id, stock + delta >= 0, *condiciones)
+        .values(stock_actual=stock + delta)
+        .returning(entidad.stock_actual)
+        .execution_options(synchronize_session=False)
+    )
+    return db.session.execute(stmt).scalar()
+
+
+def _fijar_stock(fila_id, stock_esperado, nuevo_stock, entidad=Producto, *condiciones):
+    """Compare-and-swap: fija el stock solo si nadie lo modificó desde la lectura"""
+    stmt = (
+        update(entidad)
+        .where(entidad.id == fila_id, func.coalesce(entidad.stock_actual, 0) == stock_esperado, *condiciones)
+        .values(stock_actual=nuevo_stock)
+        .returning(entidad.id)
+        .execution_options(synchronize_session=False)
+    )
+    return db.session.execute(stmt).scalar() is not None
+
+
+def _fijar_stocks(entidad, cambios):
+    """
+    _fijar_stock de varias filas en un solo UPDATE (executemany): cambios es [(id, esperado, nuevo)].
+    Devuelve False si alguna fila ya no tenía el stock esperado. Sin un rowcount confiable
+    en executemany (psycopg2), va fila por fila.
+    """
+    if not db.engine.dialect.supports_sane_multi_rowcount:
+        return all(_fijar_stock(fila_id, esperado, nuevo, entidad) for fila_id, esperado, nuevo in cambios)
+    tabla = entidad.__table__
+    resultado = db.session.execute(
+        update(tabla)
+        .where(tabla.c.id == bindparam('b_id'), func.coalesce(tabla.c.stock_actual, 0) == bindparam('b_esperado'))
+        .values(stock_actual=bindparam('b_nuevo')),
+        [{'b_id': fila_id, 'b_esperado': esperado, 'b_nuevo': nuevo} for fila_id, esperado, nuevo in cambios]
+    )
+    return resultado.rowcount == len(cambios)
+
+
+def _insertar_movimientos(movimientos):
+    """Inserta los movimientos y deja el id nuevo en cada dict"""
+    if db.engine.dialect.name != 'sqlite':
+        db.session.bulk_insert_mappings(Movimiento, movimientos, return_defaults=True)
+        return
+    # SQLite no garantiza el orden del RETURNING de un INSERT de varias filas y SQLAlchemy cae a
+    # un INSERT por fila: un executemany sin RETURNING. El INSERT deja tomado el bloqueo de
+    # escritura hasta el commit, así que los ids son consecutivos y terminan en el máximo
+    db.session.execute(insert(Movimiento.__table__), movimientos)
+    ultimo = db.session.execute(select(func.max(Movimiento.id))).scalar()
+    for movimiento_id, movimiento in zip(range(ultimo - len(movimientos) + 1, ultimo + 1), movimientos):
+        movimiento['id'] = movimiento_id
+
+
+def _leer_stock(fila_id, entidad=Producto):
+    fila = db.session.execute(
+        select(func.coalesce(entidad.stock_actual, 0)).where(entidad.id == fila_id)
+    ).first()
+    return fila[0] if fila else None
+
+
+def _cadena(producto_id, modelo_id=None, color_id=None):
+    """
+    Filas afectadas por un movimiento, de la variante al producto: [(entidad, id), ...].
+    Valida que la variante pertenezca al producto y que no falte indicar una variante
+    (para el producto sin variante, eso lo comprueba el mismo UPDATE: ver _condiciones).
+    """
+    if color_id is not None:
+        fila = db.session.execute(
+            select(ProductoColor.modelo_id, ProductoModelo.producto_id,
+                   ProductoColor.activo, ProductoModelo.activo.label('modelo_activo'))
+            .join(ProductoModelo, ProductoModelo.id == ProductoColor.modelo_id)
+            .where(ProductoColor.id == color_id)
+        ).first()
+        if (fila is None or not fila.activo or not fila.modelo_activo or fila.producto_id != producto_id
+                or (modelo_id is not None and fila.modelo_id != modelo_id)):
+            raise VarianteInvalida(f'El color {color_id} no corresponde al producto {producto_id}')
+        return [(ProductoColor, color_id), (ProductoModelo, fila.modelo_id), (Producto, producto_id)]
+
+    if modelo_id is not None:
+        fila = db.session.execute(
+            select(ProductoModelo.producto_id, ProductoModelo.activo,
+                   exists().where(ProductoColor.modelo_id == ProductoModelo.id, ProductoColor.activo == True)
+                   .label('tiene_colores'))
+            .where(ProductoModelo.id == modelo_id)
+        ).first()
+        if fila is None or not fila.activo or fila.producto_id != producto_id:
+            raise VarianteInvalida(f'El modelo {modelo_id} no corresponde al producto {producto_id}')
+        if fila.tiene_colores:
+            raise VarianteRequerida(f'El modelo {modelo_id} maneja colores: indica el color del movimiento')
+        return [(ProductoModelo, modelo_id), (Producto, producto_id)]
+
+    return [(Producto, producto_id)]
+
+
+def _condiciones(cadena):
+    """Condiciones extra del UPDATE sobre la primera fila de la cadena"""
+    return (_sin_modelos_activos(),) if len(cadena) == 1 else ()
+
+
+def _error_producto(producto_id, cantidad):
+    """Explica por qué no se pudo mover el stock del producto"""
+    if _leer_stock(producto_id) is None:
+        return ProductoNoEncontrado(f'Producto {producto_id} no encontrado')
+    tiene_modelos = db.session.execute(
+        select(exists().where(ProductoModelo.producto_id == producto_id, ProductoModelo.activo == True))
+    ).scalar()
+    if tiene_modelos:
+        return VarianteRequerida(f'El producto {producto_id} maneja modelos: indica el modelo del movimiento')
+    return StockInsuficiente(producto_id, cantidad)
+
+
+def _id_en_cadena(cadena, entidad):
+    return next((fila_id for e, fila_id in cadena if e is entidad), None)
+
+
+def registrar_movimiento(producto_id, tipo_movimiento, cantidad, usuario_id, motivo=None,
+                         observaciones=None, documento_referencia=None, commit=True,
+                         modelo_id=None, color_id=None):
+    """
+    Registra una entrada o salida de forma atómica (del producto, o de un modelo/color
+    y en cascada de sus padres).
+    Lanza StockInsuficiente si la salida dejaría el stock en negativo.
+    Con commit=False el llamador confirma la transacción (los Producto ya cargados
+    en la sesión se refrescan al hacer commit) y, si hay error, hace rollback.
+    """
+    if tipo_movimiento not in ('entrada', 'salida'):
+        raise ValueError(f'Tipo de movimiento inválido: {tipo_movimiento}')
+    if cantidad <= 0:
+        raise ValueError('La cantidad debe ser mayor a cero')
+
+    delta = cantidad if tipo_movimiento == 'entrada' else -cantidad
+
+    try:
+        cadena = _cadena(producto_id, modelo_id, color_id)
+        for posicion, (entidad, fila_id) in enumerate(cadena):
+            condiciones = _condiciones(cadena) if posicion == 0 else ()
+            stock_nuevo = _aplicar_delta(fila_id, delta, entidad, *condiciones)
+            if stock_nuevo is None:
+                if entidad is Producto:
+                    raise _error_producto(producto_id, cantidad)
+                raise StockInsuficiente(producto_id, cantidad)
+
+        movimiento = Movimiento(
+            producto_id=producto_id,
+            modelo_id=_id_en_cadena(cadena, ProductoModelo),
+            color_id=color_id,
+            usuario_id=usuario_id,
+            tipo_movimiento=tipo_movimiento,
+            cantidad=cantidad,
+            stock_anterior=stock_nuevo - delta,
+            stock_nuevo=stock_nuevo,
+            motivo=motivo,
+            observaciones=observaciones,
+            documento_referencia=documento_referencia
+        )
+        db.session.add(movimiento)
+
+        if commit:
+            db.session.commit()
+    except Exception:
+        if commit:
+            db.session.rollback()
+        raise
+
+    return movimiento
+
+
+def ajustar_stock(producto_id, nuevo_stock, usuario_id, motivo=None, observaciones=None,
+                  commit=True, intentos=5, modelo_id=None, color_id=None):
+    """
+    Fija el stock a un valor absoluto (conteo físico) del producto o de una variante.
+    Usa compare-and-swap sobre el stock leído y reintenta si otro movimiento se adelantó;
+    la diferencia se propaga a los padres de la variante.
+    """
+    if nuevo_stock < 0:
+        raise ValueError('El stock no puede ser negativo')
+
+    try:
+        cadena = _cadena(producto_id, modelo_id, color_id)
+        entidad, fila_id = cadena[0]
+        for _ in range(intentos):
+            anterior = _leer_stock(fila_id, entidad)
+            if anterior is None:
+                raise ProductoNoEncontrado(f'Producto {producto_id} no encontrado')
+            if _fijar_stock(fila_id, anterior, nuevo_stock, entidad, *_condiciones(cadena)):
+                break
+            if entidad is Producto:
+                # El CAS también falla si el producto maneja modelos; si no, se reintenta
+                error = _error_producto(producto_id, 0)
+                if isinstance(error, VarianteRequerida):
+                    raise error
+        else:
+            raise ConflictoConcurrencia(f'No se pudo ajustar el producto {producto_id}: stock modificado concurrentemente')
+
+        delta = nuevo_stock - anterior
+        stock_nuevo = nuevo_stock
+        for entidad, fila_id in cadena[1:]:
+            stock_nuevo = _aplicar_delta(fila_id, delta, entidad)
+            if stock_nuevo is None:
+                # El padre no cuadra con sus variantes (ver reconciliar_variantes)
+                raise ConflictoConcurrencia(f'El stock de {entidad.__tablename__} {fila_id} no cuadra con sus variantes')
+
+        movimiento = Movimiento(
+            producto_id=producto_id,
+            modelo_id=_id_en_cadena(cadena, ProductoModelo),
+            color_id=color_id,
+            usuario_id=usuario_id,
+            tipo_movimiento='ajuste',
+            cantidad=abs(delta),
+            stock_anterior=stock_nuevo - delta,
+            stock_nuevo=stock_nuevo,
+            motivo=motivo,
+            observaciones=observaciones
+        )
+        db.session.add(movimiento)
+
+        if commit:
+            db.session.commit()
+    except Exception:
+        if commit:
+            db.session.rollback()
+        raise
+
+    return movimiento
+
+
+# ==================== CARGA POR LOTES ====================
+
+COLUMNAS_LOTE = ('producto_id', 'codigo', 'modelo_id', 'color_id', 'tipo', 'cantidad', 'nuevo_stock',
+                 'motivo', 'observaciones', 'documento')
+
+
+def leer_lote_csv(texto):
+    """Convierte un CSV con cabecera (ver COLUMNAS_LOTE) en una lista de diccionarios"""
+    lector = csv.DictReader(io.StringIO(texto))
+    lineas = []
+    for fila in lector:
+        lineas.append({(clave or '').strip().lower(): (valor or '').strip() for clave, valor in fila.items()})
+    return lineas
+
+
+def _a_numero(valor, campo):
+    if valor is None or valor == '':
+        raise ValueError(f'Falta el campo {campo}')
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f'{campo} no es un número válido: {valor}')
+
+
+def _a_id(valor, campo):
+    if valor in (None, ''):
+        return None
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f'{campo} inválido: {valor}')
+
+
+def _normalizar_linea(linea):
+    if not isinstance(linea, dict):
+        raise ValueError('Formato de línea inválido')
+
+    tipo = str(linea.get('tipo') or linea.get('tipo_movimiento') or '').strip().lower()
+    if tipo not in TIPOS_MOVIMIENTO:
+        raise ValueError(f'Tipo de movimiento inválido: {tipo or "(vacío)"}')
+
+    producto_id = linea.get('producto_id')
+    codigo = str(linea.get('codigo') or '').strip()
+    if producto_id not in (None, ''):
+        try:
+            producto_id = int(producto_id)
+        except (TypeError, ValueError):
+            raise ValueError(f'producto_id inválido: {producto_id}')
+    elif codigo:
+        producto_id = None
+    else:
+        raise ValueError('Falta producto_id o codigo')
+
+    normalizada = {
+        'producto_id': producto_id,
+        'codigo': codigo,
+        'modelo_id': _a_id(linea.get('modelo_id'), 'modelo_id'),
+        'color_id': _a_id(linea.get('color_id'), 'color_id'),
+        'tipo': tipo,
+        'motivo': linea.get('motivo') or None,
+        'observaciones': linea.get('observaciones') or None,
+        'documento': linea.get('documento') or linea.get('documento_referencia') or None,
+    }
+
+    if tipo == 'ajuste':
+        normalizada['nuevo_stock'] = _a_numero(linea.get('nuevo_stock'), 'nuevo_stock')
+        if normalizada['nuevo_stock'] < 0:
+            raise ValueError('El stock no puede ser negativo')
+    else:
+        normalizada['cantidad'] = _a_numero(linea.get('cantidad'), 'cantidad')
+        if normalizada['cantidad'] <= 0:
+            raise ValueError('La cantidad debe ser mayor a cero')
+
+    return normalizada
+
+
+def _variantes_lote(producto_ids):
+    """Modelos y colores de los productos del lote (dos consultas IN)"""
+    if not producto_ids:
+        return {}, {}
+    modelos = {
+        f.id: f for f in db.session.execute(
+            select(ProductoModelo.id, ProductoModelo.producto_id, ProductoModelo.activo,
+                   func.coalesce(ProductoModelo.stock_actual, 0).label('stock_actual'))
+            .where(ProductoModelo.producto_id.in_(producto_ids))
+        )
+    }
+    colores = {}
+    if modelos:
+        colores = {
+            f.id: f for f in db.session.execute(
+                select(ProductoColor.id, ProductoColor.modelo_id, ProductoColor.activo,
+                       func.coalesce(ProductoColor.stock_actual, 0).label('stock_actual'))
+                .where(ProductoColor.modelo_id.in_(list(modelos)))
+            )
+        }
+    return modelos, colores
+
+
+def _cadena_lote(linea, producto_id, modelos, colores):
+    """Igual que _cadena pero con las variantes ya leídas: [(entidad, id), ...] de la variante al producto"""
+    modelo_id, color_id = linea['modelo_id'], linea['color_id']
+    if color_id is not None:
+        color = colores.get(color_id)
+        modelo = modelos.get(color.modelo_id) if color else None
+        if (modelo is None or not color.activo or not modelo.activo or modelo.producto_id != producto_id
+                or (modelo_id is not None and modelo.id != modelo_id)):
+            raise VarianteInvalida(f'El color {color_id} no corresponde al producto')
+        return [(ProductoColor, color_id), (ProductoModelo, modelo.id), (Producto, producto_id)]
+
+    if modelo_id is not None:
+        modelo = modelos.get(modelo_id)
+        if modelo is None or not modelo.activo or modelo.producto_id != producto_id:
+            raise VarianteInvalida(f'El modelo {modelo_id} no corresponde al producto')
+        if any(c.activo and c.modelo_id == modelo_id for c in colores.values()):
+            raise VarianteRequerida(f'El modelo {modelo_id} maneja colores: indica color_id')
+        return [(ProductoModelo, modelo_id), (Producto, producto_id)]
+
+    if any(m.activo and m.producto_id == producto_id for m in modelos.values()):
+        raise VarianteRequerida('El producto maneja modelos: indica modelo_id (y color_id si aplica)')
+    return [(Producto, producto_id)]
+
+
+def _procesar_lote(lineas, usuario_id, parcial, al_confirmar):
+    """
+    Un intento de aplicar el lote. Devuelve el resultado o None si otro proceso
+    modificó el stock de algún producto o variante entre la lectura y la escritura.
+    """
+    errores = []
+    normalizadas = []
+    for numero, linea in enumerate(lineas, start=1):
+        try:
+            normalizadas.append((numero, _normalizar_linea(linea)))
+        except ValueError as e:
+            errores.append({'linea': numero, 'error': str(e)})
+
+    ids = {l['producto_id'] for _, l in normalizadas if l['producto_id'] is not None}
+    codigos = {l['codigo'] for _, l in normalizadas if l['producto_id'] is None}
+
+    # Una sola consulta IN para todos los productos referenciados
+    consulta = select(Producto.id, Producto.codigo, Producto.activo, Producto.stock_actual).where(
+        or_(Producto.id.in_(ids), Producto.codigo.in_(codigos))
+    )
+    if db.engine.dialect.name != 'sqlite':
+        consulta = consulta.with_for_update()
+    filas_producto = db.session.execute(consulta).all() if (ids or codigos) else []
+    modelos, colores = _variantes_lote([f.id for f in filas_producto])
+
+    por_id = {f.id: f for f in filas_producto}
+    por_codigo = {f.codigo: f for f in filas_producto}
+    # Stock por fila afectada: clave (entidad, id)
+    stock_inicial = {(Producto, f.id): f.stock_actual for f in filas_producto}
+    stock_inicial.update({(ProductoModelo, f.id): f.stock_actual for f in modelos.values()})
+    stock_inicial.update({(ProductoColor, f.id): f.stock_actual for f in colores.values()})
+    stock = dict(stock_inicial)
+
+    ahora = datetime.utcnow()
+    movimientos = []
+    for numero, l in normalizadas:
+        producto = por_id.get(l['producto_id']) if l['producto_id'] is not None else por_codigo.get(l['codigo'])
+        if producto is None or not producto.activo:
+            errores.append({'linea': numero, 'error': f'Producto no encontrado: {l["producto_id"] or l["codigo"]}'})
+            continue
+        try:
+            cadena = _cadena_lote(l, producto.id, modelos, colores)
+        except StockError as e:
+            errores.append({'linea': numero, 'error': str(e)})
+            continue
+
+        variante = stock[cadena[0]]
+        if l['tipo'] == 'entrada':
+            cantidad = delta = l['cantidad']
+        elif l['tipo'] == 'salida':
+            cantidad = l['cantidad']
+            delta = -cantidad
+        else:
+            delta = l['nuevo_stock'] - variante
+            cantidad = abs(delta)
+
+        if any(stock[clave] + delta < 0 for clave in cadena):
+            if l['tipo'] == 'salida':
+                error = f'Stock insuficiente para {producto.codigo}: disponible {variante}, solicitado {cantidad}'
+            else:
+                error = f'El stock de {producto.codigo} no cuadra con sus variantes'
+            errores.append({'linea': numero, 'error': error})
+            continue
+
+        anterior = stock[(Producto, producto.id)]
+        for clave in cadena:
+            stock[clave] += delta
+        movimientos.append({
+            'producto_id': producto.id,
+            'modelo_id': _id_en_cadena(cadena, ProductoModelo),
+            'color_id': _id_en_cadena(cadena, ProductoColor),
+            'usuario_id': usuario_id,
+            'tipo_movimiento': l['tipo'],
+            'cantidad': cantidad,
+            'stock_anterior': anterior,
+            'stock_nuevo': stock[(Producto, producto.id)],
+            'motivo': l['motivo'],
+            'observaciones': l['observaciones'],
+            'documento_referencia': l['documento'],
+            'fecha_movimiento': ahora
+        })
+
+    errores.sort(key=lambda e: e['linea'])
+
+    if errores and not parcial:
+        db.session.rollback()
+        return {'ok': False, 'registrados': 0, 'errores': errores}
+
+    # Un UPDATE por tabla (no por línea), condicionado al stock leído de cada fila
+    cambios = {}
+    for (entidad, fila_id), nuevo in stock.items():
+        anterior = stock_inicial[(entidad, fila_id)]
+        if nuevo != anterior:
+            cambios.setdefault(entidad, []).append((fila_id, anterior, nuevo))
+    for entidad, filas in cambios.items():
+        if not _fijar_stocks(entidad, filas):
+            db.session.rollback()
+            return None
+
+    if movimientos:
+        # Los ids nuevos quedan en cada dict para el registro de cambios
+        _insertar_movimientos(movimientos)
+        # bulk_insert_mappings no dispara los eventos de flush: actualizar el resumen aquí
+        acumular_movimientos(db.session.connection(), ((m['producto_id'], ahora) for m in movimientos))
+        db.session.info['metricas_pendientes'] = True
+        marcar_productos(db.session, {m['producto_id'] for m in movimientos})
+        marcar_cambios(db.session, 'movimientos', [m['id'] for m in movimientos])
+    resultado = {'ok': not errores, 'registrados': len(movimientos), 'errores': errores}
+    if al_confirmar is not None:
+        al_confirmar(resultado)
+    db.session.commit()
+
+    return resultado
+
+
+def registrar_lote(lineas, usuario_id, parcial=False, intentos=3, al_confirmar=None):
+    """
+    Registra un lote de movimientos en una sola transacción.
+    Si parcial=False (por defecto) cualquier error rechaza el lote completo;
+    con parcial=True se registran las líneas válidas y se informan las demás.
+    al_confirmar(resultado) corre dentro de la transacción, justo antes del commit.
+    """
+    try:
+        for _ in range(intentos):
+            resultado = _procesar_lote(lineas, usuario_id, parcial, al_confirmar)
+            if resultado is not None:
+                return resultado
+    except Exception:
+        db.session.rollback()
+        raise
+    raise ConflictoConcurrencia('El stock cambió durante la carga del lote. Intenta nuevamente')
+
+
+# ==================== RECONCILIACIÓN DE VARIANTES ====================
+
+def _totales_variantes():
+    """Subconsultas con el stock calculado de cada modelo (suma de colores) y producto (suma de modelos)"""
+    colores = (
+        select(ProductoColor.modelo_id, func.sum(func.coalesce(ProductoColor.stock_actual, 0)).label('total'))
+        .where(ProductoColor.activo == True)
+        .group_by(ProductoColor.modelo_id)
+        .subquery('colores')
+    )
+    modelos = (
+        select(ProductoModelo.id, ProductoModelo.producto_id,
+               func.coalesce(ProductoModelo.stock_actual, 0).label('registrado'),
+               func.coalesce(colores.c.total, ProductoModelo.stock_actual, 0).label('calculado'))
+        .outerjoin(colores, colores.c.modelo_id == ProductoModelo.id)
+        .where(ProductoModelo.activo == True)
+        .subquery('modelos_calculados')
+    )
+    productos = (
+        select(modelos.c.producto_id, func.sum(modelos.c.calculado).label('calculado'))
+        .group_by(modelos.c.producto_id)
+        .subquery('productos_calculados')
+    )
+    return modelos, productos
+
+
+def descuadres_variantes():
+    """Modelos y productos cuyo stock no coincide con la suma de sus variantes activas"""
+    modelos, productos = _totales_variantes()
+    descuadre_modelos = db.session.execute(
+        select(modelos.c.id, modelos.c.producto_id, modelos.c.registrado, modelos.c.calculado)
+        .where(func.abs(modelos.c.calculado - modelos.c.registrado) > TOLERANCIA_DESCUADRE)
+        .order_by(modelos.c.id)
+    ).all()
+    descuadre_productos = db.session.execute(
+        select(Producto.id, Producto.codigo, func.coalesce(Producto.stock_actual, 0).label('registrado'),
+               productos.c.calculado)
+        .join(productos, productos.c.producto_id == Producto.id)
+        .where(func.abs(productos.c.calculado - func.coalesce(Producto.stock_actual, 0)) > TOLERANCIA_DESCUADRE)
+        .order_by(Producto.id)
+    ).all()
+    return {
+        'modelos': [dict(f._mapping) for f in descuadre_modelos],
+        'productos': [dict(f._mapping) for f in descuadre_productos],
+    }
+
+
+def reconciliar_variantes(usuario_id=None, aplicar=False):
+    """
+    Recalcula los totales de modelos (suma de colores) y productos (suma de modelos) en
+    dos UPDATE con subconsultas correlacionadas y devuelve el descuadre encontrado.
+    Con aplicar=True corrige los totales y registra un ajuste por cada producto corregido.
+    """
+    if aplicar and usuario_id is None:
+        raise ValueError('Se requiere el usuario que registra los ajustes')
+
+    descuadres = descuadres_variantes()
+    if not aplicar or not (descuadres['modelos'] or descuadres['productos']):
+        return descuadres
+
+    try:
+        if descuadres['modelos']:
+            suma_colores = (
+                select(func.sum(func.coalesce(ProductoColor.stock_actual, 0)))
+                .where(ProductoColor.modelo_id == ProductoModelo.id, ProductoColor.activo == True)
+                .scalar_subquery()
+            )
+            db.session.execute(
+                update(ProductoModelo)
+                .where(ProductoModelo.id.in_([d['id'] for d in descuadres['modelos']]))
+                .values(stock_actual=suma_colores)
+                .execution_options(synchronize_session=False)
+            )
+
+        # Con los modelos ya corregidos, los productos pueden haber cambiado: volver a medir
+        descuadres['productos'] = descuadres_variantes()['productos']
+        if descuadres['productos']:
+            suma_modelos = (
+                select(func.sum(func.coalesce(ProductoModelo.stock_actual, 0)))
+                .where(ProductoModelo.producto_id == Producto.id, ProductoModelo.activo == True)
+                .scalar_subquery()
+            )
+            db.session.execute(
+                update(Producto)
+                .where(Producto.id.in_([d['id'] for d in descuadres['productos']]))
+                .values(stock_actual=suma_modelos)
+                .execution_options(synchronize_session=False)
+            )
+
+            ahora = datetime.utcnow()
+            movimientos = [
+                {
+                    'producto_id': d['id'],
+                    'usuario_id': usuario_id,
+                    'tipo_movimiento': 'ajuste',
+                    'cantidad': abs(d['calculado'] - d['registrado']),
+                    'stock_anterior': d['registrado'],
+                    'stock_nuevo': d['calculado'],
+                    'motivo': 'Reconciliación de variantes',
+                    'fecha_movimiento': ahora
+                }
+                for d in descuadres['productos']
+            ]
+            db.session.bulk_insert_mappings(Movimiento, movimientos, return_defaults=True)
+            acumular_movimientos(db.session.connection(), ((m['producto_id'], ahora) for m in movimientos))
+            db.session.info['metricas_pendientes'] = True
+            marcar_productos(db.session, {m['producto_id'] for m in movimientos})
+            marcar_cambios(db.session, 'movimientos', [m['id'] for m in movimientos])
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return descuadres
@@ -0,0 +1,40 @@
+// Control del menú hamburguesa
+document.addEventListener('DOMContentLoaded', function() {
+    const menuToggle = document.getElementById('menuToggle');
+    const sidebar = document.getElementById('sidebar');
+    const overlay = document.getElementById('sidebarOverlay');
+
+    // Función para abrir/cerrar el menú
+    function toggleMenu() {
+        sidebar.classList.toggle('show');
+        overlay.classList.toggle('show');
+    }
+
+    // Click en el botón hamburguesa
+    if (menuToggle) {
+        menuToggle.addEventListener('click', toggleMenu);
+    }
+
+    // Click en el overlay para cerrar
+    if (overlay) {
+        overlay.addEventListener('click', toggleMenu);
+    }
+
+    // Cerrar menú al hacer click en un enlace (solo en móviles)
+    const sidebarLinks = sidebar.querySelectorAll('.nav-link');
+    sidebarLinks.forEach(link => {
+        link.addEventListener('click', function() {
+            if (window.innerWidth < 768) {
+                toggleMenu();
+            }
+        });
+    });
+
+    // Cerrar menú al cambiar de orientación o redimensionar
+    window.addEventListener('resize', function() {
+        if (window.innerWidth >= 768) {
+            sidebar.classList.remove('show');
+            overlay.classList.remove('show');
+        }
+    });
+});
@@ -0,0 +1,33 @@
+// Indicadores en tiempo real (sala inventario de difusion_stock.py)
+function escaparHtml(texto) {
+    const div = document.createElement('div');
+    div.textContent = texto == null ? '' : texto;
+    return div.innerHTML;
+}
+
+suscribirStock({ inventario: true }, function(mensaje) {
+    const r = mensaje.resumen;
+    if (!r) return;
+    document.getElementById('kpiTotalProductos').textContent = r.total_productos;
+    document.getElementById('kpiTotalCategorias').textContent = r.total_categorias;
+    document.getElementById('kpiBajoStock').textContent = r.total_bajo_stock;
+    document.getElementById('kpiValorTotal').textContent = 'S/ ' + Number(r.valor_total).toFixed(2);
+
+    const contenedor = document.getElementById('productosBajoStock');
+    if (!r.productos_bajo_stock.length) {
+        contenedor.innerHTML = `<div class="text-center py-4">
+            <i class="bi bi-check-circle text-success" style="font-size: 3rem;"></i>
+            <p class="text-muted mt-2">Todos los productos tienen stock suficiente</p>
+        </div>`;
+        return;
+    }
+    const filas = r.productos_bajo_stock.slice(0, 5).map(p => `<tr>
+        <td><strong>${escaparHtml(p.nombre)}</strong><br><small class="text-muted">${escaparHtml(p.codigo)}</small></td>
+        <td>${p.stock_actual} ${escaparHtml(p.unidad_medida)}</td>
+        <td>${p.stock_minimo} ${escaparHtml(p.unidad_medida)}</td>
+        <td>${p.stock_actual === 0 ? '<span class="badge bg-danger">Agotado</span>' : '<span class="badge bg-warning">Bajo</span>'}</td>
+    </tr>`).join('');
+    contenedor.innerHTML = `<div class="table-responsive"><table class="table table-hover">
+        <thead><tr><th>Producto</th><th>Stock Actual</th><th>Stock Mínimo</th><th>Estado</th></tr></thead>
+        <tbody>${filas}</tbody></table></div>`;
+});
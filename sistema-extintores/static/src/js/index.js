@@ -0,0 +1,119 @@
+// ========== SINCRONIZACIÓN EN TIEMPO REAL ==========
+let socket = null;
+let socketConectado = false;
+
+function inicializarSocketIO() {
+    try {
+        socket = io({
+            transports: ['websocket', 'polling'],
+            reconnection: true,
+            reconnectionDelay: 1000,
+            reconnectionAttempts: 5
+        });
+
+        socket.on('connect', function() {
+            socketConectado = true;
+            console.log('[SYNC] ✅ Conectado al servidor en tiempo real');
+        });
+
+        socket.on('disconnect', function() {
+            socketConectado = false;
+            console.log('[SYNC] ❌ Desconectado del servidor');
+        });
+
+        // Escuchar cambios en órdenes
+        socket.on('cambio_orden', function(evento) {
+            console.log('[SYNC] 🔄 Cambio detectado:', evento.tipo);
+            // Recargar dashboard
+            cargarDashboard();
+            cargarAlertas();
+        });
+
+        socket.on('connect_error', function(error) {
+            console.error('[SYNC] ❌ Error de conexión:', error);
+        });
+
+    } catch (error) {
+        console.error('[SYNC] ❌ Error al inicializar Socket.IO:', error);
+    }
+}
+
+// Mostrar fecha actual
+const opciones = { weekday: 'long', year: 'numeric', month: 'long', day: 'numeric' };
+document.getElementById('fecha-actual').textContent = new Date().toLocaleDateString('es-ES', opciones);
+
+// Cargar datos del dashboard
+function cargarDashboard() {
+    fetch('/api/dashboard')
+        .then(response => response.json())
+        .then(data => {
+            document.getElementById('total-clientes').textContent = data.total_clientes;
+            document.getElementById('total-extintores').textContent = data.total_extintores;
+            document.getElementById('extintores-proximos').textContent = data.extintores_proximos;
+            document.getElementById('extintores-vencidos').textContent = data.extintores_vencidos;
+            document.getElementById('mantenimientos-mes').textContent = data.mantenimientos_mes;
+            document.getElementById('ingresos-mes').textContent = '$' + data.ingresos_mes.toLocaleString('es-MX', {minimumFractionDigits: 2});
+        });
+}
+
+// Cargar alertas
+function cargarAlertas() {
+    fetch('/api/alertas')
+        .then(response => response.json())
+        .then(data => {
+            // Actualizar badges
+            document.getElementById('badge-vencidos').textContent = data.vencidos.length;
+            document.getElementById('badge-proximos-7').textContent = data.proximos_7.length;
+            document.getElementById('badge-proximos-30').textContent = data.proximos_30.length;
+
+            // Llenar tablas
+            llenarTablaAlertas('tabla-vencidos', data.vencidos, true);
+            llenarTablaAlertas('tabla-proximos-7', data.proximos_7, false);
+            llenarTablaAlertas('tabla-proximos-30', data.proximos_30, false);
+        });
+}
+
+function llenarTablaAlertas(tablaId, datos, esVencido) {
+    const tabla = document.getElementById(tablaId);
+    tabla.innerHTML = '';
+
+    if (datos.length === 0) {
+        tabla.innerHTML = '<tr><td colspan="5" class="text-center text-muted">No hay alertas</td></tr>';
+        return;
+    }
+
+    datos.forEach(item => {
+        const fila = `
+            <tr>
+                <td><strong>${item.serie}</strong></td>
+                <td>${item.cliente}</td>
+                <td>${item.fecha}</td>
+                <td>
+                    <span class="badge ${esVencido ? 'bg-danger' : 'bg-warning'}">
+                        ${item.dias} ${esVencido ? 'días vencido' : 'días restantes'}
+                    </span>
+                </td>
+                <td>
+                    <a href="/mantenimientos" class="btn btn-sm btn-primary">
+                        <i class="bi bi-tools"></i> Programar
+                    </a>
+                </td>
+            </tr>
+        `;
+        tabla.innerHTML += fila;
+    });
+}
+
+// Cargar datos al iniciar
+inicializarSocketIO();
+cargarDashboard();
+cargarAlertas();
+
+// Polling de respaldo: actualizar cada 10 segundos si no hay conexión
+setInterval(() => {
+    if (!socketConectado) {
+        console.log('[POLLING] Recargando dashboard...');
+        cargarDashboard();
+        cargarAlertas();
+    }
+}, 10000);
@@ -0,0 +1,459 @@
+// El servidor filtra y busca (/api/logs); por Socket.IO solo llegan las entradas nuevas
+let todosLogs = [];
+let offsetLogs = 0;
+let archivoLogs = null;
+let pausaBusqueda = null;
+
+function filtrosLogs() {
+    return {
+        nivel: document.getElementById('filtroTipo').value,
+        q: document.getElementById('buscarLog').value.trim(),
+        desde: document.getElementById('fechaDesde').value,
+        hasta: document.getElementById('fechaHasta').value
+    };
+}
+
+function cargarLogs() {
+    const parametros = new URLSearchParams({ cantidad: document.getElementById('cantidadLineas').value });
+    Object.entries(filtrosLogs()).forEach(([clave, valor]) => { if (valor) parametros.set(clave, valor); });
+
+    fetch(`/api/logs?${parametros}`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) throw new Error(data.error);
+            todosLogs = data.logs || [];
+            offsetLogs = data.offset;
+            archivoLogs = data.archivo;
+            mostrarLogs(todosLogs);
+            estadoConexion(true);
+        })
+        .catch(error => {
+            console.error('Error al cargar logs:', error);
+            estadoConexion(false);
+        });
+}
+
+function buscarConPausa() {
+    clearTimeout(pausaBusqueda);
+    pausaBusqueda = setTimeout(cargarLogs, 300);
+}
+
+function coincideFiltros(log) {
+    const filtros = filtrosLogs();
+    const fecha = log.slice(0, 10);
+    if (filtros.nivel && !log.startsWith(`[${filtros.nivel}]`, 24)) return false;
+    if (filtros.desde && fecha < filtros.desde) return false;
+    if (filtros.hasta && fecha > filtros.hasta) return false;
+    return !filtros.q || log.toLowerCase().includes(filtros.q.toLowerCase());
+}
+
+function recibirLogs(data) {
+    // Si el archivo rotó los offsets vuelven a empezar; si no, se ignora lo que ya se mostró
+    if (data.archivo === archivoLogs && data.offset <= offsetLogs) return;
+    archivoLogs = data.archivo;
+    offsetLogs = data.offset;
+    const nuevos = data.entradas.filter(coincideFiltros);
+    if (nuevos.length === 0) return;
+    const cantidad = parseInt(document.getElementById('cantidadLineas').value);
+    todosLogs = todosLogs.concat(nuevos).slice(-cantidad);
+    mostrarLogs(todosLogs);
+}
+
+function estadoConexion(conectado) {
+    const estado = document.getElementById('estadoLogs');
+    estado.textContent = conectado ? 'Conectado' : 'Desconectado';
+    estado.className = `badge ${conectado ? 'bg-success' : 'bg-danger'} float-end`;
+}
+
+function escaparHtml(texto) {
+    const div = document.createElement('div');
+    div.textContent = texto;
+    return div.innerHTML;
+}
+
+function mostrarLogs(logs) {
+    const contenedor = document.getElementById('contenedorLogs');
+    document.getElementById('totalLineas').textContent = logs.length;
+
+    if (logs.length === 0) {
+        contenedor.innerHTML = `
+            <div class="text-center text-muted py-5">
+                <i class="bi bi-inbox" style="font-size: 3rem;"></i>
+                <p class="mt-3">No hay logs disponibles</p>
+            </div>
+        `;
+        return;
+    }
+
+    // Solo se baja al final si el usuario ya estaba al final
+    const alFinal = contenedor.scrollHeight - contenedor.scrollTop - contenedor.clientHeight < 40;
+    let html = '';
+    logs.forEach(log => {
+        // Detectar tipo de log
+        const nivel = (log.match(/^\S+ \S+ \[([A-Z]+)\]/) || [])[1];
+        const clase = nivel ? `log-${nivel}` : '';
+
+        // Resaltar timestamp
+        const texto = escaparHtml(log).replace(/^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})/, '<span class="log-timestamp">$1</span>');
+
+        html += `<div class="log-line ${clase}" style="white-space: pre-wrap;">${texto}</div>`;
+    });
+
+    contenedor.innerHTML = html;
+    if (alFinal || contenedor.dataset.inicial === undefined) {
+        contenedor.scrollTop = contenedor.scrollHeight;
+        contenedor.dataset.inicial = '1';
+    }
+}
+
+function limpiarLogs() {
+    // Usar modal de confirmación
+    const modalHtml = `
+        <div class="modal fade" id="modalConfirmarLimpiar" tabindex="-1">
+            <div class="modal-dialog">
+                <div class="modal-content">
+                    <div class="modal-header bg-danger text-white">
+                        <h5 class="modal-title">
+                            <i class="bi bi-exclamation-triangle-fill"></i> Confirmar Limpieza
+                        </h5>
+                        <button type="button" class="btn-close btn-close-white" data-bs-dismiss="modal"></button>
+                    </div>
+                    <div class="modal-body">
+                        <p class="mb-0">¿Está seguro de limpiar los logs?</p>
+                        <p class="text-muted small mb-0">Se empieza un archivo nuevo; el actual queda comprimido y se puede seguir buscando en él.</p>
+                    </div>
+                    <div class="modal-footer">
+                        <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">Cancelar</button>
+                        <button type="button" class="btn btn-danger" onclick="confirmarLimpiarLogs()">
+                            <i class="bi bi-trash"></i> Limpiar Logs
+                        </button>
+                    </div>
+                </div>
+            </div>
+        </div>
+    `;
+
+    // Agregar modal al body si no existe
+    if (!document.getElementById('modalConfirmarLimpiar')) {
+        document.body.insertAdjacentHTML('beforeend', modalHtml);
+    }
+
+    // Mostrar modal
+    const modal = new bootstrap.Modal(document.getElementById('modalConfirmarLimpiar'));
+    modal.show();
+}
+
+function confirmarLimpiarLogs() {
+    // Cerrar modal
+    const modal = bootstrap.Modal.getInstance(document.getElementById('modalConfirmarLimpiar'));
+    modal.hide();
+
+    // Limpiar logs
+    fetch('/api/logs/limpiar', { method: 'POST' })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                mostrarNotificacion('Logs rotados: el archivo anterior quedó comprimido', 'success');
+                cargarLogs();
+            } else {
+                mostrarNotificacion('Error al limpiar logs: ' + (data.error || 'Error desconocido'), 'error');
+            }
+        })
+        .catch(error => {
+            mostrarNotificacion('Error al limpiar logs: ' + error, 'error');
+        });
+}
+
+function mostrarNotificacion(mensaje, tipo) {
+    const tipoConfig = {
+        'success': { bg: 'bg-success', icon: 'bi-check-circle-fill', titulo: 'Éxito' },
+        'error': { bg: 'bg-danger', icon: 'bi-x-circle-fill', titulo: 'Error' },
+        'warning': { bg: 'bg-warning', icon: 'bi-exclamation-triangle-fill', titulo: 'Advertencia' },
+        'info': { bg: 'bg-info', icon: 'bi-info-circle-fill', titulo: 'Información' }
+    };
+
+    const config = tipoConfig[tipo] || tipoConfig['info'];
+
+    const modalHtml = `
+        <div class="modal fade" id="modalNotificacion" tabindex="-1">
+            <div class="modal-dialog">
+                <div class="modal-content">
+                    <div class="modal-header ${config.bg} text-white">
+                        <h5 class="modal-title">
+                            <i class="bi ${config.icon}"></i> ${config.titulo}
+                        </h5>
+                        <button type="button" class="btn-close btn-close-white" data-bs-dismiss="modal"></button>
+                    </div>
+                    <div class="modal-body">
+                        <p class="mb-0">${mensaje}</p>
+                    </div>
+                    <div class="modal-footer">
+                        <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">Cerrar</button>
+                    </div>
+                </div>
+            </div>
+        </div>
+    `;
+
+    // Eliminar modal anterior si existe
+    const modalAnterior = document.getElementById('modalNotificacion');
+    if (modalAnterior) {
+        modalAnterior.remove();
+    }
+
+    // Agregar nuevo modal
+    document.body.insertAdjacentHTML('beforeend', modalHtml);
+
+    // Mostrar modal
+    const modal = new bootstrap.Modal(document.getElementById('modalNotificacion'));
+    modal.show();
+
+    // Auto-cerrar después de 3 segundos para notificaciones de éxito
+    if (tipo === 'success') {
+        setTimeout(() => {
+            modal.hide();
+        }, 3000);
+    }
+}
+
+// ========== GESTIÓN DE SERVIDORES ==========
+function cargarServidores() {
+    fetch('/api/servidores')
+        .then(response => response.json())
+        .then(data => {
+            mostrarServidores(data.servidores || []);
+        })
+        .catch(error => {
+            console.error('Error al cargar servidores:', error);
+            document.getElementById('listaServidores').innerHTML = `
+                <div class="alert alert-danger mb-0">
+                    <i class="bi bi-exclamation-triangle"></i> Error al cargar servidores
+                </div>
+            `;
+        });
+}
+
+function mostrarServidores(servidores) {
+    const contenedor = document.getElementById('listaServidores');
+
+    console.log('🖥️ Servidores recibidos:', servidores);
+
+    if (servidores.length === 0) {
+        contenedor.innerHTML = `
+            <div class="alert alert-success mb-0">
+                <i class="bi bi-check-circle"></i> No hay servidores Python activos
+            </div>
+        `;
+        return;
+    }
+
+    let html = '<div class="table-responsive"><table class="table table-hover mb-0">';
+    html += '<thead><tr>';
+    html += '<th style="width: 100px;">PID</th>';
+    html += '<th style="width: 300px;">URL Completa</th>';
+    html += '<th style="width: 120px;">Tiempo Activo</th>';
+    html += '<th style="width: 200px;">Acciones</th>';
+    html += '</tr></thead><tbody>';
+
+    servidores.forEach(servidor => {
+        const esteServidor = servidor.es_este_servidor;
+        const rowClass = esteServidor ? 'table-success' : '';
+        const badge = esteServidor ? '<span class="badge bg-success ms-2">Actual</span>' : '';
+
+        console.log(`Servidor PID ${servidor.pid}: es_este_servidor = ${esteServidor}`);
+
+        html += `<tr class="${rowClass}">`;
+        html += `<td><strong>${servidor.pid}</strong>${badge}</td>`;
+        html += `<td>`;
+        if (servidor.puerto) {
+            const url = `http://127.0.0.1:${servidor.puerto}`;
+            html += `<a href="${url}" target="_blank" class="text-decoration-none">
+                        <i class="bi bi-box-arrow-up-right"></i> ${url}
+                     </a>`;
+        } else {
+            html += '<span class="text-muted">No disponible</span>';
+        }
+        html += `</td>`;
+        html += `<td>${servidor.tiempo_activo}</td>`;
+        html += `<td>`;
+
+        // Siempre mostrar botón detener para servidores no actuales
+        if (esteServidor) {
+            // Este es el servidor actual - solo reiniciar
+            html += `<button class="btn btn-sm btn-warning" onclick="reiniciarServidor()" title="Reiniciar servidor actual">
+                        <i class="bi bi-arrow-clockwise"></i> Reiniciar
+                     </button>`;
+        } else {
+            // Servidor viejo - solo detener
+            html += `<button class="btn btn-sm btn-danger" onclick="detenerServidor(${servidor.pid})" title="Detener servidor viejo">
+                        <i class="bi bi-stop-circle"></i> Detener
+                     </button>`;
+        }
+
+        html += `</td></tr>`;
+    });
+
+    html += '</tbody></table></div>';
+
+    // Agregar botón para detener todos
+    if (servidores.length > 1) {
+        html += `
+            <div class="mt-3 text-center">
+                <button class="btn btn-danger" onclick="detenerTodosServidores()">
+                    <i class="bi bi-stop-circle-fill"></i> Detener Todos los Servidores
+                </button>
+            </div>
+        `;
+    }
+
+    contenedor.innerHTML = html;
+}
+
+function detenerServidor(pid) {
+    const modalHtml = `
+        <div class="modal fade" id="modalConfirmarDetener" tabindex="-1">
+            <div class="modal-dialog">
+                <div class="modal-content">
+                    <div class="modal-header bg-warning text-dark">
+                        <h5 class="modal-title">
+                            <i class="bi bi-exclamation-triangle-fill"></i> Confirmar Detención
+                        </h5>
+                        <button type="button" class="btn-close" data-bs-dismiss="modal"></button>
+                    </div>
+                    <div class="modal-body">
+                        <p class="mb-0">¿Está seguro de detener el servidor con PID ${pid}?</p>
+                    </div>
+                    <div class="modal-footer">
+                        <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">Cancelar</button>
+                        <button type="button" class="btn btn-danger" onclick="confirmarDetenerServidor(${pid})">
+                            <i class="bi bi-stop-circle"></i> Detener
+                        </button>
+                    </div>
+                </div>
+            </div>
+        </div>
+    `;
+
+    if (!document.getElementById('modalConfirmarDetener')) {
+        document.body.insertAdjacentHTML('beforeend', modalHtml);
+    }
+
+    const modal = new bootstrap.Modal(document.getElementById('modalConfirmarDetener'));
+    modal.show();
+}
+
+function confirmarDetenerServidor(pid) {
+    const modal = bootstrap.Modal.getInstance(document.getElementById('modalConfirmarDetener'));
+    modal.hide();
+
+    fetch('/api/servidores/detener', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ pid: pid })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            mostrarNotificacion('Servidor detenido exitosamente', 'success');
+            setTimeout(cargarServidores, 1000);
+        } else {
+            mostrarNotificacion('Error: ' + (data.error || 'Error desconocido'), 'error');
+        }
+    })
+    .catch(error => {
+        mostrarNotificacion('Error al detener servidor: ' + error, 'error');
+    });
+}
+
+function detenerTodosServidores() {
+    const modalHtml = `
+        <div class="modal fade" id="modalConfirmarDetenerTodos" tabindex="-1">
+            <div class="modal-dialog">
+                <div class="modal-content">
+                    <div class="modal-header bg-danger text-white">
+                        <h5 class="modal-title">
+                            <i class="bi bi-exclamation-triangle-fill"></i> Confirmar Detención Masiva
+                        </h5>
+                        <button type="button" class="btn-close btn-close-white" data-bs-dismiss="modal"></button>
+                    </div>
+                    <div class="modal-body">
+                        <p class="mb-0">¿Está seguro de detener TODOS los servidores Python?</p>
+                        <p class="text-muted small mb-0">Esto cerrará esta aplicación.</p>
+                    </div>
+                    <div class="modal-footer">
+                        <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">Cancelar</button>
+                        <button type="button" class="btn btn-danger" onclick="confirmarDetenerTodos()">
+                            <i class="bi bi-stop-circle-fill"></i> Detener Todos
+                        </button>
+                    </div>
+                </div>
+            </div>
+        </div>
+    `;
+
+    if (!document.getElementById('modalConfirmarDetenerTodos')) {
+        document.body.insertAdjacentHTML('beforeend', modalHtml);
+    }
+
+    const modal = new bootstrap.Modal(document.getElementById('modalConfirmarDetenerTodos'));
+    modal.show();
+}
+
+function confirmarDetenerTodos() {
+    const modal = bootstrap.Modal.getInstance(document.getElementById('modalConfirmarDetenerTodos'));
+    modal.hide();
+
+    fetch('/api/servidores/detener-todos', { method: 'POST' })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            mostrarNotificacion('Todos los servidores han sido detenidos', 'success');
+            setTimeout(() => {
+                window.location.href = '/';
+            }, 2000);
+        }
+    })
+    .catch(error => {
+        // Es normal que falle porque el servidor se cerró
+        mostrarNotificacion('Servidores detenidos', 'success');
+    });
+}
+
+function reiniciarServidor() {
+    mostrarNotificacion('Reiniciando servidor...', 'info');
+
+    fetch('/api/servidores/reiniciar', { method: 'POST' })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            mostrarNotificacion('Servidor reiniciando... Recarga la página en 5 segundos', 'success');
+            setTimeout(() => {
+                window.location.reload();
+            }, 5000);
+        }
+    })
+    .catch(error => {
+        // Es normal que falle porque el servidor se reinició
+        setTimeout(() => {
+            window.location.reload();
+        }, 3000);
+    });
+}
+
+// Cargar logs y servidores al inicio
+cargarLogs();
+cargarServidores();
+
+// Entradas nuevas en vivo; al reconectar se vuelve a pedir lo último por si se perdió algo
+if (socketApp) {
+    socketApp.on('connect', () => {
+        socketApp.emit('suscribir_logs');
+        cargarLogs();
+    });
+    socketApp.on('disconnect', () => estadoConexion(false));
+    if (socketApp.connected) socketApp.emit('suscribir_logs');
+    socketApp.on('logs', recibirLogs);
+} else {
+    setInterval(cargarLogs, 3000);
+}
+setInterval(cargarServidores, 5000); // Actualizar servidores cada 5 segundos
@@ -0,0 +1,139 @@
+let mantenimientos = [];
+let extintores = [];
+
+function cargarMantenimientos() {
+    fetch('/api/mantenimientos')
+        .then(response => response.json())
+        .then(data => {
+            mantenimientos = data;
+            mostrarMantenimientos(data);
+        });
+}
+
+function cargarExtintores() {
+    fetch('/api/extintores')
+        .then(response => response.json())
+        .then(data => {
+            extintores = data;
+            const select = document.getElementById('mant-extintor');
+            select.innerHTML = '<option value="">Seleccione un extintor...</option>';
+            data.forEach(extintor => {
+                select.innerHTML += `<option value="${extintor.id}">${extintor.codigo} - ${extintor.cliente_nombre}</option>`;
+            });
+        });
+}
+
+function mostrarMantenimientos(data) {
+    const tabla = document.getElementById('tabla-mantenimientos');
+    tabla.innerHTML = '';
+
+    if (data.length === 0) {
+        tabla.innerHTML = '<tr><td colspan="8" class="text-center text-muted">No hay mantenimientos registrados</td></tr>';
+        return;
+    }
+
+    data.forEach(mant => {
+        const fila = `
+            <tr>
+                <td>${mant.fecha_servicio}</td>
+                <td><strong>${mant.extintor_serie}</strong></td>
+                <td>${mant.cliente_nombre}</td>
+                <td><span class="badge bg-info">${mant.tipo_servicio}</span></td>
+                <td>${mant.tecnico || '-'}</td>
+                <td>$${parseFloat(mant.costo).toLocaleString('es-MX', {minimumFractionDigits: 2})}</td>
+                <td>${mant.proximo_servicio || '-'}</td>
+                <td>
+                    <button class="btn btn-sm btn-outline-success" onclick="descargarCertificado(${mant.id})">
+                        <i class="bi bi-file-pdf"></i>
+                    </button>
+                </td>
+            </tr>
+        `;
+        tabla.innerHTML += fila;
+    });
+}
+
+function guardarMantenimiento() {
+    const datos = {
+        extintor_id: document.getElementById('mant-extintor').value,
+        tipo_servicio: document.getElementById('mant-tipo').value,
+        tecnico: document.getElementById('mant-tecnico').value,
+        costo: document.getElementById('mant-costo').value || 0,
+        proximo_servicio: document.getElementById('mant-proximo').value,
+        observaciones: document.getElementById('mant-observaciones').value,
+        completado: document.getElementById('mant-completado').checked
+    };
+
+    if (!datos.extintor_id || !datos.tipo_servicio) {
+        alert('Complete los campos obligatorios');
+        return;
+    }
+
+    fetch('/api/mantenimientos', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify(datos)
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            bootstrap.Modal.getInstance(document.getElementById('modalMantenimiento')).hide();
+            cargarMantenimientos();
+            limpiarFormulario();
+            alert('Mantenimiento registrado correctamente');
+        }
+    });
+}
+
+function descargarCertificado(id) {
+    window.open(`/api/certificado/${id}`, '_blank');
+}
+
+function limpiarFormulario() {
+    document.getElementById('formMantenimiento').reset();
+    document.getElementById('mant-completado').checked = true;
+}
+
+// Filtros
+function aplicarFiltros() {
+    const busqueda = document.getElementById('buscar-mantenimiento').value.toLowerCase();
+    const tipoServicio = document.getElementById('filtro-tipo-servicio').value;
+    const mes = document.getElementById('filtro-mes').value;
+
+    const filtrados = mantenimientos.filter(m => {
+        const matchBusqueda = m.extintor_serie.toLowerCase().includes(busqueda) || 
+                              m.cliente_nombre.toLowerCase().includes(busqueda);
+        const matchTipo = !tipoServicio || m.tipo_servicio === tipoServicio;
+        const matchMes = !mes || m.fecha_servicio.startsWith(mes);
+
+        return matchBusqueda && matchTipo && matchMes;
+    });
+
+    mostrarMantenimientos(filtrados);
+}
+
+document.getElementById('buscar-mantenimiento').addEventListener('input', aplicarFiltros);
+document.getElementById('filtro-tipo-servicio').addEventListener('change', aplicarFiltros);
+document.getElementById('filtro-mes').addEventListener('change', aplicarFiltros);
+
+document.getElementById('modalMantenimiento').addEventListener('hidden.bs.modal', limpiarFormulario);
+
+// Sugerir fecha próximo servicio según tipo
+document.getElementById('mant-tipo').addEventListener('change', function() {
+    const tipo = this.value;
+    const fechaProximo = document.getElementById('mant-proximo');
+    const hoy = new Date();
+
+    let mesesAdelante = 12; // Por defecto 1 año
+
+    if (tipo === 'Recarga') mesesAdelante = 12;
+    else if (tipo === 'Inspección') mesesAdelante = 6;
+    else if (tipo === 'Mantenimiento Preventivo') mesesAdelante = 12;
+    else if (tipo === 'Prueba Hidrostática') mesesAdelante = 60; // 5 años
+
+    const fechaSugerida = new Date(hoy.setMonth(hoy.getMonth() + mesesAdelante));
+    fechaProximo.value = fechaSugerida.toISOString().split('T')[0];
+});
+
+cargarExtintores();
+cargarMantenimientos();
@@ -0,0 +1,56 @@
+// Gestión de colores
+function agregarColor() {
+    const container = document.getElementById('coloresContainer');
+
+    // Eliminar mensaje de "no hay colores" si existe
+    const mensajeVacio = container.querySelector('p.text-muted');
+    if (mensajeVacio) {
+        mensajeVacio.remove();
+    }
+
+    const div = document.createElement('div');
+    div.className = 'row mb-2 color-item';
+    div.innerHTML = `
+        <div class="col-md-4">
+            <input type="text" class="form-control form-control-sm" placeholder="Nombre del color">
+        </div>
+        <div class="col-md-3">
+            <input type="text" class="form-control form-control-sm" placeholder="Código (ej: #FF0000)">
+        </div>
+        <div class="col-md-3">
+            <input type="number" step="0.01" class="form-control form-control-sm" placeholder="Stock" value="0">
+        </div>
+        <div class="col-md-2">
+            <button type="button" class="btn btn-sm btn-danger" onclick="eliminarColor(this)">
+                <i class="bi bi-trash"></i>
+            </button>
+        </div>
+    `;
+    container.appendChild(div);
+}
+
+function eliminarColor(btn) {
+    const item = btn.closest('.color-item');
+    item.remove();
+
+    // Si no quedan colores, mostrar mensaje
+    const container = document.getElementById('coloresContainer');
+    if (container.querySelectorAll('.color-item').length === 0) {
+        container.innerHTML = '<p class="text-muted mb-0"><small>No hay colores agregados. Haz clic en "Agregar Color" para incluir variantes de color.</small></p>';
+    }
+}
+
+// Serializar colores antes de enviar el formulario
+document.getElementById('modeloForm').addEventListener('submit', function(e) {
+    const colores = [];
+    document.querySelectorAll('.color-item').forEach(item => {
+        const inputs = item.querySelectorAll('input');
+        const nombre = inputs[0].value.trim();
+        const codigo = inputs[1].value.trim();
+        const stock = inputs[2].value;
+        if (nombre) {
+            colores.push({ id: item.dataset.id || null, nombre, codigo, stock });
+        }
+    });
+    document.getElementById('coloresData').value = JSON.stringify(colores);
+});
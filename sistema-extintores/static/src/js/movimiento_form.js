@@ -0,0 +1,59 @@
+let modelosProducto = [];
+
+function mostrarInfoProducto() {
+    const select = document.getElementById('productoSelect');
+    const option = select.options[select.selectedIndex];
+
+    if (option.value) {
+        const stock = option.getAttribute('data-stock');
+        const unidad = option.getAttribute('data-unidad');
+
+        document.getElementById('stockActual').textContent = stock;
+        document.getElementById('unidadMedida').textContent = unidad;
+        document.getElementById('infoProducto').style.display = 'block';
+        cargarVariantes(option.value);
+    } else {
+        document.getElementById('infoProducto').style.display = 'none';
+        document.getElementById('variantes').style.display = 'none';
+    }
+}
+
+function cargarVariantes(productoId) {
+    fetch(`/api/producto/${productoId}/variantes`)
+        .then(response => response.json())
+        .then(modelos => {
+            modelosProducto = modelos;
+            const modeloSelect = document.getElementById('modeloSelect');
+            modeloSelect.innerHTML = '<option value="">Seleccione un modelo</option>';
+            modelos.forEach(modelo => {
+                modeloSelect.add(new Option(`${modelo.nombre} (Stock: ${modelo.stock_actual})`, modelo.id));
+            });
+            modeloSelect.required = modelos.length > 0;
+            document.getElementById('variantes').style.display = modelos.length ? 'flex' : 'none';
+            mostrarColores();
+        });
+}
+
+function mostrarColores() {
+    const modeloId = parseInt(document.getElementById('modeloSelect').value);
+    const modelo = modelosProducto.find(m => m.id === modeloId);
+    const colores = modelo ? modelo.colores : [];
+    const colorSelect = document.getElementById('colorSelect');
+    colorSelect.innerHTML = '<option value="">Seleccione un color</option>';
+    colores.forEach(color => {
+        colorSelect.add(new Option(`${color.nombre} (Stock: ${color.stock_actual})`, color.id));
+    });
+    colorSelect.required = colores.length > 0;
+    document.getElementById('grupoColor').style.display = colores.length ? 'block' : 'none';
+    mostrarStockVariante();
+}
+
+function mostrarStockVariante() {
+    const modeloId = parseInt(document.getElementById('modeloSelect').value);
+    const colorId = parseInt(document.getElementById('colorSelect').value);
+    const modelo = modelosProducto.find(m => m.id === modeloId);
+    const color = modelo ? modelo.colores.find(c => c.id === colorId) : null;
+    const option = document.getElementById('productoSelect').selectedOptions[0];
+    const variante = color || modelo;
+    document.getElementById('stockActual').textContent = variante ? variante.stock_actual : option.getAttribute('data-stock');
+}
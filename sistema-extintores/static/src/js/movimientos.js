@@ -0,0 +1,64 @@
+// Scroll infinito: al llegar al final se piden más filas a /api/movimientos con el cursor
+(function() {
+    const tabla = document.getElementById('tablaMovimientos');
+    const paginacion = document.getElementById('paginacionMovimientos');
+    const cargando = document.getElementById('cargandoMas');
+    let siguiente = siguienteMovimientos;
+    let pidiendo = false;
+
+    if (!tabla || !siguiente || !('IntersectionObserver' in window)) return;
+
+    // Con scroll infinito la navegación por páginas ya no es necesaria
+    if (paginacion) paginacion.style.display = 'none';
+
+    function escapar(texto) {
+        const div = document.createElement('div');
+        div.textContent = texto == null ? '' : texto;
+        return div.innerHTML;
+    }
+
+    function fila(mov) {
+        let tipo, cantidad;
+        if (mov.tipo_movimiento === 'entrada') {
+            tipo = '<span class="badge bg-success"><i class="bi bi-arrow-down"></i> Entrada</span>';
+            cantidad = `<span class="text-success fw-bold">+${mov.cantidad}</span>`;
+        } else if (mov.tipo_movimiento === 'salida') {
+            tipo = '<span class="badge bg-danger"><i class="bi bi-arrow-up"></i> Salida</span>';
+            cantidad = `<span class="text-danger fw-bold">-${mov.cantidad}</span>`;
+        } else {
+            tipo = '<span class="badge bg-warning"><i class="bi bi-gear"></i> Ajuste</span>';
+            cantidad = `<span class="fw-bold">${mov.cantidad}</span>`;
+        }
+        const unidad = escapar(mov.unidad_medida);
+        return `<tr>
+            <td><strong>${mov.fecha}</strong><br><small class="text-muted">${mov.hora}</small></td>
+            <td><strong>${escapar(mov.producto)}</strong><br><small class="text-muted">${escapar(mov.codigo)}</small></td>
+            <td>${tipo}</td>
+            <td>${cantidad} ${unidad}</td>
+            <td>${mov.stock_anterior} ${unidad}</td>
+            <td><strong>${mov.stock_nuevo} ${unidad}</strong></td>
+            <td><small>${escapar(mov.usuario)}</small></td>
+            <td><small>${escapar(mov.motivo) || '-'}</small></td>
+            <td><small>${escapar(mov.documento_referencia) || '-'}</small></td>
+        </tr>`;
+    }
+
+    const observador = new IntersectionObserver(function(entradas) {
+        if (!entradas[0].isIntersecting || pidiendo || !siguiente) return;
+        pidiendo = true;
+        cargando.style.visibility = 'visible';
+        fetch(`/api/movimientos?cursor=${encodeURIComponent(siguiente)}`)
+            .then(r => r.json())
+            .then(data => {
+                tabla.insertAdjacentHTML('beforeend', data.movimientos.map(fila).join(''));
+                siguiente = data.siguiente;
+                if (!siguiente) observador.disconnect();
+            })
+            .finally(() => {
+                pidiendo = false;
+                cargando.style.visibility = 'hidden';
+            });
+    }, { rootMargin: '200px' });
+
+    observador.observe(cargando);
+})();
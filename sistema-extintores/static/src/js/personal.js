@@ -0,0 +1,215 @@
+let personal = [];
+
+function cargarPersonal() {
+    fetch('/api/usuarios')
+        .then(response => response.json())
+        .then(data => {
+            personal = data;
+            mostrarPersonal(data);
+        });
+}
+
+function mostrarPersonal(data) {
+    const tabla = document.getElementById('tabla-personal');
+    tabla.innerHTML = '';
+
+    if (data.length === 0) {
+        tabla.innerHTML = '<tr><td colspan="7" class="text-center text-muted">No hay personal registrado</td></tr>';
+        return;
+    }
+
+    data.forEach(p => {
+        const estadoBadge = p.activo 
+            ? '<span class="badge bg-success">Activo</span>' 
+            : '<span class="badge bg-secondary">Inactivo</span>';
+
+        let cargoBadge = '';
+        let cargoTexto = '';
+        if (p.rol === 'PRINCIPAL') {
+            cargoBadge = '<span class="badge bg-danger">Gerente</span>';
+            cargoTexto = 'Gerente/Principal';
+        } else if (p.rol === 'ADMINISTRATIVO') {
+            cargoBadge = '<span class="badge bg-info">Administrativo</span>';
+            cargoTexto = 'Personal Administrativo';
+        } else if (p.rol === 'TECNICO') {
+            cargoBadge = '<span class="badge bg-warning">Técnico</span>';
+            cargoTexto = 'Técnico de Campo';
+        }
+
+        const fila = `
+            <tr>
+                <td><strong>${p.nombre_completo}</strong></td>
+                <td><small class="text-muted">${p.username}</small></td>
+                <td>${p.email || '-'}</td>
+                <td>${p.telefono || '-'}</td>
+                <td>${cargoBadge}</td>
+                <td>${estadoBadge}</td>
+                <td>
+                    <button class="btn btn-sm btn-outline-primary" onclick="editarPersonal(${p.id})" title="Editar">
+                        <i class="bi bi-pencil"></i>
+                    </button>
+                    <button class="btn btn-sm btn-outline-warning" onclick="abrirCambiarPassword(${p.id}, '${p.nombre_completo}')" title="Cambiar contraseña">
+                        <i class="bi bi-key"></i>
+                    </button>
+                    <button class="btn btn-sm btn-outline-danger" onclick="eliminarPersonal(${p.id})" title="Eliminar">
+                        <i class="bi bi-trash"></i>
+                    </button>
+                </td>
+            </tr>
+        `;
+        tabla.innerHTML += fila;
+    });
+}
+
+function generarUsername(nombreCompleto) {
+    const partes = nombreCompleto.trim().toLowerCase().split(' ');
+    if (partes.length >= 2) {
+        return partes[0] + '.' + partes[1];
+    }
+    return partes[0];
+}
+
+function generarPasswordFacil() {
+    const palabras = ['Sol', 'Luna', 'Mar', 'Rio', 'Flor', 'Luz', 'Paz', 'Vida', 'Amor', 'Cielo'];
+    const palabra = palabras[Math.floor(Math.random() * palabras.length)];
+    const numero = Math.floor(Math.random() * 9000) + 1000;
+    return palabra + numero;
+}
+
+function guardarPersonal() {
+    const id = document.getElementById('personalId').value;
+    const nombreCompleto = document.getElementById('nombreCompleto').value;
+    const email = document.getElementById('email').value;
+    const telefono = document.getElementById('telefono').value;
+    const dni = document.getElementById('dni').value;
+    const rol = document.getElementById('rol').value;
+    const direccion = document.getElementById('direccion').value;
+    const activo = document.getElementById('activo').checked;
+
+    if (!nombreCompleto || !rol) {
+        alert('Por favor completa los campos obligatorios');
+        return;
+    }
+
+    const data = {
+        nombre_completo: nombreCompleto,
+        email: email,
+        telefono: telefono,
+        dni: dni,
+        rol: rol,
+        direccion: direccion,
+        activo: activo
+    };
+
+    if (!id) {
+        data.username = generarUsername(nombreCompleto);
+        data.password = generarPasswordFacil();
+    }
+
+    const url = id ? `/api/usuarios/${id}` : '/api/usuarios';
+    const method = id ? 'PUT' : 'POST';
+
+    fetch(url, {
+        method: method,
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify(data)
+    })
+    .then(response => response.json())
+    .then(result => {
+        if (result.success) {
+            if (!id) {
+                document.getElementById('usernameGenerado').textContent = data.username;
+                document.getElementById('passwordGenerado').textContent = data.password;
+                document.getElementById('credencialesGeneradas').style.display = 'block';
+                document.getElementById('formPersonal').querySelectorAll('input, select').forEach(el => el.disabled = true);
+                alert('Trabajador creado exitosamente. Guarda las credenciales mostradas.');
+            } else {
+                alert('Trabajador actualizado exitosamente');
+                bootstrap.Modal.getInstance(document.getElementById('modalPersonal')).hide();
+            }
+            cargarPersonal();
+        } else {
+            alert('Error: ' + result.error);
+        }
+    });
+}
+
+function editarPersonal(id) {
+    const p = personal.find(u => u.id === id);
+    if (!p) return;
+
+    document.getElementById('modalPersonalTitulo').textContent = 'Editar Trabajador';
+    document.getElementById('personalId').value = p.id;
+    document.getElementById('nombreCompleto').value = p.nombre_completo;
+    document.getElementById('email').value = p.email || '';
+    document.getElementById('telefono').value = p.telefono || '';
+    document.getElementById('dni').value = p.dni || '';
+    document.getElementById('rol').value = p.rol;
+    document.getElementById('direccion').value = p.direccion || '';
+    document.getElementById('activo').checked = p.activo;
+
+    new bootstrap.Modal(document.getElementById('modalPersonal')).show();
+}
+
+function eliminarPersonal(id) {
+    if (!confirm('¿Eliminar este trabajador?')) return;
+
+    fetch(`/api/usuarios/${id}`, {method: 'DELETE'})
+        .then(response => response.json())
+        .then(result => {
+            if (result.success) {
+                alert('Trabajador eliminado');
+                cargarPersonal();
+            }
+        });
+}
+
+function abrirCambiarPassword(id, nombre) {
+    document.getElementById('passwordPersonalId').value = id;
+    document.getElementById('passwordNombre').textContent = nombre;
+    document.getElementById('nuevaPassword').value = '';
+    new bootstrap.Modal(document.getElementById('modalCambiarPassword')).show();
+}
+
+function generarPasswordAleatoria() {
+    document.getElementById('nuevaPassword').value = generarPasswordFacil();
+}
+
+function cambiarPassword() {
+    const id = document.getElementById('passwordPersonalId').value;
+    const password = document.getElementById('nuevaPassword').value;
+
+    if (!password) {
+        alert('Ingresa una contraseña');
+        return;
+    }
+
+    fetch(`/api/usuarios/${id}/cambiar-password`, {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({password: password})
+    })
+    .then(response => response.json())
+    .then(result => {
+        if (result.success) {
+            alert('Contraseña cambiada exitosamente');
+            bootstrap.Modal.getInstance(document.getElementById('modalCambiarPassword')).hide();
+        }
+    });
+}
+
+function copiarTexto(elementId) {
+    const texto = document.getElementById(elementId).textContent;
+    navigator.clipboard.writeText(texto);
+    alert('Copiado al portapapeles');
+}
+
+document.getElementById('modalPersonal').addEventListener('hidden.bs.modal', function() {
+    document.getElementById('formPersonal').reset();
+    document.getElementById('personalId').value = '';
+    document.getElementById('credencialesGeneradas').style.display = 'none';
+    document.getElementById('formPersonal').querySelectorAll('input, select').forEach(el => el.disabled = false);
+    document.getElementById('modalPersonalTitulo').textContent = 'Nuevo Trabajador';
+});
+
+cargarPersonal();
@@ -0,0 +1,24 @@
+function confirmarEliminacionModelo(modeloId) {
+    const modal = new bootstrap.Modal(document.getElementById('modalEliminarModelo'));
+    document.getElementById('formEliminarModelo').action = `/productos/${productoId}/modelos/${modeloId}/eliminar`;
+    modal.show();
+}
+
+// Stock en tiempo real
+suscribirStock({ productos: [productoId] }, function(mensaje) {
+    const p = (mensaje.productos || []).find(p => p.id === productoId);
+    if (!p) return;
+    document.getElementById('stockActual').textContent = p.stock;
+    document.getElementById('stockMinimo').textContent = p.minimo;
+    document.getElementById('valorTotal').textContent = 'S/ ' + (p.stock * precioUnitario).toFixed(2);
+    document.getElementById('estadoStock').innerHTML = p.stock === 0
+        ? '<div class="alert alert-danger"><i class="bi bi-exclamation-triangle"></i> <strong>Producto Agotado</strong> - No hay stock disponible</div>'
+        : p.bajo
+            ? '<div class="alert alert-warning"><i class="bi bi-exclamation-circle"></i> <strong>Stock Bajo</strong> - Se recomienda reabastecer</div>'
+            : '<div class="alert alert-success"><i class="bi bi-check-circle"></i> <strong>Stock Normal</strong> - Nivel adecuado de inventario</div>';
+    const porcentaje = p.minimo > 0 ? p.stock / p.minimo * 100 : 100;
+    const barra = document.getElementById('barraStock');
+    barra.className = 'progress-bar bg-' + (porcentaje > 100 ? 'success' : porcentaje > 50 ? 'warning' : 'danger');
+    barra.style.width = Math.min(porcentaje, 100) + '%';
+    barra.textContent = Math.round(porcentaje) + '%';
+});
@@ -0,0 +1,105 @@
+// Generar código automático
+function generarCodigo() {
+    if (!productoNuevo) {
+        return;
+    }
+    const categoriaSelect = document.getElementById('categoriaSelect');
+    const ubicacionSelect = document.getElementById('ubicacionSelect');
+    const codigoInput = document.getElementById('codigoInput');
+
+    const categoriaId = categoriaSelect.value;
+    const ubicacion = ubicacionSelect.value;
+
+    if (categoriaId && ubicacion) {
+        // Generar código temporal
+        codigoInput.value = 'Generando...';
+
+        // Hacer petición AJAX para obtener el siguiente código
+        fetch(`/api/siguiente-codigo?categoria_id=${categoriaId}&ubicacion=${encodeURIComponent(ubicacion)}`)
+            .then(response => response.json())
+            .then(data => {
+                if (data.codigo) {
+                    codigoInput.value = data.codigo;
+                } else if (data.error) {
+                    codigoInput.value = '';
+                    console.error('Error:', data.error);
+                }
+            })
+            .catch(error => {
+                codigoInput.value = '';
+                console.error('Error al generar código:', error);
+            });
+    } else {
+        codigoInput.value = '';
+    }
+}
+
+// Gestión de características
+function agregarCaracteristica() {
+    const container = document.getElementById('caracteristicasContainer');
+
+    // Eliminar mensaje de "no hay características" si existe
+    const mensajeVacio = container.querySelector('p.text-muted');
+    if (mensajeVacio) {
+        mensajeVacio.remove();
+    }
+
+    const div = document.createElement('div');
+    div.className = 'row mb-2 caracteristica-item';
+    div.innerHTML = `
+        <div class="col-md-5">
+            <input type="text" class="form-control form-control-sm" placeholder="Nombre (ej: Talla, Material)">
+        </div>
+        <div class="col-md-5">
+            <input type="text" class="form-control form-control-sm" placeholder="Valor (ej: XL, Acero)">
+        </div>
+        <div class="col-md-2">
+            <button type="button" class="btn btn-sm btn-danger" onclick="eliminarCaracteristica(this)">
+                <i class="bi bi-trash"></i>
+            </button>
+        </div>
+    `;
+    container.appendChild(div);
+}
+
+function eliminarCaracteristica(btn) {
+    const item = btn.closest('.caracteristica-item');
+    item.remove();
+
+    // Si no quedan características, mostrar mensaje
+    const container = document.getElementById('caracteristicasContainer');
+    if (container.querySelectorAll('.caracteristica-item').length === 0) {
+        container.innerHTML = '<p class="text-muted mb-0"><small>No hay características agregadas. Haz clic en "Agregar" para incluir características como talla, material, voltaje, etc.</small></p>';
+    }
+}
+
+// Serializar características antes de enviar el formulario
+document.getElementById('productoForm').addEventListener('submit', function(e) {
+    const caracteristicas = [];
+    document.querySelectorAll('.caracteristica-item').forEach(item => {
+        const inputs = item.querySelectorAll('input');
+        const nombre = inputs[0].value.trim();
+        const valor = inputs[1].value.trim();
+        if (nombre && valor) {
+            caracteristicas.push({ nombre, valor });
+        }
+    });
+    document.getElementById('caracteristicasData').value = JSON.stringify(caracteristicas);
+});
+
+// Generar código al cargar si ya hay selecciones
+document.addEventListener('DOMContentLoaded', function() {
+    generarCodigo();
+
+    // Advertencia si se activa "tiene modelos" con stock inicial
+    const tieneModelosCheck = document.getElementById('tieneModelos');
+    const stockInicial = document.getElementById('stockInicial');
+
+    if (tieneModelosCheck && stockInicial) {
+        tieneModelosCheck.addEventListener('change', function() {
+            if (this.checked && parseFloat(stockInicial.value) > 0) {
+                alert('Nota: Si el producto tiene modelos, el stock se gestionará por cada modelo individual. El stock inicial se ignorará.');
+            }
+        });
+    }
+});
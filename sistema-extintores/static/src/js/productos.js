@@ -0,0 +1,58 @@
+function confirmarEliminacion(id) {
+    const modal = new bootstrap.Modal(document.getElementById('modalEliminar'));
+    document.getElementById('formEliminar').action = `/productos/eliminar/${id}`;
+    modal.show();
+}
+
+// Autocompletado de la búsqueda
+(function() {
+    const input = document.getElementById('busqueda');
+    const lista = document.getElementById('sugerenciasProductos');
+    let temporizador = null;
+    let controlador = null;
+
+    input.addEventListener('input', function() {
+        clearTimeout(temporizador);
+        const texto = input.value.trim();
+        if (texto.length < 2) {
+            lista.innerHTML = '';
+            return;
+        }
+        temporizador = setTimeout(function() {
+            if (controlador) controlador.abort();
+            controlador = new AbortController();
+            fetch(`/api/productos/buscar?q=${encodeURIComponent(texto)}`, { signal: controlador.signal })
+                .then(r => r.json())
+                .then(productos => {
+                    lista.innerHTML = '';
+                    productos.forEach(p => {
+                        const opcion = document.createElement('option');
+                        opcion.value = p.nombre;
+                        opcion.label = `${p.codigo} · Stock: ${p.stock_actual} ${p.unidad_medida}`;
+                        lista.appendChild(opcion);
+                    });
+                })
+                .catch(() => {});
+        }, 150);
+    });
+})();
+
+// Stock en tiempo real de los productos de esta página
+(function() {
+    const filas = {};
+    document.querySelectorAll('tr[data-producto-id]').forEach(fila => {
+        filas[fila.dataset.productoId] = fila;
+    });
+    suscribirStock({ productos: Object.keys(filas) }, function(mensaje) {
+        (mensaje.productos || []).forEach(p => {
+            const fila = filas[p.id];
+            if (!fila) return;
+            fila.querySelector('[data-stock]').textContent = p.stock;
+            fila.querySelector('[data-minimo]').textContent = p.minimo;
+            fila.querySelector('[data-valor]').textContent = 'S/ ' + (p.stock * parseFloat(fila.dataset.precio || 0)).toFixed(2);
+            fila.querySelector('[data-estado]').innerHTML = p.stock === 0
+                ? '<span class="badge bg-danger">Agotado</span>'
+                : p.bajo ? '<span class="badge bg-warning">Stock Bajo</span>' : '<span class="badge bg-success">Normal</span>';
+        });
+    });
+})();
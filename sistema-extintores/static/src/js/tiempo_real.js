@@ -0,0 +1,84 @@
+// Una sola conexión Socket.IO por página (tiempo_real.py)
+const socketApp = window.io ? io({ transports: ['websocket', 'polling'] }) : null;
+
+// ========== STOCK EN TIEMPO REAL ==========
+// salas: {productos: [ids], categorias: [ids], inventario: bool} (difusion_stock.py).
+// Cada cambio confirmado llega agrupado en un mensaje {productos: [...], resumen: {...}}.
+function suscribirStock(salas, alRecibir) {
+    if (!socketApp) {
+        return;
+    }
+    // Al reconectar el servidor olvida las salas: volver a suscribirse
+    socketApp.on('connect', () => socketApp.emit('suscribir_stock', salas));
+    if (socketApp.connected) {
+        socketApp.emit('suscribir_stock', salas);
+    }
+    socketApp.on('stock', alRecibir);
+}
+
+// ========== TRABAJOS EN SEGUNDO PLANO ==========
+// Los enlaces con data-exportar generan el archivo en un trabajo (trabajos.py) y lo
+// descargan al terminar. El avance llega por Socket.IO; si no hay conexión, se consulta /api/jobs/<id>.
+const trabajosEnCurso = {};
+if (socketApp) {
+    socketApp.on('estado_trabajo', function(estado) {
+        if (trabajosEnCurso[estado.id]) {
+            trabajosEnCurso[estado.id](estado);
+        }
+    });
+}
+
+function seguirTrabajo(estado, alCambiar) {
+    return new Promise(function(resolver, rechazar) {
+        let consulta = null;
+        function recibir(nuevo) {
+            alCambiar(nuevo);
+            if (nuevo.estado === 'completado' || nuevo.estado === 'fallido') {
+                delete trabajosEnCurso[nuevo.id];
+                clearInterval(consulta);
+                (nuevo.estado === 'completado' ? resolver : rechazar)(nuevo);
+            }
+        }
+        trabajosEnCurso[estado.id] = recibir;
+        function consultar() {
+            fetch(estado.url).then(r => r.json()).then(recibir).catch(() => {});
+        }
+        // La consulta periódica cubre los eventos perdidos antes de unirse o sin socket
+        consulta = setInterval(consultar, socketApp && socketApp.connected ? 5000 : 1500);
+        consultar();
+    });
+}
+
+document.addEventListener('click', function(e) {
+    const enlace = e.target.closest('a[data-exportar]');
+    if (!enlace || enlace.classList.contains('disabled')) {
+        return;
+    }
+    e.preventDefault();
+    const original = enlace.innerHTML;
+    const datos = new FormData();
+    datos.append('formato', enlace.dataset.formato);
+    datos.append('fecha', enlace.dataset.fecha || '');
+    enlace.classList.add('disabled');
+    enlace.innerHTML = '<span class="spinner-border spinner-border-sm"></span> En cola';
+
+    fetch(enlace.dataset.exportar, { method: 'POST', body: datos })
+        .then(r => r.ok ? r.json() : Promise.reject(r))
+        .then(estado => seguirTrabajo(estado, function(nuevo) {
+            if (nuevo.estado === 'ejecutando') {
+                enlace.innerHTML = '<span class="spinner-border spinner-border-sm"></span> ' + Math.round(nuevo.progreso) + '%';
+            } else if (nuevo.estado === 'reintentando') {
+                enlace.innerHTML = '<span class="spinner-border spinner-border-sm"></span> Reintentando';
+            }
+        }))
+        .then(function(estado) {
+            window.location = estado.resultado_url;
+        })
+        .catch(function(estado) {
+            alert('No se pudo generar el archivo' + (estado && estado.error ? ': ' + estado.error : ''));
+        })
+        .finally(function() {
+            enlace.classList.remove('disabled');
+            enlace.innerHTML = original;
+        });
+});
@@ -0,0 +1,206 @@
+let usuarios = [];
+
+function cargarUsuarios() {
+    fetch('/api/usuarios')
+        .then(response => response.json())
+        .then(data => {
+            usuarios = data;
+            mostrarUsuarios(data);
+        });
+}
+
+function mostrarUsuarios(data) {
+    const tabla = document.getElementById('tabla-usuarios');
+    tabla.innerHTML = '';
+
+    if (data.length === 0) {
+        tabla.innerHTML = '<tr><td colspan="7" class="text-center text-muted">No hay usuarios registrados</td></tr>';
+        return;
+    }
+
+    data.forEach(usuario => {
+        const estadoBadge = usuario.activo 
+            ? '<span class="badge bg-success">Activo</span>' 
+            : '<span class="badge bg-secondary">Inactivo</span>';
+
+        let rolBadge = '';
+        if (usuario.rol === 'PRINCIPAL') rolBadge = '<span class="badge bg-danger">Principal</span>';
+        else if (usuario.rol === 'ADMINISTRATIVO') rolBadge = '<span class="badge bg-info">Administrativo</span>';
+        else if (usuario.rol === 'TECNICO') rolBadge = '<span class="badge bg-warning">Técnico</span>';
+
+        const fila = `
+            <tr>
+                <td><strong>${usuario.username}</strong></td>
+                <td>${usuario.nombre_completo}</td>
+                <td>${usuario.email || '-'}</td>
+                <td>${rolBadge}</td>
+                <td>${estadoBadge}</td>
+                <td><small>${usuario.ultimo_acceso || 'Nunca'}</small></td>
+                <td>
+                    <button class="btn btn-sm btn-outline-primary" onclick="editarUsuario(${usuario.id})">
+                        <i class="bi bi-pencil"></i>
+                    </button>
+                    <button class="btn btn-sm btn-outline-warning" onclick="abrirCambiarPassword(${usuario.id}, '${usuario.username}')">
+                        <i class="bi bi-key"></i>
+                    </button>
+                    <button class="btn btn-sm btn-outline-danger" onclick="eliminarUsuario(${usuario.id})">
+                        <i class="bi bi-trash"></i>
+                    </button>
+                </td>
+            </tr>
+        `;
+        tabla.innerHTML += fila;
+    });
+}
+
+function generarUsername(nombreCompleto) {
+    // Tomar primer nombre y primer apellido
+    const partes = nombreCompleto.trim().toLowerCase().split(' ');
+    if (partes.length >= 2) {
+        return partes[0] + '.' + partes[1];
+    }
+    return partes[0];
+}
+
+function generarPasswordFacil() {
+    // Generar contraseña fácil: Palabra + Número
+    const palabras = ['Sol', 'Luna', 'Mar', 'Rio', 'Flor', 'Luz', 'Paz', 'Vida', 'Amor', 'Cielo'];
+    const palabra = palabras[Math.floor(Math.random() * palabras.length)];
+    const numero = Math.floor(Math.random() * 9000) + 1000; // 1000-9999
+    return palabra + numero;
+}
+
+function guardarUsuario() {
+    const id = document.getElementById('usuarioId').value;
+    const nombreCompleto = document.getElementById('nombreCompleto').value;
+    const email = document.getElementById('email').value;
+    const rol = document.getElementById('rol').value;
+    const activo = document.getElementById('activo').checked;
+
+    if (!nombreCompleto || !rol) {
+        alert('Por favor completa los campos obligatorios');
+        return;
+    }
+
+    const data = {
+        nombre_completo: nombreCompleto,
+        email: email,
+        rol: rol,
+        activo: activo
+    };
+
+    // Si es nuevo usuario, generar credenciales
+    if (!id) {
+        data.username = generarUsername(nombreCompleto);
+        data.password = generarPasswordFacil();
+    }
+
+    const url = id ? `/api/usuarios/${id}` : '/api/usuarios';
+    const method = id ? 'PUT' : 'POST';
+
+    fetch(url, {
+        method: method,
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify(data)
+    })
+    .then(response => response.json())
+    .then(result => {
+        if (result.success) {
+            if (!id) {
+                // Mostrar credenciales generadas
+                document.getElementById('usernameGenerado').textContent = data.username;
+                document.getElementById('passwordGenerado').textContent = data.password;
+                document.getElementById('credencialesGeneradas').style.display = 'block';
+
+                // Deshabilitar el formulario
+                document.getElementById('formUsuario').querySelectorAll('input, select').forEach(el => el.disabled = true);
+
+                alert('Usuario creado exitosamente. Guarda las credenciales mostradas.');
+            } else {
+                alert('Usuario actualizado exitosamente');
+                bootstrap.Modal.getInstance(document.getElementById('modalUsuario')).hide();
+            }
+            cargarUsuarios();
+        } else {
+            alert('Error: ' + result.error);
+        }
+    });
+}
+
+function editarUsuario(id) {
+    const usuario = usuarios.find(u => u.id === id);
+    if (!usuario) return;
+
+    document.getElementById('modalUsuarioTitulo').textContent = 'Editar Usuario';
+    document.getElementById('usuarioId').value = usuario.id;
+    document.getElementById('nombreCompleto').value = usuario.nombre_completo;
+    document.getElementById('email').value = usuario.email || '';
+    document.getElementById('rol').value = usuario.rol;
+    document.getElementById('activo').checked = usuario.activo;
+
+    new bootstrap.Modal(document.getElementById('modalUsuario')).show();
+}
+
+function eliminarUsuario(id) {
+    if (!confirm('¿Eliminar este usuario?')) return;
+
+    fetch(`/api/usuarios/${id}`, {method: 'DELETE'})
+        .then(response => response.json())
+        .then(result => {
+            if (result.success) {
+                alert('Usuario eliminado');
+                cargarUsuarios();
+            }
+        });
+}
+
+function abrirCambiarPassword(id, username) {
+    document.getElementById('passwordUsuarioId').value = id;
+    document.getElementById('passwordUsername').textContent = username;
+    document.getElementById('nuevaPassword').value = '';
+    new bootstrap.Modal(document.getElementById('modalCambiarPassword')).show();
+}
+
+function generarPasswordAleatoria() {
+    document.getElementById('nuevaPassword').value = generarPasswordFacil();
+}
+
+function cambiarPassword() {
+    const id = document.getElementById('passwordUsuarioId').value;
+    const password = document.getElementById('nuevaPassword').value;
+
+    if (!password) {
+        alert('Ingresa una contraseña');
+        return;
+    }
+
+    fetch(`/api/usuarios/${id}/cambiar-password`, {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({password: password})
+    })
+    .then(response => response.json())
+    .then(result => {
+        if (result.success) {
+            alert('Contraseña cambiada exitosamente');
+            bootstrap.Modal.getInstance(document.getElementById('modalCambiarPassword')).hide();
+        }
+    });
+}
+
+function copiarTexto(elementId) {
+    const texto = document.getElementById(elementId).textContent;
+    navigator.clipboard.writeText(texto);
+    alert('Copiado al portapapeles');
+}
+
+// Limpiar formulario al cerrar modal
+document.getElementById('modalUsuario').addEventListener('hidden.bs.modal', function() {
+    document.getElementById('formUsuario').reset();
+    document.getElementById('usuarioId').value = '';
+    document.getElementById('credencialesGeneradas').style.display = 'none';
+    document.getElementById('formUsuario').querySelectorAll('input, select').forEach(el => el.disabled = false);
+    document.getElementById('modalUsuarioTitulo').textContent = 'Nuevo Usuario';
+});
+
+cargarUsuarios();
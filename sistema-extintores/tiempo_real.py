@@ -0,0 +1,42 @@
+"""
+Eventos en tiempo real (Flask-SocketIO, modo threading como el Procfile)
+- Cada usuario con sesión se une a la sala usuario_<id> al conectarse.
+- emitir() se puede llamar desde requests o desde hilos en segundo plano (trabajos.py).
+"""
+import logging
+from flask_login import current_user
+from flask_socketio import SocketIO, join_room
+
+socketio = SocketIO()
+
+registro = logging.getLogger(__name__)
+
+
+def sala_usuario(usuario_id):
+    return f'usuario_{usuario_id}'
+
+
+def emitir(evento, datos, sala=None):
+    """Emite un evento a una sala (o a todos); un fallo de Socket.IO no interrumpe al que llama"""
+    try:
+        socketio.emit(evento, datos, to=sala)
+    except Exception:
+        registro.exception('No se pudo emitir %s', evento)
+
+
+def participantes(sala):
+    """sids conectados a la sala en este proceso"""
+    try:
+        return [sid for sid, _ in socketio.server.manager.get_participants('/', sala)]
+    except (AttributeError, KeyError):
+        return []
+
+
+def registrar_tiempo_real(app):
+    socketio.init_app(app, async_mode='threading', manage_session=False)
+
+    @socketio.on('connect')
+    def _conectar(auth=None):
+        if not current_user.is_authenticated:
+            return False
+        join_room(sala_usuario(current_user.id))
@@ -0,0 +1,414 @@
+"""
+Trabajos en segundo plano (exportación de reportes, cargas masivas)
+- encolar() guarda el trabajo en la tabla jobs y vuelve enseguida: el request no espera.
+- Un despachador toma los trabajos listos y los ejecuta en un pool de hilos
+  (TRABAJOS_HILOS), cada uno con su propio app context y sesión.
+- El avance se guarda en la tabla (a lo sumo cada INTERVALO_PROGRESO segundos) y se emite
+  por Socket.IO ('estado_trabajo') a la sala del usuario; /api/jobs/<id> sirve para consultar.
+- Una tarea que escribe en la base puede llamar a completar() antes de su commit: el estado
+  "completado" se confirma con sus escrituras y un reintento nunca las repite.
+- Si la tarea lanza una excepción se reintenta con espera exponencial hasta max_intentos;
+  TrabajoFallido es un error definitivo y no se reintenta.
+- La tabla es la cola: lo pendiente sobrevive a un reinicio, y el paso a "ejecutando" es un
+  UPDATE condicional, así que con varios workers cada trabajo lo ejecuta uno solo. Los
+  trabajos de un proceso que murió se detectan por falta de latido y se reintentan.
+- @periodica registra mantenimiento (podas) que el despachador corre cada tantos segundos,
+  fuera de las transacciones de los requests.
+Hilos y no procesos: las tareas usan el app context y la sesión de SQLAlchemy. El trabajo de
+CPU (openpyxl, reportlab) comparte el GIL con los requests, pero ya no ocupa un hilo de gunicorn.
+"""
+import os
+import time
+import random
+import logging
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, has_request_context, jsonify, abort, send_file, url_for
+from flask_login import login_required, current_user
+from sqlalchemy import select, update, delete
+from models import db, Trabajo
+from tiempo_real import emitir, sala_usuario
+
+ESTADOS_LISTOS = ('pendiente', 'reintentando')
+ESTADOS_FINALES = ('completado', 'fallido')
+INTERVALO_PROGRESO = 1.0  # segundos entre actualizaciones de avance
+INTERVALO_LATIDO = 30  # segundos
+INTERVALO_LIMPIEZA = 3600  # segundos
+
+registro = logging.getLogger(__name__)
+
+# tipo -> {'funcion': callable(trabajo), 'max_intentos': int | None}
+TAREAS = {}
+# nombre -> {'funcion': callable(), 'intervalo': segundos}
+PERIODICAS = {}
+
+
+class TrabajoFallido(Exception):
+    """Error definitivo: el trabajo se marca como fallido sin reintentos"""
+
+
+def tarea(tipo, max_intentos=None):
+    """Registra una función como tarea; recibe un EnEjecucion y devuelve un resultado JSON"""
+    def decorador(funcion):
+        TAREAS[tipo] = {'funcion': funcion, 'max_intentos': max_intentos}
+        return funcion
+    return decorador
+
+
+def periodica(nombre, intervalo):
+    """Registra una función sin argumentos que el despachador corre cada `intervalo` segundos"""
+    def decorador(funcion):
+        PERIODICAS[nombre] = {'funcion': funcion, 'intervalo': intervalo}
+        return funcion
+    return decorador
+
+
+def _url(endpoint, **valores):
+    """url_for también desde los hilos del pool (sin request)"""
+    if has_request_context():
+        return url_for(endpoint, **valores)
+    adaptador = current_app.url_map.bind('', script_name=current_app.config.get('APPLICATION_ROOT', '/'))
+    return adaptador.build(endpoint, valores)
+
+
+def a_dict(trabajo):
+    datos = {
+        'id': trabajo.id,
+        'tipo': trabajo.tipo,
+        'estado': trabajo.estado,
+        'progreso': round(trabajo.progreso or 0, 1),
+        'mensaje': trabajo.mensaje,
+        'intentos': trabajo.intentos,
+        'max_intentos': trabajo.max_intentos,
+        'error': trabajo.error,
+        'resultado': trabajo.resultado,
+        'fecha_creacion': trabajo.fecha_creacion.isoformat() if trabajo.fecha_creacion else None,
+        'fecha_inicio': trabajo.fecha_inicio.isoformat() if trabajo.fecha_inicio else None,
+        'fecha_fin': trabajo.fecha_fin.isoformat() if trabajo.fecha_fin else None,
+        'url': _url('estado_trabajo', id=trabajo.id),
+    }
+    if trabajo.estado == 'reintentando' and trabajo.proximo_intento:
+        datos['proximo_intento'] = trabajo.proximo_intento.isoformat()
+    if trabajo.estado == 'completado' and trabajo.resultado_ruta:
+        datos['resultado_url'] = _url('resultado_trabajo', id=trabajo.id)
+    return datos
+
+
+def _actualizar(trabajo_id, *condiciones, **valores):
+    """UPDATE en una conexión propia: no confirma ni espera a la transacción de la tarea"""
+    with db.engine.begin() as conexion:
+        return conexion.execute(
+            update(Trabajo).where(Trabajo.id == trabajo_id, *condiciones).values(**valores)
+        ).rowcount
+
+
+def _avisar(usuario_id, datos):
+    if usuario_id is not None:
+        emitir('estado_trabajo', datos, sala=sala_usuario(usuario_id))
+
+
+# ==================== EJECUCIÓN ====================
+
+class EnEjecucion:
+    """Lo recibe cada tarea: parámetros, avance y ruta del archivo de resultado"""
+
+    def __init__(self, trabajo, directorio):
+        self.id = trabajo.id
+        self.tipo = trabajo.tipo
+        self.usuario_id = trabajo.usuario_id
+        self.parametros = trabajo.parametros or {}
+        self.intento = trabajo.intentos
+        self.ruta = None
+        self.completado = False
+        self._directorio = directorio
+        self._ultimo_aviso = 0.0
+
+    @property
+    def vigente(self):
+        """Condiciones de este intento: si otro proceso retomó el trabajo, ya no se cumplen"""
+        return Trabajo.estado == 'ejecutando', Trabajo.intentos == self.intento
+
+    def ruta_resultado(self, extension):
+        """Ruta del archivo que genera la tarea; se descarga desde /api/jobs/<id>/resultado"""
+        os.makedirs(self._directorio, exist_ok=True)
+        self.ruta = os.path.join(self._directorio, f'trabajo_{self.id}_{self.intento}.{extension}')
+        return self.ruta
+
+    def completar(self, resultado):
+        """
+        Marca el trabajo como completado dentro de la transacción de la tarea (sin commit).
+        Si el intento ya no es vigente, lanza TrabajoFallido y la tarea debe revertir.
+        """
+        ahora = datetime.utcnow()
+        filas = db.session.execute(
+            update(Trabajo).where(Trabajo.id == self.id, *self.vigente)
+            .values(estado='completado', progreso=100, mensaje=None, error=None, resultado=resultado,
+                    resultado_ruta=self.ruta, fecha_fin=ahora, fecha_actualizacion=ahora)
+        ).rowcount
+        if not filas:
+            raise TrabajoFallido('El trabajo fue retomado por otro proceso')
+        self.completado = True
+
+    def progreso(self, hechos, total=None, mensaje=None):
+        ahora = time.monotonic()
+        if ahora - self._ultimo_aviso < INTERVALO_PROGRESO:
+            return
+        self._ultimo_aviso = ahora
+        porcentaje = min(99.0, 100.0 * hechos / total) if total else 0.0
+        try:
+            _actualizar(self.id, *self.vigente, progreso=porcentaje, mensaje=mensaje,
+                        fecha_actualizacion=datetime.utcnow())
+        except Exception:
+            # El avance es informativo: un bloqueo momentáneo no debe hacer fallar la tarea
+            registro.warning('No se pudo guardar el avance del trabajo %s', self.id, exc_info=True)
+        _avisar(self.usuario_id, {'id': self.id, 'tipo': self.tipo, 'estado': 'ejecutando',
+                                  'progreso': round(porcentaje, 1), 'mensaje': mensaje})
+
+
+def _espera_reintento(app, intento):
+    base = app.config.get('TRABAJOS_REINTENTO_SEGUNDOS', 5)
+    maximo = app.config.get('TRABAJOS_REINTENTO_MAXIMO_SEGUNDOS', 300)
+    espera = min(maximo, base * 2 ** max(0, intento - 1))
+    return espera * random.uniform(0.9, 1.1)
+
+
+def _ejecutar(app, trabajo_id):
+    with app.app_context():
+        trabajo = db.session.get(Trabajo, trabajo_id)
+        en_ejecucion = EnEjecucion(trabajo, app.config['TRABAJOS_DIRECTORIO'])
+        max_intentos = trabajo.max_intentos
+        db.session.rollback()
+        _avisar(en_ejecucion.usuario_id, {'id': trabajo_id, 'tipo': en_ejecucion.tipo, 'estado': 'ejecutando',
+                                          'progreso': 0})
+
+        try:
+            definicion = TAREAS.get(en_ejecucion.tipo)
+            if definicion is None:
+                raise TrabajoFallido(f'Tipo de trabajo desconocido: {en_ejecucion.tipo}')
+            resultado = definicion['funcion'](en_ejecucion)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            if en_ejecucion.ruta and os.path.exists(en_ejecucion.ruta):
+                os.remove(en_ejecucion.ruta)
+            ahora = datetime.utcnow()
+            if isinstance(e, TrabajoFallido) or en_ejecucion.intento >= max_intentos:
+                registro.exception('Trabajo %s (%s) fallido', trabajo_id, en_ejecucion.tipo)
+                valores = {'estado': 'fallido', 'fecha_fin': ahora}
+            else:
+                espera = _espera_reintento(app, en_ejecucion.intento)
+                registro.warning('Trabajo %s (%s) falló en el intento %s, se reintenta en %.0fs: %s',
+                                 trabajo_id, en_ejecucion.tipo, en_ejecucion.intento, espera, e)
+                valores = {'estado': 'reintentando', 'proximo_intento': ahora + timedelta(seconds=espera)}
+            _actualizar(trabajo_id, *en_ejecucion.vigente, error=str(e) or type(e).__name__,
+                        fecha_actualizacion=ahora, **valores)
+        else:
+            ahora = datetime.utcnow()
+            if not en_ejecucion.completado:
+                _actualizar(trabajo_id, *en_ejecucion.vigente, estado='completado', progreso=100,
+                            mensaje=None, error=None, resultado=resultado, resultado_ruta=en_ejecucion.ruta,
+                            fecha_fin=ahora, fecha_actualizacion=ahora)
+
+        trabajo = db.session.get(Trabajo, trabajo_id)
+        _avisar(trabajo.usuario_id, a_dict(trabajo))
+
+
+# ==================== DESPACHADOR ====================
+
+class Despachador:
+    """Hilo que toma los trabajos listos de la tabla y los pasa al pool"""
+
+    def __init__(self, app):
+        self.app = app
+        self.hilos = app.config.get('TRABAJOS_HILOS', 2)
+        self.intervalo = app.config.get('TRABAJOS_INTERVALO_SEGUNDOS', 2)
+        self.abandono = app.config.get('TRABAJOS_ABANDONO_SEGUNDOS', 120)
+        self.retencion = app.config.get('TRABAJOS_RETENCION_HORAS', 24)
+        self._pool = ThreadPoolExecutor(max_workers=self.hilos, thread_name_prefix='trabajo')
+        self._aviso = threading.Event()
+        self._lock = threading.Lock()
+        self._en_curso = set()
+        self._ultimo_latido = 0.0
+        self._ultima_limpieza = 0.0
+        self._ultimas_periodicas = {}
+        self._hilo = threading.Thread(target=self._bucle, name='despachador-trabajos', daemon=True)
+        self._hilo.start()
+
+    def avisar(self):
+        self._aviso.set()
+
+    def _bucle(self):
+        while True:
+            self._aviso.wait(self.intervalo)
+            self._aviso.clear()
+            try:
+                with self.app.app_context():
+                    self._latido()
+                    self._recuperar_abandonados()
+                    self._limpiar()
+                    self._periodicas()
+                    for trabajo_id in self._tomar():
+                        self._pool.submit(self._correr, trabajo_id)
+            except Exception:
+                registro.exception('Error en el despachador de trabajos')
+
+    def _correr(self, trabajo_id):
+        try:
+            _ejecutar(self.app, trabajo_id)
+        except Exception:
+            registro.exception('Error al ejecutar el trabajo %s', trabajo_id)
+        finally:
+            with self._lock:
+                self._en_curso.discard(trabajo_id)
+            self.avisar()
+
+    def _tomar(self):
+        """Reclama hasta llenar el pool: pendiente/reintentando -> ejecutando (UPDATE condicional)"""
+        with self._lock:
+            libres = self.hilos - len(self._en_curso)
+        if libres <= 0:
+            return []
+        ahora = datetime.utcnow()
+        candidatos = db.session.execute(
+            select(Trabajo.id)
+            .where(Trabajo.estado.in_(ESTADOS_LISTOS), Trabajo.proximo_intento <= ahora)
+            .order_by(Trabajo.proximo_intento, Trabajo.id)
+            .limit(libres)
+        ).scalars().all()
+        db.session.rollback()
+
+        tomados = []
+        for trabajo_id in candidatos:
+            if _actualizar(trabajo_id, Trabajo.estado.in_(ESTADOS_LISTOS), estado='ejecutando',
+                           intentos=Trabajo.intentos + 1, fecha_inicio=ahora, fecha_actualizacion=ahora,
+                           mensaje=None):
+                with self._lock:
+                    self._en_curso.add(trabajo_id)
+                tomados.append(trabajo_id)
+        return tomados
+
+    def _latido(self):
+        ahora = time.monotonic()
+        with self._lock:
+            en_curso = list(self._en_curso)
+        if not en_curso or ahora - self._ultimo_latido < INTERVALO_LATIDO:
+            return
+        self._ultimo_latido = ahora
+        with db.engine.begin() as conexion:
+            conexion.execute(
+                update(Trabajo).where(Trabajo.id.in_(en_curso), Trabajo.estado == 'ejecutando')
+                .values(fecha_actualizacion=datetime.utcnow())
+            )
+
+    def _recuperar_abandonados(self):
+        """Trabajos 'ejecutando' sin latido: el proceso que los corría terminó"""
+        limite = datetime.utcnow() - timedelta(seconds=self.abandono)
+        abandonado = (Trabajo.estado == 'ejecutando', Trabajo.fecha_actualizacion < limite)
+        with db.engine.begin() as conexion:
+            conexion.execute(
+                update(Trabajo).where(*abandonado, Trabajo.intentos >= Trabajo.max_intentos)
+                .values(estado='fallido', error='Interrumpido', fecha_fin=datetime.utcnow())
+            )
+            conexion.execute(
+                update(Trabajo).where(*abandonado)
+                .values(estado='reintentando', error='Interrumpido', proximo_intento=datetime.utcnow())
+            )
+
+    def _limpiar(self):
+        """Borra los trabajos terminados (y sus archivos) con más de TRABAJOS_RETENCION_HORAS"""
+        ahora = time.monotonic()
+        if ahora - self._ultima_limpieza < INTERVALO_LIMPIEZA:
+            return
+        self._ultima_limpieza = ahora
+        limite = datetime.utcnow() - timedelta(hours=self.retencion)
+        viejos = db.session.execute(
+            select(Trabajo.id, Trabajo.resultado_ruta)
+            .where(Trabajo.estado.in_(ESTADOS_FINALES), Trabajo.fecha_fin < limite)
+        ).all()
+        db.session.rollback()
+        for trabajo_id, ruta in viejos:
+            if ruta and os.path.exists(ruta):
+                os.remove(ruta)
+        if viejos:
+            with db.engine.begin() as conexion:
+                conexion.execute(delete(Trabajo).where(Trabajo.id.in_([trabajo_id for trabajo_id, _ in viejos])))
+
+    def _periodicas(self):
+        """Corre las funciones de @periodica que ya cumplieron su intervalo, cada una en su transacción"""
+        for nombre, definicion in PERIODICAS.items():
+            ahora = time.monotonic()
+            if ahora - self._ultimas_periodicas.get(nombre, 0.0) < definicion['intervalo']:
+                continue
+            self._ultimas_periodicas[nombre] = ahora
+            try:
+                definicion['funcion']()
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                registro.exception('Error en la tarea periódica %s', nombre)
+
+
+_lock_inicio = threading.Lock()
+
+
+def despachador(app):
+    """Despachador de la app; se inicia con el primer request o el primer trabajo encolado"""
+    if 'trabajos' not in app.extensions:
+        with _lock_inicio:
+            if 'trabajos' not in app.extensions:
+                app.extensions['trabajos'] = Despachador(app) if app.config.get('TRABAJOS_HILOS', 2) else None
+    return app.extensions['trabajos']
+
+
+def encolar(app, tipo, parametros=None, usuario_id=None):
+    """Crea el trabajo (confirma la sesión) y avisa al despachador. Devuelve el Trabajo"""
+    if tipo not in TAREAS:
+        raise ValueError(f'Tipo de trabajo desconocido: {tipo}')
+    trabajo = Trabajo(
+        tipo=tipo,
+        parametros=parametros or {},
+        usuario_id=usuario_id,
+        max_intentos=TAREAS[tipo]['max_intentos'] or app.config.get('TRABAJOS_REINTENTOS', 3),
+        proximo_intento=datetime.utcnow(),
+    )
+    db.session.add(trabajo)
+    db.session.commit()
+    activo = despachador(app)
+    if activo is not None:
+        activo.avisar()
+    return trabajo
+
+
+# ==================== REGISTRO EN LA APP ====================
+
+def _trabajo_del_usuario(id):
+    trabajo = db.session.get(Trabajo, id)
+    if trabajo is None or (trabajo.usuario_id != current_user.id and current_user.rol != 'admin'):
+        abort(404)
+    return trabajo
+
+
+def registrar_trabajos(app):
+    app.config.setdefault('TRABAJOS_DIRECTORIO', os.path.join(app.instance_path, 'trabajos'))
+
+    @app.before_request
+    def _iniciar_despachador():
+        despachador(app)
+
+    @app.route('/api/jobs/<int:id>')
+    @login_required
+    def estado_trabajo(id):
+        return jsonify(a_dict(_trabajo_del_usuario(id)))
+
+    @app.route('/api/jobs/<int:id>/resultado')
+    @login_required
+    def resultado_trabajo(id):
+        trabajo = _trabajo_del_usuario(id)
+        if trabajo.estado != 'completado' or not trabajo.resultado_ruta:
+            return jsonify({'error': 'El trabajo no tiene un archivo de resultado', 'estado': trabajo.estado}), 409
+        if not os.path.exists(trabajo.resultado_ruta):
+            return jsonify({'error': 'El archivo de resultado ya no está disponible'}), 410
+        resultado = trabajo.resultado or {}
+        return send_file(trabajo.resultado_ruta, as_attachment=True, mimetype=resultado.get('mimetype'),
+                         download_name=resultado.get('archivo') or os.path.basename(trabajo.resultado_ruta))
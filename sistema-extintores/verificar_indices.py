@@ -0,0 +1,311 @@
+"""
+Verificación de planes de consulta
+Pobla una base de datos de prueba, recorre todas las rutas GET de la app (app.url_map,
+menos RUTAS_EXCLUIDAS), las VARIANTES con parámetros y las ESCRITURAS, capturando cada
+SELECT, UPDATE y DELETE que ejecutan y corre EXPLAIN QUERY PLAN (SQLite) o EXPLAIN (PostgreSQL)
+sobre cada una. Solo se capturan las consultas del hilo que hace los pedidos: las de los
+hilos de fondo (trabajos, logs) no se atribuyen a la ruta en curso. Termina con error si alguna consulta recorre una tabla completa o si
+alguna ruta excede su presupuesto de consultas (consultas.presupuesto_consultas).
+
+Uso:
+    python verificar_indices.py                          # SQLite temporal, 1M movimientos
+    python verificar_indices.py --movimientos 100000
+    python verificar_indices.py postgresql://u:p@host/db_de_prueba --destruir
+"""
+import os
+import re
+import sys
+import random
+import tempfile
+import threading
+import argparse
+from datetime import datetime, timedelta
+
+# Tablas pequeñas por diseño: recorrerlas completas no es un problema
+TABLAS_PERMITIDAS = {'categorias', 'usuarios'}
+
+# Rutas que recorren una tabla completa a propósito: el stock a una fecha se reconstruye
+# para todos los productos (O(productos + movimientos de la ventana))
+RECORRIDOS_ESPERADOS = {
+    '/reportes/valorizado?fecha=': {'productos'},
+}
+
+# Rutas GET que no se recorren (por endpoint)
+RUTAS_EXCLUIDAS = {
+    'static', 'estatico_dist', 'archivo_foto',  # archivos, sin consultas
+    'login', 'logout',  # cerrarían la sesión del recorrido
+    'api_consultar_ruc',  # consulta a un servicio externo
+    'estado_subida_foto',  # id de una subida en curso
+    'resultado_trabajo',  # descarga de archivo; la consulta es la de estado_trabajo
+    'siguiente_codigo',  # sin parámetros responde 400; está en VARIANTES
+}
+
+# Valores de los parámetros de las rutas, por nombre
+VALORES = {'id': 1, 'producto_id': 1, 'modelo_id': 1, 'orden_id': 1, 'clase': 'fotos'}
+
+# Además de cada ruta sin parámetros de consulta: filtros, búsquedas y ?since=
+# (CURSOR_CAMBIOS deja los últimos 200 cambios del historial que genera poblar())
+HISTORIAL_CAMBIOS = 4000
+CURSOR_CAMBIOS = HISTORIAL_CAMBIOS - 200
+VARIANTES = [
+    '/productos?categoria=1',
+    '/productos?busqueda=producto',
+    '/movimientos?tipo=entrada',
+    '/api/movimientos?tipo=salida',
+    f'/api/movimientos?since={CURSOR_CAMBIOS}',
+    f'/api/productos/cambios?since={CURSOR_CAMBIOS}',
+    f'/api/clientes?since={CURSOR_CAMBIOS}',
+    f'/api/ordenes/1/extintores?since={CURSOR_CAMBIOS}',
+    f'/reportes/valorizado?fecha={(datetime.utcnow() - timedelta(days=30)).date().isoformat()}',
+    '/api/productos/buscar?q=prod',
+    '/api/siguiente-codigo?categoria_id=1&ubicacion=Almacén',
+    '/api/logs?nivel=ERROR',
+]
+
+# Rutas de escritura: (ruta, argumentos del pedido). Se recorren después de las GET, sobre
+# productos sin modelos (poblar() da modelos a los productos 1, 11, 21...)
+ESCRITURAS = [
+    ('/categorias/nueva', {'data': {'nombre': 'Categoría verificación', 'descripcion': ''}}),
+    ('/productos/nuevo', {'data': {
+        'nombre': 'Producto verificación', 'categoria_id': 1, 'ubicacion': 'Almacén', 'unidad_medida': 'unidad',
+        'stock_actual': '5', 'stock_minimo': '1', 'precio_unitario': '10',
+        'caracteristicas_data': '[{"nombre": "Capacidad", "valor": "6 kg"}]',
+    }}),
+    ('/movimientos/entrada', {'data': {'producto_id': 2, 'cantidad': '5', 'motivo': 'Verificación'}}),
+    ('/movimientos/salida', {'data': {'producto_id': 2, 'cantidad': '1', 'motivo': 'Verificación'}}),
+    ('/movimientos/ajuste', {'data': {'producto_id': 3, 'nuevo_stock': '10', 'motivo': 'Verificación'}}),
+    ('/api/movimientos/lote', {'json': {'movimientos': [
+        {'producto_id': 4, 'tipo': 'entrada', 'cantidad': 2},
+        {'producto_id': 5, 'tipo': 'entrada', 'cantidad': 3},
+        {'producto_id': 6, 'tipo': 'ajuste', 'nuevo_stock': 7},
+    ]}}),
+    ('/api/ordenes/1/autoguardado', {'json': {'clave': 'verificacion-indices', 'cambios': [
+        {'id': 1, 'version': 1, 'campos': {'serie': 'V-1'}},
+        {'id': 2, 'version': 1, 'campos': {'marca': 'Verificación', 'observaciones': 'ok'}},
+    ]}}),
+]
+
+# Consultas que se analizan (los INSERT no recorren tablas)
+SENTENCIAS = ('SELECT', 'UPDATE', 'DELETE')
+
+LOTE = 50000
+
+
+def poblar(db, total_productos, total_movimientos):
+    from sqlalchemy import insert
+    from models import (Producto, Movimiento, ProductoModelo, ProductoColor, Cliente, RegistroCambio, Trabajo,
+                        ExtintorOrden)
+    from registro_cambios import TABLAS
+
+    rnd = random.Random(42)
+    ubicaciones = ['ALM', 'OFI', 'TAL']
+    inicio = datetime.utcnow() - timedelta(days=3 * 365)
+
+    productos = []
+    for i in range(1, total_productos + 1):
+        stock = rnd.randint(0, 200)
+        productos.append({
+            'codigo': f'{rnd.randint(1, 8):03d}-{rnd.choice(ubicaciones)}-{i:06d}',
+            'nombre': f'Producto {i:06d}',
+            'categoria_id': rnd.randint(1, 8),
+            'unidad_medida': 'unidad',
+            'stock_actual': stock,
+            # Alrededor del 2% de los productos queda con stock bajo
+            'stock_minimo': stock + 1 if rnd.random() < 0.02 else rnd.randint(0, max(stock - 1, 0)),
+            'precio_unitario': round(rnd.uniform(1, 500), 2),
+            'activo': True,
+            'fecha_creacion': inicio,
+        })
+    for i in range(0, len(productos), LOTE):
+        db.session.execute(insert(Producto.__table__), productos[i:i + LOTE])
+
+    # Un producto de cada diez maneja modelos (3 por producto) y cada modelo dos colores
+    modelos = [
+        {'producto_id': p, 'nombre_modelo': f'Modelo {n}', 'stock_actual': 0, 'fecha_creacion': inicio}
+        for p in range(1, total_productos + 1, 10) for n in range(3)
+    ]
+    db.session.execute(insert(ProductoModelo.__table__), modelos)
+    db.session.execute(insert(ProductoColor.__table__), [
+        {'modelo_id': m, 'nombre_color': color, 'stock_actual': 0, 'fecha_creacion': inicio}
+        for m in range(1, len(modelos) + 1) for color in ('Rojo', 'Negro')
+    ])
+
+    segundos = 3 * 365 * 24 * 3600
+    tipos = ['entrada', 'salida', 'ajuste']
+    lote = []
+    for n in range(total_movimientos):
+        lote.append({
+            'producto_id': rnd.randint(1, total_productos),
+            'usuario_id': 1,
+            'tipo_movimiento': rnd.choice(tipos),
+            'cantidad': 1,
+            'stock_anterior': 0,
+            'stock_nuevo': 1,
+            'fecha_movimiento': inicio + timedelta(seconds=segundos * n // total_movimientos),
+        })
+        if len(lote) == LOTE:
+            db.session.execute(insert(Movimiento.__table__), lote)
+            lote = []
+    if lote:
+        db.session.execute(insert(Movimiento.__table__), lote)
+
+    db.session.execute(insert(Cliente.__table__), [
+        {'nombre': f'Cliente {i:05d}', 'rfc': f'20{i:09d}', 'activo': rnd.random() < 0.95}
+        for i in range(1, total_productos // 10 + 1)
+    ])
+
+    # Veinte extintores por orden, en una orden de cada diez clientes
+    ordenes = total_productos // 100
+    db.session.execute(insert(ExtintorOrden.__table__), [
+        {'orden_id': orden, 'serie': f'S{orden:05d}-{n:02d}', 'tipo': 'PQS', 'capacidad': '6 kg', 'version': 1}
+        for orden in range(1, ordenes + 1) for n in range(20)
+    ])
+
+    # Historial de ?since= (intercalado entre tablas, anterior al margen) y un trabajo para /api/jobs
+    hace_una_hora = datetime.utcnow() - timedelta(hours=1)
+    db.session.execute(insert(RegistroCambio.__table__), [
+        {'tabla': tabla, 'fila_id': rnd.randint(1, total_productos), 'fecha': hace_una_hora,
+         'grupo_id': rnd.randint(1, ordenes) if tabla == 'orden_extintores' else None}
+        for tabla in (TABLAS[n % len(TABLAS)] for n in range(HISTORIAL_CAMBIOS))
+    ])
+    db.session.execute(insert(Trabajo.__table__), [{'tipo': 'lote_movimientos', 'estado': 'completado',
+                                                    'usuario_id': 1, 'resultado': {'ok': True}}])
+    db.session.commit()
+
+
+def rutas(app):
+    """Cada ruta GET de la app con VALORES en sus parámetros, seguida de las VARIANTES"""
+    adaptador = app.url_map.bind('localhost')
+    encontradas = []
+    for regla in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        if 'GET' not in regla.methods or regla.endpoint in RUTAS_EXCLUIDAS:
+            continue
+        faltantes = regla.arguments - set(VALORES)
+        if faltantes:
+            raise SystemExit(f'{regla.rule}: agregar {", ".join(sorted(faltantes))} a VALORES o la ruta a RUTAS_EXCLUIDAS')
+        encontradas.append(adaptador.build(regla.endpoint, {nombre: VALORES[nombre] for nombre in regla.arguments}))
+    return list(dict.fromkeys(encontradas + VARIANTES))
+
+
+def capturar_consultas(app, db):
+    from sqlalchemy import event
+    from consultas import PresupuestoConsultasExcedido
+
+    capturadas = []
+    excedidas = []
+    ruta_actual = {'valor': None}
+    hilo = threading.get_ident()
+
+    def antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+        if (ruta_actual['valor'] and threading.get_ident() == hilo and not executemany
+                and statement.lstrip().upper().startswith(SENTENCIAS)):
+            capturadas.append((ruta_actual['valor'], statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', antes_de_ejecutar)
+
+    cliente = app.test_client()
+    cliente.post('/login', data={'username': 'admin', 'password': 'admin123'})
+    pedidos = [(ruta, 'GET', {}) for ruta in rutas(app)] + [(ruta, 'POST', datos) for ruta, datos in ESCRITURAS]
+    for ruta, metodo, datos in pedidos:
+        ruta_actual['valor'] = ruta
+        try:
+            respuesta = cliente.open(ruta, method=metodo, **datos)
+            # Las rutas que responden en partes ejecutan sus consultas al leer el cuerpo
+            respuesta.get_data()
+            respuesta.close()
+        except PresupuestoConsultasExcedido as e:
+            excedidas.append(str(e))
+            continue
+        if respuesta.status_code >= 400:
+            print(f'ADVERTENCIA: {metodo} {ruta} respondió {respuesta.status_code}')
+    ruta_actual['valor'] = None
+
+    event.remove(db.engine, 'before_cursor_execute', antes_de_ejecutar)
+    return capturadas, excedidas
+
+
+def recorridos_completos(conexion, statement, parameters, tablas):
+    """Devuelve (plan, tablas recorridas completas) para una consulta"""
+    if conexion.dialect.name == 'sqlite':
+        filas = conexion.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+        plan = [fila[-1] for fila in filas]
+        patron = re.compile(r'^SCAN (?:TABLE )?(\w+)(.*)$')
+        completos = []
+        for detalle in plan:
+            coincidencia = patron.match(detalle)
+            if coincidencia and 'USING' not in coincidencia.group(2) and coincidencia.group(1) in tablas:
+                completos.append(coincidencia.group(1))
+    else:
+        filas = conexion.exec_driver_sql('EXPLAIN ' + statement, parameters).all()
+        plan = [fila[0] for fila in filas]
+        completos = [m.group(1) for linea in plan for m in [re.search(r'Seq Scan on (\w+)', linea)]
+                     if m and m.group(1) in tablas]
+    return plan, [t for t in completos if t not in TABLAS_PERMITIDAS]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verifica que las consultas de la app usen índices')
+    parser.add_argument('url', nargs='?', help='URL de una base de datos de prueba (se borra su contenido)')
+    parser.add_argument('--productos', type=int, default=20000)
+    parser.add_argument('--movimientos', type=int, default=1000000)
+    parser.add_argument('--destruir', action='store_true', help='Confirma que se puede borrar la base de la URL')
+    args = parser.parse_args()
+
+    if args.url and not args.destruir:
+        parser.error(f'{args.url} se borra por completo; repite con --destruir si es una base de prueba')
+
+    os.environ['DATABASE_URL'] = args.url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'planes.db')
+
+    from app import app, init_db
+    from models import db
+
+    with app.app_context():
+        db.drop_all()
+    init_db()
+
+    with app.app_context():
+        print(f'Poblando {args.productos} productos y {args.movimientos} movimientos...')
+        poblar(db, args.productos, args.movimientos)
+
+        from metricas_dashboard import reconstruir_resumen
+        from historico_stock import generar_snapshot
+        reconstruir_resumen()
+        generar_snapshot((datetime.utcnow() - timedelta(days=60)).date())
+        with db.engine.begin() as conexion:
+            conexion.exec_driver_sql('ANALYZE')
+
+        app.config['TESTING'] = True
+        app.config['PRESUPUESTO_CONSULTAS_ESTRICTO'] = True
+        consultas, excedidas = capturar_consultas(app, db)
+        tablas = set(db.metadata.tables)
+
+        fallas = 0
+        vistas = set()
+        with db.engine.connect() as conexion:
+            for ruta, statement, parameters in consultas:
+                if statement in vistas:
+                    continue
+                vistas.add(statement)
+                plan, completos = recorridos_completos(conexion, statement, parameters, tablas)
+                esperados = set().union(*(t for r, t in RECORRIDOS_ESPERADOS.items() if ruta.startswith(r)))
+                completos = [t for t in completos if t not in esperados]
+                if completos:
+                    fallas += 1
+                    print('-' * 60)
+                    print(f'RECORRIDO COMPLETO en {", ".join(completos)} (ruta {ruta})')
+                    print(' '.join(statement.split()))
+                    for linea in plan:
+                        print(f'    {linea}')
+
+    for mensaje in excedidas:
+        print(mensaje)
+
+    print('=' * 60)
+    print(f'Consultas analizadas: {len(vistas)} | Con recorrido completo: {fallas}')
+    print(f'Rutas sobre su presupuesto de consultas: {len(excedidas)}')
+    print('=' * 60)
+    sys.exit(1 if fallas or excedidas else 0)
+
+
+if __name__ == '__main__':
+    main()